@@ -4,11 +4,13 @@ Antia Platform Health and Authentication Testing
 Tests health endpoints, authentication, and panel APIs after preview URL change
 """
 
-import requests
+import asyncio
 import json
 import sys
 from typing import Dict, Any, Optional
 
+from harness import BaseTester
+
 # Configuration
 BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -21,72 +23,21 @@ TIPSTER_PASSWORD = "Tipster123!"
 CLIENT_EMAIL = "cliente@example.com"
 CLIENT_PASSWORD = "Client123!"
 
-class AntiaHealthTester:
+class AntiaHealthTester(BaseTester):
     def __init__(self):
-        self.session = requests.Session()
+        super().__init__(API_BASE)
         self.admin_token = None
         self.tipster_token = None
         self.client_token = None
         
-    def log(self, message: str, level: str = "INFO"):
-        """Log test messages"""
-        print(f"[{level}] {message}")
-        
-    def make_request(self, method: str, endpoint: str, data: Dict = None, 
-                    headers: Dict = None, token: str = None) -> requests.Response:
-        """Make HTTP request with proper headers"""
-        url = f"{API_BASE}{endpoint}"
-        
-        # Default headers
-        req_headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
-        # Add auth header if token provided
-        if token:
-            req_headers["Authorization"] = f"Bearer {token}"
-            
-        # Merge with provided headers
-        if headers:
-            req_headers.update(headers)
-            
-        self.log(f"Making {method} request to {url}")
-        if data:
-            self.log(f"Request data: {json.dumps(data, indent=2)}")
-            
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data if data else None,
-                headers=req_headers,
-                timeout=30
-            )
-            
-            self.log(f"Response status: {response.status_code}")
-            
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
-            except:
-                self.log(f"Response text: {response.text}")
-                
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {str(e)}", "ERROR")
-            raise
-
     # ===== HEALTH ENDPOINTS =====
     
-    def test_telegram_health(self) -> bool:
+    async def test_telegram_health(self) -> bool:
         """Test Telegram bot health endpoint"""
         self.log("=== Testing Telegram Health Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/health/telegram")
+            response = await self.make_request("GET", "/health/telegram")
             
             if response.status_code == 200:
                 health_data = response.json()
@@ -120,12 +71,12 @@ class AntiaHealthTester:
             self.log(f"❌ Telegram health test failed: {str(e)}", "ERROR")
             return False
 
-    def test_email_health(self) -> bool:
+    async def test_email_health(self) -> bool:
         """Test Email service health endpoint"""
         self.log("=== Testing Email Health Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/health/email")
+            response = await self.make_request("GET", "/health/email")
             
             if response.status_code == 200:
                 health_data = response.json()
@@ -157,17 +108,12 @@ class AntiaHealthTester:
 
     # ===== AUTHENTICATION TESTS =====
     
-    def test_admin_login(self) -> bool:
+    async def test_admin_login(self) -> bool:
         """Test admin authentication"""
         self.log("=== Testing Admin Authentication ===")
         
-        login_data = {
-            "email": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data)
+            response = await self.login("admin", ADMIN_EMAIL, ADMIN_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -198,17 +144,12 @@ class AntiaHealthTester:
             self.log(f"❌ Admin login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_login(self) -> bool:
+    async def test_tipster_login(self) -> bool:
         """Test tipster authentication"""
         self.log("=== Testing Tipster Authentication ===")
         
-        login_data = {
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data)
+            response = await self.login("tipster", TIPSTER_EMAIL, TIPSTER_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -239,17 +180,12 @@ class AntiaHealthTester:
             self.log(f"❌ Tipster login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_client_login(self) -> bool:
+    async def test_client_login(self) -> bool:
         """Test client authentication"""
         self.log("=== Testing Client Authentication ===")
         
-        login_data = {
-            "email": CLIENT_EMAIL,
-            "password": CLIENT_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data)
+            response = await self.login("client", CLIENT_EMAIL, CLIENT_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -282,7 +218,7 @@ class AntiaHealthTester:
 
     # ===== ADMIN PANEL TESTS =====
     
-    def test_admin_tipsters(self) -> bool:
+    async def test_admin_tipsters(self) -> bool:
         """Test admin tipsters endpoint"""
         if not self.admin_token:
             self.log("❌ No admin token available", "ERROR")
@@ -291,7 +227,7 @@ class AntiaHealthTester:
         self.log("=== Testing Admin Tipsters Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/admin/tipsters", token=self.admin_token)
+            response = await self.make_request("GET", "/admin/tipsters", token=self.admin_token)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -313,7 +249,7 @@ class AntiaHealthTester:
             self.log(f"❌ Admin tipsters test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_affiliate_houses(self) -> bool:
+    async def test_admin_affiliate_houses(self) -> bool:
         """Test admin affiliate houses endpoint"""
         if not self.admin_token:
             self.log("❌ No admin token available", "ERROR")
@@ -322,7 +258,7 @@ class AntiaHealthTester:
         self.log("=== Testing Admin Affiliate Houses Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/admin/affiliate/houses", token=self.admin_token)
+            response = await self.make_request("GET", "/admin/affiliate/houses", token=self.admin_token)
             
             if response.status_code == 200:
                 houses = response.json()
@@ -342,7 +278,7 @@ class AntiaHealthTester:
             self.log(f"❌ Admin affiliate houses test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_affiliate_referrals(self) -> bool:
+    async def test_admin_affiliate_referrals(self) -> bool:
         """Test admin affiliate referrals endpoint"""
         if not self.admin_token:
             self.log("❌ No admin token available", "ERROR")
@@ -351,7 +287,7 @@ class AntiaHealthTester:
         self.log("=== Testing Admin Affiliate Referrals Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/admin/affiliate/referrals", token=self.admin_token)
+            response = await self.make_request("GET", "/admin/affiliate/referrals", token=self.admin_token)
             
             if response.status_code == 200:
                 referrals = response.json()
@@ -365,7 +301,7 @@ class AntiaHealthTester:
             self.log(f"❌ Admin affiliate referrals test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_support_tickets(self) -> bool:
+    async def test_admin_support_tickets(self) -> bool:
         """Test admin support tickets endpoint"""
         if not self.admin_token:
             self.log("❌ No admin token available", "ERROR")
@@ -374,7 +310,7 @@ class AntiaHealthTester:
         self.log("=== Testing Admin Support Tickets Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/support/admin/tickets", token=self.admin_token)
+            response = await self.make_request("GET", "/support/admin/tickets", token=self.admin_token)
             
             if response.status_code == 200:
                 tickets = response.json()
@@ -394,7 +330,7 @@ class AntiaHealthTester:
 
     # ===== TIPSTER PANEL TESTS =====
     
-    def test_tipster_profile(self) -> bool:
+    async def test_tipster_profile(self) -> bool:
         """Test tipster profile endpoint"""
         if not self.tipster_token:
             self.log("❌ No tipster token available", "ERROR")
@@ -403,7 +339,7 @@ class AntiaHealthTester:
         self.log("=== Testing Tipster Profile Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/tipster/profile", token=self.tipster_token)
+            response = await self.make_request("GET", "/tipster/profile", token=self.tipster_token)
             
             if response.status_code == 200:
                 profile = response.json()
@@ -423,7 +359,7 @@ class AntiaHealthTester:
             self.log(f"❌ Tipster profile test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_products(self) -> bool:
+    async def test_tipster_products(self) -> bool:
         """Test tipster products endpoint"""
         if not self.tipster_token:
             self.log("❌ No tipster token available", "ERROR")
@@ -432,7 +368,7 @@ class AntiaHealthTester:
         self.log("=== Testing Tipster Products Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/products/my", token=self.tipster_token)
+            response = await self.make_request("GET", "/products/my", token=self.tipster_token)
             
             if response.status_code == 200:
                 products = response.json()
@@ -453,7 +389,7 @@ class AntiaHealthTester:
             self.log(f"❌ Tipster products test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_affiliate_referrals(self) -> bool:
+    async def test_tipster_affiliate_referrals(self) -> bool:
         """Test tipster affiliate referrals endpoint"""
         if not self.tipster_token:
             self.log("❌ No tipster token available", "ERROR")
@@ -462,7 +398,7 @@ class AntiaHealthTester:
         self.log("=== Testing Tipster Affiliate Referrals Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/affiliate/my-referrals", token=self.tipster_token)
+            response = await self.make_request("GET", "/affiliate/my-referrals", token=self.tipster_token)
             
             if response.status_code == 200:
                 referrals = response.json()
@@ -478,7 +414,7 @@ class AntiaHealthTester:
 
     # ===== CLIENT PANEL TESTS =====
     
-    def test_client_profile(self) -> bool:
+    async def test_client_profile(self) -> bool:
         """Test client profile endpoint"""
         if not self.client_token:
             self.log("❌ No client token available", "ERROR")
@@ -487,7 +423,7 @@ class AntiaHealthTester:
         self.log("=== Testing Client Profile Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/client/profile", token=self.client_token)
+            response = await self.make_request("GET", "/client/profile", token=self.client_token)
             
             if response.status_code == 200:
                 profile = response.json()
@@ -506,7 +442,7 @@ class AntiaHealthTester:
             self.log(f"❌ Client profile test failed: {str(e)}", "ERROR")
             return False
 
-    def test_client_purchases(self) -> bool:
+    async def test_client_purchases(self) -> bool:
         """Test client purchases endpoint"""
         if not self.client_token:
             self.log("❌ No client token available", "ERROR")
@@ -515,7 +451,7 @@ class AntiaHealthTester:
         self.log("=== Testing Client Purchases Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/client/purchases", token=self.client_token)
+            response = await self.make_request("GET", "/client/purchases", token=self.client_token)
             
             if response.status_code == 200:
                 purchases = response.json()
@@ -529,7 +465,7 @@ class AntiaHealthTester:
             self.log(f"❌ Client purchases test failed: {str(e)}", "ERROR")
             return False
 
-    def test_client_support_tickets(self) -> bool:
+    async def test_client_support_tickets(self) -> bool:
         """Test client support tickets endpoint"""
         if not self.client_token:
             self.log("❌ No client token available", "ERROR")
@@ -538,7 +474,7 @@ class AntiaHealthTester:
         self.log("=== Testing Client Support Tickets Endpoint ===")
         
         try:
-            response = self.make_request("GET", "/support/tickets/my", token=self.client_token)
+            response = await self.make_request("GET", "/support/tickets/my", token=self.client_token)
             
             if response.status_code == 200:
                 tickets = response.json()
@@ -552,44 +488,42 @@ class AntiaHealthTester:
             self.log(f"❌ Client support tickets test failed: {str(e)}", "ERROR")
             return False
 
-    def run_all_tests(self) -> Dict[str, bool]:
+    async def run_all_tests(self) -> Dict[str, bool]:
         """Run all tests and return results"""
         self.log("🚀 Starting Antia Platform Health and Authentication Tests")
         self.log(f"Testing against: {BASE_URL}")
         
         results = {}
         
-        # Health Tests
-        results["telegram_health"] = self.test_telegram_health()
-        results["email_health"] = self.test_email_health()
-        
-        # Authentication Tests
-        results["admin_login"] = self.test_admin_login()
-        results["tipster_login"] = self.test_tipster_login()
-        results["client_login"] = self.test_client_login()
-        
-        # Admin Panel Tests
-        results["admin_tipsters"] = self.test_admin_tipsters()
-        results["admin_affiliate_houses"] = self.test_admin_affiliate_houses()
-        results["admin_affiliate_referrals"] = self.test_admin_affiliate_referrals()
-        results["admin_support_tickets"] = self.test_admin_support_tickets()
-        
-        # Tipster Panel Tests
-        results["tipster_profile"] = self.test_tipster_profile()
-        results["tipster_products"] = self.test_tipster_products()
-        results["tipster_affiliate_referrals"] = self.test_tipster_affiliate_referrals()
+        # Health and Authentication Tests (independent - run together)
+        results.update(await self.run_concurrently({
+            "telegram_health": self.test_telegram_health,
+            "email_health": self.test_email_health,
+            "admin_login": self.test_admin_login,
+            "tipster_login": self.test_tipster_login,
+            "client_login": self.test_client_login,
+        }))
         
-        # Client Panel Tests
-        results["client_profile"] = self.test_client_profile()
-        results["client_purchases"] = self.test_client_purchases()
-        results["client_support_tickets"] = self.test_client_support_tickets()
+        # Admin, Tipster and Client Panel Tests (each only needs its own token)
+        results.update(await self.run_concurrently({
+            "admin_tipsters": self.test_admin_tipsters,
+            "admin_affiliate_houses": self.test_admin_affiliate_houses,
+            "admin_affiliate_referrals": self.test_admin_affiliate_referrals,
+            "admin_support_tickets": self.test_admin_support_tickets,
+            "tipster_profile": self.test_tipster_profile,
+            "tipster_products": self.test_tipster_products,
+            "tipster_affiliate_referrals": self.test_tipster_affiliate_referrals,
+            "client_profile": self.test_client_profile,
+            "client_purchases": self.test_client_purchases,
+            "client_support_tickets": self.test_client_support_tickets,
+        }))
         
         return results
 
 def main():
     """Main test execution"""
     tester = AntiaHealthTester()
-    results = tester.run_all_tests()
+    results = tester.run(tester.run_all_tests)
     
     # Summary
     print("\n" + "="*60)
@@ -1,12 +1,83 @@
-import { Injectable, Logger } from '@nestjs/common';
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
 import { PrismaService } from '../prisma/prisma.service';
 
+export interface MonitoredMessage {
+  channelId: string;
+  channelTitle?: string;
+  messageId: number;
+  senderUserId?: string;
+  senderUsername?: string;
+  senderFirstName?: string;
+  senderLastName?: string;
+  messageType: string;
+  textContent?: string;
+  caption?: string;
+  replyToMessageId?: number;
+  forwardFromId?: string;
+  telegramDate: Date;
+}
+
+/**
+ * AdminChannelMonitorService - Monitoreo de canales/grupos de Telegram
+ *
+ * Los ids de los canales monitoreados se guardan en un Set en memoria: cada channel_post
+ * o mensaje de grupo se filtra sin consultar Mongo. toggleMonitoring lo actualiza al
+ * momento y se recarga periódicamente para recoger cambios hechos desde otras instancias.
+ * Los mensajes capturados se acumulan y se escriben por lotes (un insert y un $inc por
+ * canal por lote).
+ */
 @Injectable()
-export class AdminChannelMonitorService {
+export class AdminChannelMonitorService implements OnModuleInit, OnModuleDestroy {
   private readonly logger = new Logger(AdminChannelMonitorService.name);
 
+  private readonly refreshMs = Number(process.env.CHANNEL_MONITOR_REFRESH_MS) || 60 * 1000;
+  private readonly flushMs = Number(process.env.CHANNEL_MESSAGE_FLUSH_MS) || 2000;
+  private readonly batchSize = Number(process.env.CHANNEL_MESSAGE_BATCH_SIZE) || 100;
+
+  private monitored = new Set<string>();
+  private loaded: Promise<void> | null = null;
+  private pending: MonitoredMessage[] = [];
+  private flushing: Promise<void> | null = null;
+  private refreshTimer: NodeJS.Timeout | null = null;
+  private flushTimer: NodeJS.Timeout | null = null;
+
   constructor(private prisma: PrismaService) {}
 
+  onModuleInit() {
+    this.loaded = this.loadMonitoredChannels();
+    this.refreshTimer = setInterval(() => {
+      this.loadMonitoredChannels();
+    }, this.refreshMs);
+    this.refreshTimer.unref();
+    this.flushTimer = setInterval(() => {
+      this.flushMessages();
+    }, this.flushMs);
+    this.flushTimer.unref();
+  }
+
+  async onModuleDestroy() {
+    if (this.refreshTimer) clearInterval(this.refreshTimer);
+    if (this.flushTimer) clearInterval(this.flushTimer);
+    this.refreshTimer = null;
+    this.flushTimer = null;
+    await this.flushMessages();
+  }
+
+  /**
+   * Recargar el Set de canales monitoreados; si falla se conserva el anterior
+   */
+  private async loadMonitoredChannels() {
+    try {
+      const configs = await this.prisma.channelMonitorConfig.findMany({
+        where: { isMonitoring: true },
+        select: { channelId: true },
+      });
+      this.monitored = new Set(configs.map((config) => config.channelId));
+    } catch (error) {
+      this.logger.error('Failed to load monitored channels:', error.message);
+    }
+  }
+
   /**
    * Get all channels that can be monitored (from detected channels)
    * with their monitoring status
@@ -191,6 +262,12 @@ export class AdminChannelMonitorService {
       });
     }
 
+    if (enable) {
+      this.monitored.add(channelId);
+    } else {
+      this.monitored.delete(channelId);
+    }
+
     this.logger.log(`📡 Monitoring ${enable ? 'ENABLED' : 'DISABLED'} for channel: ${channel.channelTitle} (${channelId}) by ${adminEmail}`);
 
     return {
@@ -202,89 +279,108 @@ export class AdminChannelMonitorService {
   }
 
   /**
-   * Check if a channel is being monitored (used by telegram service)
+   * Check if a channel is being monitored (used by telegram service), from memory
    */
   async isChannelMonitored(channelId: string): Promise<boolean> {
-    const config = await this.prisma.channelMonitorConfig.findFirst({
-      where: { channelId },
-      select: { isMonitoring: true },
-    });
-    return config?.isMonitoring || false;
+    if (this.loaded) await this.loaded;
+    return this.monitored.has(channelId);
   }
 
   /**
-   * Save a message from a monitored channel
+   * Save a message from a monitored channel. Se encola y se escribe en el siguiente lote;
+   * devuelve false si el canal no está monitoreado.
    */
-  async saveMessage(data: {
-    channelId: string;
-    channelTitle?: string;
-    messageId: number;
-    senderUserId?: string;
-    senderUsername?: string;
-    senderFirstName?: string;
-    senderLastName?: string;
-    messageType: string;
-    textContent?: string;
-    caption?: string;
-    replyToMessageId?: number;
-    forwardFromId?: string;
-    telegramDate: Date;
-  }) {
-    try {
-      // Check if monitoring is enabled
-      const isMonitored = await this.isChannelMonitored(data.channelId);
-      if (!isMonitored) {
-        return null;
-      }
-
-      // Check for duplicate
-      const existing = await this.prisma.channelMessage.findFirst({
-        where: {
-          channelId: data.channelId,
-          messageId: data.messageId,
-        },
-      });
+  async saveMessage(data: MonitoredMessage): Promise<boolean> {
+    if (!(await this.isChannelMonitored(data.channelId))) {
+      return false;
+    }
 
-      if (existing) {
-        return existing;
-      }
+    this.pending.push(data);
+    if (this.pending.length >= this.batchSize) {
+      this.flushMessages();
+    }
+    return true;
+  }
 
-      // Save the message
-      const message = await this.prisma.channelMessage.create({
-        data: {
-          channelId: data.channelId,
-          channelTitle: data.channelTitle,
-          messageId: data.messageId,
-          senderUserId: data.senderUserId,
-          senderUsername: data.senderUsername,
-          senderFirstName: data.senderFirstName,
-          senderLastName: data.senderLastName,
-          messageType: data.messageType,
-          textContent: data.textContent,
-          caption: data.caption,
-          replyToMessageId: data.replyToMessageId,
-          forwardFromId: data.forwardFromId,
-          telegramDate: data.telegramDate,
-        },
+  /**
+   * Escribir los mensajes acumulados: descarta los ya guardados (reentregas), inserta el
+   * lote y suma message_count por canal. Un lote fallido se registra y se descarta: el
+   * monitoreo no debe interrumpir el bot.
+   */
+  async flushMessages(): Promise<void> {
+    if (this.flushing) {
+      await this.flushing;
+    }
+    if (this.pending.length === 0) return;
+
+    const batch = this.pending;
+    this.pending = [];
+    this.flushing = this.writeBatch(batch)
+      .catch((error) => {
+        this.logger.error(`Error saving ${batch.length} monitored messages: ${error.message}`);
+      })
+      .finally(() => {
+        this.flushing = null;
       });
+    await this.flushing;
+  }
 
-      // Update message count using raw command
-      await this.prisma.$runCommandRaw({
-        update: 'channel_monitor_configs',
-        updates: [
-          {
-            q: { channel_id: data.channelId },
-            u: { $inc: { message_count: 1 } },
-          },
-        ],
+  private async writeBatch(batch: MonitoredMessage[]) {
+    const keyOf = (channelId: string, messageId: number) => `${channelId}:${messageId}`;
+
+    // Pares exactos (los message_id son por chat y se repiten entre canales). Agrupado por
+    // par, el resultado no pasa del tamaño del lote aunque ya haya duplicados guardados,
+    // así que cabe entero en el primer lote del cursor.
+    const existing = (await this.prisma.$runCommandRaw({
+      aggregate: 'channel_messages',
+      pipeline: [
+        { $match: { $or: batch.map((m) => ({ channel_id: m.channelId, message_id: m.messageId })) } },
+        { $group: { _id: { channel_id: '$channel_id', message_id: '$message_id' } } },
+      ],
+      cursor: { batchSize: batch.length },
+    })) as any;
+    const seen = new Set<string>(
+      (existing.cursor?.firstBatch || []).map((doc: any) => keyOf(doc._id.channel_id, doc._id.message_id)),
+    );
+
+    const now = new Date().toISOString();
+    const documents = [];
+    const counts = new Map<string, number>();
+    for (const message of batch) {
+      const key = keyOf(message.channelId, message.messageId);
+      if (seen.has(key)) continue;
+      seen.add(key);
+
+      documents.push({
+        channel_id: message.channelId,
+        channel_title: message.channelTitle || null,
+        message_id: message.messageId,
+        sender_user_id: message.senderUserId || null,
+        sender_username: message.senderUsername || null,
+        sender_first_name: message.senderFirstName || null,
+        sender_last_name: message.senderLastName || null,
+        message_type: message.messageType,
+        text_content: message.textContent || null,
+        caption: message.caption || null,
+        reply_to_message_id: message.replyToMessageId || null,
+        forward_from_id: message.forwardFromId || null,
+        telegram_date: { $date: message.telegramDate.toISOString() },
+        captured_at: { $date: now },
       });
-
-      this.logger.debug(`💬 Saved message ${data.messageId} from channel ${data.channelId}`);
-      return message;
-    } catch (error) {
-      this.logger.error(`Error saving message: ${error.message}`);
-      return null;
+      counts.set(message.channelId, (counts.get(message.channelId) || 0) + 1);
     }
+    if (documents.length === 0) return;
+
+    await this.prisma.$runCommandRaw({ insert: 'channel_messages', documents, ordered: false });
+    await this.prisma.$runCommandRaw({
+      update: 'channel_monitor_configs',
+      updates: [...counts].map(([channelId, count]) => ({
+        q: { channel_id: channelId },
+        u: { $inc: { message_count: count } },
+      })),
+    });
+
+    this.logger.debug(`💬 Saved ${documents.length} monitored messages from ${counts.size} channels`);
   }
 
   /**
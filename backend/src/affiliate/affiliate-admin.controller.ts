@@ -25,7 +25,11 @@ import {
   MarkPayoutPaidDto,
   StandardCsvRow,
 } from './dto';
-import * as csv from 'csv-parse/sync';
+import { parse } from 'csv-parse';
+import { Readable } from 'stream';
+
+// Trozos con los que se alimenta el parser, para que lea al ritmo de la importación
+const CSV_READ_CHUNK_BYTES = 64 * 1024;
 
 @Controller('admin/affiliate')
 @UseGuards(JwtAuthGuard)
@@ -129,19 +133,6 @@ export class AffiliateAdminController {
       }
     }
 
-    // Parse CSV
-    const content = file.buffer.toString('utf-8');
-    let records: any[];
-    try {
-      records = csv.parse(content, {
-        columns: true,
-        skip_empty_lines: true,
-        trim: true,
-      });
-    } catch (error: any) {
-      throw new BadRequestException('Error al parsear CSV: ' + error.message);
-    }
-
     // Map columns to standard format
     const mapping = columnMapping || {
       tipster_tracking_id: 'tipster_tracking_id',
@@ -153,25 +144,55 @@ export class AffiliateAdminController {
       currency: 'currency',
     };
 
-    const standardRows: StandardCsvRow[] = records.map((row) => ({
-      tipster_tracking_id: row[mapping.tipster_tracking_id] || row.tipster_tracking_id || row.subid,
-      event_type: (row[mapping.event_type] || row.event_type || 'REGISTER').toUpperCase(),
-      status: (row[mapping.status] || row.status || 'PENDING').toUpperCase(),
-      occurred_at:
-        row[mapping.occurred_at] || row.occurred_at || row.date || new Date().toISOString(),
-      external_ref_id: row[mapping.external_ref_id] || row.external_ref_id,
-      amount: row[mapping.amount] ? parseFloat(row[mapping.amount]) : undefined,
-      currency: row[mapping.currency] || row.currency || 'EUR',
-    }));
+    // Parse CSV en streaming: cada fila se mapea e importa a medida que se lee
+    const buffer = file.buffer;
+    const parser = Readable.from(
+      (function* () {
+        for (let start = 0; start < buffer.length; start += CSV_READ_CHUNK_BYTES) {
+          yield buffer.subarray(start, start + CSV_READ_CHUNK_BYTES);
+        }
+      })(),
+    ).pipe(
+      parse({
+        columns: true,
+        skip_empty_lines: true,
+        trim: true,
+      }),
+    );
+
+    async function* standardRows(): AsyncGenerator<StandardCsvRow> {
+      try {
+        for await (const row of parser) {
+          yield {
+            tipster_tracking_id: row[mapping.tipster_tracking_id] || row.tipster_tracking_id || row.subid,
+            event_type: (row[mapping.event_type] || row.event_type || 'REGISTER').toUpperCase(),
+            status: (row[mapping.status] || row.status || 'PENDING').toUpperCase(),
+            occurred_at:
+              row[mapping.occurred_at] || row.occurred_at || row.date || new Date().toISOString(),
+            external_ref_id: row[mapping.external_ref_id] || row.external_ref_id,
+            amount: row[mapping.amount] ? parseFloat(row[mapping.amount]) : undefined,
+            currency: row[mapping.currency] || row.currency || 'EUR',
+          };
+        }
+      } catch (error: any) {
+        throw new BadRequestException('Error al parsear CSV: ' + error.message);
+      }
+    }
+
+    // Filas estimadas para el progreso del batch (una por línea, sin la cabecera)
+    let lines = 0;
+    for (let i = buffer.indexOf(10); i !== -1; i = buffer.indexOf(10, i + 1)) lines++;
+    const expectedRows = Math.max(0, lines - (buffer[buffer.length - 1] === 10 ? 1 : 0));
 
     // Import
     return this.affiliateService.importCsv(
       houseId,
       periodMonth,
-      standardRows,
+      standardRows(),
       file.originalname,
       admin.id,
       columnMapping,
+      expectedRows,
     );
   }
 
@@ -1,6 +1,9 @@
 import { Module } from '@nestjs/common';
 import { AffiliateService } from './affiliate.service';
 import { LandingService } from './landing.service';
+import { ClickEventBufferService } from './click-event-buffer.service';
+import { BettingHouseCatalogService } from './betting-house-catalog.service';
+import { LandingMetricsRollupService } from './landing-metrics-rollup.service';
 import { PromotionService } from './promotion.service';
 import { AffiliateAdminController } from './affiliate-admin.controller';
 import { AffiliateTipsterController } from './affiliate-tipster.controller';
@@ -25,7 +28,14 @@ import { PrismaModule } from '../prisma/prisma.module';
     PromotionAdminController,
     PromotionPublicController,
   ],
-  providers: [AffiliateService, LandingService, PromotionService],
-  exports: [AffiliateService, LandingService, PromotionService],
+  providers: [
+    AffiliateService,
+    LandingService,
+    PromotionService,
+    ClickEventBufferService,
+    BettingHouseCatalogService,
+    LandingMetricsRollupService,
+  ],
+  exports: [AffiliateService, LandingService, PromotionService, BettingHouseCatalogService],
 })
 export class AffiliateModule {}
@@ -9,10 +9,20 @@ import {
   StandardCsvRow,
   MarkPayoutPaidDto,
 } from './dto';
+import { LandingService } from './landing.service';
+import { BettingHouseCatalogService } from './betting-house-catalog.service';
+
+// CSV import: conversions written per bulk insert, and errors kept on the batch document
+const IMPORT_CHUNK_SIZE = 1000;
+const IMPORT_MAX_STORED_ERRORS = 1000;
 
 @Injectable()
 export class AffiliateService {
-  constructor(private prisma: PrismaService) {}
+  constructor(
+    private prisma: PrismaService,
+    private landingService: LandingService,
+    private houseCatalog: BettingHouseCatalogService,
+  ) {}
 
   // ==================== BETTING HOUSES ====================
 
@@ -55,6 +65,8 @@ export class AffiliateService {
       ],
     });
 
+    await this.houseCatalog.refresh();
+
     return {
       id: newId.toHexString(),
       name: dto.name,
@@ -117,6 +129,10 @@ export class AffiliateService {
       update: { $set: updateFields },
     });
 
+    // Nombre, logo, estado o países de la casa se muestran en las landings públicas
+    await this.houseCatalog.refresh();
+    this.landingService.invalidatePublicLandings();
+
     return this.getBettingHouse(id);
   }
 
@@ -601,60 +617,129 @@ export class AffiliateService {
   async importCsv(
     houseId: string,
     periodMonth: string,
-    rows: StandardCsvRow[],
+    rows: Iterable<StandardCsvRow> | AsyncIterable<StandardCsvRow>,
     fileName: string,
     adminId: string,
     customMapping?: Record<string, string>,
+    expectedRows = 0,
   ) {
-    const house = await this.prisma.bettingHouse.findUnique({ where: { id: houseId } });
+    const house = await this.houseCatalog.getById(houseId);
     if (!house) {
       throw new NotFoundException('Casa de apuestas no encontrada');
     }
 
-    // Create import batch
+    // Create import batch (totalRows is an estimate until the stream ends)
     const batch = await this.prisma.affiliateImportBatch.create({
       data: {
         houseId,
         periodMonth,
         fileName,
-        totalRows: rows.length,
+        totalRows: expectedRows,
         columnMapping: customMapping || house.csvColumnMapping,
         importedBy: adminId,
       },
     });
 
+    // Prefetch the house's links once; same match rule as the old per-row findFirst
+    const links = await this.prisma.tipsterAffiliateLink.findMany({ where: { houseId } });
+    const linksByTrackingId = new Map<string, (typeof links)[number] | null>();
+    const findLink = (trackingId: string) => {
+      if (!trackingId) return null;
+      let link = linksByTrackingId.get(trackingId);
+      if (link === undefined) {
+        link =
+          links.find((l) => l.tipsterId === trackingId || l.redirectCode.includes(trackingId)) || null;
+        linksByTrackingId.set(trackingId, link);
+      }
+      return link;
+    };
+
+    let totalRows = 0;
     let processedRows = 0;
     let errorRows = 0;
     const errors: any[] = [];
+    const addError = (row: number, error: string) => {
+      errorRows++;
+      if (errors.length < IMPORT_MAX_STORED_ERRORS) errors.push({ row, error });
+    };
 
-    for (let i = 0; i < rows.length; i++) {
-      const row = rows[i];
+    let chunk: { row: number; linkId: string | null; data: any }[] = [];
+
+    const flushChunk = async () => {
+      if (!chunk.length) return;
+      const pending = chunk;
+      chunk = [];
+
+      let inserted = pending;
       try {
-        // Find tipster by tracking ID (subid)
-        const tipsterLink = await this.prisma.tipsterAffiliateLink.findFirst({
-          where: {
-            houseId,
-            OR: [
-              { tipsterId: row.tipster_tracking_id },
-              { redirectCode: { contains: row.tipster_tracking_id } },
-            ],
-          },
+        await this.prisma.affiliateConversion.createMany({ data: pending.map((p) => p.data) });
+      } catch {
+        // Retry row by row to find the failing rows; ids are preset, so rows the bulk insert
+        // already wrote come back as duplicates and count as inserted
+        inserted = [];
+        for (const p of pending) {
+          try {
+            await this.prisma.affiliateConversion.create({ data: p.data });
+            inserted.push(p);
+          } catch (error: any) {
+            if (error.code === 'P2002') {
+              inserted.push(p);
+            } else {
+              addError(p.row, error.message);
+            }
+          }
+        }
+      }
+      processedRows += inserted.length;
+
+      // Approved conversions with a known tipster: one $inc per link and chunk
+      const referrals = new Map<string, number>();
+      for (const p of inserted) {
+        if (p.linkId) referrals.set(p.linkId, (referrals.get(p.linkId) || 0) + 1);
+      }
+      if (referrals.size) {
+        const now = new Date().toISOString();
+        await this.prisma.$runCommandRaw({
+          update: 'tipster_affiliate_links',
+          updates: [...referrals.entries()].map(([linkId, count]) => ({
+            q: { _id: { $oid: linkId } },
+            u: { $inc: { total_referrals: count }, $set: { updated_at: { $date: now } } },
+          })),
+          ordered: false,
         });
+      }
 
-        const tipsterId = tipsterLink?.tipsterId || null;
+      // Progress for admins watching the batch
+      await this.prisma.affiliateImportBatch.update({
+        where: { id: batch.id },
+        data: { processedRows, errorRows, totalRows: Math.max(totalRows, expectedRows) },
+      });
+    };
 
-        // Create conversion record
-        await this.prisma.affiliateConversion.create({
+    try {
+      for await (const row of rows) {
+        totalRows++;
+        const occurredAt = new Date(row.occurred_at);
+        if (isNaN(occurredAt.getTime())) {
+          addError(totalRows, `Invalid occurred_at: ${row.occurred_at}`);
+          continue;
+        }
+
+        const tipsterLink = findLink(row.tipster_tracking_id);
+        chunk.push({
+          row: totalRows,
+          linkId: row.status === 'APPROVED' && tipsterLink ? tipsterLink.id : null,
           data: {
+            id: new ObjectId().toHexString(),
             houseId,
-            tipsterId,
+            tipsterId: tipsterLink?.tipsterId || null,
             externalRefId: row.external_ref_id,
             tipsterTrackingId: row.tipster_tracking_id,
             eventType: row.event_type,
             status: row.status,
             amountCents: row.amount ? Math.round(row.amount * 100) : null,
             currency: row.currency,
-            occurredAt: new Date(row.occurred_at),
+            occurredAt,
             importBatchId: batch.id,
             rawData: row as any,
             // If approved, calculate commission
@@ -663,19 +748,19 @@ export class AffiliateService {
           },
         });
 
-        // If approved and tipster found, update referral count
-        if (row.status === 'APPROVED' && tipsterLink) {
-          await this.prisma.tipsterAffiliateLink.update({
-            where: { id: tipsterLink.id },
-            data: { totalReferrals: { increment: 1 } },
-          });
+        if (chunk.length >= IMPORT_CHUNK_SIZE) {
+          await flushChunk();
         }
-
-        processedRows++;
-      } catch (error: any) {
-        errorRows++;
-        errors.push({ row: i + 1, error: error.message });
       }
+      await flushChunk();
+    } catch (error: any) {
+      // Unreadable CSV or database down: keep what was imported and mark the batch as failed
+      addError(totalRows + 1, error.message);
+      await this.prisma.affiliateImportBatch.update({
+        where: { id: batch.id },
+        data: { status: 'FAILED', totalRows, processedRows, errorRows, errors, completedAt: new Date() },
+      });
+      throw error;
     }
 
     // Update batch status
@@ -683,6 +768,7 @@ export class AffiliateService {
       where: { id: batch.id },
       data: {
         status: 'COMPLETED',
+        totalRows,
         processedRows,
         errorRows,
         errors: errors.length > 0 ? errors : null,
@@ -692,7 +778,7 @@ export class AffiliateService {
 
     return {
       batchId: batch.id,
-      totalRows: rows.length,
+      totalRows,
       processedRows,
       errorRows,
       errors: errors.slice(0, 10), // Return first 10 errors
@@ -708,15 +794,11 @@ export class AffiliateService {
     });
 
     // Enrich with house names
-    const houseIds = [...new Set(batches.map((b) => b.houseId))];
-    const houses = await this.prisma.bettingHouse.findMany({
-      where: { id: { in: houseIds } },
-    });
-    const housesMap = new Map(houses.map((h) => [h.id, h.name]));
+    const { byId: housesMap } = await this.houseCatalog.current();
 
     return batches.map((b) => ({
       ...b,
-      houseName: housesMap.get(b.houseId) || 'Unknown',
+      houseName: housesMap.get(b.houseId)?.name || 'Unknown',
     }));
   }
 
@@ -734,8 +816,7 @@ export class AffiliateService {
     });
 
     // Group by house
-    const houses = await this.prisma.bettingHouse.findMany();
-    const housesMap = new Map(houses.map((h) => [h.id, h]));
+    const { byId: housesMap } = await this.houseCatalog.current();
 
     const byHouse: Record<string, any> = {};
     for (const conv of conversions) {
@@ -814,8 +895,7 @@ export class AffiliateService {
     });
 
     // Get houses for names
-    const houses = await this.prisma.bettingHouse.findMany();
-    const housesMap = new Map(houses.map((h) => [h.id, h]));
+    const { byId: housesMap } = await this.houseCatalog.current();
 
     // Get all landing_click_events for this tipster to map conversions to campaigns
     const allClicksResult = (await this.prisma.$runCommandRaw({
@@ -1155,8 +1235,7 @@ export class AffiliateService {
     });
 
     // Get houses and tipsters for mapping
-    const houses = await this.prisma.bettingHouse.findMany();
-    const housesMap = new Map(houses.map((h) => [h.id, h]));
+    const { houses, byId: housesMap } = await this.houseCatalog.current();
 
     const tipstersResult = (await this.prisma.$runCommandRaw({
       find: 'tipster_profiles',
@@ -1384,8 +1463,7 @@ export class AffiliateService {
     });
 
     // Get houses for mapping
-    const houses = await this.prisma.bettingHouse.findMany();
-    const housesMap = new Map(houses.map((h) => [h.id, h]));
+    const { byId: housesMap } = await this.houseCatalog.current();
 
     // Get landings for mapping (tipster's campaigns)
     const landingsResult = (await this.prisma.$runCommandRaw({
@@ -1536,9 +1614,7 @@ export class AffiliateService {
     // Find the house
     let house: any = null;
     if (houseSlug) {
-      house = await this.prisma.bettingHouse.findFirst({
-        where: { slug: houseSlug.toLowerCase() },
-      });
+      house = await this.houseCatalog.getBySlug(houseSlug);
     }
 
     // Calculate commission
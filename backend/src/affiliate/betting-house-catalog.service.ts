@@ -0,0 +1,189 @@
+import { Injectable, Logger } from '@nestjs/common';
+import { PrismaService } from '../prisma/prisma.service';
+
+export interface CatalogHouse {
+  id: string;
+  name: string;
+  slug: string;
+  logoUrl: string | null;
+  logoBgColor: string | null;
+  status: string;
+  masterAffiliateUrl: string;
+  trackingParamName: string;
+  commissionPerReferralCents: number;
+  allowedCountries: string[];
+  blockedCountries: string[];
+  csvColumnMapping: any;
+  description: string | null;
+  websiteUrl: string | null;
+  createdAt: any;
+}
+
+interface CatalogSnapshot {
+  version: number;
+  loadedAt: number;
+  houses: CatalogHouse[];
+  byId: Map<string, CatalogHouse>;
+  bySlug: Map<string, CatalogHouse>;
+  // Casas activas por país, calculado bajo demanda para cada versión
+  byCountry: Map<string, CatalogHouse[]>;
+}
+
+/**
+ * BettingHouseCatalogService - Catálogo de casas de apuestas en memoria
+ *
+ * Las casas cambian solo desde el panel de admin, pero se leen en cada click, landing
+ * pública y métrica. El catálogo completo se carga una vez y se indexa por id (string u
+ * ObjectId, indistintamente), slug y país. Cada recarga crea una versión nueva que se
+ * sustituye de golpe, así que un lector nunca ve un catálogo a medio construir.
+ *
+ * AffiliateService llama a refresh() tras crear o editar una casa; además cada
+ * HOUSE_CATALOG_TTL_MS se recarga en segundo plano para recoger cambios de otras instancias.
+ */
+@Injectable()
+export class BettingHouseCatalogService {
+  private readonly logger = new Logger(BettingHouseCatalogService.name);
+
+  private readonly ttlMs = Number(process.env.HOUSE_CATALOG_TTL_MS) || 300000;
+  // Un id desconocido (casa recién creada en otra instancia) fuerza una recarga, como mucho una cada 10s
+  private readonly missRefreshMs = 10000;
+
+  private snapshot: CatalogSnapshot | null = null;
+  private loading: Promise<CatalogSnapshot> | null = null;
+  // Número de la última carga iniciada; una carga solo se publica si es más nueva que la vigente
+  private loadSequence = 0;
+
+  constructor(private prisma: PrismaService) {}
+
+  get version() {
+    return this.snapshot?.version || 0;
+  }
+
+  /**
+   * Catálogo vigente. Solo consulta Mongo la primera vez; si ha caducado se devuelve
+   * igualmente y se recarga en segundo plano.
+   */
+  async current(): Promise<CatalogSnapshot> {
+    if (!this.snapshot) {
+      return this.loading || this.refresh();
+    }
+    if (Date.now() - this.snapshot.loadedAt > this.ttlMs && !this.loading) {
+      this.refresh().catch((error) => this.logger.error('House catalog refresh failed:', error.message));
+    }
+    return this.snapshot;
+  }
+
+  /**
+   * Recargar el catálogo desde Mongo (tras crear o editar una casa)
+   */
+  async refresh(): Promise<CatalogSnapshot> {
+    const sequence = ++this.loadSequence;
+    const load = this.load(sequence).finally(() => {
+      if (this.loading === load) {
+        this.loading = null;
+      }
+    });
+    this.loading = load;
+    return load;
+  }
+
+  async getAll(includeInactive = false): Promise<CatalogHouse[]> {
+    const { houses } = await this.current();
+    return includeInactive ? houses : houses.filter((h) => h.status === 'ACTIVE');
+  }
+
+  async getById(id: string): Promise<CatalogHouse | null> {
+    if (!id) return null;
+    const house = (await this.current()).byId.get(id);
+    if (house) return house;
+    return (await this.refreshOnMiss())?.byId.get(id) || null;
+  }
+
+  async getBySlug(slug: string): Promise<CatalogHouse | null> {
+    if (!slug) return null;
+    const key = slug.toLowerCase();
+    const house = (await this.current()).bySlug.get(key);
+    if (house) return house;
+    return (await this.refreshOnMiss())?.bySlug.get(key) || null;
+  }
+
+  /**
+   * Casas activas con esos ids, en el orden pedido y sin repetir
+   */
+  async getActiveByIds(ids: string[]): Promise<CatalogHouse[]> {
+    const { byId } = await this.current();
+    const houses: CatalogHouse[] = [];
+    for (const id of new Set(ids)) {
+      const house = byId.get(id);
+      if (house && house.status === 'ACTIVE') houses.push(house);
+    }
+    return houses;
+  }
+
+  /**
+   * Casas activas que operan en un país (allowed_countries / blocked_countries)
+   */
+  async getForCountry(countryCode: string): Promise<CatalogHouse[]> {
+    const snapshot = await this.current();
+    let houses = snapshot.byCountry.get(countryCode);
+    if (!houses) {
+      houses = snapshot.houses.filter((h) => {
+        if (h.status !== 'ACTIVE') return false;
+        if (h.allowedCountries.length > 0 && !h.allowedCountries.includes(countryCode)) return false;
+        return !h.blockedCountries.includes(countryCode);
+      });
+      snapshot.byCountry.set(countryCode, houses);
+    }
+    return houses;
+  }
+
+  private async refreshOnMiss(): Promise<CatalogSnapshot | null> {
+    if (Date.now() - this.snapshot.loadedAt < this.missRefreshMs) return null;
+    return this.loading || this.refresh();
+  }
+
+  private async load(sequence: number): Promise<CatalogSnapshot> {
+    const result = (await this.prisma.$runCommandRaw({
+      find: 'betting_houses',
+      filter: {},
+      sort: { name: 1 },
+      batchSize: 10000,
+    })) as any;
+
+    const houses: CatalogHouse[] = (result.cursor?.firstBatch || []).map((h: any) =>
+      Object.freeze({
+        id: h._id.$oid || h._id.toString?.() || h._id,
+        name: h.name,
+        slug: h.slug,
+        logoUrl: h.logo_url || null,
+        logoBgColor: h.logo_bg_color || null,
+        status: h.status,
+        masterAffiliateUrl: h.master_affiliate_url,
+        trackingParamName: h.tracking_param_name || 'subid',
+        commissionPerReferralCents: h.commission_per_referral_cents,
+        allowedCountries: h.allowed_countries || [],
+        blockedCountries: h.blocked_countries || [],
+        csvColumnMapping: h.csv_column_mapping || null,
+        description: h.description || null,
+        websiteUrl: h.website_url || null,
+        createdAt: h.created_at,
+      }),
+    );
+
+    const snapshot: CatalogSnapshot = {
+      version: sequence,
+      loadedAt: Date.now(),
+      houses,
+      byId: new Map(houses.map((h) => [h.id, h])),
+      bySlug: new Map(houses.map((h) => [String(h.slug).toLowerCase(), h])),
+      byCountry: new Map(),
+    };
+
+    // Una carga más antigua que termina tarde no pisa a una más reciente
+    if (!this.snapshot || sequence > this.snapshot.version) {
+      this.snapshot = snapshot;
+      this.logger.log(`🏠 House catalog v${sequence} loaded (${houses.length} houses)`);
+    }
+    return this.snapshot;
+  }
+}
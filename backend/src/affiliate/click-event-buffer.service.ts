@@ -0,0 +1,168 @@
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
+import { ObjectId } from 'mongodb';
+import { PrismaService } from '../prisma/prisma.service';
+
+type LandingCounter = 'total_clicks' | 'total_impressions';
+
+/**
+ * ClickEventBufferService - Write-behind buffer for landing tracking writes
+ *
+ * El redirect de /r/click no espera a Mongo: los eventos se acumulan en memoria y se
+ * escriben cada CLICK_BUFFER_FLUSH_MS con un insert unordered por colección, y los
+ * contadores $inc de cada landing se agregan en un único update por flush.
+ * Al apagar la app se vacía el buffer (requiere app.enableShutdownHooks()).
+ */
+@Injectable()
+export class ClickEventBufferService implements OnModuleInit, OnModuleDestroy {
+  private readonly logger = new Logger(ClickEventBufferService.name);
+
+  private readonly flushIntervalMs = Number(process.env.CLICK_BUFFER_FLUSH_MS) || 500;
+  private readonly maxBatchSize = Number(process.env.CLICK_BUFFER_MAX_BATCH) || 1000;
+  // Tope de documentos retenidos si Mongo no responde; por encima se descartan los más antiguos
+  private readonly maxBuffered = Number(process.env.CLICK_BUFFER_MAX_BUFFERED) || 50000;
+
+  private documents = new Map<string, any[]>();
+  private counters = new Map<string, Partial<Record<LandingCounter, number>>>();
+  private buffered = 0;
+  private flushTimer: NodeJS.Timeout | null = null;
+  private flushing: Promise<void> | null = null;
+
+  constructor(private prisma: PrismaService) {}
+
+  onModuleInit() {
+    this.flushTimer = setInterval(() => {
+      this.flush().catch((error) => this.logger.error('Click buffer flush failed:', error.message));
+    }, this.flushIntervalMs);
+    this.flushTimer.unref();
+  }
+
+  async onModuleDestroy() {
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = null;
+    }
+    // Vaciar todo lo pendiente antes de cerrar (con pocos reintentos si Mongo no responde)
+    for (let attempt = 0; attempt < 3; attempt++) {
+      if (this.flushing) await this.flushing;
+      if (this.buffered === 0 && this.counters.size === 0) break;
+      await this.flush();
+    }
+    if (this.buffered > 0) {
+      this.logger.error(`❌ Click buffer shut down with ${this.buffered} unwritten events`);
+    } else {
+      this.logger.log('✅ Click buffer drained');
+    }
+  }
+
+  /**
+   * Encolar un documento para insertarlo en la colección indicada
+   */
+  enqueue(collection: string, document: any) {
+    let pending = this.documents.get(collection);
+    if (!pending) {
+      pending = [];
+      this.documents.set(collection, pending);
+    }
+    pending.push(document);
+    this.buffered++;
+
+    if (this.buffered > this.maxBuffered) {
+      pending.shift();
+      this.buffered--;
+      this.logger.warn(`⚠️ Click buffer full (${this.maxBuffered}), dropping oldest ${collection} event`);
+    }
+
+    if (this.buffered >= this.maxBatchSize) {
+      this.flush().catch((error) => this.logger.error('Click buffer flush failed:', error.message));
+    }
+  }
+
+  /**
+   * Sumar a un contador de la landing; se aplica coalescido en el siguiente flush
+   */
+  increment(landingId: string, counter: LandingCounter, by = 1) {
+    const pending = this.counters.get(landingId) || {};
+    pending[counter] = (pending[counter] || 0) + by;
+    this.counters.set(landingId, pending);
+  }
+
+  /**
+   * Escribir lo acumulado; un solo flush a la vez
+   */
+  async flush(): Promise<void> {
+    if (this.flushing) {
+      return this.flushing;
+    }
+    if (this.buffered === 0 && this.counters.size === 0) {
+      return;
+    }
+
+    const documents = this.documents;
+    const counters = this.counters;
+    this.documents = new Map();
+    this.counters = new Map();
+    this.buffered = 0;
+
+    this.flushing = this.write(documents, counters).finally(() => {
+      this.flushing = null;
+    });
+    return this.flushing;
+  }
+
+  private async write(
+    documents: Map<string, any[]>,
+    counters: Map<string, Partial<Record<LandingCounter, number>>>,
+  ) {
+    for (const [collection, pending] of documents) {
+      for (let start = 0; start < pending.length; start += this.maxBatchSize) {
+        const batch = pending.slice(start, start + this.maxBatchSize);
+        try {
+          const result = (await this.prisma.$runCommandRaw({
+            insert: collection,
+            documents: batch,
+            ordered: false,
+          })) as any;
+          if (result.writeErrors?.length) {
+            // Errores por documento (p.ej. click_id duplicado): no se reintentan
+            this.logger.warn(`⚠️ ${result.writeErrors.length} ${collection} events rejected`);
+          }
+        } catch (error) {
+          // Fallo del comando completo: devolver el lote al buffer para el siguiente flush
+          this.logger.error(`Failed to write ${batch.length} ${collection} events:`, error.message);
+          for (const document of batch) {
+            this.enqueue(collection, document);
+          }
+        }
+      }
+    }
+
+    if (counters.size === 0) return;
+
+    const updates = (q: (landingId: string) => any) =>
+      [...counters.entries()].map(([landingId, inc]) => ({ q: q(landingId), u: { $inc: inc } }));
+
+    try {
+      await this.prisma.$runCommandRaw({
+        update: 'tipster_affiliate_landings',
+        updates: updates((landingId) => ({ _id: new ObjectId(landingId) })),
+        ordered: false,
+      });
+    } catch (e) {
+      // Fallback: try with $oid syntax
+      try {
+        await this.prisma.$runCommandRaw({
+          update: 'tipster_affiliate_landings',
+          updates: updates((landingId) => ({ _id: { $oid: landingId } })),
+          ordered: false,
+        });
+      } catch (error) {
+        this.logger.error('Failed to apply landing counters:', error.message);
+        for (const [landingId, inc] of counters) {
+          for (const [counter, by] of Object.entries(inc)) {
+            this.increment(landingId, counter as LandingCounter, by);
+          }
+        }
+      }
+    }
+  }
+}
@@ -0,0 +1,256 @@
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
+import { PrismaService } from '../prisma/prisma.service';
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const ROLLUP_COLLECTION = 'landing_click_daily';
+const STATE_COLLECTION = 'rollup_state';
+const STATE_ID = ROLLUP_COLLECTION;
+
+export interface ClickCount {
+  _id: any;
+  count: number;
+}
+
+export interface ClickBreakdown {
+  byCountry: ClickCount[];
+  byHouse: ClickCount[];
+  byDate: ClickCount[];
+}
+
+const dayString = (ms: number) => new Date(ms).toISOString().slice(0, 10);
+const dayStart = (day: string) => Date.parse(`${day}T00:00:00.000Z`);
+
+/**
+ * LandingMetricsRollupService - Resumen diario de clicks de landings
+ *
+ * Un job de catch-up agrega los días cerrados (UTC) de landing_click_events en
+ * landing_click_daily, un documento por landing, día, país y casa. El progreso se guarda
+ * en rollup_state.rolled_through, así que el primer arranque hace el backfill completo
+ * y los siguientes solo agregan los días nuevos; el $merge reemplaza, por lo que
+ * repetir un día es idempotente.
+ *
+ * clickBreakdown() lee el resumen para los días completos ya agregados y solo agrega
+ * eventos crudos para hoy y los bordes parciales del rango pedido.
+ */
+@Injectable()
+export class LandingMetricsRollupService implements OnModuleInit, OnModuleDestroy {
+  private readonly logger = new Logger(LandingMetricsRollupService.name);
+
+  private readonly intervalMs = Number(process.env.LANDING_ROLLUP_INTERVAL_MS) || 60 * 60 * 1000;
+  // Un día se considera cerrado pasado este margen (clicks aún en el buffer de escritura)
+  private readonly graceMs = 10 * 60 * 1000;
+
+  private rolledThroughDay: string | null | undefined = undefined;
+  private timer: NodeJS.Timeout | null = null;
+  private running: Promise<void> | null = null;
+
+  constructor(private prisma: PrismaService) {}
+
+  onModuleInit() {
+    this.rollUp().catch((error) => this.logger.error('Landing rollup failed:', error.message));
+    this.timer = setInterval(() => {
+      this.rollUp().catch((error) => this.logger.error('Landing rollup failed:', error.message));
+    }, this.intervalMs);
+    this.timer.unref();
+  }
+
+  onModuleDestroy() {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  /**
+   * Último día (YYYY-MM-DD) completo en landing_click_daily, o null si aún no hay resumen
+   */
+  async rolledThrough(): Promise<string | null> {
+    if (this.rolledThroughDay === undefined) {
+      const result = (await this.prisma.$runCommandRaw({
+        find: STATE_COLLECTION,
+        filter: { _id: STATE_ID },
+        limit: 1,
+      })) as any;
+      this.rolledThroughDay = result.cursor?.firstBatch?.[0]?.rolled_through || null;
+    }
+    return this.rolledThroughDay;
+  }
+
+  /**
+   * Agregar los días cerrados pendientes; una sola ejecución a la vez
+   */
+  async rollUp(): Promise<void> {
+    if (!this.running) {
+      this.running = this.runRollUp().finally(() => {
+        this.running = null;
+      });
+    }
+    return this.running;
+  }
+
+  private async runRollUp() {
+    // Leer siempre el estado persistido: otra instancia puede haber avanzado
+    this.rolledThroughDay = undefined;
+    const rolledThrough = await this.rolledThrough();
+    const lastClosed = dayString(Math.floor((Date.now() - this.graceMs) / DAY_MS) * DAY_MS - DAY_MS);
+    if (rolledThrough && rolledThrough >= lastClosed) return;
+
+    const createdAt: any = { $lt: { $date: new Date(dayStart(lastClosed) + DAY_MS).toISOString() } };
+    if (rolledThrough) {
+      createdAt.$gte = { $date: new Date(dayStart(rolledThrough) + DAY_MS).toISOString() };
+    }
+
+    const started = Date.now();
+    await this.prisma.$runCommandRaw({
+      aggregate: 'landing_click_events',
+      pipeline: [
+        { $match: { created_at: createdAt } },
+        {
+          $group: {
+            _id: {
+              landing_id: '$landing_id',
+              day: { $dateToString: { format: '%Y-%m-%d', date: '$created_at' } },
+              country: '$country_context',
+              house: '$betting_house_id',
+            },
+            clicks: { $sum: 1 },
+          },
+        },
+        {
+          $project: {
+            landing_id: '$_id.landing_id',
+            day: '$_id.day',
+            country: '$_id.country',
+            betting_house_id: '$_id.house',
+            clicks: 1,
+          },
+        },
+        { $merge: { into: ROLLUP_COLLECTION, on: '_id', whenMatched: 'replace', whenNotMatched: 'insert' } },
+      ],
+      allowDiskUse: true,
+      cursor: {},
+    });
+
+    await this.prisma.$runCommandRaw({
+      update: STATE_COLLECTION,
+      updates: [
+        {
+          q: { _id: STATE_ID },
+          u: { $set: { rolled_through: lastClosed, updated_at: { $date: new Date().toISOString() } } },
+          upsert: true,
+        },
+      ],
+    });
+    this.rolledThroughDay = lastClosed;
+    this.logger.log(
+      `📊 Landing clicks rolled up ${rolledThrough ? `after ${rolledThrough}` : 'from the beginning'} ` +
+        `through ${lastClosed} in ${Date.now() - started}ms`,
+    );
+  }
+
+  /**
+   * Clicks de una landing por país, casa y día. Mismo resultado que agregar
+   * landing_click_events con created_at entre startDate y endDate (ambos incluidos).
+   */
+  async clickBreakdown(landingId: string, startDate?: Date, endDate?: Date): Promise<ClickBreakdown> {
+    const startMs = startDate ? startDate.getTime() : null;
+    const endMs = endDate ? endDate.getTime() : null;
+
+    // Días completos dentro del rango y ya agregados: [firstDay, lastDay]
+    const rolledThrough = await this.rolledThrough();
+    let firstDay: number | null = startMs === null ? null : Math.ceil(startMs / DAY_MS) * DAY_MS;
+    let lastDay: number | null = null;
+    if (rolledThrough) {
+      lastDay = dayStart(rolledThrough);
+      if (endMs !== null) {
+        lastDay = Math.min(lastDay, Math.floor((endMs + 1) / DAY_MS) * DAY_MS - DAY_MS);
+      }
+      if (firstDay !== null && firstDay > lastDay) lastDay = null;
+    }
+    if (lastDay === null) firstDay = null;
+
+    const queries: Promise<ClickBreakdown>[] = [];
+    const rawRanges: any[] = [];
+
+    if (lastDay === null) {
+      rawRanges.push(this.createdAtRange(startMs, endMs, false));
+    } else {
+      const day: any = { $lte: dayString(lastDay) };
+      if (firstDay !== null) day.$gte = dayString(firstDay);
+      queries.push(this.aggregateBreakdown(ROLLUP_COLLECTION, { landing_id: landingId, day }, true));
+
+      if (startMs !== null && startMs < firstDay) {
+        rawRanges.push(this.createdAtRange(startMs, firstDay, true));
+      }
+      if (endMs === null || endMs >= lastDay + DAY_MS) {
+        rawRanges.push(this.createdAtRange(lastDay + DAY_MS, endMs, false));
+      }
+    }
+
+    if (rawRanges.length) {
+      const match: any = { landing_id: landingId };
+      if (rawRanges.length === 1) {
+        Object.assign(match, rawRanges[0]);
+      } else {
+        match.$or = rawRanges;
+      }
+      queries.push(this.aggregateBreakdown('landing_click_events', match, false));
+    }
+
+    const parts = await Promise.all(queries);
+    const byCount = (a: ClickCount, b: ClickCount) => b.count - a.count;
+    return {
+      byCountry: this.mergeCounts(parts.map((p) => p.byCountry)).sort(byCount),
+      byHouse: this.mergeCounts(parts.map((p) => p.byHouse)).sort(byCount),
+      byDate: this.mergeCounts(parts.map((p) => p.byDate))
+        .sort((a, b) => (a._id < b._id ? -1 : a._id > b._id ? 1 : 0))
+        .slice(0, 30),
+    };
+  }
+
+  private createdAtRange(fromMs: number | null, toMs: number | null, toExclusive: boolean) {
+    if (fromMs === null && toMs === null) return {};
+    const createdAt: any = {};
+    if (fromMs !== null) createdAt.$gte = { $date: new Date(fromMs).toISOString() };
+    if (toMs !== null) createdAt[toExclusive ? '$lt' : '$lte'] = { $date: new Date(toMs).toISOString() };
+    return { created_at: createdAt };
+  }
+
+  private async aggregateBreakdown(collection: string, match: any, rolledUp: boolean): Promise<ClickBreakdown> {
+    const count = rolledUp ? { $sum: '$clicks' } : { $sum: 1 };
+    const country = rolledUp ? '$country' : '$country_context';
+    const day = rolledUp ? '$day' : { $dateToString: { format: '%Y-%m-%d', date: '$created_at' } };
+
+    const result = (await this.prisma.$runCommandRaw({
+      aggregate: collection,
+      pipeline: [
+        { $match: match },
+        {
+          $facet: {
+            byCountry: [{ $group: { _id: country, count } }],
+            byHouse: [{ $group: { _id: '$betting_house_id', count } }],
+            byDate: [{ $group: { _id: day, count } }],
+          },
+        },
+      ],
+      cursor: {},
+    })) as any;
+
+    const facets = result.cursor?.firstBatch?.[0] || {};
+    return {
+      byCountry: facets.byCountry || [],
+      byHouse: facets.byHouse || [],
+      byDate: facets.byDate || [],
+    };
+  }
+
+  private mergeCounts(lists: ClickCount[][]): ClickCount[] {
+    const totals = new Map<any, number>();
+    for (const list of lists) {
+      for (const { _id, count } of list) {
+        totals.set(_id ?? null, (totals.get(_id ?? null) || 0) + count);
+      }
+    }
+    return [...totals.entries()].map(([_id, count]) => ({ _id, count }));
+  }
+}
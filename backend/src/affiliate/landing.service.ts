@@ -3,10 +3,25 @@ import { PrismaService } from '../prisma/prisma.service';
 import { ObjectId } from 'mongodb';
 import { v4 as uuidv4 } from 'uuid';
 import { CreateLandingDto, UpdateLandingDto, LandingCountryConfigDto } from './dto';
+import { ClickEventBufferService } from './click-event-buffer.service';
+import { LruCache } from '../common/cache/lru-cache';
+import { BettingHouseCatalogService } from './betting-house-catalog.service';
+import { LandingMetricsRollupService } from './landing-metrics-rollup.service';
 
 @Injectable()
 export class LandingService {
-  constructor(private prisma: PrismaService) {}
+  // Landings públicas por slug|país; se invalidan al editar/eliminar la landing o una casa
+  private readonly publicLandingCache = new LruCache<any>({
+    maxEntries: Number(process.env.PUBLIC_LANDING_CACHE_MAX) || 5000,
+    ttlMs: Number(process.env.PUBLIC_LANDING_CACHE_TTL_MS) || 60000,
+  });
+
+  constructor(
+    private prisma: PrismaService,
+    private clickBuffer: ClickEventBufferService,
+    private houseCatalog: BettingHouseCatalogService,
+    private metricsRollup: LandingMetricsRollupService,
+  ) {}
 
   // ==================== LANDING CRUD ====================
 
@@ -372,6 +387,7 @@ export class LandingService {
       await this.createLandingItems(landingId, dto.countryConfigs);
     }
 
+    this.invalidatePublicLanding(landingId);
     return this.getLandingById(landingId);
   }
 
@@ -406,6 +422,7 @@ export class LandingService {
       ],
     });
 
+    this.invalidatePublicLanding(landingId);
     return { success: true };
   }
 
@@ -415,6 +432,28 @@ export class LandingService {
    * Obtener landing pública por slug (para /go/:slug)
    */
   async getPublicLanding(slug: string, countryCode?: string) {
+    return this.publicLandingCache.getOrLoad(`${slug}|${countryCode || ''}`, () =>
+      this.loadPublicLanding(slug, countryCode),
+    );
+  }
+
+  /**
+   * Invalidar las entradas cacheadas de una landing (todas sus variantes por país)
+   */
+  invalidatePublicLanding(landingId: string) {
+    this.publicLandingCache.deleteWhere((landing) => landing.id === landingId);
+  }
+
+  /**
+   * Invalidar todas las landings públicas cacheadas.
+   * Se usa al editar una casa: una casa desactivada ya no aparece en los items cacheados,
+   * así que no se puede saber qué landings la incluían.
+   */
+  invalidatePublicLandings() {
+    this.publicLandingCache.clear();
+  }
+
+  private async loadPublicLanding(slug: string, countryCode?: string) {
     const result = (await this.prisma.$runCommandRaw({
       find: 'tipster_affiliate_landings',
       filter: { slug, is_active: true },
@@ -558,72 +597,41 @@ export class LandingService {
       bettingHouseId,
     );
 
-    // Registrar evento de click
+    // Registrar evento de click (write-behind: el redirect no espera a Mongo)
     const now = new Date().toISOString();
-    await this.prisma.$runCommandRaw({
-      insert: 'landing_click_events',
-      documents: [
-        {
-          _id: new ObjectId(),
-          click_id: clickId,
-          tipster_id: tipsterId,
-          landing_id: landingId,
-          betting_house_id: bettingHouseId,
-          country_context: countryCode,
-          anonymous_session_id: anonymousSessionId || null,
-          ip_address: ipAddress || null,
-          user_agent: userAgent || null,
-          referrer: referrer || null,
-          redirect_url: redirectUrl,
-          created_at: { $date: now },
-        },
-      ],
+    this.clickBuffer.enqueue('landing_click_events', {
+      _id: new ObjectId(),
+      click_id: clickId,
+      tipster_id: tipsterId,
+      landing_id: landingId,
+      betting_house_id: bettingHouseId,
+      country_context: countryCode,
+      anonymous_session_id: anonymousSessionId || null,
+      ip_address: ipAddress || null,
+      user_agent: userAgent || null,
+      referrer: referrer || null,
+      redirect_url: redirectUrl,
+      created_at: { $date: now },
     });
 
-    // Actualizar contador de clicks en la landing usando ObjectId nativo
-    try {
-      await this.prisma.$runCommandRaw({
-        update: 'tipster_affiliate_landings',
-        updates: [
-          {
-            q: { _id: new ObjectId(landingId) },
-            u: { $inc: { total_clicks: 1 } },
-          },
-        ],
-      });
-    } catch (e) {
-      // Fallback: try with $oid syntax
-      await this.prisma.$runCommandRaw({
-        update: 'tipster_affiliate_landings',
-        updates: [
-          {
-            q: { _id: { $oid: landingId } },
-            u: { $inc: { total_clicks: 1 } },
-          },
-        ],
-      });
-    }
+    // Actualizar contador de clicks en la landing (se agrega por landing en cada flush)
+    this.clickBuffer.increment(landingId, 'total_clicks');
 
     // También registrar en affiliate_click_events para compatibilidad
-    await this.prisma.$runCommandRaw({
-      insert: 'affiliate_click_events',
-      documents: [
-        {
-          _id: new ObjectId(),
-          tipster_id: tipsterId,
-          house_id: bettingHouseId,
-          link_id: null,
-          ip_address: ipAddress || null,
-          country_code: countryCode,
-          user_agent: userAgent || null,
-          referer: referrer || null,
-          was_blocked: false,
-          block_reason: null,
-          redirected_to: redirectUrl,
-          clicked_at: { $date: now },
-          created_at: { $date: now },
-        },
-      ],
+    this.clickBuffer.enqueue('affiliate_click_events', {
+      _id: new ObjectId(),
+      tipster_id: tipsterId,
+      house_id: bettingHouseId,
+      link_id: null,
+      ip_address: ipAddress || null,
+      country_code: countryCode,
+      user_agent: userAgent || null,
+      referer: referrer || null,
+      was_blocked: false,
+      block_reason: null,
+      redirected_to: redirectUrl,
+      clicked_at: { $date: now },
+      created_at: { $date: now },
     });
 
     return {
@@ -709,59 +717,8 @@ export class LandingService {
       throw new BadRequestException('No tienes permiso para ver estas métricas');
     }
 
-    // Build date filter for MongoDB query
-    const buildDateMatch = () => {
-      const match: any = { landing_id: landingId };
-      if (startDate || endDate) {
-        match.created_at = {};
-        if (startDate) {
-          match.created_at.$gte = { $date: startDate.toISOString() };
-        }
-        if (endDate) {
-          match.created_at.$lte = { $date: endDate.toISOString() };
-        }
-      }
-      return match;
-    };
-
-    // Clicks por país
-    const clicksByCountry = (await this.prisma.$runCommandRaw({
-      aggregate: 'landing_click_events',
-      pipeline: [
-        { $match: buildDateMatch() },
-        { $group: { _id: '$country_context', count: { $sum: 1 } } },
-        { $sort: { count: -1 } },
-      ],
-      cursor: {},
-    })) as any;
-
-    // Clicks por casa
-    const clicksByHouse = (await this.prisma.$runCommandRaw({
-      aggregate: 'landing_click_events',
-      pipeline: [
-        { $match: buildDateMatch() },
-        { $group: { _id: '$betting_house_id', count: { $sum: 1 } } },
-        { $sort: { count: -1 } },
-      ],
-      cursor: {},
-    })) as any;
-
-    // Clicks por día (últimos 30 días)
-    const clicksByDate = (await this.prisma.$runCommandRaw({
-      aggregate: 'landing_click_events',
-      pipeline: [
-        { $match: buildDateMatch() },
-        {
-          $group: {
-            _id: { $dateToString: { format: '%Y-%m-%d', date: '$created_at' } },
-            count: { $sum: 1 },
-          },
-        },
-        { $sort: { _id: 1 } },
-        { $limit: 30 },
-      ],
-      cursor: {},
-    })) as any;
+    // Clicks por país, casa y día (primeros 30): resumen diario + eventos de hoy
+    const clicks = await this.metricsRollup.clickBreakdown(landingId, startDate, endDate);
 
     // Conversiones/Referidos de este landing (por tipsterId)
     const conversions = await this.prisma.affiliateConversion.findMany({
@@ -771,7 +728,7 @@ export class LandingService {
     });
 
     // Enriquecer clicks por casa con nombres
-    const houseIds = (clicksByHouse.cursor?.firstBatch || []).map((c: any) => c._id);
+    const houseIds = clicks.byHouse.map((c) => c._id);
     const houses = await this.getBettingHousesByIds(houseIds);
     const housesMap = new Map(houses.map((h: any) => [h.id, h]));
 
@@ -804,11 +761,11 @@ export class LandingService {
             : '0',
         earnings: conversionStats.totalEarningsCents,
       },
-      clicksByCountry: (clicksByCountry.cursor?.firstBatch || []).map((c: any) => ({
+      clicksByCountry: clicks.byCountry.map((c) => ({
         country: c._id || 'UNKNOWN',
         clicks: c.count,
       })),
-      clicksByHouse: (clicksByHouse.cursor?.firstBatch || []).map((c: any) => {
+      clicksByHouse: clicks.byHouse.map((c) => {
         const house: any = housesMap.get(c._id);
         return {
           houseId: c._id,
@@ -816,7 +773,7 @@ export class LandingService {
           clicks: c.count,
         };
       }),
-      clicksByDate: (clicksByDate.cursor?.firstBatch || []).map((c: any) => ({
+      clicksByDate: clicks.byDate.map((c) => ({
         date: c._id,
         clicks: c.count,
       })),
@@ -907,68 +864,13 @@ export class LandingService {
   }
 
   private async getBettingHouseById(houseId: string) {
-    // Intentar con string ID primero
-    let result = (await this.prisma.$runCommandRaw({
-      find: 'betting_houses',
-      filter: { _id: houseId },
-      limit: 1,
-    })) as any;
-
-    if (!result.cursor?.firstBatch?.length) {
-      // Intentar con ObjectId
-      result = (await this.prisma.$runCommandRaw({
-        find: 'betting_houses',
-        filter: { _id: { $oid: houseId } },
-        limit: 1,
-      })) as any;
-    }
-
-    const house = result.cursor?.firstBatch?.[0];
-    if (!house) return null;
-
-    return {
-      id: house._id.$oid || house._id.toString(),
-      name: house.name,
-      slug: house.slug,
-      logoUrl: house.logo_url,
-      status: house.status,
-      masterAffiliateUrl: house.master_affiliate_url,
-      trackingParamName: house.tracking_param_name || 'subid',
-      description: house.description,
-      websiteUrl: house.website_url,
-      allowedCountries: house.allowed_countries || [],
-    };
+    // El catálogo indexa ids string y ObjectId por igual
+    return this.houseCatalog.getById(houseId);
   }
 
   private async getBettingHousesByIds(houseIds: string[]) {
     if (!houseIds.length) return [];
-
-    // Obtener todas las casas y filtrar
-    const result = (await this.prisma.$runCommandRaw({
-      find: 'betting_houses',
-      filter: { status: 'ACTIVE' },
-    })) as any;
-
-    const allHouses = result.cursor?.firstBatch || [];
-
-    return allHouses
-      .filter((h: any) => {
-        const id = h._id.$oid || h._id.toString();
-        return houseIds.includes(id);
-      })
-      .map((h: any) => ({
-        id: h._id.$oid || h._id.toString(),
-        name: h.name,
-        slug: h.slug,
-        logoUrl: h.logo_url,
-        logoBgColor: h.logo_bg_color || null,
-        status: h.status,
-        masterAffiliateUrl: h.master_affiliate_url,
-        trackingParamName: h.tracking_param_name || 'subid',
-        description: h.description,
-        websiteUrl: h.website_url,
-        allowedCountries: h.allowed_countries || [],
-      }));
+    return this.houseCatalog.getActiveByIds(houseIds);
   }
 
   private async buildRedirectUrl(
@@ -1023,36 +925,16 @@ export class LandingService {
    * Obtener casas de apuestas disponibles para un país
    */
   async getAvailableHousesForCountry(country: string) {
-    const result = (await this.prisma.$runCommandRaw({
-      find: 'betting_houses',
-      filter: { status: 'ACTIVE' },
-    })) as any;
-
-    const houses = result.cursor?.firstBatch || [];
-
-    return houses
-      .filter((h: any) => {
-        const allowed = h.allowed_countries || [];
-        const blocked = h.blocked_countries || [];
-
-        // Si tiene allowed_countries, debe incluir el país
-        if (allowed.length > 0 && !allowed.includes(country)) {
-          return false;
-        }
-        // Si tiene blocked_countries, no debe incluir el país
-        if (blocked.includes(country)) {
-          return false;
-        }
-        return true;
-      })
-      .map((h: any) => ({
-        id: h._id.$oid || h._id.toString(),
-        name: h.name,
-        slug: h.slug,
-        logoUrl: h.logo_url,
-        description: h.description,
-        websiteUrl: h.website_url,
-        commissionPerReferralEur: (h.commission_per_referral_cents || 0) / 100,
-      }));
+    const houses = await this.houseCatalog.getForCountry(country);
+
+    return houses.map((h) => ({
+      id: h.id,
+      name: h.name,
+      slug: h.slug,
+      logoUrl: h.logoUrl,
+      description: h.description,
+      websiteUrl: h.websiteUrl,
+      commissionPerReferralEur: (h.commissionPerReferralCents || 0) / 100,
+    }));
   }
 }
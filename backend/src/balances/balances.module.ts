@@ -0,0 +1,10 @@
+import { Module } from '@nestjs/common';
+import { TipsterBalanceService } from './tipster-balance.service';
+import { PrismaModule } from '../prisma/prisma.module';
+
+@Module({
+  imports: [PrismaModule],
+  providers: [TipsterBalanceService],
+  exports: [TipsterBalanceService],
+})
+export class BalancesModule {}
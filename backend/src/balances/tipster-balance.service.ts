@@ -0,0 +1,471 @@
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
+import { PrismaService } from '../prisma/prisma.service';
+import { MongoStreamService } from '../prisma/mongo-stream.service';
+
+const BALANCE_COLLECTION = 'tipster_balances';
+
+// Estados de orden que cuentan como ingreso del tipster
+export const PAID_ORDER_STATUSES = ['PAGADA', 'ACCESS_GRANTED', 'COMPLETED', 'paid'];
+// Estados de retiro que ya descuentan del saldo
+const WITHDRAWN_STATUSES = ['APPROVED', 'PAID'];
+
+export interface TipsterBalance {
+  totalNetCents: number;
+  totalGrossCents: number;
+  totalPlatformFeeCents: number;
+  totalGatewayFeeCents: number;
+  orderCount: number;
+  totalWithdrawnCents: number;
+  withdrawalCount: number;
+  totalPendingCents: number;
+  pendingCount: number;
+  totalSettledCents: number;
+  settlementCount: number;
+}
+
+// Campo del documento de saldo para cada total
+const FIELDS: Record<keyof TipsterBalance, string> = {
+  totalNetCents: 'net_cents',
+  totalGrossCents: 'gross_cents',
+  totalPlatformFeeCents: 'platform_fee_cents',
+  totalGatewayFeeCents: 'gateway_fee_cents',
+  orderCount: 'order_count',
+  totalWithdrawnCents: 'withdrawn_cents',
+  withdrawalCount: 'withdrawal_count',
+  totalPendingCents: 'pending_withdrawal_cents',
+  pendingCount: 'pending_count',
+  totalSettledCents: 'settled_cents',
+  settlementCount: 'settlement_count',
+};
+
+const emptyBalance = (): TipsterBalance => ({
+  totalNetCents: 0,
+  totalGrossCents: 0,
+  totalPlatformFeeCents: 0,
+  totalGatewayFeeCents: 0,
+  orderCount: 0,
+  totalWithdrawnCents: 0,
+  withdrawalCount: 0,
+  totalPendingCents: 0,
+  pendingCount: 0,
+  totalSettledCents: 0,
+  settlementCount: 0,
+});
+
+/**
+ * TipsterBalanceService - Saldo acumulado por tipster (tipster_balances)
+ *
+ * Un documento por perfil de tipster con los totales de órdenes pagadas, retiros y
+ * liquidaciones pagadas, actualizado con $inc en cada transición (pago de una orden,
+ * cambio de estado de un retiro, pago de una liquidación). Leer el saldo es una búsqueda
+ * por _id en lugar de agregar todo el historial.
+ *
+ * El documento se construye desde las colecciones de origen la primera vez que se lee.
+ * Un job de reconciliación compara periódicamente cada saldo con la agregación cruda y
+ * corrige las diferencias; solo toca documentos sin movimientos desde (poco antes de) el
+ * inicio de la agregación y con la misma versión que leyó, para no pisar un $inc que la
+ * foto no incluye.
+ */
+@Injectable()
+export class TipsterBalanceService implements OnModuleInit, OnModuleDestroy {
+  private readonly logger = new Logger(TipsterBalanceService.name);
+
+  private readonly reconcileIntervalMs = Number(process.env.BALANCE_RECONCILE_INTERVAL_MS) || 6 * 60 * 60 * 1000;
+  // Documentos con movimientos desde este margen antes de empezar la pasada se dejan para la siguiente
+  private readonly quietMs = 60 * 1000;
+
+  private timer: NodeJS.Timeout | null = null;
+  private running: Promise<any> | null = null;
+
+  constructor(
+    private prisma: PrismaService,
+    private mongo: MongoStreamService,
+  ) {}
+
+  onModuleInit() {
+    this.timer = setInterval(() => {
+      this.reconcile().catch((error) => this.logger.error('Balance reconciliation failed:', error.message));
+    }, this.reconcileIntervalMs);
+    this.timer.unref();
+  }
+
+  onModuleDestroy() {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  /**
+   * Saldo de un tipster (por id de perfil); lo construye desde el origen si aún no existe
+   */
+  async getBalance(profileId: string): Promise<TipsterBalance> {
+    const existing = await this.findBalance(profileId);
+    if (existing) return existing;
+    return this.rebuild(profileId);
+  }
+
+  /**
+   * Construir (o rehacer) el saldo desde el origen. El cálculo empieza después de leer el
+   * documento y se escribe con guarda de versión: si entra un $inc entre medias la versión
+   * cambia y se recalcula, y un $inc que no encontró documento llama aquí después de su
+   * escritura en origen, así que ningún movimiento se pierde.
+   */
+  private async rebuild(profileId: string): Promise<TipsterBalance> {
+    for (let attempt = 0; attempt < 3; attempt++) {
+      const result = (await this.prisma.$runCommandRaw({
+        find: BALANCE_COLLECTION,
+        filter: { _id: profileId },
+        projection: { version: 1 },
+        limit: 1,
+      })) as any;
+      const doc = result.cursor?.firstBatch?.[0];
+      const computed = await this.computeFromSource(profileId);
+      const now = { $date: new Date().toISOString() };
+
+      if (!doc) {
+        try {
+          await this.prisma.$runCommandRaw({
+            insert: BALANCE_COLLECTION,
+            documents: [{ _id: profileId, ...this.toDocument(computed), version: 0, updated_at: now }],
+          });
+          return computed;
+        } catch (error) {
+          // Otra petición lo creó a la vez: se recalcula contra su versión
+          if (!/E11000|duplicate key/i.test(error.message)) throw error;
+          continue;
+        }
+      }
+
+      const updated = (await this.prisma.$runCommandRaw({
+        update: BALANCE_COLLECTION,
+        updates: [
+          {
+            q: { _id: profileId, version: doc.version ?? 0 },
+            u: { $set: { ...this.toDocument(computed), updated_at: now }, $inc: { version: 1 } },
+          },
+        ],
+      })) as any;
+      if ((updated.nModified || 0) > 0) return computed;
+    }
+
+    this.logger.warn(`Balance of tipster ${profileId} kept changing while rebuilding; reconciliation will fix it`);
+    return (await this.findBalance(profileId)) || this.computeFromSource(profileId);
+  }
+
+  /**
+   * Sumar una orden recién pagada. Llamar solo tras una transición real a pagada, para
+   * que reintentos de webhooks no cuenten dos veces la misma orden.
+   */
+  async recordOrderPaid(orderId: string): Promise<void> {
+    const result = (await this.prisma.$runCommandRaw({
+      find: 'orders',
+      filter: { _id: { $oid: orderId } },
+      projection: {
+        tipster_id: 1,
+        amount_cents: 1,
+        net_amount_cents: 1,
+        platform_fee_cents: 1,
+        gateway_fee_cents: 1,
+      },
+      limit: 1,
+    })) as any;
+    const order = result.cursor?.firstBatch?.[0];
+    if (!order?.tipster_id) return;
+
+    // Mismos valores que la agregación de origen ($ifNull del neto al bruto)
+    await this.increment(order.tipster_id, {
+      totalNetCents: order.net_amount_cents ?? order.amount_cents ?? 0,
+      totalGrossCents: order.amount_cents || 0,
+      totalPlatformFeeCents: order.platform_fee_cents || 0,
+      totalGatewayFeeCents: order.gateway_fee_cents || 0,
+      orderCount: 1,
+    });
+  }
+
+  /**
+   * Reservar un retiro: pasa a pendiente solo si el saldo disponible lo cubre (atómico)
+   */
+  async reserveWithdrawal(profileId: string, amountCents: number): Promise<boolean> {
+    await this.getBalance(profileId);
+
+    const result = (await this.prisma.$runCommandRaw({
+      update: BALANCE_COLLECTION,
+      updates: [
+        {
+          q: {
+            _id: profileId,
+            $expr: {
+              $gte: [
+                { $subtract: ['$net_cents', { $add: ['$withdrawn_cents', '$pending_withdrawal_cents'] }] },
+                amountCents,
+              ],
+            },
+          },
+          u: this.incrementUpdate({ totalPendingCents: amountCents, pendingCount: 1 }),
+        },
+      ],
+    })) as any;
+    return (result.nModified || 0) > 0;
+  }
+
+  /**
+   * Retiro pendiente que se rechaza (o que no llegó a crearse)
+   */
+  async releaseWithdrawal(profileId: string, amountCents: number): Promise<void> {
+    await this.increment(profileId, { totalPendingCents: -amountCents, pendingCount: -1 });
+  }
+
+  /**
+   * Retiro pendiente que se aprueba o se paga directamente
+   */
+  async settleWithdrawal(profileId: string, amountCents: number): Promise<void> {
+    await this.increment(profileId, {
+      totalPendingCents: -amountCents,
+      pendingCount: -1,
+      totalWithdrawnCents: amountCents,
+      withdrawalCount: 1,
+    });
+  }
+
+  /**
+   * Liquidación marcada como pagada
+   */
+  async recordSettlementPaid(profileId: string, netAmountCents: number): Promise<void> {
+    await this.increment(profileId, { totalSettledCents: netAmountCents || 0, settlementCount: 1 });
+  }
+
+  /**
+   * Comparar todos los saldos con la agregación cruda y corregir las diferencias.
+   * Una sola ejecución a la vez.
+   */
+  async reconcile(): Promise<{ checked: number; fixed: number; skipped: number }> {
+    if (!this.running) {
+      this.running = this.runReconcile().finally(() => {
+        this.running = null;
+      });
+    }
+    return this.running;
+  }
+
+  private async runReconcile() {
+    const started = Date.now();
+    const expected = await this.computeAllFromSource();
+    const db = await this.mongo.db();
+    const cursor = db.collection(BALANCE_COLLECTION).find({}, { batchSize: 500 });
+
+    let checked = 0;
+    let fixed = 0;
+    let skipped = 0;
+    try {
+      for await (const doc of cursor) {
+        checked++;
+        const profileId = String(doc._id);
+        const actual = this.fromDocument(doc);
+        const target = expected.get(profileId) || emptyBalance();
+        const drift = (Object.keys(FIELDS) as (keyof TipsterBalance)[]).filter((k) => actual[k] !== target[k]);
+        if (!drift.length) continue;
+
+        // `expected` se calculó desde `started`: un movimiento posterior (o poco anterior,
+        // cuyo $inc aún no había llegado) no está en la foto y no se puede comparar
+        const updatedAt = doc.updated_at instanceof Date ? doc.updated_at.getTime() : 0;
+        if (updatedAt >= started - this.quietMs) {
+          skipped++;
+          continue;
+        }
+
+        const result = (await this.prisma.$runCommandRaw({
+          update: BALANCE_COLLECTION,
+          updates: [
+            {
+              q: { _id: profileId, version: doc.version ?? 0 },
+              u: {
+                $set: { ...this.toDocument(target), reconciled_at: { $date: new Date().toISOString() } },
+                $inc: { version: 1 },
+              },
+            },
+          ],
+        })) as any;
+
+        if ((result.nModified || 0) > 0) {
+          fixed++;
+          this.logger.warn(
+            `Balance drift for tipster ${profileId}: ` +
+              drift.map((k) => `${k} ${actual[k]} → ${target[k]}`).join(', '),
+          );
+        } else {
+          skipped++;
+        }
+      }
+    } finally {
+      await cursor.close();
+    }
+
+    this.logger.log(
+      `⚖️ Balances reconciled in ${Date.now() - started}ms: ${checked} checked, ${fixed} fixed, ${skipped} skipped`,
+    );
+    return { checked, fixed, skipped };
+  }
+
+  /**
+   * Helper: Totales de un tipster calculados desde orders, withdrawal_requests y settlements
+   */
+  private async computeFromSource(profileId: string): Promise<TipsterBalance> {
+    const profile = await this.prisma.tipsterProfile.findUnique({
+      where: { id: profileId },
+      select: { userId: true },
+    });
+    const balance = emptyBalance();
+
+    const [orders, withdrawals, settlements] = (await Promise.all([
+      this.prisma.$runCommandRaw({
+        aggregate: 'orders',
+        pipeline: [{ $match: { tipster_id: profileId, status: { $in: PAID_ORDER_STATUSES } } }, this.orderTotalsGroup(null)],
+        cursor: {},
+      }),
+      // Los retiros guardan el userId del tipster, no el id del perfil
+      profile
+        ? this.prisma.$runCommandRaw({
+            aggregate: 'withdrawal_requests',
+            pipeline: [{ $match: { tipster_id: profile.userId } }, this.withdrawalTotalsGroup(null)],
+            cursor: {},
+          })
+        : Promise.resolve({}),
+      this.prisma.$runCommandRaw({
+        aggregate: 'settlements',
+        pipeline: [{ $match: { tipster_id: profileId, status: 'PAID' } }, this.settlementTotalsGroup(null)],
+        cursor: {},
+      }),
+    ])) as any[];
+
+    Object.assign(
+      balance,
+      this.pickTotals(orders.cursor?.firstBatch?.[0]),
+      this.pickTotals(withdrawals.cursor?.firstBatch?.[0]),
+      this.pickTotals(settlements.cursor?.firstBatch?.[0]),
+    );
+    return balance;
+  }
+
+  /**
+   * Helper: Totales de todos los tipsters (para la reconciliación), por id de perfil
+   */
+  private async computeAllFromSource(): Promise<Map<string, TipsterBalance>> {
+    const totals = new Map<string, TipsterBalance>();
+    const add = (profileId: string, values: Partial<TipsterBalance>) => {
+      if (!profileId) return;
+      const current = totals.get(profileId) || emptyBalance();
+      for (const [key, value] of Object.entries(values)) current[key] += value;
+      totals.set(profileId, current);
+    };
+
+    const profileByUser = new Map<string, string>();
+    for await (const profile of await this.mongo.aggregate('tipster_profiles', [{ $project: { user_id: 1 } }])) {
+      profileByUser.set(String(profile.user_id), String(profile._id));
+    }
+
+    const orders = await this.mongo.aggregate('orders', [
+      { $match: { status: { $in: PAID_ORDER_STATUSES } } },
+      this.orderTotalsGroup('$tipster_id'),
+    ]);
+    for await (const row of orders) add(row._id, this.pickTotals(row));
+
+    const withdrawals = await this.mongo.aggregate('withdrawal_requests', [this.withdrawalTotalsGroup('$tipster_id')]);
+    for await (const row of withdrawals) add(profileByUser.get(row._id), this.pickTotals(row));
+
+    const settlements = await this.mongo.aggregate('settlements', [
+      { $match: { status: 'PAID' } },
+      this.settlementTotalsGroup('$tipster_id'),
+    ]);
+    for await (const row of settlements) add(row._id, this.pickTotals(row));
+
+    return totals;
+  }
+
+  private orderTotalsGroup(id: any) {
+    return {
+      $group: {
+        _id: id,
+        totalNetCents: { $sum: { $ifNull: ['$net_amount_cents', '$amount_cents'] } },
+        totalGrossCents: { $sum: '$amount_cents' },
+        totalPlatformFeeCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+        totalGatewayFeeCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
+        orderCount: { $sum: 1 },
+      },
+    };
+  }
+
+  private withdrawalTotalsGroup(id: any) {
+    const when = (statuses: string[], value: any) => ({
+      $sum: { $cond: [{ $in: ['$status', statuses] }, value, 0] },
+    });
+    return {
+      $group: {
+        _id: id,
+        totalWithdrawnCents: when(WITHDRAWN_STATUSES, '$amount_cents'),
+        withdrawalCount: when(WITHDRAWN_STATUSES, 1),
+        totalPendingCents: when(['PENDING'], '$amount_cents'),
+        pendingCount: when(['PENDING'], 1),
+      },
+    };
+  }
+
+  private settlementTotalsGroup(id: any) {
+    return {
+      $group: {
+        _id: id,
+        totalSettledCents: { $sum: '$net_amount_cents' },
+        settlementCount: { $sum: 1 },
+      },
+    };
+  }
+
+  private pickTotals(row: any): Partial<TipsterBalance> {
+    const values: Partial<TipsterBalance> = {};
+    if (!row) return values;
+    for (const key of Object.keys(FIELDS)) {
+      if (key in row) values[key] = Number(row[key]) || 0;
+    }
+    return values;
+  }
+
+  private async findBalance(profileId: string): Promise<TipsterBalance | null> {
+    const result = (await this.prisma.$runCommandRaw({
+      find: BALANCE_COLLECTION,
+      filter: { _id: profileId },
+      limit: 1,
+    })) as any;
+    const doc = result.cursor?.firstBatch?.[0];
+    return doc ? this.fromDocument(doc) : null;
+  }
+
+  /**
+   * Helper: $inc sobre un saldo existente; si aún no existe se construye desde el origen,
+   * que ya incluye este movimiento (se llama después de escribirlo)
+   */
+  private async increment(profileId: string, delta: Partial<TipsterBalance>) {
+    const result = (await this.prisma.$runCommandRaw({
+      update: BALANCE_COLLECTION,
+      updates: [{ q: { _id: profileId }, u: this.incrementUpdate(delta) }],
+    })) as any;
+    if ((result.n || 0) === 0) await this.rebuild(profileId);
+  }
+
+  private incrementUpdate(delta: Partial<TipsterBalance>) {
+    const inc: Record<string, number> = { version: 1 };
+    for (const [key, value] of Object.entries(delta)) inc[FIELDS[key]] = value;
+    return { $inc: inc, $set: { updated_at: { $date: new Date().toISOString() } } };
+  }
+
+  private toDocument(balance: TipsterBalance) {
+    const doc: Record<string, number> = {};
+    for (const [key, field] of Object.entries(FIELDS)) doc[field] = balance[key];
+    return doc;
+  }
+
+  private fromDocument(doc: any): TipsterBalance {
+    const balance = emptyBalance();
+    for (const [key, field] of Object.entries(FIELDS)) balance[key] = Number(doc[field]) || 0;
+    return balance;
+  }
+}
@@ -5,12 +5,13 @@ import { CheckoutService } from './checkout.service';
 import { GeolocationService } from './geolocation.service';
 import { RedsysService } from './redsys.service';
 import { PrismaModule } from '../prisma/prisma.module';
+import { BalancesModule } from '../balances/balances.module';
 import { TelegramModule } from '../telegram/telegram.module';
 import { CommissionsModule } from '../commissions/commissions.module';
 import { NotificationsModule } from '../notifications/notifications.module';
 
 @Module({
-  imports: [PrismaModule, ConfigModule, TelegramModule, CommissionsModule, NotificationsModule],
+  imports: [PrismaModule, BalancesModule, ConfigModule, TelegramModule, CommissionsModule, NotificationsModule],
   controllers: [CheckoutController],
   providers: [CheckoutService, GeolocationService, RedsysService],
   exports: [CheckoutService, GeolocationService, RedsysService],
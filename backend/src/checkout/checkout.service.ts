@@ -7,6 +7,7 @@ import { RedsysService } from './redsys.service';
 import { CommissionsService } from '../commissions/commissions.service';
 import { EmailService } from '../emails/emails.service';
 import { NotificationsService } from '../notifications/notifications.service';
+import { TipsterBalanceService, PAID_ORDER_STATUSES } from '../balances/tipster-balance.service';
 import Stripe from 'stripe';
 
 export interface CreateCheckoutDto {
@@ -56,6 +57,7 @@ export class CheckoutService {
     private commissionsService: CommissionsService,
     private emailService: EmailService,
     private notificationsService: NotificationsService,
+    private balances: TipsterBalanceService,
   ) {
     const stripeKey = this.config.get<string>('STRIPE_API_KEY');
     if (!stripeKey) {
@@ -388,24 +390,12 @@ export class CheckoutService {
     this.logger.log(`Processing Redsys webhook for order ${result.orderId}`);
 
     // Update order status
-    const status = result.success ? 'PAGADA' : 'FAILED';
-    await this.prisma.$runCommandRaw({
-      update: 'orders',
-      updates: [
-        {
-          q: { _id: { $oid: result.orderId } },
-          u: {
-            $set: {
-              status,
-              payment_provider: 'redsys',
-              provider_order_id: result.transactionId,
-              response_code: result.responseCode,
-              authorization_code: result.authCode,
-              updated_at: { $date: new Date().toISOString() },
-            },
-          },
-        },
-      ],
+    await this.markOrderPaid(result.orderId, {
+      payment_provider: 'redsys',
+      provider_order_id: result.transactionId,
+      response_code: result.responseCode,
+      authorization_code: result.authCode,
+      updated_at: { $date: new Date().toISOString() },
     });
 
     // If successful, send Telegram notification
@@ -459,23 +449,12 @@ export class CheckoutService {
     this.logger.log(`Processing successful payment for order ${orderId}`);
 
     // Update order status
-    await this.prisma.$runCommandRaw({
-      update: 'orders',
-      updates: [
-        {
-          q: { _id: { $oid: orderId } },
-          u: {
-            $set: {
-              status: 'PAGADA',
-              payment_provider: 'stripe',
-              provider_order_id: session.id,
-              payment_method: 'card',
-              paid_at: { $date: new Date().toISOString() },
-              updated_at: { $date: new Date().toISOString() },
-            },
-          },
-        },
-      ],
+    await this.markOrderPaid(orderId, {
+      payment_provider: 'stripe',
+      provider_order_id: session.id,
+      payment_method: 'card',
+      paid_at: { $date: new Date().toISOString() },
+      updated_at: { $date: new Date().toISOString() },
     });
 
     // Send Telegram notification if user came from Telegram
@@ -523,23 +502,12 @@ export class CheckoutService {
       const order = await this.getOrderById(orderId);
 
       if (order && order.status === 'PENDING') {
-        await this.prisma.$runCommandRaw({
-          update: 'orders',
-          updates: [
-            {
-              q: { _id: { $oid: orderId } },
-              u: {
-                $set: {
-                  status: 'PAGADA',
-                  payment_provider: 'stripe',
-                  provider_order_id: sessionId,
-                  payment_method: 'card',
-                  paid_at: { $date: new Date().toISOString() },
-                  updated_at: { $date: new Date().toISOString() },
-                },
-              },
-            },
-          ],
+        await this.markOrderPaid(orderId, {
+          payment_provider: 'stripe',
+          provider_order_id: sessionId,
+          payment_method: 'card',
+          paid_at: { $date: new Date().toISOString() },
+          updated_at: { $date: new Date().toISOString() },
         });
 
         // =============================================
@@ -734,28 +702,17 @@ export class CheckoutService {
     );
 
     // Update order status to PAGADA with commission data
-    await this.prisma.$runCommandRaw({
-      update: 'orders',
-      updates: [
-        {
-          q: { _id: { $oid: orderId } },
-          u: {
-            $set: {
-              status: 'PAGADA',
-              payment_provider: 'stripe_simulated',
-              payment_method: 'card_simulated',
-              paid_at: { $date: new Date().toISOString() },
-              // Commission fields
-              gateway_fee_cents: commissions.gatewayFeeCents,
-              gateway_fee_percent: commissions.gatewayFeePercent,
-              platform_fee_cents: commissions.platformFeeCents,
-              platform_fee_percent: commissions.platformFeePercent,
-              net_amount_cents: commissions.netAmountCents,
-              updated_at: { $date: new Date().toISOString() },
-            },
-          },
-        },
-      ],
+    await this.markOrderPaid(orderId, {
+      payment_provider: 'stripe_simulated',
+      payment_method: 'card_simulated',
+      paid_at: { $date: new Date().toISOString() },
+      // Commission fields
+      gateway_fee_cents: commissions.gatewayFeeCents,
+      gateway_fee_percent: commissions.gatewayFeePercent,
+      platform_fee_cents: commissions.platformFeeCents,
+      platform_fee_percent: commissions.platformFeePercent,
+      net_amount_cents: commissions.netAmountCents,
+      updated_at: { $date: new Date().toISOString() },
     });
 
     // Send Telegram notification if user came from Telegram
@@ -817,29 +774,18 @@ export class CheckoutService {
     );
 
     // Update order status to PAGADA with commission data
-    await this.prisma.$runCommandRaw({
-      update: 'orders',
-      updates: [
-        {
-          q: { _id: { $oid: orderId } },
-          u: {
-            $set: {
-              status: 'PAGADA',
-              payment_provider: order.paymentProvider || 'stripe',
-              provider_order_id: sessionId || order.providerOrderId,
-              payment_method: 'card',
-              paid_at: { $date: new Date().toISOString() },
-              // Commission fields
-              gateway_fee_cents: commissions.gatewayFeeCents,
-              gateway_fee_percent: commissions.gatewayFeePercent,
-              platform_fee_cents: commissions.platformFeeCents,
-              platform_fee_percent: commissions.platformFeePercent,
-              net_amount_cents: commissions.netAmountCents,
-              updated_at: { $date: new Date().toISOString() },
-            },
-          },
-        },
-      ],
+    await this.markOrderPaid(orderId, {
+      payment_provider: order.paymentProvider || 'stripe',
+      provider_order_id: sessionId || order.providerOrderId,
+      payment_method: 'card',
+      paid_at: { $date: new Date().toISOString() },
+      // Commission fields
+      gateway_fee_cents: commissions.gatewayFeeCents,
+      gateway_fee_percent: commissions.gatewayFeePercent,
+      platform_fee_cents: commissions.platformFeeCents,
+      platform_fee_percent: commissions.platformFeePercent,
+      net_amount_cents: commissions.netAmountCents,
+      updated_at: { $date: new Date().toISOString() },
     });
 
     this.logger.log(
@@ -972,6 +918,32 @@ export class CheckoutService {
     };
   }
 
+  /**
+   * Mark an order as PAGADA only if it is not paid yet. Only that transition adds the order
+   * to the tipster balance, so replayed webhooks and double confirmations count it once.
+   */
+  private async markOrderPaid(orderId: string, fields: Record<string, any>): Promise<boolean> {
+    const result = (await this.prisma.$runCommandRaw({
+      update: 'orders',
+      updates: [
+        {
+          q: { _id: { $oid: orderId }, status: { $nin: PAID_ORDER_STATUSES } },
+          u: { $set: { status: 'PAGADA', ...fields } },
+        },
+      ],
+    })) as any;
+
+    if (!result.nModified) return false;
+
+    try {
+      await this.balances.recordOrderPaid(orderId);
+    } catch (error) {
+      // The payment stands; the balance reconciliation job picks up the difference
+      this.logger.error(`Failed to update tipster balance for order ${orderId}: ${error.message}`);
+    }
+    return true;
+  }
+
   /**
    * Get order details by ID
    */
@@ -1033,22 +1005,11 @@ export class CheckoutService {
     this.logger.log(`Created test order ${orderId}`);
 
     // 3. Simulate payment
-    await this.prisma.$runCommandRaw({
-      update: 'orders',
-      updates: [
-        {
-          q: { _id: { $oid: orderId } },
-          u: {
-            $set: {
-              status: 'PAGADA',
-              payment_provider: 'test_simulated',
-              payment_method: 'test',
-              paid_at: { $date: new Date().toISOString() },
-              updated_at: { $date: new Date().toISOString() },
-            },
-          },
-        },
-      ],
+    await this.markOrderPaid(orderId, {
+      payment_provider: 'test_simulated',
+      payment_method: 'test',
+      paid_at: { $date: new Date().toISOString() },
+      updated_at: { $date: new Date().toISOString() },
     });
 
     this.logger.log(`Simulated payment for order ${orderId}`);
@@ -1,5 +1,8 @@
-import { Injectable, Logger } from '@nestjs/common';
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
+import * as fs from 'fs';
+import { LruCache } from '../common/cache/lru-cache';
+import { IpCountryTable } from './ip-country-table';
 
 export interface GeoLocationResult {
   country: string; // Country code (ES, US, etc.)
@@ -10,14 +13,71 @@ export interface GeoLocationResult {
   isSpain: boolean;
 }
 
+/**
+ * GeolocationService - País del comprador a partir de su IP
+ *
+ * Si GEOIP_DB_PATH apunta a un CSV de rangos IPv4 (ver IpCountryTable) se resuelve en local,
+ * sin red, con una caché LRU por IP delante. El fichero se recarga solo cuando cambia.
+ * Las IPs que no están en la tabla (IPv6, rangos nuevos) o la ausencia de tabla caen a
+ * ip-api.com, salvo con GEOIP_REMOTE_FALLBACK=false.
+ */
 @Injectable()
-export class GeolocationService {
+export class GeolocationService implements OnModuleInit, OnModuleDestroy {
   private readonly logger = new Logger(GeolocationService.name);
 
+  private readonly dbPath = process.env.GEOIP_DB_PATH || '';
+  private readonly remoteFallback = process.env.GEOIP_REMOTE_FALLBACK !== 'false';
+  private readonly reloadCheckMs = Number(process.env.GEOIP_RELOAD_CHECK_MS) || 60 * 1000;
+
+  private table: IpCountryTable | null = null;
+  private reloading: Promise<void> | null = null;
+  private readonly cache = new LruCache<GeoLocationResult>({
+    maxEntries: Number(process.env.GEOIP_CACHE_MAX) || 10000,
+    ttlMs: 6 * 60 * 60 * 1000,
+  });
+  private readonly regionNames = new Intl.DisplayNames(['en'], { type: 'region' });
+
   constructor(private config: ConfigService) {}
 
+  onModuleInit() {
+    if (!this.dbPath) return;
+
+    this.reload();
+    // watchFile (polling por mtime) también detecta el fichero reemplazado con mv
+    fs.watchFile(this.dbPath, { interval: this.reloadCheckMs, persistent: false }, (curr, prev) => {
+      if (curr.mtimeMs !== prev.mtimeMs && curr.size > 0) this.reload();
+    });
+  }
+
+  onModuleDestroy() {
+    if (this.dbPath) fs.unwatchFile(this.dbPath);
+  }
+
   /**
-   * Detect country from IP address using ip-api.com (free, no API key)
+   * (Re)cargar la tabla de rangos; la anterior sigue sirviendo hasta que la nueva está lista
+   */
+  reload(): Promise<void> {
+    if (!this.reloading) {
+      const started = Date.now();
+      this.reloading = IpCountryTable.fromCsv(this.dbPath)
+        .then((table) => {
+          if (!table.size) throw new Error('no IPv4 ranges found');
+          this.table = table;
+          this.cache.clear();
+          this.logger.log(`🌍 GeoIP table loaded: ${table.size} ranges in ${Date.now() - started}ms`);
+        })
+        .catch((error) => {
+          this.logger.error(`GeoIP table load failed (${this.dbPath}): ${error.message}`);
+        })
+        .finally(() => {
+          this.reloading = null;
+        });
+    }
+    return this.reloading;
+  }
+
+  /**
+   * Detect country from IP address: local range table first, then ip-api.com (free, no API key)
    */
   async detectCountry(ip: string): Promise<GeoLocationResult> {
     try {
@@ -30,6 +90,25 @@ export class GeolocationService {
         return this.getDefaultResult(cleanIp, 'ES');
       }
 
+      const cached = this.cache.get(cleanIp);
+      if (cached) return cached;
+
+      const local = this.table?.lookup(cleanIp);
+      if (local) {
+        const result: GeoLocationResult = {
+          country: local.code,
+          countryName: local.name || this.countryName(local.code),
+          ip: cleanIp,
+          isSpain: local.code === 'ES',
+        };
+        this.cache.set(cleanIp, result);
+        return result;
+      }
+
+      if (!this.remoteFallback) {
+        return this.getDefaultResult(cleanIp, 'ES');
+      }
+
       // Call ip-api.com (free, no API key needed)
       const response = await fetch(
         `http://ip-api.com/json/${cleanIp}?fields=status,country,countryCode,regionName,city`,
@@ -47,6 +126,7 @@ export class GeolocationService {
         };
 
         this.logger.log(`Geolocation for ${cleanIp}: ${data.countryCode} (${data.country})`);
+        this.cache.set(cleanIp, result);
         return result;
       }
 
@@ -76,6 +156,17 @@ export class GeolocationService {
     return privateRanges.some((range) => range.test(ip));
   }
 
+  /**
+   * English country name for an ISO code (same language as ip-api.com)
+   */
+  private countryName(code: string): string {
+    try {
+      return this.regionNames.of(code) || code;
+    } catch {
+      return code;
+    }
+  }
+
   /**
    * Get default result when geolocation fails
    */
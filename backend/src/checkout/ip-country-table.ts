@@ -0,0 +1,120 @@
+import * as fs from 'fs';
+import { pipeline } from 'stream';
+import { parse } from 'csv-parse';
+
+/**
+ * IpCountryTable - Rangos IPv4 → país en arrays tipados ordenados
+ *
+ * Se carga desde un CSV de rangos (IP2Location LITE DB1, DB-IP "IP to Country Lite" o
+ * cualquier `inicio,fin,país[,nombre]`, con IPs en texto o como entero). Cada rango ocupa
+ * 10 bytes (inicio y fin en Uint32Array, índice de país en Uint16Array) y la búsqueda es
+ * binaria sobre los inicios. Las filas IPv6 se ignoran.
+ */
+export class IpCountryTable {
+  private constructor(
+    private readonly starts: Uint32Array,
+    private readonly ends: Uint32Array,
+    private readonly countryIndex: Uint16Array,
+    private readonly countries: { code: string; name: string | null }[],
+  ) {}
+
+  get size() {
+    return this.starts.length;
+  }
+
+  static async fromCsv(filePath: string): Promise<IpCountryTable> {
+    const starts: number[] = [];
+    const ends: number[] = [];
+    const indexes: number[] = [];
+    const countries: { code: string; name: string | null }[] = [];
+    const countryByCode = new Map<string, number>();
+
+    // pipeline (no .pipe) para que un error del fichero (ENOENT, EACCES) destruya el parser
+    // y rechace la iteración en vez de quedar como evento 'error' sin manejar
+    const parser = parse({ relax_column_count: true, skip_empty_lines: true, trim: true });
+    pipeline(fs.createReadStream(filePath), parser, () => {});
+
+    for await (const record of parser as AsyncIterable<string[]>) {
+      if (record.length < 3) continue;
+      const start = parseIp(record[0]);
+      const end = parseIp(record[1]);
+      const code = record[2]?.toUpperCase();
+      // Cabeceras, filas IPv6 y rangos sin país ('-' en IP2Location)
+      if (start < 0 || end < start || !/^[A-Z]{2}$/.test(code)) continue;
+
+      let index = countryByCode.get(code);
+      if (index === undefined) {
+        index = countries.length;
+        countries.push({ code, name: record[3] || null });
+        countryByCode.set(code, index);
+      }
+      starts.push(start);
+      ends.push(end);
+      indexes.push(index);
+    }
+
+    // La búsqueda binaria necesita los rangos ordenados por inicio
+    let order: number[] | null = null;
+    for (let i = 1; i < starts.length; i++) {
+      if (starts[i] < starts[i - 1]) {
+        order = starts.map((_, j) => j).sort((a, b) => starts[a] - starts[b]);
+        break;
+      }
+    }
+    const pick = (values: number[]) => (order ? order.map((i) => values[i]) : values);
+
+    return new IpCountryTable(
+      Uint32Array.from(pick(starts)),
+      Uint32Array.from(pick(ends)),
+      Uint16Array.from(pick(indexes)),
+      countries,
+    );
+  }
+
+  /**
+   * País de una IPv4 en texto, o null si no está en ningún rango (o no es IPv4)
+   */
+  lookup(ip: string): { code: string; name: string | null } | null {
+    const value = parseIp(ip);
+    if (value < 0) return null;
+
+    // Último rango cuyo inicio es <= value
+    let low = 0;
+    let high = this.starts.length - 1;
+    let found = -1;
+    while (low <= high) {
+      const mid = (low + high) >>> 1;
+      if (this.starts[mid] <= value) {
+        found = mid;
+        low = mid + 1;
+      } else {
+        high = mid - 1;
+      }
+    }
+
+    if (found < 0 || this.ends[found] < value) return null;
+    return this.countries[this.countryIndex[found]];
+  }
+}
+
+/**
+ * IPv4 en texto ("1.2.3.4") o entero ("16909060") a número sin signo; -1 si no es válida
+ */
+function parseIp(text: string): number {
+  if (!text) return -1;
+  if (/^\d+$/.test(text)) {
+    const value = Number(text);
+    return value <= 0xffffffff ? value : -1;
+  }
+
+  const parts = text.split('.');
+  if (parts.length !== 4) return -1;
+  let value = 0;
+  for (const part of parts) {
+    if (!/^\d{1,3}$/.test(part)) return -1;
+    const octet = Number(part);
+    if (octet > 255) return -1;
+    value = value * 256 + octet;
+  }
+  return value;
+}
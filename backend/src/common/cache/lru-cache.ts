@@ -0,0 +1,119 @@
+/**
+ * LruCache - Cache en memoria con expiración (TTL) y desalojo LRU
+ *
+ * Un Map conserva el orden de inserción: cada lectura reinserta la clave al final,
+ * de modo que la primera clave es siempre la menos usada recientemente.
+ * getOrLoad() agrupa las cargas concurrentes de una misma clave (single-flight),
+ * así un pico sobre una clave fría genera una sola consulta a Mongo.
+ */
+export interface LruCacheOptions {
+  maxEntries: number;
+  ttlMs: number;
+}
+
+interface CacheEntry<V> {
+  value: V;
+  expiresAt: number;
+}
+
+export class LruCache<V> {
+  private readonly entries = new Map<string, CacheEntry<V>>();
+  private readonly loading = new Map<string, Promise<V>>();
+  // Se incrementa en cada invalidación; una carga iniciada antes no se guarda
+  private generation = 0;
+
+  hits = 0;
+  misses = 0;
+
+  constructor(private readonly options: LruCacheOptions) {}
+
+  get size() {
+    return this.entries.size;
+  }
+
+  get(key: string): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+
+    // Mover al final (más reciente)
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: string, value: V) {
+    if (this.options.maxEntries <= 0 || this.options.ttlMs <= 0) return;
+
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.options.ttlMs });
+
+    while (this.entries.size > this.options.maxEntries) {
+      const oldest = this.entries.keys().next().value;
+      this.entries.delete(oldest);
+    }
+  }
+
+  /**
+   * Devolver el valor cacheado o cargarlo una sola vez aunque haya llamadas concurrentes
+   */
+  async getOrLoad(key: string, loader: () => Promise<V>): Promise<V> {
+    const cached = this.get(key);
+    if (cached !== undefined) {
+      this.hits++;
+      return cached;
+    }
+    this.misses++;
+
+    const pending = this.loading.get(key);
+    if (pending) return pending;
+
+    const generation = this.generation;
+    const load = loader()
+      .then((value) => {
+        if (generation === this.generation) {
+          this.set(key, value);
+        }
+        return value;
+      })
+      .finally(() => {
+        if (this.loading.get(key) === load) {
+          this.loading.delete(key);
+        }
+      });
+    this.loading.set(key, load);
+    return load;
+  }
+
+  delete(key: string) {
+    this.generation++;
+    this.loading.delete(key);
+    return this.entries.delete(key);
+  }
+
+  /**
+   * Eliminar las entradas que cumplan el predicado; devuelve cuántas se eliminaron
+   */
+  deleteWhere(predicate: (value: V, key: string) => boolean): number {
+    this.generation++;
+    this.loading.clear();
+    let removed = 0;
+    for (const [key, entry] of this.entries) {
+      if (predicate(entry.value, key)) {
+        this.entries.delete(key);
+        removed++;
+      }
+    }
+    return removed;
+  }
+
+  clear() {
+    this.generation++;
+    this.loading.clear();
+    this.entries.clear();
+  }
+}
@@ -1,9 +1,16 @@
-import { Injectable, Logger } from '@nestjs/common';
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
 import { PrismaService } from '../prisma/prisma.service';
 import axios from 'axios';
 
 const EXCHANGE_RATE_API_URL = 'https://api.exchangerate-api.com/v4/latest';
 const CACHE_DURATION_MS = 3600000; // 1 hora
+// Tras un fallo de la API no se reintenta en segundo plano antes de este margen
+const RETRY_AFTER_FAILURE_MS = 60000;
+// Pares que siempre se mantienen en la tabla
+const DEFAULT_PAIRS = [
+  ['EUR', 'USD'],
+  ['USD', 'EUR'],
+];
 
 export interface ExchangeRateInfo {
   baseCurrency: string;
@@ -14,13 +21,54 @@ export interface ExchangeRateInfo {
   updatedAt: Date;
 }
 
+// Entrada de la tabla: último valor de la API y override manual (que manda si existe)
+interface RateEntry {
+  api?: { rate: number; fetchedAt: Date };
+  manual?: { rate: number; updatedAt: Date };
+}
+
+/**
+ * CurrencyService - Tipos de cambio desde una tabla en memoria
+ *
+ * La tabla (par → valor de la API y override manual) se carga de exchange_rates al arrancar
+ * y un job la refresca cada CURRENCY_REFRESH_MS: una llamada a la API por moneda base y
+ * relectura de los overrides (por si los cambió otra instancia). getExchangeRate no toca
+ * Mongo ni la API salvo para un par nunca visto; un valor caducado se sirve igualmente y
+ * dispara un refresco en segundo plano. setManualRate/removeManualOverride actualizan la
+ * tabla al momento.
+ */
 @Injectable()
-export class CurrencyService {
+export class CurrencyService implements OnModuleInit, OnModuleDestroy {
   private readonly logger = new Logger(CurrencyService.name);
-  private rateCache: Map<string, { rate: number; fetchedAt: Date }> = new Map();
+
+  private readonly refreshIntervalMs = Number(process.env.CURRENCY_REFRESH_MS) || CACHE_DURATION_MS;
+
+  private readonly rates = new Map<string, RateEntry>();
+  private ready: Promise<void> | null = null;
+  private refreshing: Promise<void> | null = null;
+  private readonly fetchingBase = new Map<string, Promise<void>>();
+  private lastRefreshFailedAt = 0;
+  private timer: NodeJS.Timeout | null = null;
 
   constructor(private prisma: PrismaService) {}
 
+  onModuleInit() {
+    this.ensureLoaded()
+      .then(() => this.refreshRates())
+      .catch((error) => this.logger.error(`Exchange rate table init failed: ${error.message}`));
+    this.timer = setInterval(() => {
+      this.refreshRates().catch((error) => this.logger.error(`Exchange rate refresh failed: ${error.message}`));
+    }, this.refreshIntervalMs);
+    this.timer.unref();
+  }
+
+  onModuleDestroy() {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
   /**
    * Obtener tipo de cambio entre dos monedas
    */
@@ -36,44 +84,35 @@ export class CurrencyService {
       };
     }
 
-    // Buscar override manual primero
-    const manualRate = await this.getManualOverride(baseCurrency, targetCurrency);
-    if (manualRate) {
-      return manualRate;
+    await this.ensureLoaded();
+    const cacheKey = this.pairKey(baseCurrency, targetCurrency);
+    let entry = this.rates.get(cacheKey);
+
+    // Override manual primero
+    if (entry?.manual) {
+      return this.toInfo(baseCurrency, targetCurrency, entry);
     }
 
-    // Buscar en caché
-    const cacheKey = `${baseCurrency}_${targetCurrency}`;
-    const cached = this.rateCache.get(cacheKey);
-    if (cached && Date.now() - cached.fetchedAt.getTime() < CACHE_DURATION_MS) {
-      return {
-        baseCurrency,
-        targetCurrency,
-        rate: cached.rate,
-        source: 'API',
-        isManualOverride: false,
-        updatedAt: cached.fetchedAt,
-      };
+    if (entry?.api) {
+      // Stale-while-revalidate: responder ya y refrescar en segundo plano
+      if (
+        Date.now() - entry.api.fetchedAt.getTime() >= this.refreshIntervalMs &&
+        Date.now() - this.lastRefreshFailedAt >= RETRY_AFTER_FAILURE_MS
+      ) {
+        this.refreshRates().catch((error) => this.logger.error(`Exchange rate refresh failed: ${error.message}`));
+      }
+      return this.toInfo(baseCurrency, targetCurrency, entry);
     }
 
-    // Obtener de API externa
+    // Par nuevo: se registra en la tabla y se obtiene de la API en línea (solo esta vez)
+    if (!entry) {
+      entry = {};
+      this.rates.set(cacheKey, entry);
+    }
     try {
-      const rate = await this.fetchFromAPI(baseCurrency, targetCurrency);
-
-      // Guardar en caché
-      this.rateCache.set(cacheKey, { rate, fetchedAt: new Date() });
-
-      // Guardar en DB
-      await this.saveRateToDb(baseCurrency, targetCurrency, rate, 'API');
-
-      return {
-        baseCurrency,
-        targetCurrency,
-        rate,
-        source: 'API',
-        isManualOverride: false,
-        updatedAt: new Date(),
-      };
+      await this.refreshBase(baseCurrency);
+      if (entry.api) return this.toInfo(baseCurrency, targetCurrency, entry);
+      throw new Error(`Rate not found for ${baseCurrency} to ${targetCurrency}`);
     } catch (error) {
       this.logger.error(`Error fetching exchange rate: ${error.message}`);
 
@@ -83,7 +122,7 @@ export class CurrencyService {
 
       // Fallback a rate predeterminado
       const defaultRates = { EUR_USD: 1.08, USD_EUR: 0.93 };
-      const fallbackRate = defaultRates[`${baseCurrency}_${targetCurrency}`] || 1;
+      const fallbackRate = defaultRates[cacheKey] || 1;
 
       return {
         baseCurrency,
@@ -97,49 +136,162 @@ export class CurrencyService {
   }
 
   /**
-   * Obtener tipo de cambio de API externa
+   * Refrescar todos los pares de la tabla (una sola ejecución a la vez)
+   */
+  async refreshRates(): Promise<void> {
+    if (!this.refreshing) {
+      this.refreshing = this.runRefresh().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
+  }
+
+  private async runRefresh() {
+    await this.ensureLoaded();
+    await this.loadOverrides();
+
+    const bases = new Set([...this.rates.keys()].map((key) => key.split('_')[0]));
+    for (const base of bases) {
+      try {
+        await this.refreshBase(base);
+      } catch (error) {
+        this.lastRefreshFailedAt = Date.now();
+        this.logger.error(`Error refreshing ${base} rates, keeping previous values: ${error.message}`);
+      }
+    }
+  }
+
+  /**
+   * Una llamada a la API por moneda base actualiza todos los pares de esa base en la tabla
+   */
+  private refreshBase(baseCurrency: string): Promise<void> {
+    let fetching = this.fetchingBase.get(baseCurrency);
+    if (!fetching) {
+      fetching = (async () => {
+        const apiRates = await this.fetchFromAPI(baseCurrency);
+        const fetchedAt = new Date();
+        for (const [key, entry] of this.rates) {
+          const [base, target] = key.split('_');
+          const rate = apiRates[target];
+          if (base !== baseCurrency || !rate) continue;
+
+          entry.api = { rate, fetchedAt };
+          // Guardar en DB (último valor + histórico); el documento de un override guarda el manual
+          if (entry.manual) continue;
+          await this.saveRateToDb(base, target, rate, 'API').catch((error) =>
+            this.logger.error(`Error saving rate ${key}: ${error.message}`),
+          );
+        }
+      })().finally(() => {
+        this.fetchingBase.delete(baseCurrency);
+      });
+      this.fetchingBase.set(baseCurrency, fetching);
+    }
+    return fetching;
+  }
+
+  /**
+   * Obtener tipos de cambio de una moneda base desde la API externa
    */
-  private async fetchFromAPI(baseCurrency: string, targetCurrency: string): Promise<number> {
+  private async fetchFromAPI(baseCurrency: string): Promise<Record<string, number>> {
     const response = await axios.get(`${EXCHANGE_RATE_API_URL}/${baseCurrency}`);
-    const rate = response.data.rates[targetCurrency];
+    const rates = response.data?.rates;
 
-    if (!rate) {
-      throw new Error(`Rate not found for ${baseCurrency} to ${targetCurrency}`);
+    if (!rates) {
+      throw new Error(`Rates not found for ${baseCurrency}`);
     }
 
-    this.logger.log(`Fetched rate ${baseCurrency}/${targetCurrency}: ${rate}`);
-    return rate;
+    this.logger.log(`Fetched ${baseCurrency} rates (${Object.keys(rates).length} currencies)`);
+    return rates;
   }
 
   /**
-   * Obtener override manual de la DB
+   * Cargar la tabla desde exchange_rates (una vez; las llamadas concurrentes esperan la misma carga)
    */
-  private async getManualOverride(
-    baseCurrency: string,
-    targetCurrency: string,
-  ): Promise<ExchangeRateInfo | null> {
+  private ensureLoaded(): Promise<void> {
+    if (!this.ready) {
+      this.ready = this.loadTable().catch((error) => {
+        this.ready = null;
+        throw error;
+      });
+    }
+    return this.ready;
+  }
+
+  private async loadTable() {
+    for (const [base, target] of DEFAULT_PAIRS) {
+      this.rates.set(this.pairKey(base, target), {});
+    }
+
     const result = (await this.prisma.$runCommandRaw({
       find: 'exchange_rates',
-      filter: {
-        base_currency: baseCurrency,
-        target_currency: targetCurrency,
-        is_manual_override: true,
-      },
-      limit: 1,
+      filter: {},
+      batchSize: 1000,
     })) as any;
 
-    const rate = result.cursor?.firstBatch?.[0];
-    if (rate) {
+    for (const doc of result.cursor?.firstBatch || []) {
+      const key = this.pairKey(doc.base_currency, doc.target_currency);
+      const entry = this.rates.get(key) || {};
+      if (doc.is_manual_override) {
+        entry.manual = { rate: doc.rate, updatedAt: new Date(doc.updated_at?.$date || doc.updated_at) };
+      } else {
+        const fetchedAt = doc.fetched_at || doc.updated_at;
+        entry.api = { rate: doc.rate, fetchedAt: new Date(fetchedAt?.$date || fetchedAt || 0) };
+      }
+      this.rates.set(key, entry);
+    }
+    this.logger.log(`💱 Exchange rate table loaded: ${this.rates.size} pairs`);
+  }
+
+  /**
+   * Releer los overrides manuales (pueden haberse cambiado desde otra instancia)
+   */
+  private async loadOverrides() {
+    const result = (await this.prisma.$runCommandRaw({
+      find: 'exchange_rates',
+      filter: { is_manual_override: true },
+      batchSize: 1000,
+    })) as any;
+
+    const overrides = new Map<string, any>();
+    for (const doc of result.cursor?.firstBatch || []) {
+      overrides.set(this.pairKey(doc.base_currency, doc.target_currency), doc);
+    }
+
+    for (const [key, entry] of this.rates) {
+      if (!overrides.has(key)) delete entry.manual;
+    }
+    for (const [key, doc] of overrides) {
+      const entry = this.rates.get(key) || {};
+      entry.manual = { rate: doc.rate, updatedAt: new Date(doc.updated_at?.$date || doc.updated_at) };
+      this.rates.set(key, entry);
+    }
+  }
+
+  private pairKey(baseCurrency: string, targetCurrency: string) {
+    return `${baseCurrency}_${targetCurrency}`;
+  }
+
+  private toInfo(baseCurrency: string, targetCurrency: string, entry: RateEntry): ExchangeRateInfo {
+    if (entry.manual) {
       return {
         baseCurrency,
         targetCurrency,
-        rate: rate.rate,
+        rate: entry.manual.rate,
         source: 'MANUAL',
         isManualOverride: true,
-        updatedAt: new Date(rate.updated_at?.$date || rate.updated_at),
+        updatedAt: entry.manual.updatedAt,
       };
     }
-    return null;
+    return {
+      baseCurrency,
+      targetCurrency,
+      rate: entry.api.rate,
+      source: 'API',
+      isManualOverride: false,
+      updatedAt: entry.api.fetchedAt,
+    };
   }
 
   /**
@@ -270,8 +422,12 @@ export class CurrencyService {
       ],
     });
 
-    // Invalidar caché
-    this.rateCache.delete(`${baseCurrency}_${targetCurrency}`);
+    // Aplicar en la tabla en memoria
+    await this.ensureLoaded();
+    const key = this.pairKey(baseCurrency, targetCurrency);
+    const entry = this.rates.get(key) || {};
+    entry.manual = { rate, updatedAt: new Date(now) };
+    this.rates.set(key, entry);
 
     this.logger.log(
       `Manual rate set: ${baseCurrency}/${targetCurrency} = ${rate} by admin ${adminId}`,
@@ -302,8 +458,17 @@ export class CurrencyService {
       ],
     });
 
-    // Invalidar caché
-    this.rateCache.delete(`${baseCurrency}_${targetCurrency}`);
+    // Volver al valor de la API en la tabla; si no se conoce, obtenerlo ahora
+    await this.ensureLoaded();
+    const key = this.pairKey(baseCurrency, targetCurrency);
+    const entry = this.rates.get(key) || {};
+    delete entry.manual;
+    this.rates.set(key, entry);
+    if (!entry.api) {
+      await this.refreshBase(baseCurrency).catch((error) =>
+        this.logger.error(`Error fetching exchange rate: ${error.message}`),
+      );
+    }
 
     return { success: true, message: 'Manual override removed' };
   }
@@ -313,13 +478,9 @@ export class CurrencyService {
    */
   async getAllRates(): Promise<ExchangeRateInfo[]> {
     // Asegurar que tenemos EUR/USD y USD/EUR
-    const pairs = [
-      ['EUR', 'USD'],
-      ['USD', 'EUR'],
-    ];
     const results: ExchangeRateInfo[] = [];
 
-    for (const [base, target] of pairs) {
+    for (const [base, target] of DEFAULT_PAIRS) {
       const rate = await this.getExchangeRate(base, target);
       results.push(rate);
     }
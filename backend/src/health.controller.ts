@@ -2,6 +2,7 @@ import { Controller, Get, Query, Inject, forwardRef } from '@nestjs/common';
 import { ApiTags, ApiOperation } from '@nestjs/swagger';
 import { PrismaService } from './prisma/prisma.service';
 import { TelegramService } from './telegram/telegram.service';
+import { TelegramUpdateQueueService } from './telegram/telegram-update-queue.service';
 import { EmailService } from './emails/emails.service';
 
 @ApiTags('health')
@@ -10,6 +11,7 @@ export class HealthController {
   constructor(
     private prisma: PrismaService,
     @Inject(forwardRef(() => TelegramService)) private telegramService: TelegramService,
+    @Inject(forwardRef(() => TelegramUpdateQueueService)) private updateQueue: TelegramUpdateQueueService,
     @Inject(forwardRef(() => EmailService)) private emailService: EmailService,
   ) {}
 
@@ -68,6 +70,33 @@ export class HealthController {
     }
   }
 
+  @Get('telegram/queue')
+  @ApiOperation({ summary: 'Telegram outbound queue metrics' })
+  checkTelegramQueue() {
+    const stats = this.telegramService.getOutboundQueueStats();
+    return {
+      status: stats.globalPausedMs > 0 ? 'throttled' : 'ok',
+      ...stats,
+    };
+  }
+
+  @Get('telegram/updates')
+  @ApiOperation({ summary: 'Telegram webhook intake queue metrics' })
+  async checkTelegramUpdates() {
+    try {
+      const stats = await this.updateQueue.stats();
+      return {
+        status: stats.failed > 0 ? 'degraded' : 'ok',
+        ...stats,
+      };
+    } catch (error) {
+      return {
+        status: 'error',
+        error: error.message,
+      };
+    }
+  }
+
   @Get('email')
   @ApiOperation({ summary: 'Check email service status' })
   async checkEmail() {
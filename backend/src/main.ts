@@ -92,6 +92,9 @@ async function bootstrap() {
   const document = SwaggerModule.createDocument(app, config);
   SwaggerModule.setup('api/docs', app, document);
 
+  // Run onModuleDestroy on SIGTERM/SIGINT so write-behind buffers drain before exit
+  app.enableShutdownHooks();
+
   // Start server
   const port = process.env.PORT || process.env.BACKEND_PORT || 8001;
   await app.listen(port, '0.0.0.0');
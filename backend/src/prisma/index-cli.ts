@@ -0,0 +1,56 @@
+/**
+ * CLI de índices de Mongo
+ *
+ *   npm run db:indexes -- ensure   crear los índices de INDEX_MANIFEST
+ *   npm run db:indexes -- verify   explain de HOT_QUERIES; sale con código 1 si alguna hace COLLSCAN
+ *
+ * En producción (compilado): node dist/prisma/index-cli.js verify
+ */
+import { Logger } from '@nestjs/common';
+import { PrismaService } from './prisma.service';
+import { IndexManagerService } from './index-manager.service';
+
+async function main() {
+  const command = process.argv[2] || 'verify';
+  if (command !== 'ensure' && command !== 'verify') {
+    console.error('Usage: index-cli <ensure|verify>');
+    process.exit(2);
+  }
+
+  const prisma = new PrismaService();
+  await prisma.$connect();
+  const indexManager = new IndexManagerService(prisma);
+  let failed = false;
+
+  try {
+    if (command === 'ensure') {
+      const results = await indexManager.ensureIndexes();
+      for (const r of results) {
+        console.log(`${r.status.padEnd(8)} ${r.collection}.${r.name}${r.message ? `  ${r.message}` : ''}`);
+      }
+      failed = results.some((r) => r.status === 'error');
+    } else {
+      const results = await indexManager.verifyQueryPlans();
+      for (const r of results) {
+        const verdict = r.error ? 'ERROR' : r.collscan ? 'COLLSCAN' : 'ok';
+        console.log(`${verdict.padEnd(8)} ${r.collection.padEnd(28)} ${r.name}  [${r.error || r.stages.join(' > ')}]`);
+      }
+      const collscans = results.filter((r) => r.collscan || r.error);
+      if (collscans.length) {
+        console.error(`❌ ${collscans.length} of ${results.length} hot queries are not using an index`);
+        failed = true;
+      } else {
+        console.log(`✅ All ${results.length} hot queries use an index`);
+      }
+    }
+  } finally {
+    await prisma.$disconnect();
+  }
+
+  process.exit(failed ? 1 : 0);
+}
+
+main().catch((error) => {
+  new Logger('IndexCli').error(error.message);
+  process.exit(1);
+});
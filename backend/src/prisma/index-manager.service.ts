@@ -0,0 +1,162 @@
+import { Injectable, Logger, OnModuleInit } from '@nestjs/common';
+import { PrismaService } from './prisma.service';
+import { HOT_QUERIES, INDEX_MANIFEST, IndexSpec, QueryShape } from './index-manifest';
+
+// Mongo 85 (IndexOptionsConflict): mismas claves con otro nombre u otras opciones (p.ej.
+// creado por prisma db push), sirve igual. Prisma envuelve el error del servidor, así que
+// se reconoce por el mensaje.
+const INDEX_OPTIONS_CONFLICT = /IndexOptionsConflict|code:?\s*`?85\b/i;
+// Mongo 86 (IndexKeySpecsConflict): ya hay un índice con ese nombre pero otras claves, así
+// que el del manifiesto no existe
+const INDEX_KEY_SPECS_CONFLICT = /IndexKeySpecsConflict|code:?\s*`?86\b/i;
+
+export interface IndexResult {
+  collection: string;
+  name: string;
+  status: 'ok' | 'conflict' | 'error';
+  message?: string;
+}
+
+export interface QueryPlanResult {
+  name: string;
+  collection: string;
+  stages: string[];
+  collscan: boolean;
+  error?: string;
+}
+
+/**
+ * IndexManagerService - Aplica INDEX_MANIFEST y verifica los planes de HOT_QUERIES
+ *
+ * Al arrancar crea los índices en segundo plano (createIndexes es idempotente);
+ * MONGO_ENSURE_INDEXES=false lo desactiva. La CLI (src/prisma/index-cli.ts) usa los
+ * mismos métodos para aplicar o verificar desde un despliegue.
+ */
+@Injectable()
+export class IndexManagerService implements OnModuleInit {
+  private readonly logger = new Logger(IndexManagerService.name);
+
+  constructor(private prisma: PrismaService) {}
+
+  onModuleInit() {
+    if (process.env.MONGO_ENSURE_INDEXES === 'false') return;
+    this.ensureIndexes()
+      .then((results) => {
+        const failed = results.filter((r) => r.status === 'error');
+        if (failed.length) {
+          this.logger.error(`❌ ${failed.length} indexes could not be created`);
+        } else {
+          this.logger.log(`✅ ${results.length} indexes ensured`);
+        }
+      })
+      .catch((error) => this.logger.error('Index creation failed:', error.message));
+  }
+
+  /**
+   * Crear los índices del manifiesto; uno por comando para que un fallo no bloquee al resto
+   */
+  async ensureIndexes(manifest: IndexSpec[] = INDEX_MANIFEST): Promise<IndexResult[]> {
+    const results: IndexResult[] = [];
+    for (const spec of manifest) {
+      const { collection, ...index } = spec;
+      try {
+        await this.prisma.$runCommandRaw({ createIndexes: collection, indexes: [index] });
+        results.push({ collection, name: spec.name, status: 'ok' });
+      } catch (error) {
+        const message = error.message || '';
+        if (INDEX_OPTIONS_CONFLICT.test(message)) {
+          // Ya existe un índice equivalente con otro nombre/opciones: sirve igual
+          results.push({ collection, name: spec.name, status: 'conflict', message });
+          this.logger.warn(`⚠️ ${collection}.${spec.name}: equivalent index already exists`);
+        } else if (INDEX_KEY_SPECS_CONFLICT.test(message)) {
+          results.push({ collection, name: spec.name, status: 'error', message });
+          this.logger.error(
+            `${collection}.${spec.name}: an index with this name but different keys exists; ` +
+              `drop it so the manifest index can be created`,
+          );
+        } else {
+          results.push({ collection, name: spec.name, status: 'error', message: error.message });
+          this.logger.error(`Failed to create ${collection}.${spec.name}:`, error.message);
+        }
+      }
+    }
+    return results;
+  }
+
+  /**
+   * Pasar cada consulta caliente por explain y marcar las que recorren la colección entera
+   */
+  async verifyQueryPlans(queries: QueryShape[] = HOT_QUERIES): Promise<QueryPlanResult[]> {
+    const results: QueryPlanResult[] = [];
+    for (const query of queries) {
+      try {
+        const explain = (await this.prisma.$runCommandRaw({
+          explain: this.explainTarget(query),
+          verbosity: 'queryPlanner',
+        })) as any;
+        const stages = this.winningStages(explain);
+        results.push({
+          name: query.name,
+          collection: query.collection,
+          stages,
+          collscan: stages.includes('COLLSCAN'),
+        });
+      } catch (error) {
+        results.push({
+          name: query.name,
+          collection: query.collection,
+          stages: [],
+          collscan: false,
+          error: error.message,
+        });
+      }
+    }
+    return results;
+  }
+
+  private explainTarget(query: QueryShape) {
+    if (query.pipeline) {
+      return { aggregate: query.collection, pipeline: query.pipeline, cursor: {} };
+    }
+    if (query.count) {
+      return { count: query.collection, query: query.filter || {} };
+    }
+    const find: any = { find: query.collection, filter: query.filter || {} };
+    if (query.sort) find.sort = query.sort;
+    return find;
+  }
+
+  /**
+   * Etapas de los planes ganadores (find, count y aggregate, motor clásico y SBE)
+   */
+  private winningStages(explain: any): string[] {
+    const stages: string[] = [];
+    const walk = (node: any) => {
+      if (!node || typeof node !== 'object') return;
+      if (Array.isArray(node)) {
+        node.forEach(walk);
+        return;
+      }
+      for (const [key, value] of Object.entries(node)) {
+        if (key === 'rejectedPlans') continue;
+        if (key === 'stage' && typeof value === 'string') stages.push(value);
+        walk(value);
+      }
+    };
+    const plans: any[] = [];
+    const collect = (node: any) => {
+      if (!node || typeof node !== 'object') return;
+      if (Array.isArray(node)) {
+        node.forEach(collect);
+        return;
+      }
+      for (const [key, value] of Object.entries(node)) {
+        if (key === 'winningPlan') plans.push(value);
+        else if (key !== 'rejectedPlans') collect(value);
+      }
+    };
+    collect(explain);
+    plans.forEach(walk);
+    return stages;
+  }
+}
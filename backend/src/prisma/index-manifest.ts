@@ -0,0 +1,206 @@
+/**
+ * Índices de Mongo que necesitan las consultas calientes hechas con $runCommandRaw.
+ *
+ * Prisma solo crea los índices del schema con `prisma db push`, y muchas colecciones se
+ * consultan con nombres de campo crudos (landing_id, created_at...), así que aquí se
+ * declaran explícitamente. IndexManagerService los aplica al arrancar y
+ * `npm run db:indexes -- verify` comprueba con explain que HOT_QUERIES no hacen COLLSCAN.
+ *
+ * Al añadir una consulta nueva sobre una colección grande, añade su forma a HOT_QUERIES
+ * y, si hace falta, el índice a INDEX_MANIFEST.
+ */
+
+export interface IndexSpec {
+  collection: string;
+  key: Record<string, 1 | -1>;
+  name: string;
+  unique?: boolean;
+  expireAfterSeconds?: number;
+}
+
+export interface QueryShape {
+  name: string;
+  collection: string;
+  // find (con sort opcional), count o aggregate: uno de los tres
+  filter?: any;
+  sort?: any;
+  count?: boolean;
+  pipeline?: any[];
+}
+
+// Valores de ejemplo: solo importa la forma de la consulta
+const SAMPLE_ID = '000000000000000000000000';
+const SAMPLE_DATE = { $date: '2025-01-01T00:00:00.000Z' };
+
+export const INDEX_MANIFEST: IndexSpec[] = [
+  // Clicks de landings: métricas, historial, rollup diario y stats de afiliación
+  { collection: 'landing_click_events', key: { landing_id: 1, created_at: -1 }, name: 'landing_id_1_created_at_-1' },
+  { collection: 'landing_click_events', key: { tipster_id: 1, created_at: -1 }, name: 'tipster_id_1_created_at_-1' },
+  { collection: 'landing_click_events', key: { created_at: 1 }, name: 'created_at_1' },
+  { collection: 'landing_click_daily', key: { landing_id: 1, day: 1 }, name: 'landing_id_1_day_1' },
+
+  // Landings públicas
+  { collection: 'tipster_affiliate_landings', key: { slug: 1 }, name: 'slug_1' },
+  { collection: 'tipster_affiliate_landings', key: { tipster_id: 1 }, name: 'tipster_id_1' },
+  {
+    collection: 'tipster_landing_items',
+    key: { landing_id: 1, country: 1, order_index: 1 },
+    name: 'landing_id_1_country_1_order_index_1',
+  },
+  {
+    collection: 'promotion_house_links',
+    key: { promotion_id: 1, betting_house_id: 1 },
+    name: 'promotion_id_1_betting_house_id_1',
+  },
+  { collection: 'betting_houses', key: { slug: 1 }, name: 'slug_1' },
+
+  // Afiliación (modelo antiguo)
+  { collection: 'affiliate_click_events', key: { tipster_id: 1, clicked_at: -1 }, name: 'tipster_id_1_clicked_at_-1' },
+  { collection: 'affiliate_conversions', key: { tipster_id: 1, occurred_at: -1 }, name: 'tipster_id_1_occurred_at_-1' },
+  { collection: 'tipster_affiliate_links', key: { house_id: 1 }, name: 'house_id_1' },
+
+  // Pedidos: ventas del tipster, compras del cliente, accesos por Telegram e informes
+  { collection: 'orders', key: { tipster_id: 1, status: 1, created_at: -1 }, name: 'tipster_id_1_status_1_created_at_-1' },
+  { collection: 'orders', key: { client_user_id: 1, created_at: -1 }, name: 'client_user_id_1_created_at_-1' },
+  { collection: 'orders', key: { telegram_user_id: 1, created_at: -1 }, name: 'telegram_user_id_1_created_at_-1' },
+  { collection: 'orders', key: { status: 1, created_at: -1 }, name: 'status_1_created_at_-1' },
+
+  // Perfiles y usuarios
+  { collection: 'tipster_profiles', key: { user_id: 1 }, name: 'user_id_1' },
+  { collection: 'users', key: { email: 1 }, name: 'email_1' },
+
+  // Cola de updates del webhook: reclamo por orden de llegada, recuperación de leases y
+  // caducidad de los fallidos (solo ellos tienen expire_at)
+  { collection: 'telegram_update_queue', key: { status: 1, _id: 1 }, name: 'status_1__id_1' },
+  { collection: 'telegram_update_queue', key: { status: 1, locked_until: 1 }, name: 'status_1_locked_until_1' },
+  { collection: 'telegram_update_queue', key: { expire_at: 1 }, name: 'expire_at_1', expireAfterSeconds: 0 },
+  // update_id ya recibidos (deduplicación de reentregas); el _id es el update_id
+  { collection: 'telegram_update_ids', key: { expire_at: 1 }, name: 'expire_at_1', expireAfterSeconds: 0 },
+];
+
+export const HOT_QUERIES: QueryShape[] = [
+  {
+    name: 'public landing by slug',
+    collection: 'tipster_affiliate_landings',
+    filter: { slug: 'sample-slug', is_active: true },
+  },
+  {
+    name: 'landings of a tipster',
+    collection: 'tipster_affiliate_landings',
+    filter: { tipster_id: SAMPLE_ID },
+  },
+  {
+    name: 'landing items for a country',
+    collection: 'tipster_landing_items',
+    filter: { landing_id: SAMPLE_ID, country: 'ES', is_enabled: true },
+    sort: { order_index: 1 },
+  },
+  {
+    name: 'landing click history',
+    collection: 'landing_click_events',
+    filter: { landing_id: SAMPLE_ID },
+    sort: { created_at: -1 },
+  },
+  {
+    name: 'landing clicks of today',
+    collection: 'landing_click_events',
+    pipeline: [
+      { $match: { landing_id: SAMPLE_ID, created_at: { $gte: SAMPLE_DATE } } },
+      { $group: { _id: '$country_context', count: { $sum: 1 } } },
+    ],
+  },
+  {
+    name: 'landing click rollup range',
+    collection: 'landing_click_events',
+    pipeline: [{ $match: { created_at: { $gte: SAMPLE_DATE, $lt: SAMPLE_DATE } } }],
+  },
+  {
+    name: 'landing daily rollup',
+    collection: 'landing_click_daily',
+    pipeline: [
+      { $match: { landing_id: SAMPLE_ID, day: { $lte: '2025-01-01' } } },
+      { $group: { _id: '$country', count: { $sum: '$clicks' } } },
+    ],
+  },
+  {
+    name: 'landing clicks of a tipster',
+    collection: 'landing_click_events',
+    filter: { tipster_id: SAMPLE_ID },
+  },
+  {
+    name: 'promotion link for a house',
+    collection: 'promotion_house_links',
+    filter: { promotion_id: SAMPLE_ID, betting_house_id: SAMPLE_ID, is_active: true },
+  },
+  {
+    name: 'affiliate clicks of a tipster',
+    collection: 'affiliate_click_events',
+    filter: { tipster_id: SAMPLE_ID, was_blocked: false },
+    count: true,
+  },
+  {
+    name: 'affiliate conversions of a tipster',
+    collection: 'affiliate_conversions',
+    filter: { tipster_id: SAMPLE_ID, occurred_at: { $gte: SAMPLE_DATE, $lte: SAMPLE_DATE } },
+  },
+  {
+    name: 'links of a house (CSV import)',
+    collection: 'tipster_affiliate_links',
+    filter: { house_id: SAMPLE_ID },
+  },
+  {
+    name: 'paid orders of a tipster',
+    collection: 'orders',
+    filter: { tipster_id: SAMPLE_ID, status: 'PAGADA' },
+    sort: { created_at: -1 },
+  },
+  {
+    name: 'tipster sales stats',
+    collection: 'orders',
+    pipeline: [
+      { $match: { tipster_id: SAMPLE_ID, status: { $in: ['PAGADA', 'ACCESS_GRANTED'] } } },
+      { $group: { _id: null, total: { $sum: '$amount_cents' } } },
+    ],
+  },
+  {
+    name: 'sales report by date',
+    collection: 'orders',
+    pipeline: [
+      {
+        $match: {
+          status: { $in: ['PAGADA', 'COMPLETED', 'paid', 'ACCESS_GRANTED'] },
+          created_at: { $gte: SAMPLE_DATE, $lte: SAMPLE_DATE },
+        },
+      },
+      { $group: { _id: null, totalSales: { $sum: 1 } } },
+    ],
+  },
+  {
+    name: 'client purchases',
+    collection: 'orders',
+    filter: { client_user_id: SAMPLE_ID, status: { $in: ['PAGADA', 'ACCESS_GRANTED'] } },
+    sort: { created_at: -1 },
+  },
+  {
+    name: 'telegram user orders',
+    collection: 'orders',
+    filter: { telegram_user_id: '123456789', status: { $in: ['PAGADA', 'ACCESS_GRANTED'] } },
+    sort: { created_at: -1 },
+  },
+  {
+    name: 'tipster profile by user',
+    collection: 'tipster_profiles',
+    filter: { user_id: SAMPLE_ID },
+  },
+  {
+    name: 'user by email',
+    collection: 'users',
+    filter: { email: 'sample@example.com' },
+  },
+  {
+    name: 'claim queued telegram update',
+    collection: 'telegram_update_queue',
+    filter: { status: 'pending', available_at: { $lte: SAMPLE_DATE }, chat_key: { $nin: ['123456789'] } },
+    sort: { _id: 1 },
+  },
+];
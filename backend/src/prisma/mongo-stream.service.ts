@@ -0,0 +1,51 @@
+import { Injectable, Logger, OnModuleDestroy } from '@nestjs/common';
+import { Db, Document, MongoClient } from 'mongodb';
+
+/**
+ * MongoStreamService - Conexión del driver nativo solo para cursores en streaming
+ *
+ * $runCommandRaw de Prisma devuelve únicamente el primer lote de un cursor, así que las
+ * lecturas que deben recorrer colecciones enteras sin cargarlas en memoria (exportaciones)
+ * usan el driver de mongodb sobre el mismo DATABASE_URL. La conexión se abre al primer uso.
+ * Las consultas usan tipos BSON nativos (Date, ObjectId), no el extended JSON de Prisma.
+ */
+@Injectable()
+export class MongoStreamService implements OnModuleDestroy {
+  private readonly logger = new Logger(MongoStreamService.name);
+
+  private client: MongoClient | null = null;
+  private connecting: Promise<Db> | null = null;
+
+  async db(): Promise<Db> {
+    if (!this.connecting) {
+      this.client = new MongoClient(process.env.DATABASE_URL, { maxPoolSize: 5 });
+      this.connecting = this.client
+        .connect()
+        .then((client) => {
+          this.logger.log('✅ Streaming connection ready');
+          return client.db();
+        })
+        .catch((error) => {
+          this.connecting = null;
+          throw error;
+        });
+    }
+    return this.connecting;
+  }
+
+  /**
+   * Cursor de agregación; se consume con for await y respeta el ritmo del consumidor
+   */
+  async aggregate(collection: string, pipeline: Document[], batchSize = 500) {
+    const db = await this.db();
+    return db.collection(collection).aggregate(pipeline, { allowDiskUse: true, batchSize });
+  }
+
+  async onModuleDestroy() {
+    if (this.client) {
+      await this.client.close();
+      this.client = null;
+      this.connecting = null;
+    }
+  }
+}
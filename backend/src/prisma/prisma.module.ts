@@ -1,9 +1,11 @@
 import { Global, Module } from '@nestjs/common';
 import { PrismaService } from './prisma.service';
+import { IndexManagerService } from './index-manager.service';
+import { MongoStreamService } from './mongo-stream.service';
 
 @Global()
 @Module({
-  providers: [PrismaService],
-  exports: [PrismaService],
+  providers: [PrismaService, IndexManagerService, MongoStreamService],
+  exports: [PrismaService, IndexManagerService, MongoStreamService],
 })
 export class PrismaModule {}
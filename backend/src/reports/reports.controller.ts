@@ -6,8 +6,10 @@ import {
   UseGuards,
   Request,
   ForbiddenException,
+  Logger,
 } from '@nestjs/common';
 import { Response } from 'express';
+import { pipeline } from 'stream/promises';
 import { JwtAuthGuard } from '../common/guards/jwt-auth.guard';
 import { ReportsService, ReportFilters } from './reports.service';
 import { PrismaService } from '../prisma/prisma.service';
@@ -15,6 +17,8 @@ import { PrismaService } from '../prisma/prisma.service';
 @Controller('admin/reports')
 @UseGuards(JwtAuthGuard)
 export class ReportsController {
+  private readonly logger = new Logger(ReportsController.name);
+
   constructor(
     private reportsService: ReportsService,
     private prisma: PrismaService,
@@ -144,13 +148,20 @@ export class ReportsController {
     const reportType = req.params.type;
     const filters: ReportFilters = { startDate, endDate, tipsterId, status };
 
-    const csv = await this.reportsService.exportToCSV(reportType, filters);
+    // Valida el tipo antes de escribir cabeceras; el cuerpo se envía a medida que sale del cursor
+    const csv = this.reportsService.exportToCSV(reportType, filters);
 
     const filename = `antia_${reportType}_report_${new Date().toISOString().split('T')[0]}.csv`;
 
     res.setHeader('Content-Type', 'text/csv; charset=utf-8');
     res.setHeader('Content-Disposition', `attachment; filename="${filename}"`);
-    res.send(csv);
+    try {
+      await pipeline(csv, res);
+    } catch (error) {
+      // Las cabeceras ya se enviaron: solo queda cortar la respuesta
+      this.logger.error(`CSV export ${reportType} aborted: ${error.message}`);
+      res.destroy();
+    }
   }
 
   /**
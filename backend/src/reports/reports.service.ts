@@ -1,6 +1,9 @@
-import { Injectable, Logger } from '@nestjs/common';
+import { BadRequestException, Injectable, Logger } from '@nestjs/common';
+import { Readable } from 'stream';
 import { PrismaService } from '../prisma/prisma.service';
+import { MongoStreamService } from '../prisma/mongo-stream.service';
 import { CurrencyService } from '../currency/currency.service';
+import { LruCache } from '../common/cache/lru-cache';
 
 export interface ReportFilters {
   startDate?: string;
@@ -37,19 +40,33 @@ export interface SalesReport {
   }>;
 }
 
+// Celda CSV entre comillas, escapando las comillas internas
+const csvCell = (value: unknown) => `"${String(value ?? '').replace(/"/g, '""')}"`;
+
 @Injectable()
 export class ReportsService {
   private readonly logger = new Logger(ReportsService.name);
 
+  // Snapshots de reportes de rangos cerrados (clave: tipo + filtros)
+  private readonly snapshots = new LruCache<any>({
+    maxEntries: Number(process.env.REPORT_SNAPSHOT_MAX) || 500,
+    ttlMs: Number(process.env.REPORT_SNAPSHOT_TTL_MS) || 6 * 60 * 60 * 1000,
+  });
+
   constructor(
     private prisma: PrismaService,
     private currencyService: CurrencyService,
+    private mongo: MongoStreamService,
   ) {}
 
   /**
    * Reporte de Ventas
    */
   async getSalesReport(filters: ReportFilters): Promise<SalesReport> {
+    return this.snapshot('sales', filters, () => this.buildSalesReport(filters));
+  }
+
+  private async buildSalesReport(filters: ReportFilters): Promise<SalesReport> {
     const { startDate, endDate, tipsterId } = filters;
 
     // Construir filtro de fechas
@@ -63,26 +80,68 @@ export class ReportsService {
     if (Object.keys(dateFilter).length > 0) matchStage.created_at = dateFilter;
     if (tipsterId) matchStage.tipster_id = tipsterId;
 
-    // Totales generales
-    const totalsResult = (await this.prisma.$runCommandRaw({
+    // Una sola pasada sobre orders: totales, por día, por tipster y por producto (con nombres)
+    const result = (await this.prisma.$runCommandRaw({
       aggregate: 'orders',
       pipeline: [
         { $match: matchStage },
         {
-          $group: {
-            _id: null,
-            totalSales: { $sum: 1 },
-            totalGrossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
-            totalNetCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
-            totalGatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
-            totalPlatformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+          $facet: {
+            totals: [
+              {
+                $group: {
+                  _id: null,
+                  totalSales: { $sum: 1 },
+                  totalGrossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                  totalNetCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
+                  totalGatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
+                  totalPlatformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+                },
+              },
+            ],
+            byPeriod: [
+              {
+                $group: {
+                  _id: { $dateToString: { format: '%Y-%m-%d', date: '$created_at' } },
+                  sales: { $sum: 1 },
+                  grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                  netCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
+                },
+              },
+              { $sort: { _id: 1 } },
+            ],
+            byTipster: [
+              {
+                $group: {
+                  _id: '$tipster_id',
+                  sales: { $sum: 1 },
+                  grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                  netCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
+                },
+              },
+              { $sort: { grossCents: -1 } },
+              this.lookupName('tipster_profiles', 'public_name'),
+            ],
+            byProduct: [
+              {
+                $group: {
+                  _id: '$product_id',
+                  sales: { $sum: 1 },
+                  grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                },
+              },
+              { $sort: { sales: -1 } },
+              { $limit: 20 },
+              this.lookupName('products', 'title'),
+            ],
           },
         },
       ],
       cursor: {},
     })) as any;
 
-    const totals = totalsResult.cursor?.firstBatch?.[0] || {
+    const facets = result.cursor?.firstBatch?.[0] || {};
+    const totals = facets.totals?.[0] || {
       totalSales: 0,
       totalGrossCents: 0,
       totalNetCents: 0,
@@ -90,89 +149,24 @@ export class ReportsService {
       totalPlatformFeesCents: 0,
     };
 
-    // Por período (día)
-    const byPeriodResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'orders',
-      pipeline: [
-        { $match: matchStage },
-        {
-          $group: {
-            _id: { $dateToString: { format: '%Y-%m-%d', date: '$created_at' } },
-            sales: { $sum: 1 },
-            grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
-            netCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
-          },
-        },
-        { $sort: { _id: 1 } },
-      ],
-      cursor: {},
-    })) as any;
-
-    const byPeriod = (byPeriodResult.cursor?.firstBatch || []).map((item: any) => ({
+    const byPeriod = (facets.byPeriod || []).map((item: any) => ({
       period: item._id,
       sales: item.sales,
       grossCents: item.grossCents,
       netCents: item.netCents,
     }));
 
-    // Por tipster
-    const byTipsterResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'orders',
-      pipeline: [
-        { $match: matchStage },
-        {
-          $group: {
-            _id: '$tipster_id',
-            sales: { $sum: 1 },
-            grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
-            netCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
-          },
-        },
-        { $sort: { grossCents: -1 } },
-      ],
-      cursor: {},
-    })) as any;
-
-    // Obtener nombres de tipsters
-    const tipsterIds = (byTipsterResult.cursor?.firstBatch || [])
-      .map((t: any) => t._id)
-      .filter(Boolean);
-    const tipstersMap = await this.getTipstersMap(tipsterIds);
-
-    const byTipster = (byTipsterResult.cursor?.firstBatch || []).map((item: any) => ({
+    const byTipster = (facets.byTipster || []).map((item: any) => ({
       tipsterId: item._id,
-      tipsterName: tipstersMap[item._id] || 'Desconocido',
+      tipsterName: item.ref?.[0]?.name || 'Desconocido',
       sales: item.sales,
       grossCents: item.grossCents,
       netCents: item.netCents,
     }));
 
-    // Por producto
-    const byProductResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'orders',
-      pipeline: [
-        { $match: matchStage },
-        {
-          $group: {
-            _id: '$product_id',
-            sales: { $sum: 1 },
-            grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
-          },
-        },
-        { $sort: { sales: -1 } },
-        { $limit: 20 },
-      ],
-      cursor: {},
-    })) as any;
-
-    const productIds = (byProductResult.cursor?.firstBatch || [])
-      .map((p: any) => p._id)
-      .filter(Boolean);
-    const productsMap = await this.getProductsMap(productIds);
-
-    const byProduct = (byProductResult.cursor?.firstBatch || []).map((item: any) => ({
+    const byProduct = (facets.byProduct || []).map((item: any) => ({
       productId: item._id,
-      productTitle: productsMap[item._id] || 'Producto eliminado',
+      productTitle: item.ref?.[0]?.name || 'Producto eliminado',
       sales: item.sales,
       grossCents: item.grossCents,
     }));
@@ -193,6 +187,10 @@ export class ReportsService {
    * Reporte de Ingresos de Plataforma
    */
   async getPlatformIncomeReport(filters: ReportFilters) {
+    return this.snapshot('platform', filters, () => this.buildPlatformIncomeReport(filters));
+  }
+
+  private async buildPlatformIncomeReport(filters: ReportFilters) {
     const { startDate, endDate } = filters;
 
     const dateFilter: any = {};
@@ -204,51 +202,51 @@ export class ReportsService {
     };
     if (Object.keys(dateFilter).length > 0) matchStage.created_at = dateFilter;
 
-    // Totales de comisiones
+    // Totales de comisiones y desglose por mes en una sola pasada
     const result = (await this.prisma.$runCommandRaw({
       aggregate: 'orders',
       pipeline: [
         { $match: matchStage },
         {
-          $group: {
-            _id: null,
-            totalOrders: { $sum: 1 },
-            totalGrossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
-            totalPlatformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
-            totalGatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
+          $facet: {
+            totals: [
+              {
+                $group: {
+                  _id: null,
+                  totalOrders: { $sum: 1 },
+                  totalGrossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                  totalPlatformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+                  totalGatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
+                },
+              },
+            ],
+            byMonth: [
+              {
+                $group: {
+                  _id: { $dateToString: { format: '%Y-%m', date: '$created_at' } },
+                  orders: { $sum: 1 },
+                  grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                  platformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+                  gatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
+                },
+              },
+              { $sort: { _id: -1 } },
+            ],
           },
         },
       ],
       cursor: {},
     })) as any;
 
-    const totals = result.cursor?.firstBatch?.[0] || {
+    const facets = result.cursor?.firstBatch?.[0] || {};
+    const totals = facets.totals?.[0] || {
       totalOrders: 0,
       totalGrossCents: 0,
       totalPlatformFeesCents: 0,
       totalGatewayFeesCents: 0,
     };
 
-    // Por mes
-    const byMonthResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'orders',
-      pipeline: [
-        { $match: matchStage },
-        {
-          $group: {
-            _id: { $dateToString: { format: '%Y-%m', date: '$created_at' } },
-            orders: { $sum: 1 },
-            grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
-            platformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
-            gatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
-          },
-        },
-        { $sort: { _id: -1 } },
-      ],
-      cursor: {},
-    })) as any;
-
-    const byMonth = (byMonthResult.cursor?.firstBatch || []).map((item: any) => ({
+    const byMonth = (facets.byMonth || []).map((item: any) => ({
       month: item._id,
       orders: item.orders,
       grossCents: item.grossCents,
@@ -274,6 +272,10 @@ export class ReportsService {
    * Reporte de Liquidaciones
    */
   async getSettlementsReport(filters: ReportFilters) {
+    return this.snapshot('settlements', filters, () => this.buildSettlementsReport(filters));
+  }
+
+  private async buildSettlementsReport(filters: ReportFilters) {
     const { startDate, endDate, tipsterId, status } = filters;
 
     const matchStage: any = {};
@@ -286,48 +288,36 @@ export class ReportsService {
       if (endDate) matchStage.created_at.$lte = { $date: new Date(endDate).toISOString() };
     }
 
-    // Por estado
-    const byStatusResult = (await this.prisma.$runCommandRaw({
+    // Por estado y por tipo en una sola pasada
+    const groupBy = (field: string) => [
+      {
+        $group: {
+          _id: field,
+          count: { $sum: 1 },
+          totalGrossCents: { $sum: '$gross_amount_cents' },
+          totalNetCents: { $sum: '$net_amount_cents' },
+        },
+      },
+    ];
+    const result = (await this.prisma.$runCommandRaw({
       aggregate: 'settlements',
       pipeline: [
         { $match: matchStage },
-        {
-          $group: {
-            _id: '$status',
-            count: { $sum: 1 },
-            totalGrossCents: { $sum: '$gross_amount_cents' },
-            totalNetCents: { $sum: '$net_amount_cents' },
-          },
-        },
+        { $facet: { byStatus: groupBy('$status'), byType: groupBy('$type') } },
       ],
       cursor: {},
     })) as any;
 
-    const byStatus = (byStatusResult.cursor?.firstBatch || []).map((item: any) => ({
+    const facets = result.cursor?.firstBatch?.[0] || {};
+
+    const byStatus = (facets.byStatus || []).map((item: any) => ({
       status: item._id,
       count: item.count,
       totalGrossCents: item.totalGrossCents,
       totalNetCents: item.totalNetCents,
     }));
 
-    // Por tipo
-    const byTypeResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'settlements',
-      pipeline: [
-        { $match: matchStage },
-        {
-          $group: {
-            _id: '$type',
-            count: { $sum: 1 },
-            totalGrossCents: { $sum: '$gross_amount_cents' },
-            totalNetCents: { $sum: '$net_amount_cents' },
-          },
-        },
-      ],
-      cursor: {},
-    })) as any;
-
-    const byType = (byTypeResult.cursor?.firstBatch || []).map((item: any) => ({
+    const byType = (facets.byType || []).map((item: any) => ({
       type: item._id,
       count: item.count,
       totalGrossCents: item.totalGrossCents,
@@ -442,125 +432,235 @@ export class ReportsService {
   }
 
   /**
-   * Exportar a CSV
+   * Exportar a CSV en streaming
+   *
+   * Devuelve un Readable que emite la cabecera de inmediato y después una línea por documento
+   * de un cursor de agregación; el cursor solo pide el siguiente lote cuando el consumidor
+   * lee, así que la memoria no depende del rango exportado. El tipo se valida antes de
+   * devolver el stream para poder responder con error sin haber enviado nada.
    */
-  async exportToCSV(reportType: string, filters: ReportFilters): Promise<string> {
-    let data: any;
-    let headers: string[];
-    let rows: string[][];
-
-    switch (reportType) {
-      case 'sales':
-        data = await this.getSalesReport(filters);
-        headers = ['Tipster', 'Ventas', 'Bruto (EUR)', 'Neto (EUR)'];
-        rows = data.byTipster.map((t: any) => [
-          t.tipsterName,
-          t.sales.toString(),
-          (t.grossCents / 100).toFixed(2),
-          (t.netCents / 100).toFixed(2),
-        ]);
-        break;
-
-      case 'platform':
-        data = await this.getPlatformIncomeReport(filters);
-        headers = [
-          'Mes',
-          'Pedidos',
-          'Bruto (EUR)',
-          'Comisión Plataforma (EUR)',
-          'Comisión Pasarela (EUR)',
-        ];
-        rows = data.byMonth.map((m: any) => [
-          m.month,
-          m.orders.toString(),
-          (m.grossCents / 100).toFixed(2),
-          (m.platformFeesCents / 100).toFixed(2),
-          (m.gatewayFeesCents / 100).toFixed(2),
-        ]);
-        break;
-
-      case 'settlements':
-        data = await this.getSettlementsReport(filters);
-        headers = ['Estado', 'Cantidad', 'Bruto (EUR)', 'Neto (EUR)'];
-        rows = data.byStatus.map((s: any) => [
-          s.status,
-          s.count.toString(),
-          (s.totalGrossCents / 100).toFixed(2),
-          (s.totalNetCents / 100).toFixed(2),
-        ]);
-        break;
-
-      case 'tipsters':
-        data = await this.getTipstersReport(filters);
-        headers = [
-          'Tipster',
-          'Ventas',
-          'Bruto (EUR)',
-          'Neto (EUR)',
-          'Comisión Antia (EUR)',
-          'Productos Activos',
-        ];
-        rows = data.rankings.map((t: any) => [
-          t.tipsterName,
-          t.totalSales.toString(),
-          (t.totalGrossCents / 100).toFixed(2),
-          (t.totalNetCents / 100).toFixed(2),
-          (t.platformFeesCents / 100).toFixed(2),
-          t.activeProducts.toString(),
-        ]);
-        break;
-
-      default:
-        throw new Error('Tipo de reporte no válido');
+  exportToCSV(reportType: string, filters: ReportFilters): Readable {
+    const spec = this.csvExportSpec(reportType, filters);
+    const mongo = this.mongo;
+    const logger = this.logger;
+
+    async function* lines() {
+      yield spec.headers.join(',') + '\n';
+
+      const started = Date.now();
+      let rows = 0;
+      const cursor = await mongo.aggregate(spec.collection, spec.pipeline);
+      try {
+        for await (const doc of cursor) {
+          rows++;
+          yield spec.row(doc).map(csvCell).join(',') + '\n';
+        }
+      } finally {
+        await cursor.close();
+      }
+      logger.log(`📄 ${reportType} CSV export: ${rows} rows in ${Date.now() - started}ms`);
     }
 
-    // Generar CSV
-    const csvContent = [
-      headers.join(','),
-      ...rows.map((row) => row.map((cell) => `"${cell}"`).join(',')),
-    ].join('\n');
-
-    return csvContent;
+    return Readable.from(lines(), { objectMode: false });
   }
 
   /**
-   * Helper: Obtener mapa de tipsters
+   * Helper: Cabeceras, pipeline y formato de fila de cada exportación
    */
-  private async getTipstersMap(tipsterIds: string[]): Promise<Record<string, string>> {
-    if (tipsterIds.length === 0) return {};
+  private csvExportSpec(reportType: string, filters: ReportFilters) {
+    const { startDate, endDate, tipsterId, status } = filters;
 
-    const result = (await this.prisma.$runCommandRaw({
-      find: 'tipster_profiles',
-      filter: { _id: { $in: tipsterIds.map((id) => ({ $oid: id })) } },
-      projection: { _id: 1, public_name: 1 },
-    })) as any;
+    // El driver nativo usa Date, no el extended JSON de $runCommandRaw
+    const createdAt: any = {};
+    if (startDate) createdAt.$gte = new Date(startDate);
+    if (endDate) createdAt.$lte = new Date(endDate);
+    const hasDates = Object.keys(createdAt).length > 0;
+    const paidStatuses = ['PAGADA', 'COMPLETED', 'paid', 'ACCESS_GRANTED'];
+    const eur = (cents: number) => ((cents || 0) / 100).toFixed(2);
+
+    switch (reportType) {
+      case 'sales': {
+        const match: any = { status: { $in: paidStatuses } };
+        if (hasDates) match.created_at = createdAt;
+        if (tipsterId) match.tipster_id = tipsterId;
+        return {
+          headers: ['Tipster', 'Ventas', 'Bruto (EUR)', 'Neto (EUR)'],
+          collection: 'orders',
+          pipeline: [
+            { $match: match },
+            {
+              $group: {
+                _id: '$tipster_id',
+                sales: { $sum: 1 },
+                grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                netCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
+              },
+            },
+            { $sort: { grossCents: -1 } },
+            this.lookupName('tipster_profiles', 'public_name'),
+          ],
+          row: (t: any) => [t.ref?.[0]?.name || 'Desconocido', String(t.sales), eur(t.grossCents), eur(t.netCents)],
+        };
+      }
+
+      case 'platform': {
+        const match: any = { status: { $in: paidStatuses } };
+        if (hasDates) match.created_at = createdAt;
+        return {
+          headers: ['Mes', 'Pedidos', 'Bruto (EUR)', 'Comisión Plataforma (EUR)', 'Comisión Pasarela (EUR)'],
+          collection: 'orders',
+          pipeline: [
+            { $match: match },
+            {
+              $group: {
+                _id: { $dateToString: { format: '%Y-%m', date: '$created_at' } },
+                orders: { $sum: 1 },
+                grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                platformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+                gatewayFeesCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
+              },
+            },
+            { $sort: { _id: -1 } },
+          ],
+          row: (m: any) => [
+            m._id,
+            String(m.orders),
+            eur(m.grossCents),
+            eur(m.platformFeesCents),
+            eur(m.gatewayFeesCents),
+          ],
+        };
+      }
+
+      case 'settlements': {
+        const match: any = {};
+        if (tipsterId) match.tipster_id = tipsterId;
+        if (status) match.status = status;
+        if (hasDates) match.created_at = createdAt;
+        return {
+          headers: ['Estado', 'Cantidad', 'Bruto (EUR)', 'Neto (EUR)'],
+          collection: 'settlements',
+          pipeline: [
+            { $match: match },
+            {
+              $group: {
+                _id: '$status',
+                count: { $sum: 1 },
+                totalGrossCents: { $sum: '$gross_amount_cents' },
+                totalNetCents: { $sum: '$net_amount_cents' },
+              },
+            },
+          ],
+          row: (s: any) => [s._id, String(s.count), eur(s.totalGrossCents), eur(s.totalNetCents)],
+        };
+      }
+
+      case 'tipsters': {
+        // Ventas y productos activos por tipster con $lookup, en vez de dos consultas por tipster
+        const orderMatch: any = {
+          $expr: { $eq: ['$tipster_id', '$$tipsterId'] },
+          status: { $in: paidStatuses },
+        };
+        if (hasDates) orderMatch.created_at = createdAt;
+        return {
+          headers: [
+            'Tipster',
+            'Ventas',
+            'Bruto (EUR)',
+            'Neto (EUR)',
+            'Comisión Antia (EUR)',
+            'Productos Activos',
+          ],
+          collection: 'tipster_profiles',
+          pipeline: [
+            { $project: { public_name: 1, tipsterId: { $toString: '$_id' } } },
+            {
+              $lookup: {
+                from: 'orders',
+                let: { tipsterId: '$tipsterId' },
+                pipeline: [
+                  { $match: orderMatch },
+                  {
+                    $group: {
+                      _id: null,
+                      sales: { $sum: 1 },
+                      grossCents: { $sum: { $ifNull: ['$amount_cents', 0] } },
+                      netCents: { $sum: { $ifNull: ['$net_amount_cents', 0] } },
+                      platformFeesCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
+                    },
+                  },
+                ],
+                as: 'sales',
+              },
+            },
+            {
+              $lookup: {
+                from: 'products',
+                let: { tipsterId: '$tipsterId' },
+                pipeline: [
+                  { $match: { $expr: { $eq: ['$tipster_id', '$$tipsterId'] }, active: true } },
+                  { $count: 'n' },
+                ],
+                as: 'products',
+              },
+            },
+            {
+              $project: {
+                public_name: 1,
+                sales: { $ifNull: [{ $first: '$sales' }, {}] },
+                activeProducts: { $ifNull: [{ $first: '$products.n' }, 0] },
+              },
+            },
+            { $sort: { 'sales.grossCents': -1 } },
+          ],
+          row: (t: any) => [
+            t.public_name,
+            String(t.sales.sales || 0),
+            eur(t.sales.grossCents),
+            eur(t.sales.netCents),
+            eur(t.sales.platformFeesCents),
+            String(t.activeProducts),
+          ],
+        };
+      }
 
-    const map: Record<string, string> = {};
-    for (const t of result.cursor?.firstBatch || []) {
-      const id = t._id.$oid || t._id.toString();
-      map[id] = t.public_name;
+      default:
+        throw new BadRequestException('Tipo de reporte no válido');
     }
-    return map;
   }
 
   /**
-   * Helper: Obtener mapa de productos
+   * Helper: $lookup del nombre de un documento por _id (string de ObjectId) → ref[0].name
    */
-  private async getProductsMap(productIds: string[]): Promise<Record<string, string>> {
-    if (productIds.length === 0) return {};
-
-    const result = (await this.prisma.$runCommandRaw({
-      find: 'products',
-      filter: { _id: { $in: productIds.map((id) => ({ $oid: id })) } },
-      projection: { _id: 1, title: 1 },
-    })) as any;
+  private lookupName(collection: string, field: string) {
+    return {
+      $lookup: {
+        from: collection,
+        let: { refId: { $convert: { input: '$_id', to: 'objectId', onError: null, onNull: null } } },
+        pipeline: [
+          { $match: { $expr: { $eq: ['$_id', '$$refId'] } } },
+          { $project: { _id: 0, name: `$${field}` } },
+        ],
+        as: 'ref',
+      },
+    };
+  }
 
-    const map: Record<string, string> = {};
-    for (const p of result.cursor?.firstBatch || []) {
-      const id = p._id.$oid || p._id.toString();
-      map[id] = p.title;
+  /**
+   * Helper: Los reportes de rangos ya cerrados (endDate anterior a hoy, UTC) se guardan como
+   * snapshot en memoria; los que incluyen hoy se calculan siempre.
+   */
+  private async snapshot<T>(kind: string, filters: ReportFilters, build: () => Promise<T>): Promise<T> {
+    const end = filters.endDate ? new Date(filters.endDate) : null;
+    const startOfToday = new Date();
+    startOfToday.setUTCHours(0, 0, 0, 0);
+    if (!end || isNaN(end.getTime()) || end >= startOfToday) {
+      return build();
     }
-    return map;
+
+    const start = filters.startDate ? new Date(filters.startDate).toISOString() : '';
+    const key = [kind, start, end.toISOString(), filters.tipsterId || '', filters.status || ''].join('|');
+    return this.snapshots.getOrLoad(key, build);
   }
 
   /**
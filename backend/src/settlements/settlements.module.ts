@@ -2,9 +2,10 @@ import { Module } from '@nestjs/common';
 import { SettlementsService } from './settlements.service';
 import { SettlementsController } from './settlements.controller';
 import { PrismaModule } from '../prisma/prisma.module';
+import { BalancesModule } from '../balances/balances.module';
 
 @Module({
-  imports: [PrismaModule],
+  imports: [PrismaModule, BalancesModule],
   providers: [SettlementsService],
   controllers: [SettlementsController],
   exports: [SettlementsService],
@@ -1,5 +1,6 @@
 import { Injectable, Logger, NotFoundException } from '@nestjs/common';
 import { PrismaService } from '../prisma/prisma.service';
+import { TipsterBalanceService } from '../balances/tipster-balance.service';
 
 // Frecuencias de liquidación
 const SETTLEMENT_FREQUENCY = {
@@ -11,7 +12,10 @@ const SETTLEMENT_FREQUENCY = {
 export class SettlementsService {
   private readonly logger = new Logger(SettlementsService.name);
 
-  constructor(private prisma: PrismaService) {}
+  constructor(
+    private prisma: PrismaService,
+    private balances: TipsterBalanceService,
+  ) {}
 
   /**
    * Obtener resumen de liquidaciones pendientes para un tipster
@@ -144,30 +148,10 @@ export class SettlementsService {
    * Obtener total liquidado histórico
    */
   async getTotalPaidOut(tipsterId: string) {
-    const result = (await this.prisma.$runCommandRaw({
-      aggregate: 'settlements',
-      pipeline: [
-        {
-          $match: {
-            tipster_id: tipsterId,
-            status: 'PAID',
-          },
-        },
-        {
-          $group: {
-            _id: null,
-            totalNetCents: { $sum: '$net_amount_cents' },
-            count: { $sum: 1 },
-          },
-        },
-      ],
-      cursor: {},
-    })) as any;
-
-    const stats = result.cursor?.firstBatch?.[0] || { totalNetCents: 0, count: 0 };
+    const balance = await this.balances.getBalance(tipsterId);
     return {
-      totalPaidOutCents: stats.totalNetCents,
-      settlementCount: stats.count,
+      totalPaidOutCents: balance.totalSettledCents,
+      settlementCount: balance.settlementCount,
     };
   }
 
@@ -220,23 +204,28 @@ export class SettlementsService {
   async markAsPaid(settlementId: string, paymentMethod: string, paymentReference: string) {
     const now = new Date().toISOString();
 
-    await this.prisma.$runCommandRaw({
-      update: 'settlements',
-      updates: [
-        {
-          q: { _id: { $oid: settlementId } },
-          u: {
-            $set: {
-              status: 'PAID',
-              paid_at: { $date: now },
-              payment_method: paymentMethod,
-              payment_reference: paymentReference,
-              updated_at: { $date: now },
-            },
-          },
+    // Solo la transición a PAID suma al saldo: repetir la llamada no cuenta dos veces
+    const result = (await this.prisma.$runCommandRaw({
+      findAndModify: 'settlements',
+      query: { _id: { $oid: settlementId }, status: { $ne: 'PAID' } },
+      update: {
+        $set: {
+          status: 'PAID',
+          paid_at: { $date: now },
+          payment_method: paymentMethod,
+          payment_reference: paymentReference,
+          updated_at: { $date: now },
         },
-      ],
-    });
+      },
+      new: true,
+    })) as any;
+
+    const settlement = result.value;
+    if (!settlement) {
+      this.logger.warn(`Settlement ${settlementId} not found or already PAID`);
+      return;
+    }
+    await this.balances.recordSettlementPaid(settlement.tipster_id, settlement.net_amount_cents);
 
     this.logger.log(`Settlement ${settlementId} marked as PAID`);
   }
@@ -258,9 +247,11 @@ export class SettlementsService {
    * Obtener desglose detallado para el dashboard del tipster
    */
   async getDetailedBreakdown(tipsterId: string) {
-    const pending = await this.getPendingSummary(tipsterId);
-    const history = await this.getSettlementHistory(tipsterId, 10);
-    const totalPaid = await this.getTotalPaidOut(tipsterId);
+    const [pending, history, totalPaid] = await Promise.all([
+      this.getPendingSummary(tipsterId),
+      this.getSettlementHistory(tipsterId, 10),
+      this.getTotalPaidOut(tipsterId),
+    ]);
 
     return {
       pending,
@@ -8,6 +8,7 @@ import {
 import { PrismaService } from '../prisma/prisma.service';
 import { ConfigService } from '@nestjs/config';
 import { Telegraf } from 'telegraf';
+import { telegramOptions } from './telegram-http.service';
 
 export interface CreateChannelDto {
   channelId: string;
@@ -35,7 +36,7 @@ export class TelegramChannelsService {
     const token = this.config.get<string>('TELEGRAM_BOT_TOKEN');
     if (token) {
       try {
-        this.bot = new Telegraf(token);
+        this.bot = new Telegraf(token, telegramOptions(this.config));
       } catch (error) {
         this.logger.error('Failed to create Telegram bot for channels service:', error);
         this.bot = null;
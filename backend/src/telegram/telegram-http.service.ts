@@ -1,17 +1,45 @@
 import { Injectable, Logger } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
 import axios, { AxiosInstance } from 'axios';
+import * as http from 'http';
 import * as https from 'https';
+import { TelegramOutboundQueue, TelegramPriority } from './telegram-outbound-queue';
+
+// Llamadas de configuración del bot: van directas, sin pasar por la cola de salida
+// (getUpdates es long polling y ocuparía un hueco de envío)
+const DIRECT_METHODS = new Set(['getMe', 'getUpdates', 'setWebhook', 'deleteWebhook', 'getWebhookInfo']);
+// Dan acceso a un comprador: salen antes que notificaciones y publicaciones
+const HIGH_PRIORITY_METHODS = new Set([
+  'createChatInviteLink',
+  'exportChatInviteLink',
+  'approveChatJoinRequest',
+  'declineChatJoinRequest',
+  'banChatMember',
+  'unbanChatMember',
+  'getChatMember',
+  'getChat',
+  'getChatAdministrators',
+]);
+
+/**
+ * Telegraf options honouring TELEGRAM_API_BASE_URL, so bot instances talk to the same
+ * Bot API endpoint as TelegramHttpService
+ */
+export function telegramOptions(config: ConfigService): { telegram: { apiRoot: string } } | undefined {
+  const apiRoot = config.get<string>('TELEGRAM_API_BASE_URL');
+  return apiRoot ? { telegram: { apiRoot: apiRoot.replace(/\/+$/, '') } } : undefined;
+}
 
 /**
  * TelegramHttpService - Direct HTTP calls to Telegram API via proxy
  * Uses multiple CORS proxies with fallback to ensure reliability.
+ * Chat calls go through a rate-limited outbound queue (see TelegramOutboundQueue).
  */
 @Injectable()
 export class TelegramHttpService {
   private readonly logger = new Logger(TelegramHttpService.name);
   private readonly botToken: string;
-  private readonly apiBaseUrl: string = 'https://api.telegram.org';
+  private readonly apiBaseUrl: string;
 
   // Multiple proxies for redundancy - direct connection first, then proxies
   private readonly useDirectConnection: boolean = true;
@@ -25,10 +53,21 @@ export class TelegramHttpService {
   private currentProxyIndex: number = 0;
   private consecutiveFailures: number = 0;
   private lastSuccessTime: number = 0;
+  private readonly outbound: TelegramOutboundQueue;
 
   constructor(private config: ConfigService) {
     this.botToken = this.config.get<string>('TELEGRAM_BOT_TOKEN') || '';
 
+    // TELEGRAM_API_BASE_URL points at a local Bot API stand-in (offline benchmarks);
+    // public proxies are only useful in front of the real api.telegram.org
+    const customApiBaseUrl = this.config.get<string>('TELEGRAM_API_BASE_URL');
+    this.apiBaseUrl = (customApiBaseUrl || 'https://api.telegram.org').replace(/\/+$/, '');
+    if (customApiBaseUrl) {
+      this.proxyUrls = [''];
+    }
+
+    const maxInFlight = Number(this.config.get('TELEGRAM_MAX_IN_FLIGHT')) || 10;
+
     // Create axios instance with curl-like headers (required to bypass proxy restrictions)
     this.axiosInstance = axios.create({
       timeout: 30000,
@@ -36,13 +75,28 @@ export class TelegramHttpService {
         'User-Agent': 'curl/7.88.1',
         Accept: '*/*',
       },
+      httpAgent: new http.Agent({ keepAlive: true, maxSockets: maxInFlight + DIRECT_METHODS.size }),
       httpsAgent: new https.Agent({
         rejectUnauthorized: true,
         keepAlive: true,
+        maxSockets: maxInFlight + DIRECT_METHODS.size,
       }),
     });
 
-    this.logger.log(`TelegramHttpService initialized with ${this.proxyUrls.length} proxy(s)`);
+    this.outbound = new TelegramOutboundQueue(
+      (method, params) => this.callApiOnce(method, params),
+      {
+        globalPerSecond: Number(this.config.get('TELEGRAM_GLOBAL_RATE')) || 30,
+        perChatIntervalMs: Number(this.config.get('TELEGRAM_PER_CHAT_INTERVAL_MS')) || 1000,
+        maxInFlight,
+        maxQueued: Number(this.config.get('TELEGRAM_MAX_QUEUED')) || 10000,
+      },
+      this.logger,
+    );
+
+    this.logger.log(
+      `TelegramHttpService initialized with ${this.proxyUrls.length} proxy(s) against ${this.apiBaseUrl}`,
+    );
   }
 
   /**
@@ -72,20 +126,11 @@ export class TelegramHttpService {
 
     for (let attempt = 0; attempt < retries; attempt++) {
       try {
-        const result = await this.callApiGet<T>(method, params);
-        this.consecutiveFailures = 0;
-        this.lastSuccessTime = Date.now();
-        return result;
+        return await this.callApiOnce<T>(method, params);
       } catch (error) {
         lastError = error;
-        this.consecutiveFailures++;
         this.logger.warn(`API call failed (attempt ${attempt + 1}/${retries}): ${error.message}`);
 
-        // If too many failures, try rotating proxy
-        if (this.consecutiveFailures >= 2 && this.proxyUrls.length > 1) {
-          this.rotateProxy();
-        }
-
         // Wait before retry (exponential backoff)
         if (attempt < retries - 1) {
           const waitTime = Math.min(1000 * Math.pow(2, attempt), 5000);
@@ -97,6 +142,29 @@ export class TelegramHttpService {
     throw lastError || new Error('All retries failed');
   }
 
+  /**
+   * Single attempt, keeping track of failures to rotate proxies
+   */
+  private async callApiOnce<T>(method: string, params: Record<string, any> = {}): Promise<T> {
+    try {
+      const result = await this.callApiGet<T>(method, params);
+      this.consecutiveFailures = 0;
+      this.lastSuccessTime = Date.now();
+      return result;
+    } catch (error) {
+      // A 4xx is Telegram rejecting the call, not the route failing
+      const status = error.response?.status;
+      if (!status || status >= 500) {
+        this.consecutiveFailures++;
+        // If too many failures, try rotating proxy
+        if (this.consecutiveFailures >= 2 && this.proxyUrls.length > 1) {
+          this.rotateProxy();
+        }
+      }
+      throw error;
+    }
+  }
+
   /**
    * Make a direct API call to Telegram via proxy (GET method)
    */
@@ -136,10 +204,29 @@ export class TelegramHttpService {
   }
 
   /**
-   * Main API call method with retry logic
+   * Main API call method: chat calls are queued (rate limits, priority, retries),
+   * bot configuration calls go direct with retry logic
+   */
+  private async callApi<T>(
+    method: string,
+    params: Record<string, any> = {},
+    priority?: TelegramPriority,
+  ): Promise<T> {
+    if (DIRECT_METHODS.has(method)) {
+      return this.callApiWithRetry<T>(method, params);
+    }
+    return this.outbound.enqueue<T>(
+      method,
+      params,
+      priority || (HIGH_PRIORITY_METHODS.has(method) ? 'high' : 'normal'),
+    );
+  }
+
+  /**
+   * Outbound queue metrics (queue depth per lane, in flight, 429s, failures)
    */
-  private async callApi<T>(method: string, params: Record<string, any> = {}): Promise<T> {
-    return this.callApiWithRetry<T>(method, params);
+  getQueueStats() {
+    return this.outbound.stats();
   }
 
   /**
@@ -158,6 +245,8 @@ export class TelegramHttpService {
     options: {
       parseMode?: 'Markdown' | 'MarkdownV2' | 'HTML';
       replyMarkup?: any;
+      // 'low' for marketing posts, 'high' for messages carrying access
+      priority?: TelegramPriority;
     } = {},
   ): Promise<any> {
     const params: Record<string, any> = {
@@ -173,7 +262,7 @@ export class TelegramHttpService {
       params.reply_markup = JSON.stringify(options.replyMarkup);
     }
 
-    return this.callApi('sendMessage', params);
+    return this.callApi('sendMessage', params, options.priority);
   }
 
   /**
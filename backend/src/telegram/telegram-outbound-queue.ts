@@ -0,0 +1,273 @@
+import { Logger } from '@nestjs/common';
+
+export type TelegramPriority = 'high' | 'normal' | 'low';
+
+const LANES: TelegramPriority[] = ['high', 'normal', 'low'];
+// Trabajos mirados por carril al buscar uno enviable (los de chats en espera se saltan)
+const SCAN_LIMIT = 100;
+
+export interface OutboundQueueOptions {
+  // Llamadas por segundo a la Bot API en total
+  globalPerSecond: number;
+  // Separación mínima entre mensajes a un mismo chat
+  perChatIntervalMs: number;
+  maxInFlight: number;
+  maxQueued: number;
+}
+
+interface Job {
+  method: string;
+  params: Record<string, any>;
+  priority: TelegramPriority;
+  chatKey: string | null;
+  attempts: number;
+  enqueuedAt: number;
+  notBefore: number;
+  resolve: (value: any) => void;
+  reject: (error: any) => void;
+}
+
+interface ChatState {
+  nextAt: number;
+  busy: boolean;
+}
+
+/**
+ * TelegramOutboundQueue - Cola de salida hacia la Bot API con límites de Telegram
+ *
+ * - Límite global con token bucket (~30 llamadas/s) y máximo de peticiones en vuelo.
+ * - Límite por chat (~1 mensaje/s) solo para los métodos send*; los mensajes de un mismo
+ *   chat salen en orden y de uno en uno.
+ * - Carriles de prioridad: high (enlaces de invitación, altas en canales) sale antes que
+ *   normal (notificaciones) y low (publicaciones de marketing). Un chat en espera no
+ *   bloquea al resto de su carril.
+ * - Un 429 respeta parameters.retry_after (pausa ese chat, o toda la cola si no hay chat)
+ *   y reintenta el trabajo al principio de su carril; errores de red y 5xx se reintentan
+ *   con backoff exponencial; otros 4xx fallan sin reintentar.
+ */
+export class TelegramOutboundQueue {
+  private readonly lanes: Record<TelegramPriority, Job[]> = { high: [], normal: [], low: [] };
+  private readonly chats = new Map<string, ChatState>();
+
+  private tokens: number;
+  private lastRefill = Date.now();
+  private pausedUntil = 0;
+  private inFlight = 0;
+  private timer: NodeJS.Timeout | null = null;
+
+  private sent = 0;
+  private throttled = 0;
+  private retried = 0;
+  private failed = 0;
+  private rejected = 0;
+
+  constructor(
+    private readonly send: (method: string, params: Record<string, any>) => Promise<any>,
+    private readonly options: OutboundQueueOptions,
+    private readonly logger: Logger,
+  ) {
+    this.tokens = options.globalPerSecond;
+  }
+
+  enqueue<T>(method: string, params: Record<string, any>, priority: TelegramPriority): Promise<T> {
+    if (this.depth() >= this.options.maxQueued) {
+      this.rejected++;
+      return Promise.reject(new Error(`Telegram outbound queue full (${this.options.maxQueued} queued)`));
+    }
+
+    // Telegram limita por chat los mensajes, no las consultas de gestión
+    const chatKey = method.startsWith('send') && params.chat_id !== undefined ? String(params.chat_id) : null;
+
+    return new Promise<T>((resolve, reject) => {
+      this.lanes[priority].push({
+        method,
+        params,
+        priority,
+        chatKey,
+        attempts: 0,
+        enqueuedAt: Date.now(),
+        notBefore: 0,
+        resolve,
+        reject,
+      });
+      this.pump();
+    });
+  }
+
+  /**
+   * Métricas de la cola (profundidad por carril, en vuelo, contadores acumulados)
+   */
+  stats() {
+    const now = Date.now();
+    const oldest = Math.min(...LANES.map((lane) => this.lanes[lane][0]?.enqueuedAt ?? now));
+    let pausedChats = 0;
+    for (const state of this.chats.values()) {
+      if (state.nextAt > now) pausedChats++;
+    }
+
+    return {
+      queued: {
+        high: this.lanes.high.length,
+        normal: this.lanes.normal.length,
+        low: this.lanes.low.length,
+        total: this.depth(),
+      },
+      inFlight: this.inFlight,
+      oldestWaitMs: now - oldest,
+      pausedChats,
+      globalPausedMs: Math.max(0, this.pausedUntil - now),
+      sent: this.sent,
+      throttled: this.throttled,
+      retried: this.retried,
+      failed: this.failed,
+      rejected: this.rejected,
+      limits: this.options,
+    };
+  }
+
+  private depth() {
+    return this.lanes.high.length + this.lanes.normal.length + this.lanes.low.length;
+  }
+
+  private pump() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+
+    let wakeAt = Infinity;
+    while (this.inFlight < this.options.maxInFlight && this.depth() > 0) {
+      const now = Date.now();
+      if (now < this.pausedUntil) {
+        wakeAt = Math.min(wakeAt, this.pausedUntil);
+        break;
+      }
+
+      this.refill(now);
+      if (this.tokens < 1) {
+        wakeAt = Math.min(wakeAt, now + ((1 - this.tokens) * 1000) / this.options.globalPerSecond);
+        break;
+      }
+
+      const job = this.takeNext(now, (at) => (wakeAt = Math.min(wakeAt, at)));
+      if (!job) break;
+
+      this.tokens -= 1;
+      this.dispatch(job);
+    }
+
+    if (wakeAt !== Infinity) {
+      this.timer = setTimeout(() => this.pump(), Math.max(1, Math.ceil(wakeAt - Date.now())));
+      this.timer.unref();
+    }
+
+    if (this.chats.size > 10000) this.pruneChats();
+  }
+
+  private refill(now: number) {
+    const rate = this.options.globalPerSecond;
+    this.tokens = Math.min(rate, this.tokens + ((now - this.lastRefill) * rate) / 1000);
+    this.lastRefill = now;
+  }
+
+  /**
+   * Primer trabajo enviable por orden de carril; informa cuándo se libera el primero bloqueado
+   */
+  private takeNext(now: number, blockedUntil: (at: number) => void): Job | null {
+    for (const priority of LANES) {
+      const lane = this.lanes[priority];
+      const limit = Math.min(lane.length, SCAN_LIMIT);
+      for (let i = 0; i < limit; i++) {
+        const job = lane[i];
+        if (job.notBefore > now) {
+          blockedUntil(job.notBefore);
+          continue;
+        }
+        const state = job.chatKey ? this.chats.get(job.chatKey) : null;
+        if (state?.busy) continue; // se reintenta al terminar el envío en curso
+        if (state && state.nextAt > now) {
+          blockedUntil(state.nextAt);
+          continue;
+        }
+        lane.splice(i, 1);
+        return job;
+      }
+    }
+    return null;
+  }
+
+  private dispatch(job: Job) {
+    this.inFlight++;
+    let state: ChatState | null = null;
+    if (job.chatKey) {
+      state = this.chats.get(job.chatKey) || { nextAt: 0, busy: false };
+      state.busy = true;
+      this.chats.set(job.chatKey, state);
+    }
+
+    this.send(job.method, job.params)
+      .then(
+        (result) => {
+          this.sent++;
+          job.resolve(result);
+        },
+        (error) => this.handleFailure(job, error),
+      )
+      .finally(() => {
+        this.inFlight--;
+        if (state) {
+          state.busy = false;
+          state.nextAt = Math.max(state.nextAt, Date.now() + this.options.perChatIntervalMs);
+        }
+        this.pump();
+      });
+  }
+
+  private handleFailure(job: Job, error: any) {
+    job.attempts++;
+    const status: number | undefined = error.response?.status;
+    const retryAfter = Number(error.response?.data?.parameters?.retry_after) || 0;
+
+    if (status === 429 || retryAfter) {
+      this.throttled++;
+      const until = Date.now() + Math.max(retryAfter, 1) * 1000;
+      if (job.chatKey) {
+        const state = this.chats.get(job.chatKey);
+        if (state) state.nextAt = Math.max(state.nextAt, until);
+      } else {
+        this.pausedUntil = Math.max(this.pausedUntil, until);
+      }
+      this.logger.warn(`Telegram 429 on ${job.method}${job.chatKey ? ` (chat ${job.chatKey})` : ''}, retry after ${retryAfter || 1}s`);
+      if (job.attempts < 5) {
+        this.requeue(job, 0);
+        return;
+      }
+    } else if ((!status || status >= 500) && job.attempts < 3) {
+      this.requeue(job, Math.min(1000 * Math.pow(2, job.attempts - 1), 5000));
+      return;
+    }
+
+    this.failed++;
+    job.reject(error);
+  }
+
+  /**
+   * Volver a poner el trabajo al principio de su carril (mantiene el orden del chat)
+   */
+  private requeue(job: Job, delayMs: number) {
+    this.retried++;
+    job.notBefore = delayMs ? Date.now() + delayMs : 0;
+    if (job.chatKey && delayMs) {
+      const state = this.chats.get(job.chatKey);
+      if (state) state.nextAt = Math.max(state.nextAt, job.notBefore);
+    }
+    this.lanes[job.priority].unshift(job);
+  }
+
+  private pruneChats() {
+    const now = Date.now();
+    for (const [key, state] of this.chats) {
+      if (!state.busy && state.nextAt <= now) this.chats.delete(key);
+    }
+  }
+}
@@ -0,0 +1,362 @@
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common';
+import { PrismaService } from '../prisma/prisma.service';
+import { TelegramService } from './telegram.service';
+import { UpdateIdRing } from './update-id-ring';
+
+const QUEUE_COLLECTION = 'telegram_update_queue';
+// update_id ya recibidos, compartido entre instancias; caduca por TTL en expire_at
+const SEEN_COLLECTION = 'telegram_update_ids';
+const MAX_ATTEMPTS = 3;
+// Los updates que agotan los intentos se guardan para revisarlos y caducan a los 7 días
+const FAILED_RETENTION_MS = 7 * 24 * 60 * 60 * 1000;
+
+/**
+ * Chat por el que se ordena un update. Las solicitudes de unión van por el usuario (su
+ * chat privado con el bot) para que queden detrás del /start del pago que las origina.
+ */
+function chatKeyOf(update: any): string | null {
+  const id =
+    update.message?.chat?.id ??
+    update.channel_post?.chat?.id ??
+    update.callback_query?.message?.chat?.id ??
+    update.callback_query?.from?.id ??
+    update.chat_join_request?.from?.id ??
+    update.my_chat_member?.chat?.id;
+  return id !== undefined && id !== null ? String(id) : null;
+}
+
+/**
+ * TelegramUpdateQueueService - Cola persistente de updates del webhook
+ *
+ * El webhook solo inserta el update en telegram_update_queue y responde; un pool de
+ * workers lo reclama (findAndModify → processing con un lease), lo procesa con
+ * TelegramService.handleUpdate y lo borra. Nunca hay dos updates del mismo chat en curso
+ * a la vez y se toman por orden de llegada, así que cada chat se procesa en orden.
+ *
+ * Un fallo reintenta el update con backoff (el chat espera mientras tanto) hasta
+ * MAX_ATTEMPTS y después queda como failed. Los updates en processing cuyo lease vence
+ * (reinicio o caída de la instancia) vuelven a pending, de modo que nada se pierde al
+ * reiniciar. El orden por chat está garantizado dentro de una instancia.
+ *
+ * Telegram reentrega los updates cuyo webhook tarda o falla. Antes de encolar, el
+ * update_id se busca en un anillo en memoria (sin tocar la base de datos) y después se
+ * registra en telegram_update_ids, cuyo _id único descarta los que ya recibió otra
+ * instancia; un duplicado se confirma a Telegram sin procesarlo otra vez.
+ */
+@Injectable()
+export class TelegramUpdateQueueService implements OnModuleInit, OnModuleDestroy {
+  private readonly logger = new Logger(TelegramUpdateQueueService.name);
+
+  private readonly concurrency = Number(process.env.TELEGRAM_UPDATE_WORKERS) || 8;
+  private readonly pollMs = Number(process.env.TELEGRAM_UPDATE_POLL_MS) || 1000;
+  private readonly leaseMs = Number(process.env.TELEGRAM_UPDATE_LEASE_MS) || 2 * 60 * 1000;
+  private readonly dedupTtlMs = Number(process.env.TELEGRAM_UPDATE_DEDUP_TTL_MS) || 24 * 60 * 60 * 1000;
+
+  private readonly recentIds = new UpdateIdRing(Number(process.env.TELEGRAM_UPDATE_DEDUP_SIZE) || 10000);
+
+  // Chats con un update en curso en esta instancia
+  private readonly activeChats = new Set<string>();
+  // Chats esperando el backoff de un reintento, hasta cuándo
+  private readonly delayedChats = new Map<string, number>();
+  private readonly running = new Set<Promise<void>>();
+
+  private timer: NodeJS.Timeout | null = null;
+  private filling = false;
+  private refill = false;
+  private stopped = false;
+
+  private processed = 0;
+  private duplicates = 0;
+  private retried = 0;
+  private failed = 0;
+
+  constructor(
+    private prisma: PrismaService,
+    private telegramService: TelegramService,
+  ) {}
+
+  async onModuleInit() {
+    // Lo que quedó a medias en un arranque anterior vuelve a la cola
+    await this.recoverExpired().catch((error) =>
+      this.logger.error('Failed to recover queued updates:', error.message),
+    );
+    this.timer = setInterval(() => {
+      this.recoverExpired()
+        .catch((error) => this.logger.error('Failed to recover queued updates:', error.message))
+        .finally(() => this.wake());
+    }, this.pollMs);
+    this.timer.unref();
+    this.wake();
+  }
+
+  async onModuleDestroy() {
+    this.stopped = true;
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+    // Lo que no termine a tiempo se recupera por lease en el siguiente arranque
+    await Promise.race([
+      Promise.allSettled([...this.running]),
+      new Promise((resolve) => setTimeout(resolve, 10000).unref()),
+    ]);
+  }
+
+  /**
+   * Guardar un update recibido por el webhook; el procesamiento es asíncrono. Devuelve
+   * false si el update ya se había recibido (reentrega de Telegram).
+   */
+  async enqueue(update: any): Promise<boolean> {
+    const updateId = typeof update.update_id === 'number' ? update.update_id : null;
+    if (updateId !== null) {
+      if (!this.recentIds.add(updateId) || !(await this.markSeen(updateId))) {
+        this.duplicates++;
+        return false;
+      }
+    }
+
+    // Ventana en vuelo: una reentrega que llega mientras este insert está pendiente ya
+    // choca con el anillo y se confirma como duplicada; si el insert falla después, forget
+    // llega tarde para ella y el update depende de la siguiente reentrega de Telegram
+    // (que sí ocurre, porque a esta petición se le responde 503).
+    try {
+      await this.insert(update);
+    } catch (error) {
+      // Sin encolar no cuenta como recibido: la reentrega de Telegram debe entrar
+      if (updateId !== null) await this.forget(updateId);
+      throw error;
+    }
+    this.wake();
+    return true;
+  }
+
+  private async insert(update: any) {
+    const now = new Date().toISOString();
+    await this.prisma.$runCommandRaw({
+      insert: QUEUE_COLLECTION,
+      documents: [
+        {
+          update_id: update.update_id ?? null,
+          chat_key: chatKeyOf(update),
+          status: 'pending',
+          attempts: 0,
+          // Como texto: los ids de chat no caben en int32 y así el update vuelve tal cual
+          payload: JSON.stringify(update),
+          available_at: { $date: now },
+          created_at: { $date: now },
+        },
+      ],
+    });
+  }
+
+  /**
+   * Registrar el update_id para todas las instancias; false si otra ya lo tenía
+   */
+  private async markSeen(updateId: number): Promise<boolean> {
+    try {
+      await this.prisma.$runCommandRaw({
+        insert: SEEN_COLLECTION,
+        documents: [
+          {
+            _id: updateId,
+            expire_at: { $date: new Date(Date.now() + this.dedupTtlMs).toISOString() },
+          },
+        ],
+      });
+      return true;
+    } catch (error) {
+      if (/E11000|duplicate key/i.test(error.message)) return false;
+      this.recentIds.delete(updateId);
+      throw error;
+    }
+  }
+
+  private async forget(updateId: number) {
+    this.recentIds.delete(updateId);
+    await this.prisma
+      .$runCommandRaw({ delete: SEEN_COLLECTION, deletes: [{ q: { _id: updateId }, limit: 1 }] })
+      .catch((error) => this.logger.error(`Failed to forget update ${updateId}:`, error.message));
+  }
+
+  /**
+   * Profundidad de la cola y contadores de esta instancia
+   */
+  async stats() {
+    const count = async (status: string) => {
+      const result = (await this.prisma.$runCommandRaw({
+        count: QUEUE_COLLECTION,
+        query: { status },
+      })) as any;
+      return result?.n || 0;
+    };
+    const [pending, processing, failed] = await Promise.all([
+      count('pending'),
+      count('processing'),
+      count('failed'),
+    ]);
+
+    return {
+      pending,
+      processing,
+      failed,
+      workers: { active: this.running.size, concurrency: this.concurrency },
+      delayedChats: this.delayedChats.size,
+      recentIds: this.recentIds.size,
+      totals: {
+        processed: this.processed,
+        duplicates: this.duplicates,
+        retried: this.retried,
+        failed: this.failed,
+      },
+    };
+  }
+
+  private wake() {
+    if (this.stopped) return;
+    if (this.filling) {
+      this.refill = true;
+      return;
+    }
+    this.filling = true;
+    this.fill()
+      .catch((error) => this.logger.error('Failed to claim queued updates:', error.message))
+      .finally(() => {
+        this.filling = false;
+        if (this.refill) {
+          this.refill = false;
+          this.wake();
+        }
+      });
+  }
+
+  /**
+   * Reclamar updates hasta llenar el pool
+   */
+  private async fill() {
+    while (!this.stopped && this.running.size < this.concurrency) {
+      const job = await this.claim();
+      if (!job) return;
+
+      const task = this.process(job).finally(() => {
+        this.running.delete(task);
+        if (job.chat_key) this.activeChats.delete(job.chat_key);
+        this.wake();
+      });
+      this.running.add(task);
+    }
+  }
+
+  private async claim(): Promise<any | null> {
+    const now = Date.now();
+    for (const [chatKey, until] of this.delayedChats) {
+      if (until <= now) this.delayedChats.delete(chatKey);
+    }
+    const busyChats = [...this.activeChats, ...this.delayedChats.keys()];
+
+    const result = (await this.prisma.$runCommandRaw({
+      findAndModify: QUEUE_COLLECTION,
+      query: {
+        status: 'pending',
+        available_at: { $lte: { $date: new Date(now).toISOString() } },
+        ...(busyChats.length > 0 && { chat_key: { $nin: busyChats } }),
+      },
+      sort: { _id: 1 },
+      update: {
+        $set: { status: 'processing', locked_until: { $date: new Date(now + this.leaseMs).toISOString() } },
+        $inc: { attempts: 1 },
+      },
+      new: true,
+    })) as any;
+
+    const job = result.value;
+    if (job?.chat_key) this.activeChats.add(job.chat_key);
+    return job || null;
+  }
+
+  private async process(job: any) {
+    const id = job._id.$oid || job._id;
+    try {
+      await this.telegramService.handleUpdate(JSON.parse(job.payload));
+      await this.prisma.$runCommandRaw({
+        delete: QUEUE_COLLECTION,
+        deletes: [{ q: { _id: { $oid: id } }, limit: 1 }],
+      });
+      this.processed++;
+    } catch (error) {
+      await this.release(job, id, error).catch((releaseError) =>
+        this.logger.error(`Failed to release update ${job.update_id}:`, releaseError.message),
+      );
+    }
+  }
+
+  /**
+   * Devolver un update fallido a la cola con backoff, o dejarlo como failed
+   */
+  private async release(job: any, id: string, error: any) {
+    const now = Date.now();
+    const message = String(error?.message || error).substring(0, 500);
+
+    if (job.attempts >= MAX_ATTEMPTS) {
+      this.failed++;
+      this.logger.error(`Update ${job.update_id} failed after ${job.attempts} attempts: ${message}`);
+      await this.prisma.$runCommandRaw({
+        update: QUEUE_COLLECTION,
+        updates: [
+          {
+            q: { _id: { $oid: id } },
+            u: {
+              $set: {
+                status: 'failed',
+                last_error: message,
+                expire_at: { $date: new Date(now + FAILED_RETENTION_MS).toISOString() },
+              },
+              $unset: { locked_until: '' },
+            },
+          },
+        ],
+      });
+      return;
+    }
+
+    this.retried++;
+    const delayMs = Math.min(1000 * Math.pow(4, job.attempts - 1), 30000);
+    this.logger.warn(`Update ${job.update_id} failed (attempt ${job.attempts}), retrying in ${delayMs}ms: ${message}`);
+    // Los siguientes updates del chat esperan a que este se reintente
+    if (job.chat_key) this.delayedChats.set(job.chat_key, now + delayMs);
+    await this.prisma.$runCommandRaw({
+      update: QUEUE_COLLECTION,
+      updates: [
+        {
+          q: { _id: { $oid: id } },
+          u: {
+            $set: {
+              status: 'pending',
+              last_error: message,
+              available_at: { $date: new Date(now + delayMs).toISOString() },
+            },
+            $unset: { locked_until: '' },
+          },
+        },
+      ],
+    });
+  }
+
+  /**
+   * Updates en processing con el lease vencido (instancia caída o reiniciada) → pending
+   */
+  private async recoverExpired() {
+    const result = (await this.prisma.$runCommandRaw({
+      update: QUEUE_COLLECTION,
+      updates: [
+        {
+          q: { status: 'processing', locked_until: { $lt: { $date: new Date().toISOString() } } },
+          u: { $set: { status: 'pending' }, $unset: { locked_until: '' } },
+          multi: true,
+        },
+      ],
+    })) as any;
+    if (result?.nModified > 0) {
+      this.logger.warn(`Recovered ${result.nModified} queued updates with an expired lease`);
+    }
+  }
+}
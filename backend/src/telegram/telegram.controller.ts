@@ -9,8 +9,10 @@ import {
   HttpStatus,
   Req,
   Logger,
+  ServiceUnavailableException,
 } from '@nestjs/common';
 import { TelegramService } from './telegram.service';
+import { TelegramUpdateQueueService } from './telegram-update-queue.service';
 import { JwtAuthGuard } from '../common/guards/jwt-auth.guard';
 import { Roles } from '../common/decorators/roles.decorator';
 import { RolesGuard } from '../common/guards/roles.guard';
@@ -25,6 +27,7 @@ export class TelegramController {
 
   constructor(
     private telegramService: TelegramService,
+    private updateQueue: TelegramUpdateQueueService,
     private prisma: PrismaService,
   ) {}
 
@@ -52,13 +55,14 @@ export class TelegramController {
   @ApiOperation({ summary: 'Telegram webhook endpoint' })
   async handleWebhook(@Req() req: any, @Body() update: any) {
     try {
-      this.logger.log(`📥 Received webhook update: ${JSON.stringify(update).substring(0, 200)}...`);
-      // Procesar el update con el bot
-      await this.telegramService.handleUpdate(update);
+      // Solo se encola: los workers de TelegramUpdateQueueService lo procesan
+      const queued = await this.updateQueue.enqueue(update);
+      if (!queued) this.logger.debug(`Duplicate webhook update ${update.update_id} ignored`);
       return { ok: true };
     } catch (error) {
-      this.logger.error('Error processing webhook:', error);
-      return { ok: false };
+      // Sin 2xx Telegram vuelve a entregar el update más tarde
+      this.logger.error(`Error queueing webhook update ${update?.update_id}:`, error.message);
+      throw new ServiceUnavailableException('Update could not be queued');
     }
   }
 
@@ -5,13 +5,15 @@ import { TelegramChannelsService } from './telegram-channels.service';
 import { TelegramChannelsController } from './telegram-channels.controller';
 import { TelegramAuthController } from './telegram-auth.controller';
 import { TelegramHttpService } from './telegram-http.service';
+import { TelegramUpdateQueueService } from './telegram-update-queue.service';
 import { PrismaModule } from '../prisma/prisma.module';
+import { AdminModule } from '../admin/admin.module';
 import { ConfigModule } from '@nestjs/config';
 
 @Module({
-  imports: [PrismaModule, ConfigModule],
-  providers: [TelegramService, TelegramChannelsService, TelegramHttpService],
+  imports: [PrismaModule, ConfigModule, AdminModule],
+  providers: [TelegramService, TelegramChannelsService, TelegramHttpService, TelegramUpdateQueueService],
   controllers: [TelegramController, TelegramChannelsController, TelegramAuthController],
-  exports: [TelegramService, TelegramChannelsService, TelegramHttpService],
+  exports: [TelegramService, TelegramChannelsService, TelegramHttpService, TelegramUpdateQueueService],
 })
 export class TelegramModule {}
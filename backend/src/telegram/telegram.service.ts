@@ -9,29 +9,29 @@ import {
 import { Telegraf, Context } from 'telegraf';
 import { PrismaService } from '../prisma/prisma.service';
 import { ConfigService } from '@nestjs/config';
-import { TelegramHttpService } from './telegram-http.service';
+import { TelegramHttpService, telegramOptions } from './telegram-http.service';
+import { AdminChannelMonitorService } from '../admin/admin-channel-monitor.service';
 
 @Injectable()
 export class TelegramService implements OnModuleInit, OnModuleDestroy {
   private bot: Telegraf | null = null;
   private readonly logger = new Logger(TelegramService.name);
   private isInitialized = false;
-  private httpService: TelegramHttpService;
 
   constructor(
     private prisma: PrismaService,
     private config: ConfigService,
+    // Shared instance: the outbound rate limits are per bot, not per service
+    private httpService: TelegramHttpService,
+    private channelMonitor: AdminChannelMonitorService,
   ) {
-    // Create HTTP service for proxy-based API calls
-    this.httpService = new TelegramHttpService(config);
-
     const token = this.config.get<string>('TELEGRAM_BOT_TOKEN');
     if (!token) {
       this.logger.warn('TELEGRAM_BOT_TOKEN is not configured - Telegram features disabled');
       return;
     }
     try {
-      this.bot = new Telegraf(token);
+      this.bot = new Telegraf(token, telegramOptions(this.config));
       this.setupBot();
       this.setupCallbackHandlers();
     } catch (error) {
@@ -918,6 +918,7 @@ export class TelegramService implements OnModuleInit, OnModuleDestroy {
         await this.httpService.sendMessage(telegramUserId, text, {
           parseMode: options.parse_mode || 'Markdown',
           replyMarkup: options.reply_markup,
+          priority: 'high',
         });
       } catch (err) {
         this.logger.error('Failed to send via proxy:', err.message);
@@ -1951,12 +1952,13 @@ export class TelegramService implements OnModuleInit, OnModuleDestroy {
         return { success: false, error: 'Tipster not found' };
       }
 
-      // Helper function to send message via proxy
+      // Helper function to send message via proxy (carries the access link)
       const sendMessageViaProxy = async (chatId: string, text: string, options: any = {}) => {
         try {
           await this.httpService.sendMessage(chatId, text, {
             parseMode: options.parse_mode || 'Markdown',
             replyMarkup: options.reply_markup,
+            priority: 'high',
           });
           return true;
         } catch (error) {
@@ -2258,93 +2260,64 @@ export class TelegramService implements OnModuleInit, OnModuleDestroy {
   }
 
   /**
-   * Manejar updates desde webhook - PROCESA DIRECTAMENTE VIA PROXY
+   * Procesar un update del webhook - PROCESA DIRECTAMENTE VIA PROXY
+   *
+   * Lo llaman los workers de TelegramUpdateQueueService: espera a que termine todo el
+   * procesamiento y propaga los errores para que el update se reintente.
    */
   async handleUpdate(update: any) {
-    try {
-      this.logger.log(`Processing webhook update: ${JSON.stringify(update).substring(0, 200)}`);
+    this.logger.log(`Processing webhook update: ${JSON.stringify(update).substring(0, 200)}`);
 
-      // Process my_chat_member directly (critical - needs sync processing)
-      if (update.my_chat_member) {
-        await this.handleMyChatMemberUpdate(update.my_chat_member);
-        this.logger.log('Webhook my_chat_member processed successfully');
-        return;
-      }
+    if (update.my_chat_member) {
+      await this.handleMyChatMemberUpdate(update.my_chat_member);
+      this.logger.log('Webhook my_chat_member processed successfully');
+      return;
+    }
 
-      // Process channel_post directly (critical for detecting new channels)
-      if (update.channel_post) {
-        const chat = update.channel_post.chat;
-        if (chat && chat.type === 'channel') {
-          this.logger.log(`📬 Webhook channel_post: ${chat.title} (${chat.id})`);
-          await this.saveDetectedChannel(chat.id.toString(), chat.title, chat.username, chat.type);
-          
-          // Save message if channel is being monitored
-          await this.saveMonitoredMessage(update.channel_post, chat);
-          
-          this.logger.log('Webhook channel_post processed - channel saved');
-        }
-        return;
-      }
+    // Critical for detecting new channels
+    if (update.channel_post) {
+      const chat = update.channel_post.chat;
+      if (chat && chat.type === 'channel') {
+        this.logger.log(`📬 Webhook channel_post: ${chat.title} (${chat.id})`);
+        await this.saveDetectedChannel(chat.id.toString(), chat.title, chat.username, chat.type);
 
-      // Process message updates directly (bypass Telegraf to use proxy)
-      if (update.message) {
-        const chat = update.message.chat;
-        // Also check for monitored messages in groups
-        if (chat && (chat.type === 'supergroup' || chat.type === 'group')) {
-          await this.saveMonitoredMessage(update.message, chat);
-        }
-        
-        setImmediate(async () => {
-          try {
-            await this.handleMessageUpdateViaProxy(update.message);
-          } catch (err) {
-            this.logger.error('Message processing failed:', err.message);
-          }
-        });
-        return;
-      }
+        // Save message if channel is being monitored
+        await this.saveMonitoredMessage(update.channel_post, chat);
 
-      // Process callback queries directly
-      if (update.callback_query) {
-        setImmediate(async () => {
-          try {
-            await this.handleCallbackQueryViaProxy(update.callback_query);
-          } catch (err) {
-            this.logger.error('Callback processing failed:', err.message);
-          }
-        });
-        return;
+        this.logger.log('Webhook channel_post processed - channel saved');
       }
+      return;
+    }
 
-      // Process chat join requests
-      if (update.chat_join_request) {
-        setImmediate(async () => {
-          try {
-            await this.handleChatJoinRequestViaProxy(update.chat_join_request);
-          } catch (err) {
-            this.logger.error('Join request processing failed:', err.message);
-          }
-        });
-        return;
+    // Process message updates directly (bypass Telegraf to use proxy)
+    if (update.message) {
+      const chat = update.message.chat;
+      // Also check for monitored messages in groups
+      if (chat && (chat.type === 'supergroup' || chat.type === 'group')) {
+        await this.saveMonitoredMessage(update.message, chat);
       }
+      await this.handleMessageUpdateViaProxy(update.message);
+      return;
+    }
 
-      // For other updates, try using Telegraf as fallback
-      if (this.bot) {
-        setImmediate(async () => {
-          try {
-            await this.bot.handleUpdate(update);
-            this.logger.log('Webhook update processed via Telegraf (background)');
-          } catch (err) {
-            this.logger.error('Telegraf processing failed:', err.message);
-          }
-        });
-      }
+    if (update.callback_query) {
+      await this.handleCallbackQueryViaProxy(update.callback_query);
+      return;
+    }
 
-      // Ensure webhook is still configured (non-blocking)
-      this.ensureWebhookAsync();
-    } catch (error) {
-      this.logger.error('Error handling update:', error);
+    if (update.chat_join_request) {
+      await this.handleChatJoinRequestViaProxy(update.chat_join_request);
+      return;
+    }
+
+    // For other updates, try using Telegraf as fallback
+    if (this.bot) {
+      await this.bot.handleUpdate(update);
+      this.logger.log('Webhook update processed via Telegraf');
     }
+
+    // Ensure webhook is still configured (non-blocking)
+    this.ensureWebhookAsync();
   }
 
   /**
@@ -2897,11 +2870,13 @@ ${product.description ? this.escapeMarkdown(product.description) + '\n\n' : ''}
 🛒 *¡Compra ahora y accede al contenido premium\\!*
       `.trim();
 
-      await this.bot.telegram.sendMessage(channelId, message, {
-        parse_mode: 'MarkdownV2',
-        reply_markup: {
+      // Marketing post: lowest lane of the outbound queue
+      await this.httpService.sendMessage(channelId, message, {
+        parseMode: 'MarkdownV2',
+        replyMarkup: {
           inline_keyboard: [[{ text: '💳 Comprar Ahora', url: checkoutUrl }]],
         },
+        priority: 'low',
       });
 
       this.logger.log(`✅ Published product ${productId} to channel ${channelId}`);
@@ -2937,15 +2912,24 @@ ${product.description ? this.escapeMarkdown(product.description) + '\n\n' : ''}
         lastErrorDate: webhookInfo.last_error_date
           ? new Date(webhookInfo.last_error_date * 1000).toISOString()
           : null,
+        outboundQueue: this.httpService.getQueueStats(),
       };
     } catch (error) {
       return {
         isInitialized: this.isInitialized,
         error: error.message,
+        outboundQueue: this.httpService.getQueueStats(),
       };
     }
   }
 
+  /**
+   * Outbound Bot API queue metrics
+   */
+  getOutboundQueueStats() {
+    return this.httpService.getQueueStats();
+  }
+
   /**
    * Generar código de vinculación único
    */
@@ -3872,29 +3856,16 @@ ${product.description ? this.escapeMarkdown(product.description) + '\n\n' : ''}
 
   /**
    * Save a message to the monitored messages collection
-   * Only saves if the channel is being actively monitored
+   * Only saves if the channel is being actively monitored (checked in memory, written in batches)
    */
   private async saveMonitoredMessage(message: any, chat: any): Promise<void> {
     try {
       const channelId = chat.id.toString();
-      
-      this.logger.log(`🔍 Checking if channel ${channelId} is monitored...`);
-      
-      // Check if this channel is being monitored
-      const monitorConfig = await this.prisma.channelMonitorConfig.findFirst({
-        where: { channelId },
-        select: { isMonitoring: true, id: true },
-      });
-
-      this.logger.log(`🔍 Monitor config for ${channelId}: ${JSON.stringify(monitorConfig)}`);
 
-      if (!monitorConfig?.isMonitoring) {
-        this.logger.log(`⏭️ Channel ${channelId} not monitored, skipping`);
+      if (!(await this.channelMonitor.isChannelMonitored(channelId))) {
         return; // Not monitored, skip
       }
 
-      this.logger.log(`✅ Channel ${channelId} IS monitored, saving message...`);
-
       // Determine message type
       let messageType = 'text';
       let textContent = message.text || null;
@@ -3919,54 +3890,21 @@ ${product.description ? this.escapeMarkdown(product.description) + '\n\n' : ''}
       const senderFirstName = sender?.first_name || sender?.title || null;
       const senderLastName = sender?.last_name || null;
 
-      // Check for duplicate using raw query
-      const existingCount = await this.prisma.$runCommandRaw({
-        count: 'channel_messages',
-        query: { channel_id: channelId, message_id: message.message_id },
-      }) as any;
-
-      if (existingCount?.n > 0) {
-        return; // Already saved
-      }
-
-      const now = new Date();
-      const telegramDate = new Date(message.date * 1000);
-
-      // Save the message using raw MongoDB command
-      await this.prisma.$runCommandRaw({
-        insert: 'channel_messages',
-        documents: [
-          {
-            channel_id: channelId,
-            channel_title: chat.title || null,
-            message_id: message.message_id,
-            sender_user_id: senderUserId,
-            sender_username: senderUsername,
-            sender_first_name: senderFirstName,
-            sender_last_name: senderLastName,
-            message_type: messageType,
-            text_content: textContent,
-            caption: caption,
-            reply_to_message_id: message.reply_to_message?.message_id || null,
-            forward_from_id: message.forward_from?.id?.toString() || message.forward_from_chat?.id?.toString() || null,
-            telegram_date: { $date: telegramDate.toISOString() },
-            captured_at: { $date: now.toISOString() },
-          },
-        ],
-      });
-
-      // Update message count using raw command
-      await this.prisma.$runCommandRaw({
-        update: 'channel_monitor_configs',
-        updates: [
-          {
-            q: { channel_id: channelId },
-            u: { $inc: { message_count: 1 } },
-          },
-        ],
+      await this.channelMonitor.saveMessage({
+        channelId,
+        channelTitle: chat.title || null,
+        messageId: message.message_id,
+        senderUserId,
+        senderUsername,
+        senderFirstName,
+        senderLastName,
+        messageType,
+        textContent,
+        caption,
+        replyToMessageId: message.reply_to_message?.message_id || null,
+        forwardFromId: message.forward_from?.id?.toString() || message.forward_from_chat?.id?.toString() || null,
+        telegramDate: new Date(message.date * 1000),
       });
-
-      this.logger.log(`💬 Monitored message saved: ${message.message_id} from ${chat.title}`);
     } catch (error) {
       // Log but don't throw - monitoring should not interrupt normal operation
       this.logger.warn(`Error saving monitored message: ${error.message}`);
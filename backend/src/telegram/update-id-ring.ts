@@ -0,0 +1,42 @@
+/**
+ * UpdateIdRing - Últimos N update_id vistos, con búsqueda e inserción O(1)
+ *
+ * Un Set para la búsqueda y un buffer circular para saber cuál sale al llenarse; la
+ * memoria queda acotada a `capacity` ids.
+ */
+export class UpdateIdRing {
+  private readonly slots: Array<number | undefined>;
+  private readonly seen = new Set<number>();
+  private next = 0;
+
+  constructor(private readonly capacity: number) {
+    this.slots = new Array(capacity);
+  }
+
+  get size() {
+    return this.seen.size;
+  }
+
+  /**
+   * Registrar un id; devuelve false si ya estaba
+   */
+  add(updateId: number): boolean {
+    if (this.seen.has(updateId)) return false;
+
+    const evicted = this.slots[this.next];
+    if (evicted !== undefined) this.seen.delete(evicted);
+    this.slots[this.next] = updateId;
+    this.next = (this.next + 1) % this.capacity;
+    this.seen.add(updateId);
+    return true;
+  }
+
+  /**
+   * Olvidar un id (p.ej. si no se pudo encolar y Telegram debe poder reentregarlo)
+   */
+  delete(updateId: number) {
+    if (!this.seen.delete(updateId)) return;
+    const index = this.slots.indexOf(updateId);
+    if (index >= 0) this.slots[index] = undefined;
+  }
+}
@@ -2,9 +2,10 @@ import { Module } from '@nestjs/common';
 import { WithdrawalsService } from './withdrawals.service';
 import { WithdrawalsController, AdminWithdrawalsController, InvoicesController } from './withdrawals.controller';
 import { PrismaModule } from '../prisma/prisma.module';
+import { BalancesModule } from '../balances/balances.module';
 
 @Module({
-  imports: [PrismaModule],
+  imports: [PrismaModule, BalancesModule],
   controllers: [WithdrawalsController, AdminWithdrawalsController, InvoicesController],
   providers: [WithdrawalsService],
   exports: [WithdrawalsService],
@@ -1,5 +1,6 @@
 import { Injectable, Logger, BadRequestException, NotFoundException, ForbiddenException } from '@nestjs/common';
 import { PrismaService } from '../prisma/prisma.service';
+import { TipsterBalanceService } from '../balances/tipster-balance.service';
 import * as fs from 'fs';
 import * as path from 'path';
 
@@ -7,7 +8,10 @@ import * as path from 'path';
 export class WithdrawalsService {
   private readonly logger = new Logger(WithdrawalsService.name);
 
-  constructor(private prisma: PrismaService) {}
+  constructor(
+    private prisma: PrismaService,
+    private balances: TipsterBalanceService,
+  ) {}
 
   /**
    * Obtener el ID del perfil de tipster a partir del userId
@@ -42,103 +46,21 @@ export class WithdrawalsService {
       };
     }
 
-    // Calcular ingresos netos totales de órdenes pagadas
-    const ordersResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'orders',
-      pipeline: [
-        {
-          $match: {
-            tipster_id: profileId,
-            status: { $in: ['PAGADA', 'ACCESS_GRANTED', 'COMPLETED', 'paid'] },
-          },
-        },
-        {
-          $group: {
-            _id: null,
-            totalNetCents: { $sum: { $ifNull: ['$net_amount_cents', '$amount_cents'] } },
-            totalGrossCents: { $sum: '$amount_cents' },
-            totalPlatformFeeCents: { $sum: { $ifNull: ['$platform_fee_cents', 0] } },
-            totalGatewayFeeCents: { $sum: { $ifNull: ['$gateway_fee_cents', 0] } },
-            orderCount: { $sum: 1 },
-          },
-        },
-      ],
-      cursor: {},
-    })) as any;
-
-    const orderStats = ordersResult.cursor?.firstBatch?.[0] || {
-      totalNetCents: 0,
-      totalGrossCents: 0,
-      totalPlatformFeeCents: 0,
-      totalGatewayFeeCents: 0,
-      orderCount: 0,
-    };
-
-    // Calcular retiros ya pagados (usando el userId, no profileId)
-    const withdrawalsResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'withdrawal_requests',
-      pipeline: [
-        {
-          $match: {
-            tipster_id: userId,
-            status: { $in: ['APPROVED', 'PAID'] },
-          },
-        },
-        {
-          $group: {
-            _id: null,
-            totalWithdrawnCents: { $sum: '$amount_cents' },
-            withdrawalCount: { $sum: 1 },
-          },
-        },
-      ],
-      cursor: {},
-    })) as any;
-
-    const withdrawalStats = withdrawalsResult.cursor?.firstBatch?.[0] || {
-      totalWithdrawnCents: 0,
-      withdrawalCount: 0,
-    };
-
-    // Calcular retiros pendientes
-    const pendingResult = (await this.prisma.$runCommandRaw({
-      aggregate: 'withdrawal_requests',
-      pipeline: [
-        {
-          $match: {
-            tipster_id: userId,
-            status: 'PENDING',
-          },
-        },
-        {
-          $group: {
-            _id: null,
-            totalPendingCents: { $sum: '$amount_cents' },
-            pendingCount: { $sum: 1 },
-          },
-        },
-      ],
-      cursor: {},
-    })) as any;
-
-    const pendingStats = pendingResult.cursor?.firstBatch?.[0] || {
-      totalPendingCents: 0,
-      pendingCount: 0,
-    };
-
-    const availableBalanceCents = orderStats.totalNetCents - withdrawalStats.totalWithdrawnCents - pendingStats.totalPendingCents;
+    // Totales mantenidos en tipster_balances (una lectura por _id)
+    const balance = await this.balances.getBalance(profileId);
+    const availableBalanceCents = balance.totalNetCents - balance.totalWithdrawnCents - balance.totalPendingCents;
 
     return {
-      totalEarnedCents: orderStats.totalNetCents,
-      totalGrossCents: orderStats.totalGrossCents,
-      totalPlatformFeeCents: orderStats.totalPlatformFeeCents,
-      totalGatewayFeeCents: orderStats.totalGatewayFeeCents,
-      totalWithdrawnCents: withdrawalStats.totalWithdrawnCents,
-      pendingWithdrawalCents: pendingStats.totalPendingCents,
+      totalEarnedCents: balance.totalNetCents,
+      totalGrossCents: balance.totalGrossCents,
+      totalPlatformFeeCents: balance.totalPlatformFeeCents,
+      totalGatewayFeeCents: balance.totalGatewayFeeCents,
+      totalWithdrawnCents: balance.totalWithdrawnCents,
+      pendingWithdrawalCents: balance.totalPendingCents,
       availableBalanceCents: Math.max(0, availableBalanceCents),
-      orderCount: orderStats.orderCount,
-      withdrawalCount: withdrawalStats.withdrawalCount,
-      pendingCount: pendingStats.pendingCount,
+      orderCount: balance.orderCount,
+      withdrawalCount: balance.withdrawalCount,
+      pendingCount: balance.pendingCount,
       currency: 'EUR',
     };
   }
@@ -184,6 +106,15 @@ export class WithdrawalsService {
       where: { id: tipsterId },
     });
 
+    // Reservar el importe en el saldo: falla si otra solicitud concurrente ya lo consumió
+    const reserved = await this.balances.reserveWithdrawal(tipsterProfile.id, data.amountCents);
+    if (!reserved) {
+      const current = await this.getAvailableBalance(tipsterId);
+      throw new BadRequestException(
+        `Saldo insuficiente. Disponible: €${(current.availableBalanceCents / 100).toFixed(2)}, Solicitado: €${(data.amountCents / 100).toFixed(2)}`
+      );
+    }
+
     // Generar número de factura único
     const invoiceNumber = await this.generateInvoiceNumber();
 
@@ -232,6 +163,9 @@ export class WithdrawalsService {
           updated_at: { $date: now },
         },
       ],
+    }).catch(async (error) => {
+      await this.balances.releaseWithdrawal(tipsterProfile.id, data.amountCents);
+      throw error;
     });
 
     this.logger.log(`Withdrawal request created: ${invoiceNumber} for tipster ${tipsterId} - €${(data.amountCents / 100).toFixed(2)}`);
@@ -372,22 +306,12 @@ export class WithdrawalsService {
 
     const now = new Date().toISOString();
 
-    await this.prisma.$runCommandRaw({
-      update: 'withdrawal_requests',
-      updates: [
-        {
-          q: { _id: { $oid: withdrawalId } },
-          u: {
-            $set: {
-              status: 'APPROVED',
-              approved_at: { $date: now },
-              approved_by: adminId,
-              admin_notes: adminNotes || null,
-              updated_at: { $date: now },
-            },
-          },
-        },
-      ],
+    await this.transition(withdrawal, {
+      status: 'APPROVED',
+      approved_at: { $date: now },
+      approved_by: adminId,
+      admin_notes: adminNotes || null,
+      updated_at: { $date: now },
     });
 
     this.logger.log(`Withdrawal ${withdrawalId} APPROVED by admin ${adminId}`);
@@ -415,26 +339,16 @@ export class WithdrawalsService {
 
     const now = new Date().toISOString();
 
-    await this.prisma.$runCommandRaw({
-      update: 'withdrawal_requests',
-      updates: [
-        {
-          q: { _id: { $oid: withdrawalId } },
-          u: {
-            $set: {
-              status: 'PAID',
-              payment_method: data.paymentMethod,
-              payment_reference: data.paymentReference || null,
-              paid_at: { $date: now },
-              paid_by: adminId,
-              admin_notes: data.adminNotes || withdrawal.adminNotes || null,
-              approved_at: withdrawal.approvedAt ? withdrawal.approvedAt : { $date: now },
-              approved_by: withdrawal.approvedBy || adminId,
-              updated_at: { $date: now },
-            },
-          },
-        },
-      ],
+    await this.transition(withdrawal, {
+      status: 'PAID',
+      payment_method: data.paymentMethod,
+      payment_reference: data.paymentReference || null,
+      paid_at: { $date: now },
+      paid_by: adminId,
+      admin_notes: data.adminNotes || withdrawal.adminNotes || null,
+      approved_at: withdrawal.approvedAt ? withdrawal.approvedAt : { $date: now },
+      approved_by: withdrawal.approvedBy || adminId,
+      updated_at: { $date: now },
     });
 
     this.logger.log(`Withdrawal ${withdrawalId} marked as PAID by admin ${adminId}`);
@@ -462,27 +376,48 @@ export class WithdrawalsService {
 
     const now = new Date().toISOString();
 
-    await this.prisma.$runCommandRaw({
+    await this.transition(withdrawal, {
+      status: 'REJECTED',
+      rejection_reason: rejectionReason,
+      rejected_at: { $date: now },
+      rejected_by: adminId,
+      updated_at: { $date: now },
+    });
+
+    this.logger.log(`Withdrawal ${withdrawalId} REJECTED by admin ${adminId}: ${rejectionReason}`);
+
+    return { success: true, message: 'Solicitud rechazada' };
+  }
+
+  /**
+   * Cambiar el estado de una solicitud solo si sigue en el estado leído, y reflejarlo en el
+   * saldo del tipster. Si otro admin la procesó a la vez, no se aplica nada.
+   */
+  private async transition(withdrawal: any, changes: Record<string, any> & { status: string }) {
+    const result = (await this.prisma.$runCommandRaw({
       update: 'withdrawal_requests',
       updates: [
         {
-          q: { _id: { $oid: withdrawalId } },
-          u: {
-            $set: {
-              status: 'REJECTED',
-              rejection_reason: rejectionReason,
-              rejected_at: { $date: now },
-              rejected_by: adminId,
-              updated_at: { $date: now },
-            },
-          },
+          q: { _id: { $oid: withdrawal.id }, status: withdrawal.status },
+          u: { $set: changes },
         },
       ],
-    });
+    })) as any;
 
-    this.logger.log(`Withdrawal ${withdrawalId} REJECTED by admin ${adminId}: ${rejectionReason}`);
+    if (!result.nModified) {
+      throw new BadRequestException('La solicitud cambió de estado mientras se procesaba, recarga e inténtalo de nuevo');
+    }
 
-    return { success: true, message: 'Solicitud rechazada' };
+    // Solo PENDING → APPROVED/PAID/REJECTED mueve el saldo; APPROVED → PAID ya estaba descontado
+    if (withdrawal.status !== 'PENDING') return;
+    const profileId = await this.getTipsterProfileId(withdrawal.tipsterId);
+    if (!profileId) return;
+
+    if (changes.status === 'REJECTED') {
+      await this.balances.releaseWithdrawal(profileId, withdrawal.amountCents);
+    } else {
+      await this.balances.settleWithdrawal(profileId, withdrawal.amountCents);
+    }
   }
 
   /**
@@ -4,11 +4,13 @@ Antia Platform Backend API Testing
 Tests Affiliate Landing System for tipster platform
 """
 
-import requests
+import asyncio
 import json
 import sys
 from typing import Dict, Any, Optional
 
+from harness import BaseTester, Step
+
 # Configuration
 BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -21,10 +23,9 @@ TIPSTER_PASSWORD = "Tipster123!"
 ADMIN_EMAIL = "admin@antia.com"
 ADMIN_PASSWORD = "SuperAdmin123!"
 
-class AntiaAffiliateTester:
+class AntiaAffiliateTester(BaseTester):
     def __init__(self):
-        self.session = requests.Session()
-        self.access_token = None
+        super().__init__(API_BASE)
         self.admin_access_token = None
         self.test_landing_id = None
         self.test_click_id = None
@@ -35,68 +36,12 @@ class AntiaAffiliateTester:
         self.test_admin_promotion_id = None
         self.test_admin_house_link_id = None
         
-    def log(self, message: str, level: str = "INFO"):
-        """Log test messages"""
-        print(f"[{level}] {message}")
-        
-    def make_request(self, method: str, endpoint: str, data: Dict = None, 
-                    headers: Dict = None, use_auth: bool = True) -> requests.Response:
-        """Make HTTP request with proper headers"""
-        url = f"{API_BASE}{endpoint}"
-        
-        # Default headers
-        req_headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
-        # Add auth header if token available and requested
-        if use_auth and self.access_token:
-            req_headers["Authorization"] = f"Bearer {self.access_token}"
-            
-        # Merge with provided headers
-        if headers:
-            req_headers.update(headers)
-            
-        self.log(f"Making {method} request to {url}")
-        if data:
-            self.log(f"Request data: {json.dumps(data, indent=2)}")
-            
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data if data else None,
-                headers=req_headers,
-                timeout=30
-            )
-            
-            self.log(f"Response status: {response.status_code}")
-            
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
-            except:
-                self.log(f"Response text: {response.text}")
-                
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {str(e)}", "ERROR")
-            raise
-
-    def test_login(self) -> bool:
+    async def test_login(self) -> bool:
         """Test authentication with tipster credentials"""
         self.log("=== Testing Authentication ===")
         
-        login_data = {
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data, use_auth=False)
+            response = await self.login("tipster", TIPSTER_EMAIL, TIPSTER_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -118,12 +63,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_tipster_landings(self) -> bool:
+    async def test_get_tipster_landings(self) -> bool:
         """Test getting tipster's landings"""
         self.log("=== Testing Get Tipster Landings ===")
         
         try:
-            response = self.make_request("GET", "/tipster/landings")
+            response = await self.make_request("GET", "/tipster/landings")
             
             if response.status_code == 200:
                 landings = response.json()
@@ -149,12 +94,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get tipster landings test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_available_houses_for_spain(self) -> bool:
+    async def test_get_available_houses_for_spain(self) -> bool:
         """Test getting available betting houses for Spain"""
         self.log("=== Testing Get Available Houses for Spain ===")
         
         try:
-            response = self.make_request("GET", "/tipster/landings/houses/ES")
+            response = await self.make_request("GET", "/tipster/landings/houses/ES")
             
             if response.status_code == 200:
                 houses = response.json()
@@ -174,7 +119,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get houses for Spain test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_landing_metrics(self) -> bool:
+    async def test_get_landing_metrics(self) -> bool:
         """Test getting landing metrics"""
         if not self.test_landing_id:
             self.log("❌ No test landing ID available", "ERROR")
@@ -183,7 +128,7 @@ class AntiaAffiliateTester:
         self.log("=== Testing Get Landing Metrics ===")
         
         try:
-            response = self.make_request("GET", f"/tipster/landings/{self.test_landing_id}/metrics")
+            response = await self.make_request("GET", f"/tipster/landings/{self.test_landing_id}/metrics")
             
             if response.status_code == 200:
                 metrics = response.json()
@@ -217,7 +162,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get landing metrics test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_public_landing(self) -> bool:
+    async def test_get_public_landing(self) -> bool:
         """Test getting public landing by slug"""
         self.log("=== Testing Get Public Landing ===")
         
@@ -226,7 +171,7 @@ class AntiaAffiliateTester:
         country = "ES"
         
         try:
-            response = self.make_request("GET", f"/go/{slug}?country={country}", use_auth=False)
+            response = await self.make_request("GET", f"/go/{slug}?country={country}", use_auth=False)
             
             if response.status_code == 200:
                 landing = response.json()
@@ -282,7 +227,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get public landing test failed: {str(e)}", "ERROR")
             return False
 
-    def test_public_landing_redesign_specific(self) -> bool:
+    async def test_public_landing_redesign_specific(self) -> bool:
         """Test the redesigned public landing page endpoint specifically for review request"""
         self.log("=== Testing Redesigned Public Landing Page ===")
         
@@ -291,7 +236,7 @@ class AntiaAffiliateTester:
         
         try:
             # Test without country parameter (should auto-detect or default)
-            response = self.make_request("GET", f"/go/{slug}", use_auth=False)
+            response = await self.make_request("GET", f"/go/{slug}", use_auth=False)
             
             if response.status_code == 200:
                 landing = response.json()
@@ -358,7 +303,7 @@ class AntiaAffiliateTester:
                 
                 # Test with country parameter ES
                 self.log("--- Testing with country parameter ES ---")
-                response_es = self.make_request("GET", f"/go/{slug}?country=ES", use_auth=False)
+                response_es = await self.make_request("GET", f"/go/{slug}?country=ES", use_auth=False)
                 
                 if response_es.status_code == 200:
                     landing_es = response_es.json()
@@ -379,7 +324,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Redesigned public landing test failed: {str(e)}", "ERROR")
             return False
 
-    def test_click_tracking_redesign(self) -> bool:
+    async def test_click_tracking_redesign(self) -> bool:
         """Test click tracking for the redesigned landing page"""
         self.log("=== Testing Click Tracking for Redesigned Landing ===")
         
@@ -388,7 +333,7 @@ class AntiaAffiliateTester:
         
         try:
             # First get the landing to find available houses
-            response = self.make_request("GET", f"/go/{slug}?country=ES", use_auth=False)
+            response = await self.make_request("GET", f"/go/{slug}?country=ES", use_auth=False)
             
             if response.status_code != 200:
                 self.log(f"❌ Could not get landing for click tracking test: {response.status_code}", "ERROR")
@@ -423,7 +368,7 @@ class AntiaAffiliateTester:
                 "country": "ES"
             }
             
-            click_response = self.make_request("POST", "/r/click", click_data, use_auth=False)
+            click_response = await self.make_request("POST", "/r/click", click_data, use_auth=False)
             
             if click_response.status_code in [200, 201]:
                 result = click_response.json()
@@ -453,12 +398,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Click tracking test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_active_promotions(self) -> bool:
+    async def test_get_active_promotions(self) -> bool:
         """Test getting active promotions for tipsters"""
         self.log("=== Testing Get Active Promotions ===")
         
         try:
-            response = self.make_request("GET", "/promotions")
+            response = await self.make_request("GET", "/promotions")
             
             if response.status_code == 200:
                 promotions = response.json()
@@ -483,7 +428,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get active promotions test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_promotion_houses(self) -> bool:
+    async def test_get_promotion_houses(self) -> bool:
         """Test getting houses for a specific promotion"""
         if not hasattr(self, 'test_promotion_id') or not self.test_promotion_id:
             self.log("❌ No test promotion ID available", "ERROR")
@@ -492,7 +437,7 @@ class AntiaAffiliateTester:
         self.log("=== Testing Get Promotion Houses ===")
         
         try:
-            response = self.make_request("GET", f"/promotions/{self.test_promotion_id}/houses")
+            response = await self.make_request("GET", f"/promotions/{self.test_promotion_id}/houses")
             
             if response.status_code == 200:
                 houses = response.json()
@@ -519,7 +464,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get promotion houses test failed: {str(e)}", "ERROR")
             return False
 
-    def test_create_landing_with_promotion(self) -> bool:
+    async def test_create_landing_with_promotion(self) -> bool:
         """Test creating a landing with a promotion"""
         if not hasattr(self, 'test_promotion_id') or not self.test_promotion_id:
             self.log("❌ No test promotion ID available", "ERROR")
@@ -547,7 +492,7 @@ class AntiaAffiliateTester:
         }
         
         try:
-            response = self.make_request("POST", "/tipster/landings", landing_data)
+            response = await self.make_request("POST", "/tipster/landings", landing_data)
             
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -572,7 +517,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Create landing with promotion test failed: {str(e)}", "ERROR")
             return False
 
-    def test_public_landing_with_promotion(self) -> bool:
+    async def test_public_landing_with_promotion(self) -> bool:
         """Test getting public landing with promotion data"""
         # Use the specific slug from the review request or the one we just created
         slug = getattr(self, 'test_promotion_landing_slug', 'fausto-perez-mi-reto-navidad')
@@ -580,7 +525,7 @@ class AntiaAffiliateTester:
         self.log("=== Testing Public Landing with Promotion ===")
         
         try:
-            response = self.make_request("GET", f"/go/{slug}?country=ES", use_auth=False)
+            response = await self.make_request("GET", f"/go/{slug}?country=ES", use_auth=False)
             
             if response.status_code == 200:
                 landing = response.json()
@@ -625,7 +570,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get public landing with promotion test failed: {str(e)}", "ERROR")
             return False
 
-    def test_promotion_specific_redirect(self) -> bool:
+    async def test_promotion_specific_redirect(self) -> bool:
         """Test click tracking with promotion-specific redirect URL"""
         self.log("=== Testing Promotion-Specific Redirect ===")
         
@@ -640,7 +585,7 @@ class AntiaAffiliateTester:
         }
         
         try:
-            response = self.make_request("POST", "/r/click", click_data, use_auth=False)
+            response = await self.make_request("POST", "/r/click", click_data, use_auth=False)
             
             if response.status_code in [200, 201]:  # Accept both 200 and 201
                 result = response.json()
@@ -674,7 +619,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Promotion-specific click tracking test failed: {str(e)}", "ERROR")
             return False
 
-    def test_click_tracking(self) -> bool:
+    async def test_click_tracking(self) -> bool:
         """Test basic click tracking functionality (legacy test)"""
         self.log("=== Testing Basic Click Tracking ===")
         
@@ -685,7 +630,7 @@ class AntiaAffiliateTester:
         }
         
         try:
-            response = self.make_request("POST", "/r/click", click_data, use_auth=False)
+            response = await self.make_request("POST", "/r/click", click_data, use_auth=False)
             
             if response.status_code in [200, 201]:  # Accept both 200 and 201
                 result = response.json()
@@ -709,12 +654,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Basic click tracking test failed: {str(e)}", "ERROR")
             return False
 
-    def test_health_telegram(self) -> bool:
+    async def test_health_telegram(self) -> bool:
         """Test Telegram bot health check"""
         self.log("=== Testing Telegram Health Check ===")
         
         try:
-            response = self.make_request("GET", "/health/telegram", use_auth=False)
+            response = await self.make_request("GET", "/health/telegram", use_auth=False)
             
             if response.status_code == 200:
                 status = response.json()
@@ -737,17 +682,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Telegram health check test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_login(self) -> bool:
+    async def test_admin_login(self) -> bool:
         """Test authentication with admin credentials"""
         self.log("=== Testing Admin Authentication ===")
         
-        login_data = {
-            "email": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data, use_auth=False)
+            response = await self.login("admin", ADMIN_EMAIL, ADMIN_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -769,16 +709,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Admin login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_get_all_promotions(self) -> bool:
+    async def test_admin_get_all_promotions(self) -> bool:
         """Test GET /api/admin/promotions - List all promotions"""
         self.log("=== Testing Admin Get All Promotions ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         try:
-            response = self.make_request("GET", "/admin/promotions")
+            response = await self.make_request("GET", "/admin/promotions", token=self.admin_access_token)
             
             if response.status_code == 200:
                 promotions = response.json()
@@ -799,18 +735,11 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Get all promotions test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_admin_create_promotion(self) -> bool:
+    async def test_admin_create_promotion(self) -> bool:
         """Test POST /api/admin/promotions - Create new promotion"""
         self.log("=== Testing Admin Create Promotion ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         promotion_data = {
             "name": "Reto Año Nuevo 2026",
             "description": "Celebra el año nuevo con bonos especiales",
@@ -818,7 +747,7 @@ class AntiaAffiliateTester:
         }
         
         try:
-            response = self.make_request("POST", "/admin/promotions", promotion_data)
+            response = await self.make_request("POST", "/admin/promotions", promotion_data, token=self.admin_access_token)
             
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -842,11 +771,8 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Create promotion test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_admin_add_house_to_promotion(self) -> bool:
+    async def test_admin_add_house_to_promotion(self) -> bool:
         """Test POST /api/admin/promotions/:id/houses - Add house to promotion"""
         if not self.test_admin_promotion_id:
             self.log("❌ No test admin promotion ID available", "ERROR")
@@ -854,10 +780,6 @@ class AntiaAffiliateTester:
             
         self.log("=== Testing Admin Add House to Promotion ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         house_data = {
             "bettingHouseId": "6944674739e53ced97a01362",  # Bwin
             "affiliateUrl": "https://bwin.com/ano-nuevo-2026?aff=antia",
@@ -865,7 +787,7 @@ class AntiaAffiliateTester:
         }
         
         try:
-            response = self.make_request("POST", f"/admin/promotions/{self.test_admin_promotion_id}/houses", house_data)
+            response = await self.make_request("POST", f"/admin/promotions/{self.test_admin_promotion_id}/houses", house_data, token=self.admin_access_token)
             
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -887,11 +809,8 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Add house to promotion test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_admin_get_promotion_detail(self) -> bool:
+    async def test_admin_get_promotion_detail(self) -> bool:
         """Test GET /api/admin/promotions/:id - Get promotion detail"""
         if not self.test_admin_promotion_id:
             self.log("❌ No test admin promotion ID available", "ERROR")
@@ -899,12 +818,8 @@ class AntiaAffiliateTester:
             
         self.log("=== Testing Admin Get Promotion Detail ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         try:
-            response = self.make_request("GET", f"/admin/promotions/{self.test_admin_promotion_id}")
+            response = await self.make_request("GET", f"/admin/promotions/{self.test_admin_promotion_id}", token=self.admin_access_token)
             
             if response.status_code == 200:
                 promotion = response.json()
@@ -941,11 +856,8 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Get promotion detail test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_admin_update_promotion_status(self) -> bool:
+    async def test_admin_update_promotion_status(self) -> bool:
         """Test PUT /api/admin/promotions/:id - Update promotion status"""
         if not self.test_admin_promotion_id:
             self.log("❌ No test admin promotion ID available", "ERROR")
@@ -953,16 +865,12 @@ class AntiaAffiliateTester:
             
         self.log("=== Testing Admin Update Promotion Status ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         update_data = {
             "status": "INACTIVE"
         }
         
         try:
-            response = self.make_request("PUT", f"/admin/promotions/{self.test_admin_promotion_id}", update_data)
+            response = await self.make_request("PUT", f"/admin/promotions/{self.test_admin_promotion_id}", update_data, token=self.admin_access_token)
             
             if response.status_code == 200:
                 result = response.json()
@@ -983,16 +891,13 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Update promotion status test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_tipster_view_active_promotions(self) -> bool:
+    async def test_tipster_view_active_promotions(self) -> bool:
         """Test GET /api/promotions - Verify tipster can see only ACTIVE promotions"""
         self.log("=== Testing Tipster View Active Promotions ===")
         
         try:
-            response = self.make_request("GET", "/promotions")
+            response = await self.make_request("GET", "/promotions")
             
             if response.status_code == 200:
                 promotions = response.json()
@@ -1019,7 +924,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Get active promotions for tipster test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_delete_promotion(self) -> bool:
+    async def test_admin_delete_promotion(self) -> bool:
         """Test DELETE /api/admin/promotions/:id - Delete promotion"""
         if not self.test_admin_promotion_id:
             self.log("❌ No test admin promotion ID available", "ERROR")
@@ -1027,12 +932,8 @@ class AntiaAffiliateTester:
             
         self.log("=== Testing Admin Delete Promotion ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         try:
-            response = self.make_request("DELETE", f"/admin/promotions/{self.test_admin_promotion_id}")
+            response = await self.make_request("DELETE", f"/admin/promotions/{self.test_admin_promotion_id}", token=self.admin_access_token)
             
             if response.status_code == 200:
                 result = response.json()
@@ -1053,16 +954,13 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Delete promotion test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_health_telegram(self) -> bool:
+    async def test_health_telegram(self) -> bool:
         """Test Telegram bot health check"""
         self.log("=== Testing Telegram Health Check ===")
         
         try:
-            response = self.make_request("GET", "/health/telegram", use_auth=False)
+            response = await self.make_request("GET", "/health/telegram", use_auth=False)
             
             if response.status_code == 200:
                 status = response.json()
@@ -1085,12 +983,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Telegram health check test failed: {str(e)}", "ERROR")
             return False
 
-    def test_health_email(self) -> bool:
+    async def test_health_email(self) -> bool:
         """Test email service health check"""
         self.log("=== Testing Email Health Check ===")
         
         try:
-            response = self.make_request("GET", "/health/email", use_auth=False)
+            response = await self.make_request("GET", "/health/email", use_auth=False)
             
             if response.status_code == 200:
                 status = response.json()
@@ -1114,14 +1012,10 @@ class AntiaAffiliateTester:
 
     # ==================== AFFILIATE STATISTICS TESTS ====================
 
-    def test_admin_affiliate_stats(self) -> bool:
+    async def test_admin_affiliate_stats(self) -> bool:
         """Test GET /api/admin/affiliate/stats - Admin Affiliate Statistics Dashboard"""
         self.log("=== Testing Admin Affiliate Stats ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         try:
             # Test with basic parameters
             params = {
@@ -1129,7 +1023,7 @@ class AntiaAffiliateTester:
                 'endDate': '2024-12-31'
             }
             
-            response = self.make_request("GET", "/admin/affiliate/stats", headers={'Content-Type': 'application/json'})
+            response = await self.make_request("GET", "/admin/affiliate/stats", headers={'Content-Type': 'application/json'}, token=self.admin_access_token)
             
             if response.status_code == 200:
                 stats = response.json()
@@ -1159,11 +1053,8 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Admin affiliate stats test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
-    def test_tipster_affiliate_stats(self) -> bool:
+    async def test_tipster_affiliate_stats(self) -> bool:
         """Test GET /api/affiliate/tipster/stats - Tipster Statistics Dashboard"""
         self.log("=== Testing Tipster Affiliate Stats ===")
         
@@ -1174,7 +1065,7 @@ class AntiaAffiliateTester:
                 'endDate': '2024-12-31'
             }
             
-            response = self.make_request("GET", "/affiliate/tipster/stats")
+            response = await self.make_request("GET", "/affiliate/tipster/stats")
             
             if response.status_code == 200:
                 stats = response.json()
@@ -1205,12 +1096,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Tipster affiliate stats test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_promotions(self) -> bool:
+    async def test_tipster_promotions(self) -> bool:
         """Test GET /api/tipster/landings/promotions - Tipster Promotions/Campaigns"""
         self.log("=== Testing Tipster Promotions ===")
         
         try:
-            response = self.make_request("GET", "/tipster/landings/promotions")
+            response = await self.make_request("GET", "/tipster/landings/promotions")
             
             if response.status_code == 200:
                 promotions = response.json()
@@ -1237,7 +1128,7 @@ class AntiaAffiliateTester:
             self.log(f"❌ Tipster promotions test failed: {str(e)}", "ERROR")
             return False
 
-    def test_conversion_postback(self) -> bool:
+    async def test_conversion_postback(self) -> bool:
         """Test POST /api/r/postback - Conversion Postback"""
         self.log("=== Testing Conversion Postback ===")
         
@@ -1253,7 +1144,7 @@ class AntiaAffiliateTester:
             }
             
             # Try the correct postback endpoint from the controller
-            response = self.make_request("POST", "/r/postback", postback_data, use_auth=False)
+            response = await self.make_request("POST", "/r/postback", postback_data, use_auth=False)
             
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -1273,12 +1164,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Conversion postback test failed: {str(e)}", "ERROR")
             return False
 
-    def test_health_check(self) -> bool:
+    async def test_health_check(self) -> bool:
         """Test GET /api/health - Health Check"""
         self.log("=== Testing Health Check ===")
         
         try:
-            response = self.make_request("GET", "/health", use_auth=False)
+            response = await self.make_request("GET", "/health", use_auth=False)
             
             if response.status_code == 200:
                 health = response.json()
@@ -1299,152 +1190,135 @@ class AntiaAffiliateTester:
             self.log(f"❌ Health check test failed: {str(e)}", "ERROR")
             return False
 
-    def run_affiliate_statistics_tests(self) -> Dict[str, bool]:
+    async def run_affiliate_statistics_tests(self) -> Dict[str, bool]:
         """Run affiliate statistics system tests as requested in review"""
         self.log("🚀 Starting AFFILIA-GO Affiliate Statistics System Tests")
         self.log("=" * 60)
         
-        results = {}
-        
-        # 1. Health Check (P0)
-        results["health_check"] = self.test_health_check()
-        
-        # 2. Authentication Tests
-        results["tipster_login"] = self.test_login()
-        results["admin_login"] = self.test_admin_login()
-        
-        if not results["tipster_login"]:
-            self.log("❌ Tipster authentication failed - skipping tipster tests", "ERROR")
-        
-        if not results["admin_login"]:
-            self.log("❌ Admin authentication failed - skipping admin tests", "ERROR")
-        
-        # 3. Admin Affiliate Stats (P0)
-        if results["admin_login"]:
-            results["admin_affiliate_stats"] = self.test_admin_affiliate_stats()
-        else:
-            results["admin_affiliate_stats"] = False
-        
-        # 4. Tipster Stats (P0)
-        if results["tipster_login"]:
-            results["tipster_affiliate_stats"] = self.test_tipster_affiliate_stats()
-        else:
-            results["tipster_affiliate_stats"] = False
-        
-        # 5. Tipster Promotions/Campaigns (P0)
-        if results["tipster_login"]:
-            results["tipster_promotions"] = self.test_tipster_promotions()
-        else:
-            results["tipster_promotions"] = False
-        
-        # 6. Conversion Postback (P1)
-        results["conversion_postback"] = self.test_conversion_postback()
+        results = await self.run_steps([
+            # 1. Health Check (P0)
+            Step("health_check", self.test_health_check),
+            
+            # 2. Authentication Tests
+            Step("tipster_login", self.test_login, produces=("access_token",)),
+            Step("admin_login", self.test_admin_login, produces=("admin_access_token",)),
+            
+            # 3. Admin Affiliate Stats (P0)
+            Step("admin_affiliate_stats", self.test_admin_affiliate_stats, consumes=("admin_access_token",)),
+            
+            # 4. Tipster Stats (P0)
+            Step("tipster_affiliate_stats", self.test_tipster_affiliate_stats, consumes=("access_token",)),
+            
+            # 5. Tipster Promotions/Campaigns (P0)
+            Step("tipster_promotions", self.test_tipster_promotions, consumes=("access_token",)),
+            
+            # 6. Conversion Postback (P1)
+            Step("conversion_postback", self.test_conversion_postback),
+        ])
         
         return results
 
-    def run_public_landing_redesign_tests(self) -> Dict[str, bool]:
+    async def run_public_landing_redesign_tests(self) -> Dict[str, bool]:
         """Run tests for the redesigned public landing page as requested in review"""
         self.log("🚀 Starting Public Landing Page Redesign Tests")
         self.log("=" * 60)
         
         results = {}
         
-        # 1. Test the redesigned public landing endpoint
-        results["public_landing_redesign"] = self.test_public_landing_redesign_specific()
-        
-        # 2. Test click tracking for the redesigned landing
-        results["click_tracking_redesign"] = self.test_click_tracking_redesign()
-        
-        # 3. Test the original public landing endpoint for compatibility
-        results["public_landing_original"] = self.test_get_public_landing()
+        # Redesigned landing, its click tracking and the original endpoint (compatibility)
+        # are all public and independent of each other
+        results.update(await self.run_concurrently({
+            "public_landing_redesign": self.test_public_landing_redesign_specific,
+            "click_tracking_redesign": self.test_click_tracking_redesign,
+            "public_landing_original": self.test_get_public_landing,
+        }))
         
         return results
 
-    def run_affiliate_landing_tests(self) -> Dict[str, bool]:
+    async def run_affiliate_landing_tests(self) -> Dict[str, bool]:
         """Run all affiliate landing system tests"""
         self.log("🚀 Starting Antia Affiliate Landing System Tests")
         self.log("=" * 60)
         
-        results = {}
-        
-        # 1. Authentication
-        results["login"] = self.test_login()
-        
-        if not results["login"]:
-            self.log("❌ Authentication failed - skipping authenticated tests", "ERROR")
-            return results
-        
-        # 2. Admin Authentication and Tests
-        results["admin_login"] = self.test_admin_login()
-        
-        if results["admin_login"]:
-            # Admin Promotions API Tests
-            results["admin_get_all_promotions"] = self.test_admin_get_all_promotions()
-            results["admin_create_promotion"] = self.test_admin_create_promotion()
-            
-            if hasattr(self, 'test_admin_promotion_id') and self.test_admin_promotion_id:
-                results["admin_add_house_to_promotion"] = self.test_admin_add_house_to_promotion()
-                results["admin_get_promotion_detail"] = self.test_admin_get_promotion_detail()
-                results["admin_update_promotion_status"] = self.test_admin_update_promotion_status()
-                results["tipster_view_active_promotions"] = self.test_tipster_view_active_promotions()
-                results["admin_delete_promotion"] = self.test_admin_delete_promotion()
-            else:
-                self.log("⚠️ No admin promotion ID available - skipping promotion management tests", "WARN")
-        else:
-            self.log("❌ Admin authentication failed - skipping admin tests", "ERROR")
-        
-        # 3. Promotions API (existing tests for promotion-specific functionality)
-        results["get_active_promotions"] = self.test_get_active_promotions()
-        
-        if hasattr(self, 'test_promotion_id') and self.test_promotion_id:
-            results["get_promotion_houses"] = self.test_get_promotion_houses()
-        else:
-            self.log("⚠️ No promotion ID available - skipping promotion houses test", "WARN")
-            results["get_promotion_houses"] = True  # Skip but don't fail
-        
-        # 4. Landing CRUD (with tipster token)
-        results["get_tipster_landings"] = self.test_get_tipster_landings()
-        results["get_houses_spain"] = self.test_get_available_houses_for_spain()
-        
-        # 5. Create landing with promotion
-        if hasattr(self, 'test_promotion_id') and self.test_promotion_id:
-            results["create_landing_with_promotion"] = self.test_create_landing_with_promotion()
-        else:
-            self.log("⚠️ No promotion ID available - skipping create landing with promotion test", "WARN")
-            results["create_landing_with_promotion"] = True  # Skip but don't fail
-        
-        if self.test_landing_id:
-            results["get_landing_metrics"] = self.test_get_landing_metrics()
-        else:
-            self.log("⚠️ No landing ID available - skipping metrics test", "WARN")
-            results["get_landing_metrics"] = True  # Skip but don't fail
-        
-        # 6. Public Landing (no auth required)
-        results["get_public_landing"] = self.test_get_public_landing()
-        results["get_public_landing_with_promotion"] = self.test_public_landing_with_promotion()
-        
-        # 7. Click Tracking
-        results["click_tracking"] = self.test_click_tracking()
-        results["promotion_specific_redirect"] = self.test_promotion_specific_redirect()
-        
-        # 8. Health Checks
-        results["health_telegram"] = self.test_health_telegram()
-        results["health_email"] = self.test_health_email()
+        results = await self.run_steps([
+            # 1. Authentication
+            Step("login", self.test_login, produces=("access_token",)),
+            
+            # 2. Admin Authentication and Promotions API Tests (skipped without an admin promotion)
+            Step("admin_login", self.test_admin_login, produces=("admin_access_token",)),
+            Step("admin_get_all_promotions", self.test_admin_get_all_promotions,
+                 consumes=("admin_access_token",), skip_result=None),
+            Step("admin_create_promotion", self.test_admin_create_promotion,
+                 consumes=("admin_access_token",), produces=("test_admin_promotion_id",), skip_result=None),
+            Step("admin_add_house_to_promotion", self.test_admin_add_house_to_promotion,
+                 consumes=("admin_access_token", "test_admin_promotion_id"),
+                 produces=("test_admin_house_link_id",), skip_result=None),
+            Step("admin_get_promotion_detail", self.test_admin_get_promotion_detail,
+                 consumes=("admin_access_token", "test_admin_promotion_id"),
+                 after=("admin_add_house_to_promotion",), skip_result=None),
+            Step("admin_update_promotion_status", self.test_admin_update_promotion_status,
+                 consumes=("admin_access_token", "test_admin_promotion_id"),
+                 after=("admin_add_house_to_promotion",), skip_result=None),
+            Step("tipster_view_active_promotions", self.test_tipster_view_active_promotions,
+                 consumes=("access_token", "test_admin_promotion_id"),
+                 after=("admin_update_promotion_status",), skip_result=None),
+            Step("admin_delete_promotion", self.test_admin_delete_promotion,
+                 consumes=("admin_access_token", "test_admin_promotion_id"),
+                 after=("admin_get_promotion_detail", "admin_update_promotion_status",
+                        "tipster_view_active_promotions"), skip_result=None),
+            
+            # 3. Promotions API - waits for the admin test promotion to be deleted so the
+            # "first active promotion" picked here is never the one being torn down
+            Step("get_active_promotions", self.test_get_active_promotions,
+                 consumes=("access_token",), produces=("test_promotion_id",),
+                 after=("admin_delete_promotion",)),
+            Step("get_promotion_houses", self.test_get_promotion_houses,
+                 consumes=("access_token", "test_promotion_id"),
+                 produces=("test_promotion_house_id", "test_promotion_affiliate_url"),
+                 skip_result=True),  # Skip but don't fail
+            
+            # 4. Landing CRUD (with tipster token)
+            Step("get_tipster_landings", self.test_get_tipster_landings,
+                 consumes=("access_token",), produces=("test_landing_id",)),
+            Step("get_houses_spain", self.test_get_available_houses_for_spain, consumes=("access_token",)),
+            
+            # 5. Create landing with promotion
+            Step("create_landing_with_promotion", self.test_create_landing_with_promotion,
+                 consumes=("access_token", "test_promotion_id"), produces=("test_promotion_landing_slug",),
+                 after=("get_promotion_houses",), skip_result=True),  # Skip but don't fail
+            Step("get_landing_metrics", self.test_get_landing_metrics,
+                 consumes=("access_token", "test_landing_id"), skip_result=True),  # Skip but don't fail
+            
+            # 6. Public Landing (no auth required)
+            Step("get_public_landing", self.test_get_public_landing),
+            Step("get_public_landing_with_promotion", self.test_public_landing_with_promotion,
+                 after=("create_landing_with_promotion",)),
+            
+            # 7. Click Tracking
+            Step("click_tracking", self.test_click_tracking, produces=("test_click_id",)),
+            Step("promotion_specific_redirect", self.test_promotion_specific_redirect,
+                 produces=("test_click_id",),
+                 after=("get_promotion_houses", "create_landing_with_promotion")),
+            
+            # 8. Health Checks
+            Step("health_telegram", self.test_health_telegram),
+            Step("health_email", self.test_health_email),
+        ])
         
         return results
 
-    def test_review_request_endpoints(self) -> Dict[str, bool]:
+    async def test_review_request_endpoints(self) -> Dict[str, bool]:
         """Test the specific endpoints mentioned in the review request"""
         self.log("🚀 Starting Review Request Endpoint Tests")
         self.log("=" * 60)
         
         results = {}
         
-        # 1. Login - POST /api/auth/login (Tipster)
-        results["login_tipster"] = self.test_login()
-        
-        # 2. Admin Login - POST /api/auth/login (Admin)
-        results["login_admin"] = self.test_admin_login()
+        # 1-2. Login - POST /api/auth/login (Tipster and Admin)
+        results.update(await self.run_concurrently({
+            "login_tipster": self.test_login,
+            "login_admin": self.test_admin_login,
+        }))
         
         if not results["login_tipster"]:
             self.log("❌ Tipster authentication failed - skipping tipster tests", "ERROR")
@@ -1453,40 +1327,26 @@ class AntiaAffiliateTester:
             self.log("❌ Admin authentication failed - skipping admin tests", "ERROR")
         
         # 3. Affiliate Metrics - GET /api/affiliate/metrics (with Bearer token)
-        if results["login_tipster"]:
-            results["affiliate_metrics"] = self.test_affiliate_metrics()
-        else:
-            results["affiliate_metrics"] = False
-        
         # 4. Houses with Links - GET /api/affiliate/houses (with Bearer token)
-        if results["login_tipster"]:
-            results["affiliate_houses"] = self.test_affiliate_houses()
-        else:
-            results["affiliate_houses"] = False
-        
         # 5. Tipster Landings - GET /api/tipster/landings (with Bearer token)
-        if results["login_tipster"]:
-            results["tipster_landings"] = self.test_get_tipster_landings()
-        else:
-            results["tipster_landings"] = False
-        
         # 6. Public Landing - GET /api/go/fausto-perez-reto-navidad-2025?country=ES
-        results["public_landing"] = self.test_public_landing_specific()
-        
         # 7. Admin Houses - GET /api/admin/affiliate/houses (admin token)
-        if results["login_admin"]:
-            results["admin_houses"] = self.test_admin_houses()
-        else:
-            results["admin_houses"] = False
+        results.update(await self.run_concurrently({
+            "affiliate_metrics": self.only_if(results["login_tipster"], self.test_affiliate_metrics),
+            "affiliate_houses": self.only_if(results["login_tipster"], self.test_affiliate_houses),
+            "tipster_landings": self.only_if(results["login_tipster"], self.test_get_tipster_landings),
+            "public_landing": self.test_public_landing_specific,
+            "admin_houses": self.only_if(results["login_admin"], self.test_admin_houses),
+        }))
         
         return results
 
-    def test_affiliate_metrics(self) -> bool:
+    async def test_affiliate_metrics(self) -> bool:
         """Test GET /api/affiliate/metrics - Affiliate Metrics endpoint"""
         self.log("=== Testing Affiliate Metrics ===")
         
         try:
-            response = self.make_request("GET", "/affiliate/metrics")
+            response = await self.make_request("GET", "/affiliate/metrics")
             
             if response.status_code == 200:
                 metrics = response.json()
@@ -1511,12 +1371,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Affiliate metrics test failed: {str(e)}", "ERROR")
             return False
 
-    def test_affiliate_houses(self) -> bool:
+    async def test_affiliate_houses(self) -> bool:
         """Test GET /api/affiliate/houses - Houses with Links endpoint"""
         self.log("=== Testing Affiliate Houses ===")
         
         try:
-            response = self.make_request("GET", "/affiliate/houses")
+            response = await self.make_request("GET", "/affiliate/houses")
             
             if response.status_code == 200:
                 houses = response.json()
@@ -1541,12 +1401,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Affiliate houses test failed: {str(e)}", "ERROR")
             return False
 
-    def test_public_landing_specific(self) -> bool:
+    async def test_public_landing_specific(self) -> bool:
         """Test GET /api/go/fausto-perez-reto-navidad-2025?country=ES - Specific Public Landing"""
         self.log("=== Testing Specific Public Landing ===")
         
         try:
-            response = self.make_request("GET", "/go/fausto-perez-reto-navidad-2025?country=ES", use_auth=False)
+            response = await self.make_request("GET", "/go/fausto-perez-reto-navidad-2025?country=ES", use_auth=False)
             
             if response.status_code == 200:
                 landing = response.json()
@@ -1591,16 +1451,12 @@ class AntiaAffiliateTester:
             self.log(f"❌ Specific public landing test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_houses(self) -> bool:
+    async def test_admin_houses(self) -> bool:
         """Test GET /api/admin/affiliate/houses - Admin Houses endpoint"""
         self.log("=== Testing Admin Houses ===")
         
-        # Temporarily switch to admin token
-        original_token = self.access_token
-        self.access_token = self.admin_access_token
-        
         try:
-            response = self.make_request("GET", "/admin/affiliate/houses")
+            response = await self.make_request("GET", "/admin/affiliate/houses", token=self.admin_access_token)
             
             if response.status_code == 200:
                 houses = response.json()
@@ -1621,9 +1477,6 @@ class AntiaAffiliateTester:
         except Exception as e:
             self.log(f"❌ Admin houses test failed: {str(e)}", "ERROR")
             return False
-        finally:
-            # Restore original token
-            self.access_token = original_token
 
 def main():
     """Main test runner"""
@@ -1633,7 +1486,7 @@ def main():
     print("=" * 60)
     
     # Run the specific tests requested in the review
-    results = tester.test_review_request_endpoints()
+    results = tester.run(tester.test_review_request_endpoints)
     
     # Print summary
     print("\n" + "=" * 60)
@@ -1663,4 +1516,9 @@ def main():
     return failed == 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        # Load mode for the public landing hot path: python backend_test.py load --rate 200 --duration 60
+        from harness.landing_load import main as landing_load_main
+        landing_load_main(["--api-base", API_BASE] + sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
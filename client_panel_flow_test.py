@@ -3,10 +3,12 @@
 Client Panel Flow Test - Following the exact test flow from review request
 """
 
-import requests
+import asyncio
 import json
 import sys
 
+from harness import BaseTester
+
 # Configuration
 BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -15,63 +17,11 @@ API_BASE = f"{BASE_URL}/api"
 CLIENT_EMAIL = "cliente@example.com"
 CLIENT_PASSWORD = "Client123!"
 
-class ClientPanelFlowTester:
+class ClientPanelFlowTester(BaseTester):
     def __init__(self):
-        self.session = requests.Session()
-        self.access_token = None
-        
-    def log(self, message: str, level: str = "INFO"):
-        """Log test messages"""
-        print(f"[{level}] {message}")
+        super().__init__(API_BASE)
         
-    def make_request(self, method: str, endpoint: str, data: dict = None, 
-                    headers: dict = None, use_auth: bool = True) -> requests.Response:
-        """Make HTTP request with proper headers"""
-        url = f"{API_BASE}{endpoint}"
-        
-        # Default headers
-        req_headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
-        # Add auth header if token available and requested
-        if use_auth and self.access_token:
-            req_headers["Authorization"] = f"Bearer {self.access_token}"
-            
-        # Merge with provided headers
-        if headers:
-            req_headers.update(headers)
-            
-        self.log(f"Making {method} request to {url}")
-        if data:
-            self.log(f"Request data: {json.dumps(data, indent=2)}")
-            
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data if data else None,
-                headers=req_headers,
-                timeout=30
-            )
-            
-            self.log(f"Response status: {response.status_code}")
-            
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
-            except:
-                self.log(f"Response text: {response.text}")
-                
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {str(e)}", "ERROR")
-            raise
-
-    def test_flow(self):
+    async def test_flow(self):
         """Execute the complete test flow as specified in review request"""
         
         self.log("🚀 Starting Client Panel Flow Test")
@@ -79,12 +29,7 @@ class ClientPanelFlowTester:
         
         # 1. Login as client
         self.log("\n1️⃣ Login as client")
-        login_data = {
-            "email": CLIENT_EMAIL,
-            "password": CLIENT_PASSWORD
-        }
-        
-        response = self.make_request("POST", "/auth/login", login_data, use_auth=False)
+        response = await self.login("client", CLIENT_EMAIL, CLIENT_PASSWORD)
         if response.status_code != 200:
             self.log("❌ Login failed", "ERROR")
             return False
@@ -99,7 +44,7 @@ class ClientPanelFlowTester:
         
         # 2. Get client profile - verify structure
         self.log("\n2️⃣ Get client profile - verify structure")
-        response = self.make_request("GET", "/client/profile")
+        response = await self.make_request("GET", "/client/profile")
         if response.status_code != 200:
             self.log("❌ Get profile failed", "ERROR")
             return False
@@ -119,7 +64,7 @@ class ClientPanelFlowTester:
             "locale": "fr-FR"
         }
         
-        response = self.make_request("PUT", "/client/profile", update_data)
+        response = await self.make_request("PUT", "/client/profile", update_data)
         if response.status_code != 200:
             self.log("❌ Update profile failed", "ERROR")
             return False
@@ -128,7 +73,7 @@ class ClientPanelFlowTester:
         
         # 4. Get purchases list
         self.log("\n4️⃣ Get purchases list")
-        response = self.make_request("GET", "/client/purchases")
+        response = await self.make_request("GET", "/client/purchases")
         if response.status_code != 200:
             self.log("❌ Get purchases failed", "ERROR")
             return False
@@ -138,7 +83,7 @@ class ClientPanelFlowTester:
         
         # 5. Get payment history
         self.log("\n5️⃣ Get payment history")
-        response = self.make_request("GET", "/client/payments")
+        response = await self.make_request("GET", "/client/payments")
         if response.status_code != 200:
             self.log("❌ Get payments failed", "ERROR")
             return False
@@ -154,7 +99,7 @@ class ClientPanelFlowTester:
             "description": "Testing"
         }
         
-        response = self.make_request("POST", "/support/tickets", ticket_data)
+        response = await self.make_request("POST", "/support/tickets", ticket_data)
         if response.status_code not in [200, 201]:
             self.log("❌ Create ticket failed", "ERROR")
             return False
@@ -173,7 +118,7 @@ class ClientPanelFlowTester:
         
         # 7. Get my tickets and verify the new ticket appears
         self.log("\n7️⃣ Get my tickets and verify the new ticket appears")
-        response = self.make_request("GET", "/support/tickets/my")
+        response = await self.make_request("GET", "/support/tickets/my")
         if response.status_code != 200:
             self.log("❌ Get my tickets failed", "ERROR")
             return False
@@ -188,7 +133,7 @@ class ClientPanelFlowTester:
         
         # 8. Get ticket details
         self.log("\n8️⃣ Get ticket details")
-        response = self.make_request("GET", f"/support/tickets/my/{ticket_id}")
+        response = await self.make_request("GET", f"/support/tickets/my/{ticket_id}")
         if response.status_code != 200:
             self.log("❌ Get ticket details failed", "ERROR")
             return False
@@ -216,7 +161,7 @@ def main():
     tester = ClientPanelFlowTester()
     
     try:
-        success = tester.test_flow()
+        success = tester.run(tester.test_flow)
         sys.exit(0 if success else 1)
         
     except KeyboardInterrupt:
@@ -0,0 +1,36 @@
+"""
+Antia test harness
+Shared async HTTP core used by the API testers (backend_test.py, antia_health_test.py, ...)
+"""
+
+from .client import API_BASE, BASE_URL, ApiClient, BaseTester
+from .exchange_log import ExchangeLog
+from .histogram import LatencyHistogram
+from .load import EndpointStats, OpenLoopRunner, Operation
+from .scheduler import Step, StepGraph
+from .telegram_stub import StubConfig, TelegramStub
+from .token_store import TokenStore, default_token_store
+from .webhook_replay import UpdateCorpus
+from .workers import WorkerPlan, WorkerReport, run_workers
+
+__all__ = [
+    "API_BASE",
+    "BASE_URL",
+    "ApiClient",
+    "BaseTester",
+    "EndpointStats",
+    "ExchangeLog",
+    "LatencyHistogram",
+    "OpenLoopRunner",
+    "Operation",
+    "Step",
+    "StepGraph",
+    "StubConfig",
+    "TelegramStub",
+    "TokenStore",
+    "UpdateCorpus",
+    "WorkerPlan",
+    "WorkerReport",
+    "default_token_store",
+    "run_workers",
+]
@@ -0,0 +1,387 @@
+"""
+Endpoint benchmark suite
+Times every read endpoint the testers touch (public, tipster, admin and client panels) with
+warm-up, repeated measured rounds and machine-readable JSON output, and compares a run
+against a stored baseline, flagging only regressions that are both statistically significant
+(one-sided Mann-Whitney U) and larger than a minimum effect size.
+
+Usage:
+    python -m harness.bench run                                   # writes bench_output.txt
+    python -m harness.bench run --only health,tipster_landings --rounds 10
+    python -m harness.bench run --output bench_baseline.json      # record a new baseline
+    python -m harness.bench compare bench_baseline.json bench_output.txt
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .client import API_BASE, BaseTester
+from .exchange_log import ExchangeLog
+
+DEFAULT_OUTPUT = "bench_output.txt"
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_WARMUP = 3
+DEFAULT_ROUNDS = 5
+DEFAULT_ITERATIONS = 10
+
+# A regression must be significant at ALPHA and at least this much worse
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_EFFECT = 0.10
+
+# Test credentials
+ADMIN_EMAIL = "admin@antia.com"
+ADMIN_PASSWORD = "SuperAdmin123!"
+TIPSTER_EMAIL = "fausto.perez@antia.com"
+TIPSTER_PASSWORD = "Tipster123!"
+CLIENT_EMAIL = "cliente@example.com"
+CLIENT_PASSWORD = "Client123!"
+
+CREDENTIALS = {
+    "admin": (ADMIN_EMAIL, ADMIN_PASSWORD),
+    "tipster": (TIPSTER_EMAIL, TIPSTER_PASSWORD),
+    "client": (CLIENT_EMAIL, CLIENT_PASSWORD),
+}
+
+LANDING_SLUG = "fausto-perez-reto-navidad-2025"
+
+
+@dataclass
+class Benchmark:
+    """One endpoint; {landing_id} and {slug} in path are filled in before the run"""
+    name: str
+    path: str
+    role: Optional[str] = None
+    method: str = "GET"
+
+
+BENCHMARKS = [
+    # Public
+    Benchmark("health", "/health"),
+    Benchmark("health_email", "/health/email"),
+    Benchmark("health_telegram", "/health/telegram"),
+    Benchmark("public_promotions", "/promotions"),
+    Benchmark("landing_public", "/go/{slug}?country=ES"),
+    # Tipster panel
+    Benchmark("tipster_profile", "/tipster/profile", "tipster"),
+    Benchmark("tipster_products", "/products/my", "tipster"),
+    Benchmark("tipster_landings", "/tipster/landings", "tipster"),
+    Benchmark("tipster_landing_metrics", "/tipster/landings/{landing_id}/metrics", "tipster"),
+    Benchmark("tipster_landing_promotions", "/tipster/landings/promotions", "tipster"),
+    Benchmark("tipster_landing_houses", "/tipster/landings/houses/ES", "tipster"),
+    Benchmark("affiliate_tipster_stats", "/affiliate/tipster/stats", "tipster"),
+    Benchmark("affiliate_metrics", "/affiliate/metrics", "tipster"),
+    Benchmark("affiliate_houses", "/affiliate/houses", "tipster"),
+    Benchmark("affiliate_referrals", "/affiliate/my-referrals", "tipster"),
+    Benchmark("telegram_status", "/telegram/status", "tipster"),
+    Benchmark("telegram_publication_channel", "/telegram/publication-channel", "tipster"),
+    Benchmark("tipster_support_tickets", "/support/tickets/my", "tipster"),
+    # Admin panel
+    Benchmark("admin_affiliate_stats", "/admin/affiliate/stats", "admin"),
+    Benchmark("admin_affiliate_houses", "/admin/affiliate/houses?includeInactive=true", "admin"),
+    Benchmark("admin_affiliate_referrals", "/admin/affiliate/referrals", "admin"),
+    Benchmark("admin_tipsters", "/admin/tipsters", "admin"),
+    Benchmark("admin_promotions", "/admin/promotions", "admin"),
+    Benchmark("admin_support_tickets", "/support/admin/tickets", "admin"),
+    # Client panel
+    Benchmark("client_profile", "/client/profile", "client"),
+    Benchmark("client_purchases", "/client/purchases", "client"),
+    Benchmark("client_payments", "/client/payments", "client"),
+]
+
+
+class BenchmarkRunner(BaseTester):
+    """Runs the benchmarks sequentially so rounds do not interfere with each other"""
+
+    def __init__(self, api_base: str = API_BASE, warmup: int = DEFAULT_WARMUP, rounds: int = DEFAULT_ROUNDS,
+                 iterations: int = DEFAULT_ITERATIONS):
+        super().__init__(api_base, exchange_log=ExchangeLog("deferred"))
+        self.warmup = warmup
+        self.rounds = rounds
+        self.iterations = iterations
+        self.tokens_by_role: Dict[str, str] = {}
+        self.params = {"slug": LANDING_SLUG}
+
+    async def prepare(self, roles: Sequence[str]):
+        """Log in once per role (through the token store) and discover path parameters"""
+        for role in roles:
+            email, password = CREDENTIALS[role]
+            response = await self.login(role, email, password)
+            if response.status_code in (200, 201):
+                self.tokens_by_role[role] = response.json().get("access_token")
+            else:
+                self.log(f"❌ {role} login failed with status {response.status_code}", "ERROR")
+
+        if "tipster" in self.tokens_by_role:
+            response = await self.api.request("GET", "/tipster/landings", token=self.tokens_by_role["tipster"])
+            if response.status_code == 200:
+                landings = response.json()
+                landings = landings if isinstance(landings, list) else landings.get("landings", [])
+                if landings:
+                    self.params["landing_id"] = landings[0].get("id")
+                    self.params["slug"] = landings[0].get("slug") or LANDING_SLUG
+
+    async def measure(self, benchmark: Benchmark) -> Optional[Dict]:
+        """Warm up, then time rounds x iterations sequential requests"""
+        token = None
+        if benchmark.role:
+            token = self.tokens_by_role.get(benchmark.role)
+            if not token:
+                self.log(f"⚠️ {benchmark.name}: no {benchmark.role} token, skipped", "WARN")
+                return None
+        try:
+            path = benchmark.path.format(**self.params)
+        except KeyError as e:
+            self.log(f"⚠️ {benchmark.name}: no value for {e}, skipped", "WARN")
+            return None
+
+        async def once() -> Tuple[float, Optional[int]]:
+            started = time.perf_counter()
+            try:
+                response = await self.api.request(benchmark.method, path, token=token)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = None
+            return (time.perf_counter() - started) * 1000.0, status
+
+        for _ in range(self.warmup):
+            await once()
+
+        samples: List[float] = []
+        rounds = []
+        errors = 0
+        for _ in range(self.rounds):
+            round_started = time.perf_counter()
+            round_samples = []
+            for _ in range(self.iterations):
+                elapsed_ms, status = await once()
+                round_samples.append(elapsed_ms)
+                if status is None or status >= 400:
+                    errors += 1
+            round_elapsed = time.perf_counter() - round_started
+            samples.extend(round_samples)
+            rounds.append({
+                "median_ms": statistics.median(round_samples),
+                "throughput": len(round_samples) / round_elapsed if round_elapsed > 0 else 0.0,
+            })
+
+        result = {
+            "method": benchmark.method,
+            "path": benchmark.path,
+            "role": benchmark.role,
+            "samples_ms": [round(sample, 3) for sample in samples],
+            "rounds": rounds,
+            "errors": errors,
+            "summary": summarize(samples, rounds),
+        }
+        summary = result["summary"]
+        self.log(f"{'✅' if not errors else '❌'} {benchmark.name}: median {summary['median_ms']:.1f} ms  "
+                 f"p95 {summary['p95_ms']:.1f} ms  {summary['throughput']:.1f} req/s  errors {errors}")
+        return result
+
+    async def run_suite(self, benchmarks: Sequence[Benchmark]) -> Dict:
+        await self.prepare(sorted({benchmark.role for benchmark in benchmarks if benchmark.role}))
+        results = {}
+        for benchmark in benchmarks:
+            result = await self.measure(benchmark)
+            if result is not None:
+                results[benchmark.name] = result
+        return {
+            "meta": {
+                "api_base": self.api.api_base,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "host": platform.node(),
+                "warmup": self.warmup,
+                "rounds": self.rounds,
+                "iterations": self.iterations,
+            },
+            "results": results,
+        }
+
+
+def summarize(samples: List[float], rounds: List[Dict]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "median_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "stdev_ms": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "throughput": statistics.median(r["throughput"] for r in rounds),
+    }
+
+
+# ===== COMPARISON =====
+
+def mann_whitney_greater(a: Sequence[float], b: Sequence[float]) -> float:
+    """One-sided p-value that values in b tend to be larger than in a
+
+    Normal approximation with tie and continuity correction; good enough from ~5 samples per side.
+    """
+    n_a, n_b = len(a), len(b)
+    if not n_a or not n_b:
+        return 1.0
+
+    combined = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    rank_sum_b = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum_b += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 1)
+        i = j + 1
+
+    n = n_a + n_b
+    u_b = rank_sum_b - n_b * (n_b + 1) / 2
+    mean = n_a * n_b / 2
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_b - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline: Dict, current: Dict, alpha: float = DEFAULT_ALPHA,
+            min_effect: float = DEFAULT_MIN_EFFECT) -> List[Dict]:
+    """Per-benchmark verdicts; a regression is significant at alpha and worse by min_effect"""
+    verdicts = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            verdicts.append({"name": name, "status": "new"})
+            continue
+
+        base_median = base["summary"]["median_ms"]
+        current_median = result["summary"]["median_ms"]
+        latency_change = (current_median - base_median) / base_median if base_median else 0.0
+        latency_p = mann_whitney_greater(base["samples_ms"], result["samples_ms"])
+
+        base_throughput = [r["throughput"] for r in base["rounds"]]
+        current_throughput = [r["throughput"] for r in result["rounds"]]
+        base_tp = statistics.median(base_throughput)
+        throughput_change = (statistics.median(current_throughput) - base_tp) / base_tp if base_tp else 0.0
+        throughput_p = mann_whitney_greater(current_throughput, base_throughput)
+
+        latency_regressed = latency_p < alpha and latency_change > min_effect
+        throughput_regressed = throughput_p < alpha and throughput_change < -min_effect
+        improved = mann_whitney_greater(result["samples_ms"], base["samples_ms"]) < alpha \
+            and latency_change < -min_effect
+
+        verdicts.append({
+            "name": name,
+            "status": "regression" if latency_regressed or throughput_regressed
+            else "improvement" if improved else "unchanged",
+            "latency_change": latency_change,
+            "latency_p": latency_p,
+            "throughput_change": throughput_change,
+            "throughput_p": throughput_p,
+        })
+
+    for name in baseline["results"]:
+        if name not in current["results"]:
+            verdicts.append({"name": name, "status": "missing"})
+    return verdicts
+
+
+def format_comparison(verdicts: List[Dict]) -> str:
+    icons = {"regression": "❌", "improvement": "🚀", "unchanged": "✅", "new": "🆕", "missing": "⚠️"}
+    lines = ["=" * 60, "📊 BENCHMARK COMPARISON VS BASELINE", "=" * 60]
+    for verdict in sorted(verdicts, key=lambda v: (v["status"] != "regression", v["name"])):
+        line = f"{icons[verdict['status']]} {verdict['name']}: {verdict['status'].upper()}"
+        if "latency_change" in verdict:
+            line += (f"  median {verdict['latency_change']:+.1%} (p={verdict['latency_p']:.3f})"
+                     f"  throughput {verdict['throughput_change']:+.1%} (p={verdict['throughput_p']:.3f})")
+        lines.append(line)
+    regressions = sum(1 for verdict in verdicts if verdict["status"] == "regression")
+    lines.append("=" * 60)
+    lines.append(f"{regressions} regression(s) across {len(verdicts)} benchmark(s)")
+    return "\n".join(lines)
+
+
+def load_results(path: str) -> Dict:
+    with open(path, encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+# ===== CLI =====
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Endpoint benchmark suite with baseline comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and write JSON results")
+    run.add_argument("--api-base", default=API_BASE)
+    run.add_argument("--output", default=DEFAULT_OUTPUT)
+    run.add_argument("--only", help="Comma-separated benchmark names")
+    run.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Unmeasured requests per endpoint")
+    run.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Measured rounds per endpoint")
+    run.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Requests per round")
+    run.add_argument("--compare", metavar="BASELINE", help="Compare against a baseline after running")
+    run.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    run.add_argument("--min-effect", type=float, default=DEFAULT_MIN_EFFECT)
+
+    cmp = commands.add_parser("compare", help="Compare two result files")
+    cmp.add_argument("baseline", nargs="?", default=DEFAULT_BASELINE)
+    cmp.add_argument("current", nargs="?", default=DEFAULT_OUTPUT)
+    cmp.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    cmp.add_argument("--min-effect", type=float, default=DEFAULT_MIN_EFFECT)
+
+    commands.add_parser("list", help="List benchmark names")
+    return parser
+
+
+def main(argv: Sequence[str] = None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "list":
+        for benchmark in BENCHMARKS:
+            print(f"{benchmark.name:32} {benchmark.method} {benchmark.path}  [{benchmark.role or 'public'}]")
+        return
+
+    if args.command == "run":
+        benchmarks = BENCHMARKS
+        if args.only:
+            wanted = set(args.only.split(","))
+            unknown = wanted - {benchmark.name for benchmark in BENCHMARKS}
+            if unknown:
+                sys.exit(f"❌ Unknown benchmarks: {', '.join(sorted(unknown))}")
+            benchmarks = [benchmark for benchmark in BENCHMARKS if benchmark.name in wanted]
+
+        runner = BenchmarkRunner(args.api_base, warmup=args.warmup, rounds=args.rounds,
+                                 iterations=args.iterations)
+        print(f"🚀 Benchmarking {len(benchmarks)} endpoint(s) against {args.api_base}")
+        current = runner.run(lambda: runner.run_suite(benchmarks))
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(current, output_file, indent=2)
+        print(f"💾 Results written to {args.output}")
+        failed = any(result["errors"] for result in current["results"].values())
+        if not args.compare:
+            sys.exit(1 if failed else 0)
+        baseline_path, alpha, min_effect = args.compare, args.alpha, args.min_effect
+    else:
+        current = load_results(args.current)
+        baseline_path, alpha, min_effect = args.baseline, args.alpha, args.min_effect
+
+    verdicts = compare(load_results(baseline_path), current, alpha=alpha, min_effect=min_effect)
+    print(format_comparison(verdicts))
+    sys.exit(1 if any(verdict["status"] == "regression" for verdict in verdicts) else 0)
+
+
+if __name__ == "__main__":
+    main()
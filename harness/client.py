@@ -0,0 +1,271 @@
+"""
+Async HTTP client core for the Antia API testers
+One bounded keep-alive connection pool per tester, so independent test_* calls can run concurrently
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+
+from .exchange_log import ExchangeLog
+from .scheduler import Step, StepGraph
+from .token_store import TokenStore, credential_key, default_token_store
+
+# Configuration
+BASE_URL = os.environ.get("REACT_APP_BACKEND_URL", "https://campaign-tracker-47.preview.emergentagent.com")
+API_BASE = f"{BASE_URL}/api"
+
+# Connection pool defaults (kept small: the preview backend is a single instance)
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 30
+
+T = TypeVar("T")
+
+
+class ApiClient:
+    """Async HTTP client over a bounded keep-alive connection pool"""
+
+    def __init__(self, api_base: str = API_BASE, timeout: float = DEFAULT_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+                 keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY):
+        self.api_base = api_base.rstrip("/")
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Underlying httpx client, created on first use inside the running loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                },
+            )
+        return self._client
+
+    def url(self, endpoint: str) -> str:
+        """Resolve an API endpoint ("/health") or pass an absolute URL through"""
+        if endpoint.startswith("http://") or endpoint.startswith("https://"):
+            return endpoint
+        return f"{self.api_base}{endpoint}"
+
+    async def request(self, method: str, endpoint: str, data: Any = None,
+                      headers: Dict = None, token: str = None,
+                      timeout: float = None, **kwargs) -> httpx.Response:
+        """Send one request through the shared pool"""
+        req_headers = {}
+        if token:
+            req_headers["Authorization"] = f"Bearer {token}"
+        if headers:
+            req_headers.update(headers)
+
+        return await self.client.request(
+            method,
+            self.url(endpoint),
+            json=data if data else None,
+            headers=req_headers,
+            timeout=timeout if timeout is not None else self.timeout,
+            **kwargs,
+        )
+
+    async def aclose(self):
+        """Close every pooled connection"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "ApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class BaseTester:
+    """Common base for the API testers: logging, auth headers and concurrent test runs"""
+
+    def __init__(self, api_base: str = API_BASE, timeout: float = DEFAULT_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, token_store: TokenStore = None,
+                 exchange_log: ExchangeLog = None):
+        self.api = ApiClient(api_base, timeout=timeout, max_connections=max_connections,
+                             max_keepalive=max_connections)
+        self.access_token = None
+        self.tokens = token_store or default_token_store()
+        self.exchanges = exchange_log or ExchangeLog()
+        self._login_locks: Dict[str, asyncio.Lock] = {}
+        # access_token -> (role, email, password) of the login that issued it
+        self._token_logins: Dict[str, Tuple[str, str, str]] = {}
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log test messages; an ERROR also dumps the buffered requests in quiet log modes"""
+        print(f"[{level}] {message}")
+        if level == "ERROR" and not self.exchanges.verbose:
+            self.exchanges.dump(lambda line: print(f"[DUMP] {line}"))
+
+    async def make_request(self, method: str, endpoint: str, data: Dict = None,
+                           headers: Dict = None, use_auth: bool = True,
+                           token: str = None, timeout: float = None) -> httpx.Response:
+        """Make HTTP request with proper headers
+
+        An explicit token wins over self.access_token, so concurrent admin and
+        tipster checks never have to swap the shared token. A 401 for a token issued by
+        login() drops it from the token store, logs in again and retries once.
+        """
+        if token is None and use_auth:
+            token = self.access_token
+
+        response = await self._send(method, endpoint, data, headers, token, timeout)
+        if response.status_code == 401 and token in self._token_logins:
+            fresh = await self._relogin(token)
+            if fresh is not None:
+                response = await self._send(method, endpoint, data, headers, fresh, timeout)
+        return response
+
+    async def _send(self, method: str, endpoint: str, data: Optional[Dict], headers: Optional[Dict],
+                    token: Optional[str], timeout: Optional[float]) -> httpx.Response:
+        """One request with request/response logging"""
+        url = self.api.url(endpoint)
+        verbose = self.exchanges.verbose
+        if verbose:
+            self.log(f"Making {method} request to {url}")
+            if data:
+                self.log(f"Request data: {json.dumps(data, indent=2)}")
+
+        try:
+            response = await self.api.request(method, endpoint, data, headers=headers,
+                                              token=token, timeout=timeout)
+        except httpx.HTTPError as e:
+            self.exchanges.record(method, url, data, error=e)
+            self.log(f"Request failed: {str(e)}", "ERROR")
+            raise
+
+        if verbose:
+            self.log(f"Response status: {response.status_code}")
+
+            # Try to parse JSON response
+            try:
+                response_data = response.json()
+                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
+            except ValueError:
+                self.log(f"Response text: {response.text}")
+        else:
+            exchange = self.exchanges.record(method, url, data, response)
+            if exchange is not None:
+                for line in exchange.lines():
+                    self.log(line)
+
+        return response
+
+    async def login(self, role: str, email: str, password: str) -> httpx.Response:
+        """POST /auth/login through the token store
+
+        A cached, unexpired login is returned as a synthetic 200 response; concurrent
+        logins with the same credential share one request.
+        """
+        key = credential_key(role, email, password)
+        lock = self._login_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self.tokens.get(key)
+            if cached is not None:
+                self.log(f"🔑 Reusing cached {role} token for {email}")
+                self._remember_token(cached, role, email, password)
+                return httpx.Response(200, json=cached,
+                                      request=httpx.Request("POST", self.api.url("/auth/login")))
+
+            response = await self.make_request("POST", "/auth/login",
+                                               {"email": email, "password": password}, use_auth=False)
+            if response.status_code in (200, 201):
+                try:
+                    data = response.json()
+                except ValueError:
+                    return response
+                self.tokens.put(key, data)
+                self._remember_token(data, role, email, password)
+            return response
+
+    def _remember_token(self, data: Dict, role: str, email: str, password: str):
+        token = data.get("access_token") if isinstance(data, dict) else None
+        if token:
+            self._token_logins[token] = (role, email, password)
+
+    async def _relogin(self, rejected: str) -> Optional[str]:
+        """Replace a token the backend rejected with a fresh login; None if that fails
+
+        Tester attributes still holding the rejected token (access_token,
+        admin_access_token, ...) are switched to the new one.
+        """
+        role, email, password = self._token_logins[rejected]
+        self.log(f"🔑 {role} token for {email} rejected (401), logging in again", "WARN")
+        self.tokens.invalidate(credential_key(role, email, password), token=rejected)
+
+        response = await self.login(role, email, password)
+        if response.status_code not in (200, 201):
+            return None
+        fresh = response.json().get("access_token")
+        if not fresh or fresh == rejected:
+            return None
+        for name, value in list(vars(self).items()):
+            if value == rejected:
+                setattr(self, name, fresh)
+        return fresh
+
+    async def run_concurrently(self, tests: Dict[str, Callable[[], Awaitable[bool]]]) -> Dict[str, bool]:
+        """Run independent test_* coroutines at the same time
+
+        Results keep the order of the given mapping; a test that raises counts as failed.
+        """
+        names = list(tests)
+        outcomes = await asyncio.gather(*(tests[name]() for name in names), return_exceptions=True)
+
+        results = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                self.log(f"❌ {name} raised: {outcome}", "ERROR")
+                results[name] = False
+            else:
+                results[name] = bool(outcome)
+        return results
+
+    async def run_steps(self, steps: List[Step]) -> Dict[str, bool]:
+        """Run chained test steps as a dependency graph over this tester's state"""
+        return await StepGraph(steps, state=self, log=self.log).run()
+
+    @staticmethod
+    def only_if(condition: bool, test: Callable[[], Awaitable[bool]]) -> Callable[[], Awaitable[bool]]:
+        """Return the test itself, or a stand-in that fails without a request when condition is false"""
+        if condition:
+            return test
+
+        async def skipped() -> bool:
+            return False
+
+        return skipped
+
+    async def close(self):
+        """Release the connection pool"""
+        await self.api.aclose()
+
+    def run(self, suite: Callable[[], Awaitable[T]]) -> T:
+        """Run an async suite to completion on a fresh event loop, then close the pool"""
+        async def runner() -> T:
+            try:
+                return await suite()
+            finally:
+                await self.close()
+
+        return asyncio.run(runner())
@@ -0,0 +1,120 @@
+"""
+Request/response logging for make_request
+verbose  - print every exchange as it happens (default, the testers' historical output)
+sampled  - print a per-endpoint sample; keep the rest in the ring buffer
+deferred - print nothing until a check fails, then dump the ring buffer
+
+Exchanges are kept as references and only serialized when printed, so quiet modes cost
+almost nothing per request.
+
+Environment:
+    ANTIA_LOG_MODE=verbose|sampled|deferred
+    ANTIA_LOG_SAMPLE=0.01                   sampled mode rate (default 0.01)
+    ANTIA_LOG_BUFFER=50                     exchanges kept for failure dumps
+"""
+
+import json
+import os
+import random
+import re
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import httpx
+
+LOG_MODE_ENV = "ANTIA_LOG_MODE"
+LOG_SAMPLE_ENV = "ANTIA_LOG_SAMPLE"
+LOG_BUFFER_ENV = "ANTIA_LOG_BUFFER"
+
+LOG_MODES = ("verbose", "sampled", "deferred")
+DEFAULT_SAMPLE_RATE = 0.01
+DEFAULT_BUFFER_SIZE = 50
+
+# Mongo ObjectIds, UUIDs and numeric path segments collapse into one sampling key
+_ID_SEGMENT = re.compile(r"/(?:[0-9a-f]{24}|[0-9a-f]{8}-[0-9a-f-]{27}|\d+)(?=/|$|\?)")
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Route template used for per-endpoint sampling, e.g. "GET /api/products/{id}\""""
+    path = httpx.URL(url).path
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+class Exchange:
+    """One request and its outcome, serialized only when printed"""
+
+    __slots__ = ("method", "url", "data", "response", "error")
+
+    def __init__(self, method: str, url: str, data: Any, response: Optional[httpx.Response],
+                 error: Optional[BaseException]):
+        self.method = method
+        self.url = url
+        self.data = data
+        self.response = response
+        self.error = error
+
+    def lines(self) -> List[str]:
+        lines = [f"Making {self.method} request to {self.url}"]
+        if self.data:
+            lines.append(f"Request data: {json.dumps(self.data, indent=2)}")
+        if self.error is not None:
+            lines.append(f"Request failed: {self.error}")
+            return lines
+
+        lines.append(f"Response status: {self.response.status_code}")
+        try:
+            lines.append(f"Response data: {json.dumps(self.response.json(), indent=2)}")
+        except ValueError:
+            lines.append(f"Response text: {self.response.text}")
+        return lines
+
+
+class ExchangeLog:
+    """Ring buffer of recent exchanges with verbose, sampled or deferred printing"""
+
+    def __init__(self, mode: str = None, sample_rate: float = None,
+                 endpoint_rates: Dict[str, float] = None, capacity: int = None,
+                 seed: Optional[int] = None):
+        self.mode = mode or os.environ.get(LOG_MODE_ENV, "verbose")
+        if self.mode not in LOG_MODES:
+            raise ValueError(f"Unknown log mode {self.mode!r}; expected one of {', '.join(LOG_MODES)}")
+        if sample_rate is None:
+            sample_rate = float(os.environ.get(LOG_SAMPLE_ENV, DEFAULT_SAMPLE_RATE))
+        if capacity is None:
+            capacity = int(os.environ.get(LOG_BUFFER_ENV, DEFAULT_BUFFER_SIZE))
+        self.sample_rate = sample_rate
+        self.endpoint_rates = endpoint_rates or {}
+        self.recent: Deque[Exchange] = deque(maxlen=capacity)
+        self._random = random.Random(seed)
+
+    @property
+    def verbose(self) -> bool:
+        return self.mode == "verbose"
+
+    def record(self, method: str, url: str, data: Any = None, response: httpx.Response = None,
+               error: BaseException = None) -> Optional[Exchange]:
+        """Buffer an exchange; returns it when it should be printed now"""
+        exchange = Exchange(method, url, data, response, error)
+        if self.mode == "verbose":
+            return exchange
+
+        self.recent.append(exchange)
+        if self.mode == "sampled" and self._sampled(method, url):
+            return exchange
+        return None
+
+    def _sampled(self, method: str, url: str) -> bool:
+        rate = self.sample_rate
+        if self.endpoint_rates:
+            rate = self.endpoint_rates.get(endpoint_key(method, url), rate)
+        return self._random.random() < rate
+
+    def dump(self, emit: Callable[[str], None]):
+        """Print and clear the buffered exchanges, oldest first"""
+        if not self.recent:
+            return
+        emit(f"--- last {len(self.recent)} request(s) before failure ---")
+        while self.recent:
+            for line in self.recent.popleft().lines():
+                emit(line)
+        emit("--- end of request dump ---")
@@ -0,0 +1,197 @@
+"""
+HDR-style latency histogram
+Log-linear buckets with a fixed number of significant figures, mergeable across runs and processes
+"""
+
+import math
+from typing import Dict, Iterator, Tuple
+
+# Latencies are recorded in microseconds
+DEFAULT_LOWEST = 1
+DEFAULT_HIGHEST = 3_600_000_000  # 1 hour
+DEFAULT_SIGNIFICANT_FIGURES = 3
+
+SUMMARY_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """Latency histogram with HdrHistogram bucketing (values in microseconds)"""
+
+    def __init__(self, lowest: int = DEFAULT_LOWEST, highest: int = DEFAULT_HIGHEST,
+                 significant_figures: int = DEFAULT_SIGNIFICANT_FIGURES):
+        if lowest < 1 or highest < 2 * lowest or not 1 <= significant_figures <= 5:
+            raise ValueError("Invalid histogram range or precision")
+
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_figures = significant_figures
+
+        single_unit_resolution = 2 * 10 ** significant_figures
+        self._sub_bucket_count_magnitude = int(math.ceil(math.log2(single_unit_resolution)))
+        self._sub_bucket_half_count_magnitude = self._sub_bucket_count_magnitude - 1
+        self._sub_bucket_count = 1 << self._sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._unit_magnitude = int(math.floor(math.log2(lowest)))
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        bucket_count = 1
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._counts_len = (bucket_count + 1) * self._sub_bucket_half_count
+
+        self.reset()
+
+    def reset(self):
+        """Drop every recorded value"""
+        self.counts = [0] * self._counts_len
+        self.total_count = 0
+        self.total_sum = 0
+        self.min_value = 0
+        self.max_value = 0
+
+    # ===== BUCKET MATH =====
+
+    def _counts_index(self, value: int) -> int:
+        bucket_index = ((value | self._sub_bucket_mask).bit_length()
+                        - self._unit_magnitude - (self._sub_bucket_half_count_magnitude + 1))
+        sub_bucket_index = value >> (bucket_index + self._unit_magnitude)
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + \
+            (sub_bucket_index - self._sub_bucket_half_count)
+
+    def _index_location(self, index: int) -> Tuple[int, int]:
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        return bucket_index, sub_bucket_index
+
+    def _value_at_index(self, index: int) -> int:
+        """Highest value that lands in the given counts slot"""
+        bucket_index, sub_bucket_index = self._index_location(index)
+        lowest = sub_bucket_index << (bucket_index + self._unit_magnitude)
+        adjusted_bucket = bucket_index + (1 if sub_bucket_index >= self._sub_bucket_count else 0)
+        return lowest + (1 << (self._unit_magnitude + adjusted_bucket)) - 1
+
+    # ===== RECORDING =====
+
+    def record(self, value: int, count: int = 1):
+        """Record a latency in microseconds (clamped to the trackable range)"""
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self.highest:
+            value = self.highest
+
+        self.counts[self._counts_index(value)] += count
+        if self.total_count == 0 or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+        self.total_count += count
+        self.total_sum += value * count
+
+    def record_seconds(self, elapsed: float):
+        """Record a latency measured in seconds"""
+        self.record(int(elapsed * 1_000_000))
+
+    def record_corrected(self, value: int, expected_interval: int):
+        """Record a latency and back-fill the samples a stalled closed-loop client never sent
+
+        Same correction as HdrHistogram's recordValueWithExpectedInterval: when a call took
+        longer than the expected interval between calls, the calls that should have been issued
+        meanwhile are recorded with linearly decreasing latencies.
+        """
+        self.record(value)
+        if expected_interval <= 0 or value <= expected_interval:
+            return
+        missing = value - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add every value recorded in another histogram"""
+        if other.total_count == 0:
+            return
+        if self._counts_len == other._counts_len and self.lowest == other.lowest \
+                and self.significant_figures == other.significant_figures:
+            counts = self.counts
+            for index, count in enumerate(other.counts):
+                if count:
+                    counts[index] += count
+            if self.total_count == 0 or other.min_value < self.min_value:
+                self.min_value = other.min_value
+            self.max_value = max(self.max_value, other.max_value)
+            self.total_count += other.total_count
+            self.total_sum += other.total_sum
+        else:
+            for value, count in other.iter_values():
+                self.record(value, count)
+
+    # ===== QUERIES =====
+
+    def iter_values(self) -> Iterator[Tuple[int, int]]:
+        """Yield (bucket value, count) for every non-empty bucket"""
+        for index, count in enumerate(self.counts):
+            if count:
+                yield self._value_at_index(index), count
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Latency (microseconds) at or below which the given percentage of samples fall"""
+        if self.total_count == 0:
+            return 0
+        percentile = min(max(percentile, 0.0), 100.0)
+        count_at_percentile = max(int(percentile / 100.0 * self.total_count + 0.5), 1)
+
+        running = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                running += count
+                if running >= count_at_percentile:
+                    return min(self._value_at_index(index), self.max_value)
+        return self.max_value
+
+    @property
+    def mean(self) -> float:
+        return self.total_sum / self.total_count if self.total_count else 0.0
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES) -> Dict[str, float]:
+        """Count plus min/mean/percentiles/max in milliseconds"""
+        result = {
+            "count": self.total_count,
+            "min_ms": self.min_value / 1000.0,
+            "mean_ms": round(self.mean / 1000.0, 3),
+        }
+        for percentile in percentiles:
+            result[f"p{percentile:g}_ms"] = self.value_at_percentile(percentile) / 1000.0
+        result["max_ms"] = self.max_value / 1000.0
+        return result
+
+    # ===== SERIALIZATION =====
+
+    def to_dict(self) -> Dict:
+        """Compact snapshot: configuration plus sparse (index, count) pairs"""
+        return {
+            "lowest": self.lowest,
+            "highest": self.highest,
+            "significant_figures": self.significant_figures,
+            "total_count": self.total_count,
+            "total_sum": self.total_sum,
+            "min": self.min_value,
+            "max": self.max_value,
+            "counts": [[index, count] for index, count in enumerate(self.counts) if count],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls(data["lowest"], data["highest"], data["significant_figures"])
+        for index, count in data["counts"]:
+            histogram.counts[index] = count
+        histogram.total_count = data["total_count"]
+        histogram.total_sum = data["total_sum"]
+        histogram.min_value = data["min"]
+        histogram.max_value = data["max"]
+        return histogram
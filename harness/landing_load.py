@@ -0,0 +1,187 @@
+"""
+Load mode for the public landing hot path
+Drives GET /go/{slug}?country=XX and POST /r/click at a constant arrival rate with a
+Zipf-skewed slug mix and a weighted country mix.
+
+Usage:
+    python -m harness.landing_load --rate 200 --duration 60 --slugs fausto-perez-reto-navidad-2025
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import random
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .client import API_BASE, ApiClient
+from .load import EndpointStats, OpenLoopRunner, Operation, format_report
+from .workers import WorkerPlan, format_timeline, run_workers
+
+DEFAULT_SLUGS = ["fausto-perez-reto-navidad-2025"]
+
+# Rough share of landing visits per country (Spain first, then LATAM)
+DEFAULT_COUNTRY_MIX = {
+    "ES": 0.55,
+    "MX": 0.15,
+    "CO": 0.10,
+    "AR": 0.08,
+    "PE": 0.05,
+    "CL": 0.04,
+    "EC": 0.03,
+}
+
+# Share of arrivals that are clicks on a house button rather than page views
+DEFAULT_CLICK_RATIO = 0.3
+
+LANDING_ENDPOINT = "GET /go/{slug}"
+CLICK_ENDPOINT = "POST /r/click"
+
+
+class LandingHotPathScenario:
+    """Realistic mix of public landing views and house clicks"""
+
+    def __init__(self, slugs: Sequence[str], country_mix: Dict[str, float] = None,
+                 click_ratio: float = DEFAULT_CLICK_RATIO, zipf_exponent: float = 1.1,
+                 seed: Optional[int] = None):
+        if not slugs:
+            raise ValueError("At least one landing slug is required")
+        self.slugs = list(slugs)
+        country_mix = country_mix or DEFAULT_COUNTRY_MIX
+        self.countries = list(country_mix)
+        self.click_ratio = click_ratio
+        self.random = random.Random(seed)
+
+        # Cumulative weights: popular landings get most of the traffic
+        self._slug_weights = list(itertools.accumulate(
+            1.0 / (rank ** zipf_exponent) for rank in range(1, len(self.slugs) + 1)))
+        self._country_weights = list(itertools.accumulate(country_mix[c] for c in self.countries))
+
+        # (slug, country) -> house ids shown on that landing, filled by discover()
+        self.houses: Dict[Tuple[str, str], List[str]] = {}
+
+    async def discover(self, api: ApiClient):
+        """Fetch each landing once per country to learn which house ids can be clicked"""
+        async def load(slug: str, country: str):
+            try:
+                response = await api.request("GET", f"/go/{slug}?country={country}")
+                if response.status_code != 200:
+                    return
+                items = response.json().get("items", [])
+            except Exception:
+                return
+            house_ids = [item.get("house", {}).get("id") for item in items]
+            house_ids = [house_id for house_id in house_ids if house_id]
+            if house_ids:
+                self.houses[(slug, country)] = house_ids
+
+        await asyncio.gather(*(load(slug, country) for slug in self.slugs for country in self.countries))
+
+    prepare = discover
+
+    def next_operation(self) -> Operation:
+        slug = self.random.choices(self.slugs, cum_weights=self._slug_weights)[0]
+        country = self.random.choices(self.countries, cum_weights=self._country_weights)[0]
+
+        house_ids = self.houses.get((slug, country))
+        if house_ids and self.random.random() < self.click_ratio:
+            return Operation(CLICK_ENDPOINT, "POST", "/r/click", {
+                "slug": slug,
+                "houseId": self.random.choice(house_ids),
+                "country": country,
+            })
+        return Operation(LANDING_ENDPOINT, "GET", f"/go/{slug}?country={country}")
+
+
+async def run_landing_load(api: ApiClient, scenario: LandingHotPathScenario, rate: float,
+                           duration: float, warmup: float = 0.0,
+                           max_in_flight: int = 256) -> Tuple[Dict[str, EndpointStats], float]:
+    """Discover clickable houses, then run the open-loop scenario; returns (stats, elapsed)"""
+    await scenario.discover(api)
+    runner = OpenLoopRunner(api, rate, duration, warmup=warmup, max_in_flight=max_in_flight)
+    stats = await runner.run(scenario.next_operation)
+    return stats, runner.elapsed
+
+
+def worker_scenario(slugs: Sequence[str], country_mix: Dict[str, float], click_ratio: float,
+                    seed: Optional[int], index: int) -> LandingHotPathScenario:
+    """Per-process scenario for run_workers; each worker gets its own random stream"""
+    return LandingHotPathScenario(slugs, country_mix=country_mix, click_ratio=click_ratio,
+                                  seed=None if seed is None else seed + index)
+
+
+def parse_country_mix(value: str) -> Dict[str, float]:
+    """Parse "ES:0.6,MX:0.4" into a weight map"""
+    mix = {}
+    for part in value.split(","):
+        country, _, weight = part.partition(":")
+        mix[country.strip().upper()] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Open-loop load test for /go/{slug} and /r/click")
+    parser.add_argument("--api-base", default=API_BASE)
+    parser.add_argument("--rate", type=float, default=50.0, help="Arrivals per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--slugs", default=",".join(DEFAULT_SLUGS), help="Comma-separated landing slugs, most popular first")
+    parser.add_argument("--countries", type=parse_country_mix, default=DEFAULT_COUNTRY_MIX,
+                        help="Country weights, e.g. ES:0.6,MX:0.4")
+    parser.add_argument("--click-ratio", type=float, default=DEFAULT_CLICK_RATIO)
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--connections", type=int, default=100, help="Connection pool size")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes sharing the rate (0 = one per core)")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv: Sequence[str] = None):
+    args = build_parser().parse_args(argv)
+    slugs = [slug for slug in args.slugs.split(",") if slug]
+    if args.processes != 1:
+        return main_multiprocess(args, slugs)
+
+    scenario = LandingHotPathScenario(
+        slugs,
+        country_mix=args.countries,
+        click_ratio=args.click_ratio,
+        seed=args.seed,
+    )
+
+    async def run():
+        async with ApiClient(args.api_base, max_connections=args.connections,
+                             max_keepalive=args.connections) as api:
+            return await run_landing_load(api, scenario, args.rate, args.duration,
+                                          warmup=args.warmup, max_in_flight=args.max_in_flight)
+
+    print(f"🚀 Landing hot path load: {args.rate:g} req/s for {args.duration:g}s against {args.api_base}")
+    stats, elapsed = asyncio.run(run())
+    print(format_report(stats, elapsed, title="LANDING HOT PATH LOAD RESULTS"))
+
+    failures = sum(endpoint_stats.failures for endpoint_stats in stats.values())
+    sys.exit(1 if failures else 0)
+
+
+def main_multiprocess(args: argparse.Namespace, slugs: List[str]):
+    plan = WorkerPlan(args.api_base, args.rate, args.duration, warmup=args.warmup,
+                      processes=args.processes, max_in_flight=args.max_in_flight,
+                      connections=args.connections)
+    factory = functools.partial(worker_scenario, slugs, args.countries, args.click_ratio, args.seed)
+
+    print(f"🚀 Landing hot path load: {args.rate:g} req/s for {args.duration:g}s against {args.api_base} "
+          f"across {plan.processes} processes")
+    report = run_workers(plan, factory)
+    for error in report.errors:
+        print(f"[ERROR] Worker failed:\n{error}")
+    print(format_timeline(report.timeline, plan.interval))
+    print(format_report(report.stats, report.elapsed, title="LANDING HOT PATH LOAD RESULTS"))
+
+    failures = sum(endpoint_stats.failures for endpoint_stats in report.stats.values())
+    sys.exit(1 if failures or report.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Open-loop load generation
+Requests are issued on a fixed arrival schedule whether or not earlier ones have returned,
+and latency is measured from each request's intended start to avoid coordinated omission
+"""
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import httpx
+
+from .client import ApiClient
+from .histogram import LatencyHistogram
+
+DEFAULT_MAX_IN_FLIGHT = 256
+
+
+@dataclass
+class Operation:
+    """One request issued by a load scenario; endpoint is the stats key (route template)"""
+    endpoint: str
+    method: str
+    path: str
+    data: Any = None
+    token: Optional[str] = None
+
+
+class EndpointStats:
+    """Latency and outcome counters for one endpoint
+
+    latency: intended start -> response (coordinated-omission corrected)
+    service: actual send -> response (what a closed-loop client would report)
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def record(self, intended: float, sent: float, done: float, status: Optional[int]):
+        self.latency.record_seconds(done - intended)
+        self.service.record_seconds(done - sent)
+        if status is None:
+            self.errors += 1
+        else:
+            self.statuses[status] += 1
+
+    @property
+    def failures(self) -> int:
+        """Transport errors plus non-2xx/3xx responses"""
+        return self.errors + sum(count for status, count in self.statuses.items() if status >= 400)
+
+    def merge(self, other: "EndpointStats"):
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        self.statuses.update(other.statuses)
+        self.errors += other.errors
+
+    def to_dict(self) -> Dict:
+        return {
+            "endpoint": self.endpoint,
+            "latency": self.latency.to_dict(),
+            "service": self.service.to_dict(),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "errors": self.errors,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EndpointStats":
+        stats = cls(data["endpoint"])
+        stats.latency = LatencyHistogram.from_dict(data["latency"])
+        stats.service = LatencyHistogram.from_dict(data["service"])
+        stats.statuses = Counter({int(status): count for status, count in data["statuses"].items()})
+        stats.errors = data["errors"]
+        return stats
+
+
+class OpenLoopRunner:
+    """Constant-arrival-rate load generator over a shared ApiClient
+
+    max_in_flight bounds concurrent requests; arrivals beyond it queue, and the queueing
+    time shows up in the corrected latency instead of silently lowering the offered rate.
+    """
+
+    def __init__(self, api: ApiClient, rate: float, duration: float, warmup: float = 0.0,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        if rate <= 0 or duration <= 0:
+            raise ValueError("rate and duration must be positive")
+        self.api = api
+        self.rate = rate
+        self.duration = duration
+        self.warmup = warmup
+        self.max_in_flight = max_in_flight
+        self.stats: Dict[str, EndpointStats] = {}
+        self.sent = 0
+        self.elapsed = 0.0
+        self.measure_from: Optional[float] = None
+
+    def _stats_for(self, endpoint: str) -> EndpointStats:
+        stats = self.stats.get(endpoint)
+        if stats is None:
+            stats = self.stats[endpoint] = EndpointStats(endpoint)
+        return stats
+
+    async def _fire(self, operation: Operation, intended: float, measure_from: float,
+                    slots: asyncio.Semaphore):
+        async with slots:
+            sent = time.perf_counter()
+            status = None
+            try:
+                response = await self.api.request(operation.method, operation.path, operation.data,
+                                                  token=operation.token)
+                status = response.status_code
+            except httpx.HTTPError:
+                pass
+            done = time.perf_counter()
+
+        if intended >= measure_from:
+            self._stats_for(operation.endpoint).record(intended, sent, done, status)
+
+    def take_stats(self) -> Dict[str, EndpointStats]:
+        """Hand over the stats recorded so far and start a fresh interval"""
+        stats, self.stats = self.stats, {}
+        return stats
+
+    def arrival_offsets(self) -> Iterable[float]:
+        """Constant-rate arrival times (seconds from start) covering warmup + duration"""
+        interval = 1.0 / self.rate
+        total = int(self.rate * (self.warmup + self.duration))
+        return (i * interval for i in range(total))
+
+    async def run(self, next_operation: Callable[[], Operation],
+                  offsets: Iterable[float] = None) -> Dict[str, EndpointStats]:
+        """Drive next_operation() on the arrival schedule
+
+        offsets are intended send times in seconds from start, in ascending order; the
+        default is the constant-rate schedule for warmup + duration seconds.
+        """
+        slots = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+
+        start = time.perf_counter()
+        measure_from = self.measure_from = start + self.warmup
+        for offset in (self.arrival_offsets() if offsets is None else offsets):
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            task = asyncio.ensure_future(self._fire(next_operation(), intended, measure_from, slots))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            self.sent += 1
+
+        if pending:
+            await asyncio.gather(*pending)
+        self.elapsed = time.perf_counter() - measure_from
+        return self.stats
+
+
+def format_report(stats: Dict[str, EndpointStats], elapsed: float, title: str = "LOAD TEST RESULTS") -> str:
+    """Human-readable per-endpoint report"""
+    lines = ["=" * 60, f"📊 {title}", "=" * 60]
+    for endpoint, endpoint_stats in sorted(stats.items()):
+        latency = endpoint_stats.latency.summary()
+        service = endpoint_stats.service.summary()
+        throughput = latency["count"] / elapsed if elapsed > 0 else 0.0
+        lines.append(f"{endpoint}")
+        lines.append(f"  Requests: {latency['count']}  Throughput: {throughput:.1f} req/s  "
+                     f"Failures: {endpoint_stats.failures}")
+        lines.append(f"  Statuses: {dict(sorted(endpoint_stats.statuses.items()))}  Errors: {endpoint_stats.errors}")
+        lines.append("  Latency (corrected) ms: " + format_percentiles(latency))
+        lines.append("  Service time ms:        " + format_percentiles(service))
+    return "\n".join(lines)
+
+
+def format_percentiles(summary: Dict[str, float]) -> str:
+    keys = [key for key in summary if key.endswith("_ms")]
+    return "  ".join(f"{key[:-3]}={summary[key]:.1f}" for key in keys)
+
+
+def merge_stats(target: Dict[str, EndpointStats], source: Dict[str, EndpointStats]):
+    """Fold per-endpoint stats from one run into another"""
+    for endpoint, stats in source.items():
+        if endpoint in target:
+            target[endpoint].merge(stats)
+        else:
+            merged = target[endpoint] = EndpointStats(endpoint)
+            merged.merge(stats)
+
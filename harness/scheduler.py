@@ -0,0 +1,138 @@
+"""
+Dependency-graph scheduler for chained test steps
+Each step declares the state it produces and consumes; steps start as soon as their inputs are ready
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+_MISSING = object()
+
+
+@dataclass
+class Step:
+    """One test step in a graph
+
+    consumes: state keys the step needs; it is skipped when any of them is unavailable
+    produces: state keys the step sets (normally tester attributes such as test_landing_id)
+    after:    names of steps that must finish first, whatever their outcome (side-effect ordering)
+    skip_result: result recorded when the step is skipped (None = leave it out of the results)
+    """
+    name: str
+    run: Callable[[], Awaitable[bool]]
+    consumes: Tuple[str, ...] = ()
+    produces: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    skip_result: Optional[bool] = False
+
+
+class StepGraph:
+    """Runs a set of steps with maximum parallelism allowed by their declared dependencies
+
+    A produced key is available when its producer succeeded and, if the state object has an
+    attribute of that name, the attribute is truthy. Keys nobody produces are read from the
+    state object directly.
+    """
+
+    def __init__(self, steps: List[Step], state: Any = None,
+                 log: Callable[[str, str], None] = None):
+        self.steps = list(steps)
+        self.state = state
+        self.log = log or (lambda message, level="INFO": print(f"[{level}] {message}"))
+        self._by_name: Dict[str, Step] = {}
+        self._producers: Dict[str, List[str]] = {}
+        self._outcomes: Dict[str, Optional[bool]] = {}
+
+        for step in self.steps:
+            if step.name in self._by_name:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            self._by_name[step.name] = step
+            for key in step.produces:
+                self._producers.setdefault(key, []).append(step.name)
+
+        for step in self.steps:
+            for name in step.after:
+                if name not in self._by_name:
+                    raise ValueError(f"Step {step.name} runs after unknown step {name}")
+
+        self._order = self._topological_order()
+
+    def upstream(self, step: Step) -> List[str]:
+        """Names of the steps that must finish before this one starts"""
+        names = list(step.after)
+        for key in step.consumes:
+            names.extend(p for p in self._producers.get(key, []) if p != step.name)
+        return list(dict.fromkeys(names))
+
+    def _topological_order(self) -> List[Step]:
+        """Order steps so every step follows its upstream steps; reject cycles"""
+        order: List[Step] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(step: Step, path: Tuple[str, ...]):
+            mark = state.get(step.name)
+            if mark == 2:
+                return
+            if mark == 1:
+                cycle = " -> ".join(path + (step.name,))
+                raise ValueError(f"Dependency cycle: {cycle}")
+            state[step.name] = 1
+            for name in self.upstream(step):
+                visit(self._by_name[name], path + (step.name,))
+            state[step.name] = 2
+            order.append(step)
+
+        for step in self.steps:
+            visit(step, ())
+        return order
+
+    def is_available(self, key: str) -> bool:
+        """Whether a state key can be consumed right now"""
+        value = getattr(self.state, key, _MISSING) if self.state is not None else _MISSING
+        producers = self._producers.get(key)
+
+        if not producers:
+            return value is not _MISSING and bool(value)
+        if not any(self._outcomes.get(name) for name in producers):
+            return False
+        return value is _MISSING or bool(value)
+
+    async def _execute(self, step: Step, upstream: List["asyncio.Task"]) -> Optional[bool]:
+        if upstream:
+            await asyncio.gather(*upstream)
+
+        missing = [key for key in step.consumes if not self.is_available(key)]
+        if missing:
+            self.log(f"⚠️ {', '.join(missing)} not available - skipping {step.name}", "WARN")
+            self._outcomes[step.name] = None
+            return None
+
+        try:
+            outcome = bool(await step.run())
+        except Exception as e:
+            self.log(f"❌ {step.name} raised: {str(e)}", "ERROR")
+            outcome = False
+
+        self._outcomes[step.name] = outcome
+        return outcome
+
+    async def run(self) -> Dict[str, bool]:
+        """Run every step; results follow declaration order"""
+        self._outcomes = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        for step in self._order:
+            upstream = [tasks[name] for name in self.upstream(step)]
+            tasks[step.name] = asyncio.ensure_future(self._execute(step, upstream))
+
+        await asyncio.gather(*tasks.values())
+
+        results = {}
+        for step in self.steps:
+            outcome = self._outcomes.get(step.name)
+            if outcome is None:
+                if step.skip_result is not None:
+                    results[step.name] = step.skip_result
+            else:
+                results[step.name] = outcome
+        return results
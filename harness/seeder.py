@@ -0,0 +1,479 @@
+"""
+Scale data seeder for MongoDB
+Bulk-loads a synthetic dataset shaped like prisma/schema.prisma so queries can be benchmarked
+at production volumes: tipsters, betting houses, landings and their items, products, then
+millions of landing_impression_events, landing_click_events, affiliate_click_events, orders
+and affiliate_conversions.
+
+Traffic is skewed the way real traffic is: a Zipf distribution over tipsters and houses,
+the landing country mix from harness.landing_load, and an evening-heavy time of day.
+Every document carries load_seed=<run id> so a run can be removed with --drop-run.
+
+Event collections are split across worker processes; each writes unordered insert_many
+batches over its own connection.
+
+Requires pymongo (pip install pymongo).
+
+Usage:
+    python -m harness.seeder --mongo-url mongodb://localhost:27017/antia --events 10000000 --processes 8
+    python -m harness.seeder --mongo-url mongodb://localhost:27017/antia --drop-run scale-20261017
+"""
+
+import argparse
+import bisect
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .landing_load import DEFAULT_COUNTRY_MIX
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Share of --events per event collection
+DEFAULT_EVENT_MIX = {
+    "landing_impression_events": 0.50,
+    "landing_click_events": 0.25,
+    "affiliate_click_events": 0.15,
+    "affiliate_conversions": 0.06,
+    "orders": 0.04,
+}
+
+# Relative traffic per hour of day (UTC), peaking in the evening
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 1, 2, 3, 4, 5, 5, 6, 7, 6, 6, 6, 7, 8, 10, 12, 13, 12, 8, 4]
+
+ORDER_STATUSES = {"ACCESS_GRANTED": 0.55, "PAGADA": 0.20, "PENDING": 0.15, "EXPIRED": 0.06, "REFUNDED": 0.04}
+CONVERSION_EVENTS = {"REGISTER": 0.6, "DEPOSIT": 0.3, "QUALIFIED": 0.1}
+CONVERSION_STATUSES = {"APPROVED": 0.6, "PENDING": 0.3, "REJECTED": 0.1}
+PAYMENT_PROVIDERS = {"stripe": 0.7, "redsys": 0.3}
+
+USER_AGENTS = [
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 Chrome/124.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+    "TelegramBot (like TwitterBot)",
+]
+REFERRERS = [None, "https://t.me/", "https://www.instagram.com/", "https://x.com/", "https://www.tiktok.com/"]
+
+
+class Weighted:
+    """Weighted choice over a fixed population using cumulative weights"""
+
+    def __init__(self, population: Sequence, weights: Sequence[float]):
+        self.population = list(population)
+        self.cum_weights = list(itertools.accumulate(weights))
+
+    @classmethod
+    def from_mix(cls, mix: Dict) -> "Weighted":
+        return cls(list(mix), list(mix.values()))
+
+    @classmethod
+    def zipf(cls, population: Sequence, exponent: float) -> "Weighted":
+        return cls(population, [1.0 / (rank ** exponent) for rank in range(1, len(population) + 1)])
+
+    def pick(self, rng: random.Random):
+        index = bisect.bisect(self.cum_weights, rng.random() * self.cum_weights[-1])
+        return self.population[min(index, len(self.population) - 1)]
+
+
+@dataclass
+class Dimensions:
+    """Ids and attributes of the seeded tipsters, houses, landings and products (picklable)"""
+    run_id: str
+    start: datetime
+    days: int
+    tipsters: List[str] = field(default_factory=list)
+    houses: Dict[str, Dict] = field(default_factory=dict)             # id -> {url, param, commission}
+    landings: Dict[str, List[str]] = field(default_factory=dict)      # tipster id -> landing ids
+    landing_items: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)  # (landing, country) -> houses
+    landing_countries: Dict[str, List[str]] = field(default_factory=dict)
+    products: Dict[str, List[Dict]] = field(default_factory=dict)     # tipster id -> [{id, price}]
+    tipster_exponent: float = 1.1
+    house_exponent: float = 0.9
+
+
+# ===== DIMENSIONS =====
+
+def build_dimensions(rng: random.Random, run_id: str, tipsters: int, houses: int, landings_per_tipster: int,
+                     days: int, country_mix: Dict[str, float], object_id) -> Tuple[Dimensions, Dict[str, List[Dict]]]:
+    """Create the dimension documents; returns (ids for the workers, documents per collection)"""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    dims = Dimensions(run_id=run_id, start=now - timedelta(days=days), days=days)
+    docs: Dict[str, List[Dict]] = {name: [] for name in (
+        "users", "tipster_profiles", "betting_houses", "tipster_affiliate_landings",
+        "tipster_landing_items", "products")}
+    countries = list(country_mix)
+
+    def stamp(doc: Dict) -> Dict:
+        doc.setdefault("created_at", dims.start)
+        doc.setdefault("updated_at", dims.start)
+        doc["load_seed"] = run_id
+        return doc
+
+    for h in range(houses):
+        house_id = object_id()
+        slug = f"seed-house-{h:03d}"
+        allowed = rng.sample(countries, k=rng.randint(max(1, len(countries) // 2), len(countries)))
+        house = {
+            "url": f"https://{slug}.example.com/affiliate?ref=antia",
+            "param": "subid",
+            "commission": rng.choice([1500, 2000, 2500, 3000, 5000]),
+        }
+        dims.houses[str(house_id)] = house
+        docs["betting_houses"].append(stamp({
+            "_id": house_id, "name": f"Seed House {h:03d}", "slug": slug, "status": "ACTIVE",
+            "master_affiliate_url": house["url"], "tracking_param_name": house["param"],
+            "commission_per_referral_cents": house["commission"],
+            "allowed_countries": allowed, "blocked_countries": [],
+        }))
+    house_ids = list(dims.houses)
+
+    for t in range(tipsters):
+        user_id, profile_id = object_id(), object_id()
+        tipster_id = str(profile_id)
+        dims.tipsters.append(tipster_id)
+        docs["users"].append(stamp({
+            "_id": user_id, "email": f"seed-tipster-{run_id}-{t:05d}@load.antia.test",
+            "password_hash": "!seed-no-login", "role": "TIPSTER", "status": "ACTIVE",
+        }))
+        docs["tipster_profiles"].append(stamp({
+            "_id": profile_id, "user_id": str(user_id), "public_name": f"Seed Tipster {t:05d}",
+            "locale": "es", "timezone": "Europe/Madrid", "application_status": "APPROVED",
+            "kyc_completed": True, "module_forecasts": True, "module_affiliate": True,
+        }))
+
+        dims.products[tipster_id] = []
+        for p in range(rng.randint(1, 4)):
+            product_id = object_id()
+            price = rng.choice([999, 1999, 2999, 4999, 9999])
+            dims.products[tipster_id].append({"id": str(product_id), "price": price})
+            docs["products"].append(stamp({
+                "_id": product_id, "tipster_id": tipster_id, "title": f"Seed product {t:05d}-{p}",
+                "price_cents": price, "currency": "EUR", "billing_type": rng.choice(["ONE_TIME", "SUBSCRIPTION"]),
+                "active": True, "access_mode": "AUTO_JOIN",
+            }))
+
+        dims.landings[tipster_id] = []
+        for l in range(landings_per_tipster):
+            landing_id = object_id()
+            landing = str(landing_id)
+            enabled = rng.sample(countries, k=rng.randint(1, len(countries)))
+            dims.landings[tipster_id].append(landing)
+            dims.landing_countries[landing] = enabled
+            docs["tipster_affiliate_landings"].append(stamp({
+                "_id": landing_id, "tipster_id": tipster_id, "slug": f"seed-{run_id}-{t:05d}-{l}",
+                "title": f"Seed landing {t:05d}-{l}", "countries_enabled": enabled, "is_active": True,
+                "total_clicks": 0, "total_impressions": 0,
+            }))
+            for country in enabled:
+                chosen = rng.sample(house_ids, k=min(len(house_ids), rng.randint(2, 5)))
+                dims.landing_items[(landing, country)] = chosen
+                for order_index, house_id in enumerate(chosen):
+                    docs["tipster_landing_items"].append(stamp({
+                        "_id": object_id(), "landing_id": landing, "country": country,
+                        "betting_house_id": house_id, "order_index": order_index, "is_enabled": True,
+                    }))
+
+    return dims, docs
+
+
+# ===== EVENTS =====
+
+class EventFactory:
+    """Generates event documents consistent with the seeded dimensions"""
+
+    def __init__(self, dims: Dimensions, country_mix: Dict[str, float], rng: random.Random, object_id):
+        self.dims = dims
+        self.rng = rng
+        self.object_id = object_id
+        self.tipsters = Weighted.zipf(dims.tipsters, dims.tipster_exponent)
+        self.houses = Weighted.zipf(list(dims.houses), dims.house_exponent)
+        self.countries = Weighted.from_mix(country_mix)
+        self.hours = Weighted(range(24), HOUR_WEIGHTS)
+        self.order_statuses = Weighted.from_mix(ORDER_STATUSES)
+        self.conversion_events = Weighted.from_mix(CONVERSION_EVENTS)
+        self.conversion_statuses = Weighted.from_mix(CONVERSION_STATUSES)
+        self.providers = Weighted.from_mix(PAYMENT_PROVIDERS)
+        self.builders = {
+            "landing_impression_events": self.landing_impression,
+            "landing_click_events": self.landing_click,
+            "affiliate_click_events": self.affiliate_click,
+            "orders": self.order,
+            "affiliate_conversions": self.conversion,
+        }
+
+    def timestamp(self) -> datetime:
+        """Uniform day in the window, evening-heavy hour; more recent days get more traffic"""
+        day = int(self.dims.days * (self.rng.random() ** 0.7))
+        seconds = self.hours.pick(self.rng) * 3600 + self.rng.randrange(3600)
+        return self.dims.start + timedelta(days=day, seconds=seconds)
+
+    def _ip(self) -> str:
+        rng = self.rng
+        return f"{rng.randint(2, 223)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randint(1, 254)}"
+
+    def _landing_visit(self) -> Tuple[str, str, str]:
+        tipster = self.tipsters.pick(self.rng)
+        landing = self.rng.choice(self.dims.landings[tipster])
+        enabled = self.dims.landing_countries[landing]
+        country = self.countries.pick(self.rng)
+        if country not in enabled:
+            country = self.rng.choice(enabled)
+        return tipster, landing, country
+
+    def landing_impression(self) -> Dict:
+        tipster, landing, country = self._landing_visit()
+        return {
+            "tipster_id": tipster, "landing_id": landing, "country_context": country,
+            "anonymous_session_id": uuid.UUID(int=self.rng.getrandbits(128)).hex,
+            "ip_address": self._ip(), "user_agent": self.rng.choice(USER_AGENTS),
+            "referrer": self.rng.choice(REFERRERS), "created_at": self.timestamp(),
+        }
+
+    def landing_click(self) -> Dict:
+        tipster, landing, country = self._landing_visit()
+        house = self.rng.choice(self.dims.landing_items[(landing, country)])
+        meta = self.dims.houses[house]
+        click_id = str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+        return {
+            "click_id": click_id, "tipster_id": tipster, "landing_id": landing, "betting_house_id": house,
+            "country_context": country, "anonymous_session_id": uuid.UUID(int=self.rng.getrandbits(128)).hex,
+            "ip_address": self._ip(), "user_agent": self.rng.choice(USER_AGENTS),
+            "referrer": self.rng.choice(REFERRERS),
+            "redirect_url": f"{meta['url']}&{meta['param']}={tipster}_{click_id[:8]}",
+            "created_at": self.timestamp(),
+        }
+
+    def affiliate_click(self) -> Dict:
+        tipster = self.tipsters.pick(self.rng)
+        house = self.houses.pick(self.rng)
+        meta = self.dims.houses[house]
+        blocked = self.rng.random() < 0.02
+        clicked_at = self.timestamp()
+        return {
+            "tipster_id": tipster, "house_id": house, "ip_address": self._ip(),
+            "country_code": self.countries.pick(self.rng), "user_agent": self.rng.choice(USER_AGENTS),
+            "referer": self.rng.choice(REFERRERS), "was_blocked": blocked,
+            "block_reason": "COUNTRY_NOT_ALLOWED" if blocked else None,
+            "redirected_to": None if blocked else f"{meta['url']}&{meta['param']}={tipster}",
+            "clicked_at": clicked_at, "created_at": clicked_at,
+        }
+
+    def order(self) -> Dict:
+        tipster = self.tipsters.pick(self.rng)
+        product = self.rng.choice(self.dims.products[tipster])
+        amount = product["price"]
+        gateway_fee = int(amount * 0.029) + 25
+        platform_percent = self.rng.choice([10.0, 7.0])
+        platform_fee = int(amount * platform_percent / 100)
+        created_at = self.timestamp()
+        return {
+            "product_id": product["id"], "tipster_id": tipster,
+            "telegram_user_id": str(self.rng.randint(10 ** 8, 7 * 10 ** 9)),
+            "email_backup": f"client{self.rng.randrange(10 ** 7)}@load.antia.test",
+            "amount_cents": amount, "currency": "EUR", "payment_provider": self.providers.pick(self.rng),
+            "status": self.order_statuses.pick(self.rng),
+            "gateway_fee_cents": gateway_fee, "gateway_fee_percent": 2.9,
+            "platform_fee_cents": platform_fee, "platform_fee_percent": platform_percent,
+            "net_amount_cents": amount - gateway_fee - platform_fee, "base_currency": "EUR",
+            "created_at": created_at, "updated_at": created_at,
+        }
+
+    def conversion(self) -> Dict:
+        tipster = self.tipsters.pick(self.rng)
+        house = self.houses.pick(self.rng)
+        event_type = self.conversion_events.pick(self.rng)
+        status = self.conversion_statuses.pick(self.rng)
+        occurred_at = self.timestamp()
+        return {
+            "house_id": house, "tipster_id": tipster, "external_ref_id": uuid.UUID(int=self.rng.getrandbits(128)).hex,
+            "tipster_tracking_id": tipster, "country_code": self.countries.pick(self.rng),
+            "event_type": event_type, "status": status,
+            "rejection_reason": "DUPLICATE" if status == "REJECTED" else None,
+            "amount_cents": self.rng.choice([1000, 2000, 5000, 10000]) if event_type == "DEPOSIT" else None,
+            "currency": "EUR",
+            "commission_cents": self.dims.houses[house]["commission"] if status == "APPROVED" else None,
+            "occurred_at": occurred_at, "approved_at": occurred_at + timedelta(days=3) if status == "APPROVED" else None,
+            "imported_at": occurred_at + timedelta(days=1),
+            "created_at": occurred_at, "updated_at": occurred_at,
+        }
+
+    def build(self, collection: str) -> Dict:
+        doc = self.builders[collection]()
+        doc["_id"] = self.object_id()
+        doc["load_seed"] = self.dims.run_id
+        return doc
+
+
+def plan_events(total: int, mix: Dict[str, float]) -> Dict[str, int]:
+    weight = sum(mix.values())
+    return {collection: int(total * share / weight) for collection, share in mix.items()}
+
+
+def split_counts(counts: Dict[str, int], processes: int) -> List[Dict[str, int]]:
+    """Divide each collection's count as evenly as possible across workers"""
+    shares = [{} for _ in range(processes)]
+    for collection, count in counts.items():
+        base, extra = divmod(count, processes)
+        for index in range(processes):
+            shares[index][collection] = base + (1 if index < extra else 0)
+    return shares
+
+
+def _seed_worker(index: int, mongo_url: str, database: Optional[str], dims: Dimensions,
+                 country_mix: Dict[str, float], counts: Dict[str, int], batch_size: int,
+                 seed: Optional[int], progress):
+    from bson import ObjectId
+    from pymongo import MongoClient
+
+    rng = random.Random(None if seed is None else seed * 1000 + index + 1)
+    factory = EventFactory(dims, country_mix, rng, ObjectId)
+    client = MongoClient(mongo_url, w=1)
+    db = client[database] if database else client.get_default_database()
+    try:
+        for collection, count in counts.items():
+            target = db[collection]
+            remaining = count
+            while remaining > 0:
+                size = min(batch_size, remaining)
+                target.insert_many([factory.build(collection) for _ in range(size)],
+                                   ordered=False, bypass_document_validation=True)
+                remaining -= size
+                progress.put((collection, size))
+    finally:
+        client.close()
+
+
+def seed(mongo_url: str, database: Optional[str], events: int, tipsters: int, houses: int,
+         landings_per_tipster: int, days: int, processes: int, batch_size: int,
+         country_mix: Dict[str, float] = None, event_mix: Dict[str, float] = None,
+         run_id: str = None, seed_value: Optional[int] = None) -> Dict[str, int]:
+    """Insert dimensions, then fan event inserts out to worker processes; returns inserted counts"""
+    from bson import ObjectId
+    from pymongo import MongoClient
+
+    country_mix = country_mix or DEFAULT_COUNTRY_MIX
+    run_id = run_id or f"scale-{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    rng = random.Random(seed_value)
+
+    client = MongoClient(mongo_url, w=1)
+    db = client[database] if database else client.get_default_database()
+    dims, docs = build_dimensions(rng, run_id, tipsters, houses, landings_per_tipster, days, country_mix, ObjectId)
+    inserted: Dict[str, int] = {}
+    for collection, collection_docs in docs.items():
+        for start in range(0, len(collection_docs), batch_size):
+            db[collection].insert_many(collection_docs[start:start + batch_size], ordered=False)
+        inserted[collection] = len(collection_docs)
+        print(f"✅ {collection}: {len(collection_docs)}")
+    client.close()
+
+    counts = plan_events(events, event_mix or DEFAULT_EVENT_MIX)
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    progress = context.Queue()
+    workers = [
+        context.Process(target=_seed_worker, args=(index, mongo_url, database, dims, country_mix, share,
+                                                   batch_size, seed_value, progress))
+        for index, share in enumerate(split_counts(counts, processes))
+    ]
+    for worker in workers:
+        worker.start()
+
+    total = sum(counts.values())
+    done = 0
+    started = time.perf_counter()
+    last_report = started
+    while any(worker.is_alive() for worker in workers) or not progress.empty():
+        try:
+            collection, size = progress.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        inserted[collection] = inserted.get(collection, 0) + size
+        done += size
+        now = time.perf_counter()
+        if now - last_report >= 5 or done == total:
+            print(f"⏳ {done:,}/{total:,} events ({done / (now - started):,.0f} docs/s)")
+            last_report = now
+
+    for worker in workers:
+        worker.join()
+    failed = [index for index, worker in enumerate(workers) if worker.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Seeder workers failed: {failed}")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {done:,} events in {elapsed:.1f}s ({done / elapsed if elapsed else 0:,.0f} docs/s), run id {run_id}")
+    return inserted
+
+
+def drop_run(mongo_url: str, database: Optional[str], run_id: str) -> Dict[str, int]:
+    """Delete every document tagged with load_seed=run_id"""
+    from pymongo import MongoClient
+
+    client = MongoClient(mongo_url)
+    db = client[database] if database else client.get_default_database()
+    deleted = {}
+    for collection in list(DEFAULT_EVENT_MIX) + ["tipster_landing_items", "tipster_affiliate_landings",
+                                                 "products", "tipster_profiles", "users", "betting_houses"]:
+        deleted[collection] = db[collection].delete_many({"load_seed": run_id}).deleted_count
+        print(f"🗑️ {collection}: {deleted[collection]}")
+    client.close()
+    return deleted
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse "landing_click_events:0.5,orders:0.5" into a weight map"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition(":")
+        mix[name.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bulk-load a synthetic Antia dataset into MongoDB")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL") or os.environ.get("DATABASE_URL"),
+                        help="Connection string (default: $MONGO_URL or $DATABASE_URL)")
+    parser.add_argument("--database", help="Database name if not in the connection string")
+    parser.add_argument("--events", type=int, default=1_000_000, help="Total event documents across collections")
+    parser.add_argument("--event-mix", type=parse_mix, default=DEFAULT_EVENT_MIX)
+    parser.add_argument("--tipsters", type=int, default=200)
+    parser.add_argument("--houses", type=int, default=30)
+    parser.add_argument("--landings-per-tipster", type=int, default=3)
+    parser.add_argument("--days", type=int, default=90, help="Spread events over the last N days")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--run-id", help="Tag for the inserted documents (default: scale-<timestamp>)")
+    parser.add_argument("--drop-run", metavar="RUN_ID", help="Delete a previous run instead of seeding")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv: Sequence[str] = None):
+    args = build_parser().parse_args(argv)
+    if not args.mongo_url:
+        sys.exit("❌ --mongo-url (or MONGO_URL) is required")
+    try:
+        import pymongo  # noqa: F401
+    except ImportError:
+        sys.exit("❌ pymongo is required: pip install pymongo")
+
+    if args.drop_run:
+        drop_run(args.mongo_url, args.database, args.drop_run)
+        return
+
+    print(f"🌱 Seeding {args.events:,} events for {args.tipsters} tipsters / {args.houses} houses "
+          f"with {args.processes} processes")
+    seed(args.mongo_url, args.database, args.events, args.tipsters, args.houses, args.landings_per_tipster,
+         args.days, args.processes, args.batch_size, event_mix=args.event_mix, run_id=args.run_id,
+         seed_value=args.seed)
+
+
+if __name__ == "__main__":
+    main()
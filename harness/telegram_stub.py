@@ -0,0 +1,422 @@
+"""
+Local Telegram Bot API stand-in
+Implements the Bot API methods the backend and the testers call (sendMessage, createChatInviteLink,
+approveChatJoinRequest, getChatMember, banChatMember, ...) with configurable latency, Telegram-style
+429 retry_after throttling and failure injection, and records every call in memory for assertions.
+
+Point the backend at it with TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 and the testers with
+the same variable.
+
+Usage:
+    python -m harness.telegram_stub --port 8081 --latency-ms 40 --jitter-ms 20 --global-rate 30 --per-chat-rate 1
+
+Control endpoints (JSON):
+    GET  /_stub/calls?method=sendMessage&limit=100   recorded calls, newest last
+    GET  /_stub/stats                                per-method counters
+    POST /_stub/config                               update StubConfig fields at runtime
+    POST /_stub/reset                                clear recorded calls and counters
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_PORT = 8081
+DEFAULT_MAX_RECORDED_CALLS = 100_000
+
+# Methods that Telegram throttles as outgoing messages
+MESSAGE_METHODS = {"sendMessage", "sendPhoto", "copyMessage", "forwardMessage"}
+
+# Methods that do not take a chat_id
+CHATLESS_METHODS = {"getMe", "getUpdates", "setWebhook", "deleteWebhook", "getWebhookInfo"}
+
+STUB_BOT = {
+    "id": 8422601694,
+    "is_bot": True,
+    "first_name": "Antia",
+    "username": "Antiabetbot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": False,
+    "supports_inline_queries": False,
+}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+               500: "Internal Server Error", 502: "Bad Gateway"}
+
+
+@dataclass
+class StubConfig:
+    """Behaviour knobs; every field can be changed at runtime through POST /_stub/config"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    method_latency_ms: Dict[str, float] = field(default_factory=dict)
+    global_rate: float = 0.0          # messages per second across all chats (0 = unlimited)
+    per_chat_rate: float = 0.0        # messages per second per chat (0 = unlimited)
+    throttle_probability: float = 0.0  # chance of a spurious 429 on any call
+    retry_after: int = 1              # seconds reported in injected 429s
+    failure_rate: float = 0.0         # chance of an injected 500/502
+    method_failure_rate: Dict[str, float] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+
+@dataclass
+class CallRecord:
+    method: str
+    params: Dict[str, Any]
+    received_at: float
+    status: int
+    latency_ms: float
+
+
+class TokenBucket:
+    """Allows `rate` events per second with a burst of one second's worth"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class TelegramStub:
+    """In-process Bot API stand-in; use start()/stop() or `async with`"""
+
+    def __init__(self, config: StubConfig = None, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 max_recorded_calls: int = DEFAULT_MAX_RECORDED_CALLS):
+        self.config = config or StubConfig()
+        self.host = host
+        self.port = port
+        self.calls: Deque[CallRecord] = deque(maxlen=max_recorded_calls)
+        self.counters: Counter = Counter()
+        self.webhook_url = ""
+        self._random = random.Random(self.config.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._global_bucket: Optional[TokenBucket] = None
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._next_message_id = 1
+        self._reset_limits()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # ===== LIFECYCLE =====
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "TelegramStub":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ===== ASSERTION HELPERS =====
+
+    def calls_to(self, method: str) -> List[CallRecord]:
+        return [call for call in self.calls if call.method == method]
+
+    def count(self, method: str = None) -> int:
+        if method is None:
+            return sum(value for (name, status), value in self.counters.items())
+        return sum(value for (name, status), value in self.counters.items() if name == method)
+
+    def reset(self):
+        self.calls.clear()
+        self.counters.clear()
+        self._reset_limits()
+
+    def configure(self, **changes):
+        for key, value in changes.items():
+            if not hasattr(self.config, key):
+                raise ValueError(f"Unknown stub setting: {key}")
+            setattr(self.config, key, value)
+        if "seed" in changes:
+            self._random = random.Random(self.config.seed)
+        self._reset_limits()
+
+    def _reset_limits(self):
+        self._global_bucket = TokenBucket(self.config.global_rate) if self.config.global_rate > 0 else None
+        self._chat_buckets = {}
+
+    # ===== HTTP =====
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = b""
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    body = await reader.readexactly(length)
+
+                status, payload = await self.dispatch(method, target, headers, body)
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, http_method: str, target: str, headers: Dict[str, str],
+                       body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        params: Dict[str, Any] = dict(parse_qsl(url.query))
+        if body:
+            content_type = headers.get("content-type", "")
+            if "json" in content_type:
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body.decode()))
+
+        if url.path.startswith("/_stub/"):
+            return self._control(http_method, url.path, params)
+
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or not parts[0].startswith("bot"):
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        return await self.call(parts[1], params)
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Tuple[int, Dict]:
+        """Handle one Bot API call: latency, throttling, failures, then the method itself"""
+        received_at = time.time()
+        config = self.config
+
+        latency = config.method_latency_ms.get(method, config.latency_ms)
+        if config.jitter_ms:
+            latency += self._random.uniform(0, config.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000.0)
+
+        status, payload = self._throttle(method, params) or self._inject_failure(method) \
+            or self._invoke(method, params)
+
+        self.counters[(method, status)] += 1
+        self.calls.append(CallRecord(method, params, received_at, status, latency))
+        return status, payload
+
+    def _throttle(self, method: str, params: Dict[str, Any]) -> Optional[Tuple[int, Dict]]:
+        wait = 0.0
+        if self.config.throttle_probability and self._random.random() < self.config.throttle_probability:
+            wait = self.config.retry_after
+        elif method in MESSAGE_METHODS:
+            if self._global_bucket is not None:
+                wait = self._global_bucket.take()
+            if not wait and self.config.per_chat_rate > 0:
+                chat_id = str(params.get("chat_id", ""))
+                bucket = self._chat_buckets.get(chat_id)
+                if bucket is None:
+                    bucket = self._chat_buckets[chat_id] = TokenBucket(self.config.per_chat_rate)
+                wait = bucket.take()
+
+        if not wait:
+            return None
+        retry_after = max(1, int(wait + 0.999))
+        return 429, {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after}",
+            "parameters": {"retry_after": retry_after},
+        }
+
+    def _inject_failure(self, method: str) -> Optional[Tuple[int, Dict]]:
+        rate = self.config.method_failure_rate.get(method, self.config.failure_rate)
+        if not rate or self._random.random() >= rate:
+            return None
+        status = self._random.choice([500, 502])
+        return status, {"ok": False, "error_code": status, "description": STATUS_TEXT[status]}
+
+    # ===== BOT API METHODS =====
+
+    def _invoke(self, method: str, params: Dict[str, Any]) -> Tuple[int, Dict]:
+        handler = getattr(self, f"_api_{method}", None)
+        if handler is None:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+        if method not in CHATLESS_METHODS and "chat_id" not in params:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: chat_id is empty"}
+        return 200, {"ok": True, "result": handler(params)}
+
+    @staticmethod
+    def _chat(chat_id: Any) -> Dict:
+        chat_id = int(chat_id) if str(chat_id).lstrip("-").isdigit() else chat_id
+        if isinstance(chat_id, int) and chat_id > 0:
+            return {"id": chat_id, "type": "private", "first_name": "User"}
+        return {"id": chat_id, "type": "channel", "title": f"Chat {chat_id}"}
+
+    def _invite_link(self, params: Dict[str, Any]) -> Dict:
+        link = {
+            "invite_link": f"https://t.me/+stub{self._random.getrandbits(48):012x}",
+            "creator": STUB_BOT,
+            "creates_join_request": str(params.get("creates_join_request", "false")).lower() == "true",
+            "is_primary": False,
+            "is_revoked": False,
+        }
+        for key in ("name", "expire_date", "member_limit"):
+            if key in params:
+                link[key] = int(params[key]) if key != "name" else params[key]
+        return link
+
+    def _api_getMe(self, params):
+        return STUB_BOT
+
+    def _api_sendMessage(self, params):
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        return {"message_id": message_id, "from": STUB_BOT, "chat": self._chat(params["chat_id"]),
+                "date": int(time.time()), "text": params.get("text", "")}
+
+    def _api_getChat(self, params):
+        return self._chat(params["chat_id"])
+
+    def _api_getChatMember(self, params):
+        return {"user": {"id": int(params.get("user_id", 0)), "is_bot": False, "first_name": "User"},
+                "status": "member"}
+
+    def _api_getChatAdministrators(self, params):
+        return [{"user": STUB_BOT, "status": "administrator", "can_invite_users": True}]
+
+    def _api_exportChatInviteLink(self, params):
+        return self._invite_link(params)["invite_link"]
+
+    def _api_createChatInviteLink(self, params):
+        return self._invite_link(params)
+
+    def _api_approveChatJoinRequest(self, params):
+        return True
+
+    def _api_declineChatJoinRequest(self, params):
+        return True
+
+    def _api_banChatMember(self, params):
+        return True
+
+    def _api_unbanChatMember(self, params):
+        return True
+
+    def _api_setWebhook(self, params):
+        self.webhook_url = params.get("url", "")
+        return True
+
+    def _api_deleteWebhook(self, params):
+        self.webhook_url = ""
+        return True
+
+    def _api_getWebhookInfo(self, params):
+        return {"url": self.webhook_url, "has_custom_certificate": False, "pending_update_count": 0,
+                "max_connections": 40}
+
+    def _api_getUpdates(self, params):
+        return []
+
+    # ===== CONTROL ENDPOINTS =====
+
+    def _control(self, http_method: str, path: str, params: Dict[str, Any]) -> Tuple[int, Dict]:
+        if path == "/_stub/calls":
+            calls = self.calls_to(params["method"]) if params.get("method") else list(self.calls)
+            limit = int(params.get("limit", 100))
+            return 200, {"ok": True, "result": [asdict(call) for call in calls[-limit:]]}
+        if path == "/_stub/stats":
+            stats: Dict[str, Dict[str, int]] = {}
+            for (method, status), value in self.counters.items():
+                stats.setdefault(method, {})[str(status)] = value
+            return 200, {"ok": True, "result": stats}
+        if path == "/_stub/reset" and http_method == "POST":
+            self.reset()
+            return 200, {"ok": True, "result": True}
+        if path == "/_stub/config":
+            if http_method == "POST":
+                try:
+                    self.configure(**params)
+                except ValueError as e:
+                    return 400, {"ok": False, "error_code": 400, "description": str(e)}
+            return 200, {"ok": True, "result": asdict(self.config)}
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Local Telegram Bot API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--global-rate", type=float, default=0.0, help="Messages/s before 429s (0 = unlimited)")
+    parser.add_argument("--per-chat-rate", type=float, default=0.0, help="Messages/s per chat before 429s")
+    parser.add_argument("--throttle-probability", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        global_rate=args.global_rate,
+        per_chat_rate=args.per_chat_rate,
+        throttle_probability=args.throttle_probability,
+        retry_after=args.retry_after,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    stub = TelegramStub(config, host=args.host, port=args.port)
+    print(f"🤖 Telegram Bot API stand-in listening on {stub.base_url}")
+    try:
+        asyncio.run(stub.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+JWT token store shared by the testers
+Login responses are cached per role and credential, in process and optionally on disk
+(ANTIA_TOKEN_CACHE=/path/to/tokens.json), and reused until the token's exp claim is close,
+so suites and load runs do not pay the bcrypt compare in /auth/login on every run.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+TOKEN_CACHE_ENV = "ANTIA_TOKEN_CACHE"
+
+# Refresh this many seconds before exp so a token never expires mid-suite
+DEFAULT_REFRESH_MARGIN = 300
+
+
+def decode_jwt_claims(token: str) -> Dict:
+    """Decode a JWT payload without verifying the signature; {} if it is not a JWT"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except (IndexError, ValueError):
+        return {}
+
+
+def credential_key(role: str, email: str, password: str) -> str:
+    """Cache key for one login; a changed password never reuses the old token"""
+    fingerprint = hashlib.sha256(f"{email}\0{password}".encode()).hexdigest()[:16]
+    return f"{role}:{email}:{fingerprint}"
+
+
+class TokenStore:
+    """Login responses keyed by credential, valid until exp - refresh_margin"""
+
+    def __init__(self, path: Optional[str] = None, refresh_margin: float = DEFAULT_REFRESH_MARGIN):
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict] = {}
+        self._load()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached login response for key, or None when missing or close to expiry"""
+        entry = self._entries.get(key)
+        if entry is not None and entry["exp"] - self.refresh_margin > time.time():
+            self.hits += 1
+            return entry["response"]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, response: Dict):
+        """Remember a login response; tokens without an exp claim are not cached"""
+        exp = decode_jwt_claims(response.get("access_token") or "").get("exp")
+        if not exp:
+            return
+        self._entries[key] = {"exp": exp, "response": response}
+        self._save()
+
+    def invalidate(self, key: str, token: Optional[str] = None):
+        """Drop a token the backend rejected (e.g. after JWT_SECRET rotation)
+
+        With token, the entry is only dropped while it still holds that token, so a late
+        401 for the old token does not throw away a fresh login.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if token is not None and entry["response"].get("access_token") != token:
+            return
+        del self._entries[key]
+        self._save()
+
+    def clear(self):
+        self._entries.clear()
+        self._save()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        self._entries = {key: entry for key, entry in entries.items() if entry.get("exp", 0) > now}
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+
+_default_store: Optional[TokenStore] = None
+
+
+def default_token_store() -> TokenStore:
+    """Process-wide store; persisted to $ANTIA_TOKEN_CACHE when that is set"""
+    global _default_store
+    if _default_store is None:
+        _default_store = TokenStore(os.environ.get(TOKEN_CACHE_ENV))
+    return _default_store
@@ -0,0 +1,380 @@
+"""
+Telegram webhook update replayer
+Streams a corpus of Telegram updates into /api/telegram/webhook at a configurable rate,
+concurrency and burst pattern, and reports the ack-latency distribution per update type.
+
+Telegram redelivers updates whose webhook call is slow or fails and then throttles the bot,
+so the number to watch is the p99 ack latency while bursts are in flight.
+
+Usage:
+    python -m harness.webhook_replay --rate 50 --duration 30 --burst-size 200 --burst-every 10
+    python -m harness.webhook_replay --corpus updates.jsonl --rate 100
+"""
+
+import argparse
+import asyncio
+import functools
+import heapq
+import itertools
+import json
+import random
+import secrets
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .client import API_BASE, ApiClient
+from .load import EndpointStats, OpenLoopRunner, Operation, format_report
+from .workers import WorkerPlan, format_timeline, run_workers
+
+WEBHOOK_PATH = "/telegram/webhook"
+BOT_USER = {"id": 8422601694, "is_bot": True, "first_name": "Antia", "username": "Antiabetbot"}
+
+# Relative frequency of each update type in production traffic
+DEFAULT_UPDATE_MIX = {
+    "message": 0.25,
+    "start": 0.20,
+    "group_message": 0.20,
+    "channel_post": 0.15,
+    "callback_query": 0.10,
+    "chat_join_request": 0.07,
+    "my_chat_member": 0.03,
+}
+
+PLAIN_TEXTS = ["hola", "info", "¿cómo pago?", "gracias", "ayuda", "https://t.me/Antiabetbot?start=x"]
+CALLBACK_DATA = ["view_products", "buy", "support", "channel_access"]
+
+
+def _object_id(rng: random.Random) -> str:
+    return "%024x" % rng.getrandbits(96)
+
+
+class UpdateCorpus:
+    """Synthetic Telegram updates covering every type handleUpdate routes
+
+    Chats and users are drawn from small fixed pools so per-chat ordering and repeat
+    users behave like real traffic; update_id is unique and increasing.
+    """
+
+    def __init__(self, mix: Dict[str, float] = None, product_ids: Sequence[str] = (),
+                 order_ids: Sequence[str] = (), users: int = 5000, channels: int = 20,
+                 groups: int = 10, first_update_id: int = None, update_id_step: int = 1,
+                 seed: Optional[int] = None):
+        mix = mix or DEFAULT_UPDATE_MIX
+        unknown = set(mix) - set(self.BUILDERS)
+        if unknown:
+            raise ValueError(f"Unknown update types: {sorted(unknown)}")
+
+        self.random = random.Random(seed)
+        self.kinds = list(mix)
+        self._kind_weights = list(itertools.accumulate(mix[kind] for kind in self.kinds))
+        self.product_ids = list(product_ids) or [_object_id(self.random) for _ in range(5)]
+        self.order_ids = list(order_ids) or [_object_id(self.random) for _ in range(5)]
+        self.user_ids = [self.random.randint(10 ** 8, 7 * 10 ** 9) for _ in range(users)]
+        self.channel_ids = [-1001000000000 - i for i in range(channels)]
+        self.group_ids = [-1002000000000 - i for i in range(groups)]
+        self.update_ids = itertools.count(first_update_id or self.random.randint(10 ** 8, 9 * 10 ** 8),
+                                          update_id_step)
+        self.message_ids = itertools.count(1)
+
+    # ===== BUILDERS =====
+
+    def _user(self) -> Dict:
+        user_id = self.random.choice(self.user_ids)
+        return {"id": user_id, "is_bot": False, "first_name": "Load", "username": f"load_{user_id}",
+                "language_code": "es"}
+
+    def _channel(self) -> Dict:
+        # Skewed towards the first channels: a few busy channels, a long tail of quiet ones
+        index = min(int(self.random.paretovariate(1.2)) - 1, len(self.channel_ids) - 1)
+        chat_id = self.channel_ids[index]
+        return {"id": chat_id, "title": f"Load Channel {-chat_id % 1000}", "type": "channel"}
+
+    def _private_message(self, text: str) -> Dict:
+        user = self._user()
+        return {
+            "message_id": next(self.message_ids),
+            "from": user,
+            "chat": {"id": user["id"], "first_name": user["first_name"], "username": user["username"],
+                     "type": "private"},
+            "date": int(time.time()),
+            "text": text,
+        }
+
+    def build_message(self) -> Dict:
+        return {"message": self._private_message(self.random.choice(PLAIN_TEXTS))}
+
+    def build_start(self) -> Dict:
+        payload = self.random.choice([
+            "",
+            f" product_{self.random.choice(self.product_ids)}",
+            f" order_{self.random.choice(self.order_ids)}",
+        ])
+        message = self._private_message(f"/start{payload}")
+        if payload:
+            message["entities"] = [{"offset": 0, "length": 6, "type": "bot_command"}]
+        return {"message": message}
+
+    def build_group_message(self) -> Dict:
+        chat_id = self.random.choice(self.group_ids)
+        return {"message": {
+            "message_id": next(self.message_ids),
+            "from": self._user(),
+            "chat": {"id": chat_id, "title": f"Load Group {-chat_id % 1000}", "type": "supergroup"},
+            "date": int(time.time()),
+            "text": self.random.choice(PLAIN_TEXTS),
+        }}
+
+    def build_channel_post(self) -> Dict:
+        return {"channel_post": {
+            "message_id": next(self.message_ids),
+            "chat": self._channel(),
+            "date": int(time.time()),
+            "text": "📊 Pronóstico del día: Real Madrid - Barcelona, over 2.5 @1.85",
+        }}
+
+    def build_my_chat_member(self) -> Dict:
+        old_status, new_status = self.random.choice([("left", "administrator"), ("administrator", "left")])
+        return {"my_chat_member": {
+            "chat": self._channel(),
+            "from": self._user(),
+            "date": int(time.time()),
+            "old_chat_member": {"user": BOT_USER, "status": old_status},
+            "new_chat_member": {"user": BOT_USER, "status": new_status, "can_invite_users": True},
+        }}
+
+    def build_chat_join_request(self) -> Dict:
+        user = self._user()
+        return {"chat_join_request": {
+            "chat": self._channel(),
+            "from": user,
+            "user_chat_id": user["id"],
+            "date": int(time.time()),
+            "invite_link": {
+                "invite_link": f"https://t.me/+{secrets.token_urlsafe(12)}",
+                "creator": BOT_USER,
+                "creates_join_request": True,
+                "is_primary": False,
+                "is_revoked": False,
+            },
+        }}
+
+    def build_callback_query(self) -> Dict:
+        message = self._private_message("Elige una opción")
+        return {"callback_query": {
+            "id": str(self.random.getrandbits(63)),
+            "from": message["from"],
+            "message": message,
+            "chat_instance": str(self.random.getrandbits(63)),
+            "data": self.random.choice(CALLBACK_DATA),
+        }}
+
+    BUILDERS = {
+        "message": build_message,
+        "start": build_start,
+        "group_message": build_group_message,
+        "channel_post": build_channel_post,
+        "my_chat_member": build_my_chat_member,
+        "chat_join_request": build_chat_join_request,
+        "callback_query": build_callback_query,
+    }
+
+    def next_update(self) -> Tuple[str, Dict]:
+        """Return (update type, update) with a fresh update_id"""
+        kind = self.random.choices(self.kinds, cum_weights=self._kind_weights)[0]
+        update = self.BUILDERS[kind](self)
+        return kind, {"update_id": next(self.update_ids), **update}
+
+
+def update_kind(update: Dict) -> str:
+    """Classify a recorded update the way handleUpdate routes it"""
+    message = update.get("message")
+    if message:
+        if (message.get("text") or "").startswith("/start"):
+            return "start"
+        if message.get("chat", {}).get("type") in ("group", "supergroup"):
+            return "group_message"
+        return "message"
+    for kind in ("channel_post", "my_chat_member", "chat_join_request", "callback_query"):
+        if kind in update:
+            return kind
+    return "other"
+
+
+def load_corpus(path: str) -> List[Dict]:
+    """Read recorded updates from a JSON Lines file (one update per line)"""
+    updates = []
+    with open(path, encoding="utf-8") as corpus_file:
+        for line in corpus_file:
+            line = line.strip()
+            if line:
+                updates.append(json.loads(line))
+    if not updates:
+        raise ValueError(f"Corpus {path} is empty")
+    return updates
+
+
+class RecordedUpdates:
+    """Cycles through a recorded corpus, renumbering update_id unless told to keep it"""
+
+    def __init__(self, updates: List[Dict], keep_update_ids: bool = False, update_id_offset: int = 0,
+                 update_id_step: int = 1):
+        self.updates = updates
+        self.keep_update_ids = keep_update_ids
+        self._cycle = itertools.cycle(updates)
+        self._update_ids = itertools.count(max(u.get("update_id", 0) for u in updates) + 1 + update_id_offset,
+                                           update_id_step)
+
+    def next_update(self) -> Tuple[str, Dict]:
+        update = next(self._cycle)
+        if not self.keep_update_ids:
+            update = {**update, "update_id": next(self._update_ids)}
+        return update_kind(update), update
+
+
+def burst_offsets(rate: float, duration: float, warmup: float = 0.0, burst_size: int = 0,
+                  burst_every: float = 0.0) -> Iterator[float]:
+    """Constant-rate arrivals with burst_size extra updates landing together every burst_every seconds"""
+    total = warmup + duration
+    steady = (i / rate for i in range(int(rate * total)))
+    if burst_size <= 0 or burst_every <= 0:
+        return steady
+    bursts = (
+        warmup + k * burst_every
+        for k in range(1, int(duration / burst_every) + 1)
+        for _ in range(burst_size)
+    )
+    return heapq.merge(steady, bursts)
+
+
+class WebhookScenario:
+    """Webhook calls for each update from source, on the steady-plus-bursts schedule"""
+
+    def __init__(self, source, burst_size: int = 0, burst_every: float = 0.0):
+        self.source = source
+        self.burst_size = burst_size
+        self.burst_every = burst_every
+
+    def next_operation(self) -> Operation:
+        kind, update = self.source.next_update()
+        return Operation(f"webhook {kind}", "POST", WEBHOOK_PATH, update)
+
+    def arrival_offsets(self, rate: float, duration: float, warmup: float = 0.0) -> Iterator[float]:
+        return burst_offsets(rate, duration, warmup, self.burst_size, self.burst_every)
+
+
+async def replay(api: ApiClient, source, rate: float, duration: float, warmup: float = 0.0,
+                 burst_size: int = 0, burst_every: float = 0.0,
+                 max_in_flight: int = 64) -> Tuple[Dict[str, EndpointStats], float]:
+    """Send updates from source.next_update() at rate (plus bursts); returns (stats per type, elapsed)"""
+    runner = OpenLoopRunner(api, rate, duration, warmup=warmup, max_in_flight=max_in_flight)
+    scenario = WebhookScenario(source, burst_size, burst_every)
+    stats = await runner.run(scenario.next_operation, scenario.arrival_offsets(rate, duration, warmup))
+    return stats, runner.elapsed
+
+
+def worker_scenario(args: argparse.Namespace, processes: int, first_update_id: int,
+                    index: int) -> WebhookScenario:
+    """Per-process scenario for run_workers; update_ids interleave so they stay unique across workers"""
+    if args.corpus:
+        source = RecordedUpdates(load_corpus(args.corpus), keep_update_ids=args.keep_update_ids,
+                                 update_id_offset=index, update_id_step=processes)
+    else:
+        product_ids = [p for p in args.product_ids.split(",") if p]
+        source = UpdateCorpus(args.mix, product_ids=product_ids, first_update_id=first_update_id + index,
+                              update_id_step=processes,
+                              seed=None if args.seed is None else args.seed + index)
+    return WebhookScenario(source, args.burst_size, args.burst_every)
+
+
+def overall_stats(stats: Dict[str, EndpointStats]) -> EndpointStats:
+    """All update types folded into one distribution"""
+    combined = EndpointStats("webhook (all updates)")
+    for endpoint_stats in stats.values():
+        combined.merge(endpoint_stats)
+    return combined
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse "message:0.5,channel_post:0.5" into a weight map"""
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition(":")
+        mix[kind.strip()] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Replay Telegram updates into the webhook endpoint")
+    parser.add_argument("--api-base", default=API_BASE)
+    parser.add_argument("--rate", type=float, default=20.0, help="Steady updates per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--burst-size", type=int, default=0, help="Extra updates sent together in each burst")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="Seconds between bursts")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum webhook calls in flight")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-call timeout in seconds")
+    parser.add_argument("--corpus", help="JSON Lines file of recorded updates (default: synthetic)")
+    parser.add_argument("--keep-update-ids", action="store_true",
+                        help="Send recorded update_ids unchanged (exercises redelivery handling)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_UPDATE_MIX,
+                        help="Synthetic update weights, e.g. message:0.5,channel_post:0.5")
+    parser.add_argument("--product-ids", default="", help="Comma-separated product ids for /start deep links")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Worker processes sharing the rate (0 = one per core)")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def main(argv: Sequence[str] = None):
+    args = build_parser().parse_args(argv)
+    if args.processes != 1:
+        return main_multiprocess(args)
+
+    if args.corpus:
+        source = RecordedUpdates(load_corpus(args.corpus), keep_update_ids=args.keep_update_ids)
+    else:
+        product_ids = [p for p in args.product_ids.split(",") if p]
+        source = UpdateCorpus(args.mix, product_ids=product_ids, seed=args.seed)
+
+    async def run():
+        async with ApiClient(args.api_base, timeout=args.timeout, max_connections=args.concurrency,
+                             max_keepalive=args.concurrency) as api:
+            return await replay(api, source, args.rate, args.duration, warmup=args.warmup,
+                                burst_size=args.burst_size, burst_every=args.burst_every,
+                                max_in_flight=args.concurrency)
+
+    print(f"🚀 Webhook replay: {args.rate:g} updates/s for {args.duration:g}s"
+          + (f", bursts of {args.burst_size} every {args.burst_every:g}s" if args.burst_size else "")
+          + f" against {args.api_base}{WEBHOOK_PATH}")
+    stats, elapsed = asyncio.run(run())
+
+    combined = overall_stats(stats)
+    print(format_report({**stats, combined.endpoint: combined}, elapsed, title="WEBHOOK ACK LATENCY"))
+    print(f"\np99 ack latency: {combined.latency.value_at_percentile(99) / 1000.0:.1f} ms")
+    sys.exit(1 if combined.failures else 0)
+
+
+def main_multiprocess(args: argparse.Namespace):
+    plan = WorkerPlan(args.api_base, args.rate, args.duration, warmup=args.warmup,
+                      processes=args.processes, max_in_flight=args.concurrency,
+                      connections=args.concurrency, timeout=args.timeout)
+    first_update_id = random.Random(args.seed).randint(10 ** 8, 9 * 10 ** 8)
+    factory = functools.partial(worker_scenario, args, plan.processes, first_update_id)
+
+    print(f"🚀 Webhook replay: {args.rate:g} updates/s for {args.duration:g}s"
+          + (f", bursts of {args.burst_size} every {args.burst_every:g}s" if args.burst_size else "")
+          + f" against {args.api_base}{WEBHOOK_PATH} across {plan.processes} processes")
+    report = run_workers(plan, factory)
+    for error in report.errors:
+        print(f"[ERROR] Worker failed:\n{error}")
+
+    combined = overall_stats(report.stats)
+    print(format_timeline(report.timeline, plan.interval))
+    print(format_report({**report.stats, combined.endpoint: combined}, report.elapsed, title="WEBHOOK ACK LATENCY"))
+    print(f"\np99 ack latency: {combined.latency.value_at_percentile(99) / 1000.0:.1f} ms")
+    sys.exit(1 if combined.failures or report.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Multiprocess load coordinator
+One Python process cannot saturate the backend (GIL, JSON encoding), so the arrival schedule
+is split round-robin across N worker processes, each running its own event loop and
+connection pool. Workers stream sparse histogram snapshots back over a pipe once per
+interval; the coordinator merges them into totals and a per-second timeline.
+
+Used by the --processes option of harness.landing_load and harness.webhook_replay.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import time
+import traceback
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, Iterable, List
+
+from .client import ApiClient
+from .load import EndpointStats, OpenLoopRunner, format_percentiles, merge_stats
+
+DEFAULT_SNAPSHOT_INTERVAL = 1.0
+
+
+@dataclass
+class WorkerPlan:
+    """Load shape shared by every worker; rates and limits are totals across workers"""
+    api_base: str
+    rate: float
+    duration: float
+    warmup: float = 0.0
+    processes: int = 0
+    max_in_flight: int = 256
+    connections: int = 100
+    timeout: float = 30
+    interval: float = DEFAULT_SNAPSHOT_INTERVAL
+
+    def __post_init__(self):
+        if self.processes <= 0:
+            self.processes = os.cpu_count() or 1
+
+    def per_worker(self, total: int) -> int:
+        return max(1, total // self.processes)
+
+
+@dataclass
+class WorkerReport:
+    """Merged outcome of a multiprocess run"""
+    stats: Dict[str, EndpointStats] = field(default_factory=dict)
+    timeline: Dict[int, Dict[str, EndpointStats]] = field(default_factory=dict)
+    elapsed: float = 0.0
+    sent: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def _snapshot(stats: Dict[str, EndpointStats]) -> Dict[str, Dict]:
+    return {endpoint: endpoint_stats.to_dict() for endpoint, endpoint_stats in stats.items()}
+
+
+def _restore(snapshot: Dict[str, Dict]) -> Dict[str, EndpointStats]:
+    return {endpoint: EndpointStats.from_dict(data) for endpoint, data in snapshot.items()}
+
+
+async def _run_worker(index: int, plan: WorkerPlan, scenario_factory: Callable[[int], Any],
+                      conn: Connection, barrier):
+    scenario = scenario_factory(index)
+    async with ApiClient(plan.api_base, timeout=plan.timeout,
+                         max_connections=plan.per_worker(plan.connections),
+                         max_keepalive=plan.per_worker(plan.connections)) as api:
+        prepare = getattr(scenario, "prepare", None)
+        if prepare is not None:
+            await prepare(api)
+
+        runner = OpenLoopRunner(api, plan.rate / plan.processes, plan.duration, warmup=plan.warmup,
+                                max_in_flight=plan.per_worker(plan.max_in_flight))
+
+        # Every worker walks the same full schedule and keeps every Nth arrival
+        schedule = getattr(scenario, "arrival_offsets", None)
+        offsets: Iterable[float] = (
+            schedule(plan.rate, plan.duration, plan.warmup) if schedule is not None
+            else (i / plan.rate for i in range(int(plan.rate * (plan.warmup + plan.duration))))
+        )
+        offsets = itertools.islice(offsets, index, None, plan.processes)
+
+        # Start together so per-second buckets line up across workers
+        await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+        run = asyncio.ensure_future(runner.run(scenario.next_operation, offsets))
+
+        # Snapshot on fixed interval boundaries measured from the end of warmup
+        boundary = 1
+        while not run.done():
+            if runner.measure_from is None:
+                await asyncio.wait({run}, timeout=0.01)
+                continue
+            delay = runner.measure_from + boundary * plan.interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.wait({run}, timeout=delay)
+            stats = runner.take_stats()
+            if stats:
+                conn.send(("interval", boundary - 1, _snapshot(stats)))
+            if not run.done():
+                boundary += 1
+
+        await run
+        conn.send(("done", runner.sent, runner.elapsed))
+
+
+def _worker_main(index: int, plan: WorkerPlan, scenario_factory: Callable[[int], Any],
+                 conn: Connection, barrier):
+    try:
+        asyncio.run(_run_worker(index, plan, scenario_factory, conn, barrier))
+    except BaseException:
+        barrier.abort()
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def run_workers(plan: WorkerPlan, scenario_factory: Callable[[int], Any]) -> WorkerReport:
+    """Fork plan.processes workers, each driving scenario_factory(worker_index), and merge their stats
+
+    The scenario needs next_operation(); optional async prepare(api) runs once per worker
+    before the start barrier, and optional arrival_offsets(rate, duration, warmup) replaces
+    the constant-rate schedule. scenario_factory must be picklable where fork is unavailable.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    barrier = context.Barrier(plan.processes)
+
+    connections, processes = [], []
+    for index in range(plan.processes):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_worker_main, args=(index, plan, scenario_factory, sender, barrier),
+                                  daemon=True)
+        process.start()
+        sender.close()
+        connections.append(receiver)
+        processes.append(process)
+
+    report = WorkerReport()
+    open_connections = list(connections)
+    while open_connections:
+        for conn in wait(open_connections):
+            try:
+                message = conn.recv()
+            except EOFError:
+                open_connections.remove(conn)
+                continue
+
+            kind = message[0]
+            if kind == "interval":
+                _, second, snapshot = message
+                stats = _restore(snapshot)
+                merge_stats(report.timeline.setdefault(second, {}), stats)
+                merge_stats(report.stats, stats)
+            elif kind == "done":
+                _, sent, elapsed = message
+                report.sent += sent
+                report.elapsed = max(report.elapsed, elapsed)
+            elif kind == "error":
+                report.errors.append(message[1])
+
+    for process in processes:
+        process.join()
+    return report
+
+
+def format_timeline(timeline: Dict[int, Dict[str, EndpointStats]],
+                    interval: float = DEFAULT_SNAPSHOT_INTERVAL) -> str:
+    """Per-interval throughput, error rate and merged percentiles across all endpoints"""
+    lines = ["=" * 60, "📈 PER-SECOND TIMELINE (all workers)", "=" * 60]
+    for second in sorted(timeline):
+        combined = EndpointStats("all")
+        for endpoint_stats in timeline[second].values():
+            combined.merge(endpoint_stats)
+        latency = combined.latency.summary()
+        error_rate = combined.failures / latency["count"] * 100 if latency["count"] else 0.0
+        lines.append(f"t={second * interval:>5.0f}s  {latency['count'] / interval:>8.1f} req/s  "
+                     f"errors {error_rate:5.2f}%  " + format_percentiles(latency))
+    return "\n".join(lines)
@@ -6,11 +6,13 @@ Tests the new system where:
 2. Tipsters create their own campaigns selecting houses
 """
 
-import requests
+import asyncio
 import json
 import sys
 from typing import Dict, Any, Optional
 
+from harness import BaseTester
+
 # Configuration
 BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -21,76 +23,20 @@ ADMIN_PASSWORD = "SuperAdmin123!"
 TIPSTER_EMAIL = "fausto.perez@antia.com"
 TIPSTER_PASSWORD = "Tipster123!"
 
-class NewAffiliateTester:
+class NewAffiliateTester(BaseTester):
     def __init__(self):
-        self.session = requests.Session()
+        super().__init__(API_BASE)
         self.admin_token = None
         self.tipster_token = None
         self.test_campaign_id = None
         self.test_house_id = None
         
-    def log(self, message: str, level: str = "INFO"):
-        """Log test messages"""
-        print(f"[{level}] {message}")
-        
-    def make_request(self, method: str, endpoint: str, data: Dict = None, 
-                    headers: Dict = None, token: str = None) -> requests.Response:
-        """Make HTTP request with proper headers"""
-        url = f"{API_BASE}{endpoint}"
-        
-        # Default headers
-        req_headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        
-        # Add auth header if token provided
-        if token:
-            req_headers["Authorization"] = f"Bearer {token}"
-            
-        # Merge with provided headers
-        if headers:
-            req_headers.update(headers)
-            
-        self.log(f"Making {method} request to {url}")
-        if data:
-            self.log(f"Request data: {json.dumps(data, indent=2)}")
-            
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data if data else None,
-                headers=req_headers,
-                timeout=30
-            )
-            
-            self.log(f"Response status: {response.status_code}")
-            
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
-            except:
-                self.log(f"Response text: {response.text}")
-                
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {str(e)}", "ERROR")
-            raise
-
-    def test_admin_login(self) -> bool:
+    async def test_admin_login(self) -> bool:
         """Test admin authentication"""
         self.log("=== Testing Admin Authentication ===")
         
-        login_data = {
-            "email": ADMIN_EMAIL,
-            "password": ADMIN_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data)
+            response = await self.login("admin", ADMIN_EMAIL, ADMIN_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -111,17 +57,12 @@ class NewAffiliateTester:
             self.log(f"❌ Admin login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_login(self) -> bool:
+    async def test_tipster_login(self) -> bool:
         """Test tipster authentication"""
         self.log("=== Testing Tipster Authentication ===")
         
-        login_data = {
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data)
+            response = await self.login("tipster", TIPSTER_EMAIL, TIPSTER_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -142,12 +83,12 @@ class NewAffiliateTester:
             self.log(f"❌ Tipster login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_betting_houses(self) -> bool:
+    async def test_admin_betting_houses(self) -> bool:
         """Test GET /api/admin/affiliate/houses?includeInactive=true"""
         self.log("=== Testing Admin - Betting Houses ===")
         
         try:
-            response = self.make_request("GET", "/admin/affiliate/houses?includeInactive=true", token=self.admin_token)
+            response = await self.make_request("GET", "/admin/affiliate/houses?includeInactive=true", token=self.admin_token)
             
             if response.status_code == 200:
                 houses = response.json()
@@ -186,12 +127,12 @@ class NewAffiliateTester:
             self.log(f"❌ Admin betting houses test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_houses_for_country(self) -> bool:
+    async def test_tipster_houses_for_country(self) -> bool:
         """Test GET /api/tipster/landings/houses/ES"""
         self.log("=== Testing Tipster - Get Available Houses for Spain ===")
         
         try:
-            response = self.make_request("GET", "/tipster/landings/houses/ES", token=self.tipster_token)
+            response = await self.make_request("GET", "/tipster/landings/houses/ES", token=self.tipster_token)
             
             if response.status_code == 200:
                 houses = response.json()
@@ -215,7 +156,7 @@ class NewAffiliateTester:
             self.log(f"❌ Tipster houses for Spain test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_create_campaign(self) -> bool:
+    async def test_tipster_create_campaign(self) -> bool:
         """Test POST /api/tipster/landings - Create Campaign/Landing without promotionId"""
         self.log("=== Testing Tipster - Create Campaign/Landing ===")
         
@@ -242,7 +183,7 @@ class NewAffiliateTester:
         }
         
         try:
-            response = self.make_request("POST", "/tipster/landings", campaign_data, token=self.tipster_token)
+            response = await self.make_request("POST", "/tipster/landings", campaign_data, token=self.tipster_token)
             
             if response.status_code in [200, 201]:
                 result = response.json()
@@ -271,14 +212,14 @@ class NewAffiliateTester:
             self.log(f"❌ Create campaign test failed: {str(e)}", "ERROR")
             return False
 
-    def test_admin_stats(self) -> bool:
+    async def test_admin_stats(self) -> bool:
         """Test GET /api/admin/affiliate/stats - Admin Get Stats"""
         self.log("=== Testing Admin - Get Stats ===")
         
         try:
             # Test with date range parameters
             params = "?startDate=2024-01-01&endDate=2025-12-31"
-            response = self.make_request("GET", f"/admin/affiliate/stats{params}", token=self.admin_token)
+            response = await self.make_request("GET", f"/admin/affiliate/stats{params}", token=self.admin_token)
             
             if response.status_code == 200:
                 stats = response.json()
@@ -314,14 +255,14 @@ class NewAffiliateTester:
             self.log(f"❌ Admin stats test failed: {str(e)}", "ERROR")
             return False
 
-    def test_tipster_stats(self) -> bool:
+    async def test_tipster_stats(self) -> bool:
         """Test GET /api/affiliate/tipster/stats - Tipster Get Own Stats"""
         self.log("=== Testing Tipster - Get Own Stats ===")
         
         try:
             # Test with date range parameters
             params = "?startDate=2024-01-01&endDate=2025-12-31"
-            response = self.make_request("GET", f"/affiliate/tipster/stats{params}", token=self.tipster_token)
+            response = await self.make_request("GET", f"/affiliate/tipster/stats{params}", token=self.tipster_token)
             
             if response.status_code == 200:
                 stats = response.json()
@@ -355,16 +296,18 @@ class NewAffiliateTester:
             self.log(f"❌ Tipster stats test failed: {str(e)}", "ERROR")
             return False
 
-    def run_new_affiliate_tests(self) -> Dict[str, bool]:
+    async def run_new_affiliate_tests(self) -> Dict[str, bool]:
         """Run all new affiliate system architecture tests"""
         self.log("🚀 Starting AFFILIA-GO New Affiliate System Architecture Tests")
         self.log("=" * 70)
         
         results = {}
         
-        # 1. Authentication Tests
-        results["admin_login"] = self.test_admin_login()
-        results["tipster_login"] = self.test_tipster_login()
+        # 1. Authentication Tests (independent logins)
+        results.update(await self.run_concurrently({
+            "admin_login": self.test_admin_login,
+            "tipster_login": self.test_tipster_login,
+        }))
         
         if not results["admin_login"]:
             self.log("❌ Admin authentication failed - skipping admin tests", "ERROR")
@@ -372,35 +315,23 @@ class NewAffiliateTester:
         if not results["tipster_login"]:
             self.log("❌ Tipster authentication failed - skipping tipster tests", "ERROR")
         
-        # 2. Admin - Betting Houses (no campaigns anymore)
-        if results["admin_login"]:
-            results["admin_betting_houses"] = self.test_admin_betting_houses()
-        else:
-            results["admin_betting_houses"] = False
-        
-        # 3. Tipster - Get Available Houses for Country
-        if results["tipster_login"]:
-            results["tipster_houses_for_country"] = self.test_tipster_houses_for_country()
-        else:
-            results["tipster_houses_for_country"] = False
+        # 2-3. Admin betting houses and tipster houses for country (both look up a house ID)
+        results.update(await self.run_concurrently({
+            "admin_betting_houses": self.only_if(results["admin_login"], self.test_admin_betting_houses),
+            "tipster_houses_for_country": self.only_if(results["tipster_login"], self.test_tipster_houses_for_country),
+        }))
         
         # 4. Tipster - Create Campaign/Landing (without promotionId)
         if results["tipster_login"]:
-            results["tipster_create_campaign"] = self.test_tipster_create_campaign()
+            results["tipster_create_campaign"] = await self.test_tipster_create_campaign()
         else:
             results["tipster_create_campaign"] = False
         
-        # 5. Admin - Get Stats (should show tipster campaigns)
-        if results["admin_login"]:
-            results["admin_stats"] = self.test_admin_stats()
-        else:
-            results["admin_stats"] = False
-        
-        # 6. Tipster - Get Own Stats
-        if results["tipster_login"]:
-            results["tipster_stats"] = self.test_tipster_stats()
-        else:
-            results["tipster_stats"] = False
+        # 5-6. Admin and Tipster stats (should show the new campaign)
+        results.update(await self.run_concurrently({
+            "admin_stats": self.only_if(results["admin_login"], self.test_admin_stats),
+            "tipster_stats": self.only_if(results["tipster_login"], self.test_tipster_stats),
+        }))
         
         return results
 
@@ -410,7 +341,7 @@ def main():
     
     try:
         # Run the new affiliate system tests
-        results = tester.run_new_affiliate_tests()
+        results = tester.run(tester.run_new_affiliate_tests)
         
         # Print summary
         print("\n" + "=" * 70)
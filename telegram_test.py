@@ -4,11 +4,13 @@ AFFILIA-GO Platform Telegram Bot API Testing
 Tests Telegram Bot integration for the platform
 """
 
-import requests
+import asyncio
 import json
 import sys
 from typing import Dict, Any, Optional
 
+from harness import BaseTester
+
 # Configuration
 BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -17,73 +19,16 @@ API_BASE = f"{BASE_URL}/api"
 TIPSTER_EMAIL = "fausto.perez@antia.com"
 TIPSTER_PASSWORD = "Tipster123!"
 
-class TelegramBotTester:
+class TelegramBotTester(BaseTester):
     def __init__(self):
-        self.session = requests.Session()
-        self.access_token = None
-        
-    def log(self, message: str, level: str = "INFO"):
-        """Log test messages"""
-        print(f"[{level}] {message}")
-        
-    def make_request(self, method: str, endpoint: str, data: Dict = None, 
-                    headers: Dict = None, use_auth: bool = True, timeout: int = 10) -> requests.Response:
-        """Make HTTP request with proper headers"""
-        url = f"{API_BASE}{endpoint}"
-        
-        # Default headers
-        req_headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
+        super().__init__(API_BASE, timeout=10)
         
-        # Add auth header if token available and requested
-        if use_auth and self.access_token:
-            req_headers["Authorization"] = f"Bearer {self.access_token}"
-            
-        # Merge with provided headers
-        if headers:
-            req_headers.update(headers)
-            
-        self.log(f"Making {method} request to {url}")
-        if data:
-            self.log(f"Request data: {json.dumps(data, indent=2)}")
-            
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data if data else None,
-                headers=req_headers,
-                timeout=timeout
-            )
-            
-            self.log(f"Response status: {response.status_code}")
-            
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
-            except:
-                self.log(f"Response text: {response.text}")
-                
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {str(e)}", "ERROR")
-            raise
-
-    def test_login(self) -> bool:
+    async def test_login(self) -> bool:
         """Test authentication with tipster credentials"""
         self.log("=== Testing Authentication ===")
         
-        login_data = {
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data, use_auth=False)
+            response = await self.login("tipster", TIPSTER_EMAIL, TIPSTER_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -105,12 +50,12 @@ class TelegramBotTester:
             self.log(f"❌ Login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_telegram_bot_status(self) -> bool:
+    async def test_telegram_bot_status(self) -> bool:
         """Test Telegram bot status endpoint (P0)"""
         self.log("=== Testing Telegram Bot Status (P0) ===")
         
         try:
-            response = self.make_request("GET", "/telegram/status", use_auth=False, timeout=60)
+            response = await self.make_request("GET", "/telegram/status", use_auth=False, timeout=60)
             
             if response.status_code == 200:
                 status = response.json()
@@ -164,12 +109,12 @@ class TelegramBotTester:
             self.log(f"❌ Telegram bot status test failed: {str(e)}", "ERROR")
             return False
 
-    def test_health_check(self) -> bool:
+    async def test_health_check(self) -> bool:
         """Test main health check endpoint (P0)"""
         self.log("=== Testing Health Check (P0) ===")
         
         try:
-            response = self.make_request("GET", "/health", use_auth=False)
+            response = await self.make_request("GET", "/health", use_auth=False)
             
             if response.status_code == 200:
                 health = response.json()
@@ -196,12 +141,12 @@ class TelegramBotTester:
             self.log(f"❌ Health check test failed: {str(e)}", "ERROR")
             return False
 
-    def test_telegram_channel_info_with_auth(self) -> bool:
+    async def test_telegram_channel_info_with_auth(self) -> bool:
         """Test Telegram channel info endpoint with authentication"""
         self.log("=== Testing Telegram Channel Info (with auth) ===")
         
         try:
-            response = self.make_request("GET", "/telegram/channel-info")
+            response = await self.make_request("GET", "/telegram/channel-info")
             
             if response.status_code == 200:
                 channel_info = response.json()
@@ -221,13 +166,13 @@ class TelegramBotTester:
             self.log(f"❌ Telegram channel info test failed: {str(e)}", "ERROR")
             return False
 
-    def test_telegram_webhook_endpoint(self) -> bool:
+    async def test_telegram_webhook_endpoint(self) -> bool:
         """Test Telegram webhook endpoint"""
         self.log("=== Testing Telegram Webhook Endpoint ===")
         
         try:
             # Test with empty body as specified in review request
-            response = self.make_request("POST", "/telegram/webhook", {}, use_auth=False, timeout=15)
+            response = await self.make_request("POST", "/telegram/webhook", {}, use_auth=False, timeout=15)
             
             if response.status_code == 200:
                 result = response.json()
@@ -249,24 +194,24 @@ class TelegramBotTester:
             self.log(f"❌ Telegram webhook test failed: {str(e)}", "ERROR")
             return False
 
-    def run_telegram_tests(self) -> Dict[str, bool]:
+    async def run_telegram_tests(self) -> Dict[str, bool]:
         """Run all Telegram bot tests"""
         self.log("🚀 Starting AFFILIA-GO Telegram Bot Tests")
         self.log("=" * 60)
         
         results = {}
         
-        # P0 Tests - Critical
-        results["health_check"] = self.test_health_check()
-        results["telegram_bot_status"] = self.test_telegram_bot_status()
-        results["telegram_webhook"] = self.test_telegram_webhook_endpoint()
-        
-        # Authentication Test
-        results["login"] = self.test_login()
+        # P0 Tests - Critical, plus Authentication (all independent)
+        results.update(await self.run_concurrently({
+            "health_check": self.test_health_check,
+            "telegram_bot_status": self.test_telegram_bot_status,
+            "telegram_webhook": self.test_telegram_webhook_endpoint,
+            "login": self.test_login,
+        }))
         
         # Authenticated Tests
         if results["login"]:
-            results["telegram_channel_info"] = self.test_telegram_channel_info_with_auth()
+            results["telegram_channel_info"] = await self.test_telegram_channel_info_with_auth()
         else:
             self.log("❌ Authentication failed - skipping authenticated tests", "ERROR")
             results["telegram_channel_info"] = False
@@ -278,7 +223,7 @@ def main():
     tester = TelegramBotTester()
     
     try:
-        results = tester.run_telegram_tests()
+        results = tester.run(tester.run_telegram_tests)
         
         # Print summary
         print("\n" + "=" * 60)
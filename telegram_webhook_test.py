@@ -6,6 +6,7 @@ Tests webhook configuration and message handling flows
 
 import requests
 import json
+import os
 import sys
 import subprocess
 from typing import Dict, Any, Optional
@@ -15,6 +16,8 @@ BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 WEBHOOK_URL = f"{BASE_URL}/api/telegram/webhook"
 BOT_TOKEN = "8422601694:AAHiM9rnHgufLkeLKrNe28aibFZippxGr-k"
 BOT_USERNAME = "Antiabetbot"
+# Local Bot API stand-in (python -m harness.telegram_stub) for offline runs
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE_URL", "https://api.telegram.org")
 
 # Real product ID from MongoDB
 REAL_PRODUCT_ID = "6941ab8bc37d0aa47ab23ef8"
@@ -63,7 +66,7 @@ class TelegramWebhookTester:
         
         try:
             # Call Telegram API to get webhook info
-            telegram_api_url = f"https://api.telegram.org/bot{BOT_TOKEN}/getWebhookInfo"
+            telegram_api_url = f"{TELEGRAM_API_BASE}/bot{BOT_TOKEN}/getWebhookInfo"
             response = self.session.get(telegram_api_url, timeout=30)
             
             if response.status_code == 200:
@@ -401,4 +404,9 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        # Replay mode: python telegram_webhook_test.py replay --rate 50 --burst-size 200 --burst-every 10
+        from harness.webhook_replay import main as replay_main
+        replay_main(["--api-base", f"{BASE_URL}/api"] + sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
@@ -4,10 +4,12 @@ Telegram Publication Channel Feature Testing
 Tests the new publication channel endpoints for tipsters
 """
 
-import requests
+import asyncio
 import json
 import sys
 
+from harness import BaseTester
+
 # Configuration
 BASE_URL = "https://campaign-tracker-47.preview.emergentagent.com"
 API_BASE = f"{BASE_URL}/api"
@@ -16,73 +18,16 @@ API_BASE = f"{BASE_URL}/api"
 TIPSTER_EMAIL = "fausto.perez@antia.com"
 TIPSTER_PASSWORD = "Tipster123!"
 
-class PublicationChannelTester:
+class PublicationChannelTester(BaseTester):
     def __init__(self):
-        self.session = requests.Session()
-        self.access_token = None
-        
-    def log(self, message: str, level: str = "INFO"):
-        """Log test messages"""
-        print(f"[{level}] {message}")
-        
-    def make_request(self, method: str, endpoint: str, data: dict = None, 
-                    headers: dict = None, use_auth: bool = True) -> requests.Response:
-        """Make HTTP request with proper headers"""
-        url = f"{API_BASE}{endpoint}"
-        
-        # Default headers
-        req_headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
+        super().__init__(API_BASE)
         
-        # Add auth header if token available and requested
-        if use_auth and self.access_token:
-            req_headers["Authorization"] = f"Bearer {self.access_token}"
-            
-        # Merge with provided headers
-        if headers:
-            req_headers.update(headers)
-            
-        self.log(f"Making {method} request to {url}")
-        if data:
-            self.log(f"Request data: {json.dumps(data, indent=2)}")
-            
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data if data else None,
-                headers=req_headers,
-                timeout=30
-            )
-            
-            self.log(f"Response status: {response.status_code}")
-            
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                self.log(f"Response data: {json.dumps(response_data, indent=2)}")
-            except:
-                self.log(f"Response text: {response.text}")
-                
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            self.log(f"Request failed: {str(e)}", "ERROR")
-            raise
-            
-    def test_login(self) -> bool:
+    async def test_login(self) -> bool:
         """Test authentication with tipster credentials"""
         self.log("=== Testing Authentication ===")
         
-        login_data = {
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        }
-        
         try:
-            response = self.make_request("POST", "/auth/login", login_data, use_auth=False)
+            response = await self.login("tipster", TIPSTER_EMAIL, TIPSTER_PASSWORD)
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -104,12 +49,12 @@ class PublicationChannelTester:
             self.log(f"❌ Login test failed: {str(e)}", "ERROR")
             return False
 
-    def test_get_publication_channel(self) -> bool:
+    async def test_get_publication_channel(self) -> bool:
         """Test GET /api/telegram/publication-channel - Get current publication channel config"""
         self.log("=== Testing Get Publication Channel ===")
         
         try:
-            response = self.make_request("GET", "/telegram/publication-channel")
+            response = await self.make_request("GET", "/telegram/publication-channel")
             
             if response.status_code == 200:
                 channel_info = response.json()
@@ -133,7 +78,7 @@ class PublicationChannelTester:
             self.log(f"❌ Get publication channel test failed: {str(e)}", "ERROR")
             return False
 
-    def test_set_publication_channel(self) -> bool:
+    async def test_set_publication_channel(self) -> bool:
         """Test POST /api/telegram/publication-channel - Set publication channel"""
         self.log("=== Testing Set Publication Channel ===")
         
@@ -144,7 +89,7 @@ class PublicationChannelTester:
         }
         
         try:
-            response = self.make_request("POST", "/telegram/publication-channel", channel_data)
+            response = await self.make_request("POST", "/telegram/publication-channel", channel_data)
             
             if response.status_code == 200 or response.status_code == 201:
                 result = response.json()
@@ -169,13 +114,13 @@ class PublicationChannelTester:
             self.log(f"❌ Set publication channel test failed: {str(e)}", "ERROR")
             return False
 
-    def test_publish_product_to_telegram(self) -> bool:
+    async def test_publish_product_to_telegram(self) -> bool:
         """Test POST /api/products/:id/publish-telegram - Publish product to Telegram"""
         self.log("=== Testing Publish Product to Telegram ===")
         
         # First get a product ID from the tipster's products
         try:
-            products_response = self.make_request("GET", "/products/my")
+            products_response = await self.make_request("GET", "/products/my")
             
             if products_response.status_code != 200:
                 self.log("❌ Could not get products list for publish test", "ERROR")
@@ -195,7 +140,7 @@ class PublicationChannelTester:
             self.log(f"Using product ID: {product_id} for publish test")
             
             # Test publishing to Telegram
-            response = self.make_request("POST", f"/products/{product_id}/publish-telegram")
+            response = await self.make_request("POST", f"/products/{product_id}/publish-telegram")
             
             if response.status_code == 200 or response.status_code == 201:
                 result = response.json()
@@ -221,12 +166,12 @@ class PublicationChannelTester:
             self.log(f"❌ Publish product to Telegram test failed: {str(e)}", "ERROR")
             return False
 
-    def test_delete_publication_channel(self) -> bool:
+    async def test_delete_publication_channel(self) -> bool:
         """Test DELETE /api/telegram/publication-channel - Remove publication channel"""
         self.log("=== Testing Delete Publication Channel ===")
         
         try:
-            response = self.make_request("DELETE", "/telegram/publication-channel")
+            response = await self.make_request("DELETE", "/telegram/publication-channel")
             
             if response.status_code == 200:
                 result = response.json()
@@ -247,7 +192,7 @@ class PublicationChannelTester:
             self.log(f"❌ Delete publication channel test failed: {str(e)}", "ERROR")
             return False
 
-    def run_tests(self):
+    async def run_tests(self):
         """Run all publication channel tests"""
         self.log("🚀 Starting Telegram Publication Channel Tests")
         self.log(f"Testing against: {API_BASE}")
@@ -255,19 +200,19 @@ class PublicationChannelTester:
         results = {}
         
         # Test authentication first
-        results["login"] = self.test_login()
+        results["login"] = await self.test_login()
         if not results["login"]:
             self.log("❌ Authentication failed - stopping tests", "ERROR")
             return results
             
         # Test publication channel endpoints
-        results["get_publication_channel"] = self.test_get_publication_channel()
-        results["set_publication_channel"] = self.test_set_publication_channel()
-        results["publish_product_to_telegram"] = self.test_publish_product_to_telegram()
-        results["delete_publication_channel"] = self.test_delete_publication_channel()
+        results["get_publication_channel"] = await self.test_get_publication_channel()
+        results["set_publication_channel"] = await self.test_set_publication_channel()
+        results["publish_product_to_telegram"] = await self.test_publish_product_to_telegram()
+        results["delete_publication_channel"] = await self.test_delete_publication_channel()
         
         # Final verification
-        results["verify_publication_channel_deleted"] = self.test_get_publication_channel()
+        results["verify_publication_channel_deleted"] = await self.test_get_publication_channel()
         
         # Print summary
         self.log("\n" + "="*50)
@@ -294,7 +239,7 @@ class PublicationChannelTester:
 
 def main():
     tester = PublicationChannelTester()
-    results = tester.run_tests()
+    results = tester.run(tester.run_tests)
     
     # Exit with error code if any tests failed
     if not all(results.values()):
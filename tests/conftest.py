@@ -0,0 +1,57 @@
+"""
+Shared fixtures for the API test suites
+The tipster login goes through the harness token store, so one token is reused across
+test classes (and across runs when ANTIA_TOKEN_CACHE is set) instead of logging in per class.
+"""
+
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness.token_store import credential_key, default_token_store
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://campaign-tracker-47.preview.emergentagent.com')
+
+# Test credentials
+TIPSTER_EMAIL = "fausto.perez@antia.com"
+TIPSTER_PASSWORD = "Tipster123!"
+
+
+@pytest.fixture(scope="session")
+def auth_token():
+    """Get authentication token for tipster"""
+    store = default_token_store()
+    key = credential_key("tipster", TIPSTER_EMAIL, TIPSTER_PASSWORD)
+
+    data = store.get(key)
+    if data is None:
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "email": TIPSTER_EMAIL,
+            "password": TIPSTER_PASSWORD
+        })
+
+        if response.status_code not in [200, 201]:
+            pytest.skip(f"Authentication failed: {response.status_code} - {response.text}")
+
+        data = response.json()
+        store.put(key, data)
+
+    token = data.get("access_token") or data.get("token")
+    if not token:
+        pytest.skip(f"No token in response: {data}")
+
+    print(f"✅ Authenticated as {TIPSTER_EMAIL}")
+    return token
+
+
+@pytest.fixture(scope="session")
+def auth_headers(auth_token):
+    """Get headers with auth token"""
+    return {
+        "Authorization": f"Bearer {auth_token}",
+        "Content-Type": "application/json"
+    }
@@ -0,0 +1,475 @@
+"""
+Test suite for the shared test harness (no backend required)
+- StepGraph: dependency ordering, parallelism and skip handling
+- LatencyHistogram: percentile accuracy, coordinated-omission correction, merging
+- TelegramStub: Bot API responses, 429 throttling, call recording
+- TokenStore: exp-based reuse, on-disk persistence, single-flight logins, re-login on 401
+- ExchangeLog: deferred and sampled request logging
+- run_workers: multiprocess load with merged histograms
+- webhook_replay: burst schedule, update_id renumbering, seeded update mix
+- seeder: synthetic documents stay consistent with the seeded dimensions
+- bench: baseline comparison flags only significant regressions
+"""
+
+import asyncio
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harness import ApiClient, BaseTester, ExchangeLog, LatencyHistogram, Step, StepGraph, StubConfig, TelegramStub
+from harness.load import Operation
+from harness.token_store import TokenStore, credential_key
+from harness.webhook_replay import DEFAULT_UPDATE_MIX, RecordedUpdates, UpdateCorpus, burst_offsets, update_kind
+from harness.workers import WorkerPlan, run_workers
+
+
+class State:
+    """Plain tester-like state holder"""
+    token = None
+    landing_id = None
+
+
+class TestStepGraph:
+    """Dependency-graph scheduler for chained test steps"""
+
+    def test_consumer_waits_for_producer_and_independent_steps_overlap(self):
+        """A consumer starts after its producer; unrelated steps run at the same time"""
+        state = State()
+        events = []
+
+        async def login():
+            await asyncio.sleep(0.05)
+            state.token = "jwt"
+            events.append("login")
+            return True
+
+        async def slow_admin():
+            events.append("admin-start")
+            await asyncio.sleep(0.1)
+            events.append("admin-end")
+            return True
+
+        async def landings():
+            events.append(f"landings:{state.token}")
+            return True
+
+        graph = StepGraph([
+            Step("admin", slow_admin),
+            Step("login", login, produces=("token",)),
+            Step("landings", landings, consumes=("token",)),
+        ], state=state)
+        results = asyncio.run(graph.run())
+
+        assert results == {"admin": True, "login": True, "landings": True}
+        assert events.index("login") < events.index("landings:jwt")
+        assert events.index("landings:jwt") < events.index("admin-end")
+
+    def test_missing_input_skips_consumer_with_skip_result(self):
+        """A failed producer skips its consumers; skip_result decides what is recorded"""
+        state = State()
+
+        async def fails():
+            return False
+
+        async def never():
+            raise AssertionError("consumer should not run")
+
+        graph = StepGraph([
+            Step("tipster_landings", fails, produces=("landing_id",)),
+            Step("metrics", never, consumes=("landing_id",), skip_result=True),
+            Step("detail", never, consumes=("landing_id",), skip_result=None),
+        ], state=state)
+        results = asyncio.run(graph.run())
+
+        assert results == {"tipster_landings": False, "metrics": True}
+
+    def test_after_orders_steps_regardless_of_outcome(self):
+        """after= waits for a step to finish even when it failed"""
+        order = []
+
+        async def update():
+            order.append("update")
+            raise RuntimeError("boom")
+
+        async def delete():
+            order.append("delete")
+            return True
+
+        graph = StepGraph([
+            Step("delete", delete, after=("update",)),
+            Step("update", update),
+        ])
+        results = asyncio.run(graph.run())
+
+        assert order == ["update", "delete"]
+        assert results == {"delete": True, "update": False}
+
+    def test_cycle_is_rejected(self):
+        """Cyclic declarations fail before anything runs"""
+        async def noop():
+            return True
+
+        with pytest.raises(ValueError):
+            StepGraph([
+                Step("a", noop, consumes=("x",), produces=("y",)),
+                Step("b", noop, consumes=("y",), produces=("x",)),
+            ])
+
+
+class TestLatencyHistogram:
+    """HDR-style latency histogram"""
+
+    def test_percentiles_within_precision(self):
+        """Percentiles stay within the configured 3 significant figures"""
+        rng = random.Random(7)
+        values = sorted(rng.randint(100, 2_000_000) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for percentile in (50, 90, 99, 99.9):
+            exact = values[int(percentile / 100 * len(values)) - 1]
+            assert abs(histogram.value_at_percentile(percentile) - exact) <= exact * 0.002
+        assert histogram.max_value == values[-1]
+
+    def test_record_corrected_backfills_stalled_samples(self):
+        """A 1s stall with a 100ms expected interval adds the 9 missed samples"""
+        histogram = LatencyHistogram()
+        histogram.record_corrected(1_000_000, 100_000)
+
+        assert histogram.total_count == 10
+        assert histogram.min_value == 100_000
+        assert histogram.value_at_percentile(50) < 600_000
+
+    def test_merge_and_snapshot_round_trip(self):
+        """Snapshots survive to_dict/from_dict and merge like one histogram"""
+        first, second, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 5000, 7):
+            first.record(value)
+            combined.record(value)
+        for value in range(3000, 90000, 11):
+            second.record(value)
+            combined.record(value)
+
+        merged = LatencyHistogram.from_dict(first.to_dict())
+        merged.merge(LatencyHistogram.from_dict(second.to_dict()))
+
+        assert merged.total_count == combined.total_count
+        assert merged.summary() == combined.summary()
+
+
+class TestTelegramStub:
+    """Local Telegram Bot API stand-in"""
+
+    def test_per_chat_limit_returns_retry_after_and_records_calls(self):
+        """A second message to the same chat within a second gets a 429 with retry_after"""
+        async def scenario():
+            async with TelegramStub(StubConfig(per_chat_rate=1), port=0) as stub:
+                async with ApiClient(stub.base_url) as api:
+                    first = await api.request("POST", "/botTOKEN/sendMessage", {"chat_id": 42, "text": "hola"})
+                    second = await api.request("POST", "/botTOKEN/sendMessage", {"chat_id": 42, "text": "hola"})
+                    other = await api.request("GET", "/botTOKEN/sendMessage?chat_id=7&text=hola")
+                return stub, first.json(), second, other.status_code
+
+        stub, first, second, other_status = asyncio.run(scenario())
+
+        assert first["ok"] and first["result"]["chat"]["id"] == 42
+        assert second.status_code == 429
+        assert second.json()["parameters"]["retry_after"] == 1
+        assert other_status == 200
+        assert stub.count("sendMessage") == 3
+        assert [call.status for call in stub.calls_to("sendMessage")] == [200, 429, 200]
+
+    def test_failure_injection_and_unknown_method(self):
+        """failure_rate=1 fails every call; unknown methods answer 404 like Telegram"""
+        async def scenario():
+            async with TelegramStub(StubConfig(method_failure_rate={"banChatMember": 1.0}), port=0) as stub:
+                async with ApiClient(stub.base_url) as api:
+                    banned = await api.request("POST", "/botTOKEN/banChatMember", {"chat_id": -100, "user_id": 1})
+                    link = await api.request("POST", "/botTOKEN/createChatInviteLink",
+                                             {"chat_id": -100, "creates_join_request": True})
+                    unknown = await api.request("GET", "/botTOKEN/sendDice?chat_id=1")
+                return banned.status_code, link.json(), unknown.status_code
+
+        banned_status, link, unknown_status = asyncio.run(scenario())
+
+        assert banned_status in (500, 502)
+        assert link["result"]["creates_join_request"] is True
+        assert unknown_status == 404
+
+
+def make_jwt(exp: float) -> str:
+    """Unsigned JWT with the given exp claim"""
+    def encode(part: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip("=")
+    return f"{encode({'alg': 'HS256'})}.{encode({'id': 'u1', 'exp': int(exp)})}.sig"
+
+
+class TestTokenStore:
+    """JWT token cache shared across testers and runs"""
+
+    def test_reuses_until_refresh_margin_and_persists(self, tmp_path):
+        """Fresh tokens are reused and survive a reload; near-expiry tokens are refreshed"""
+        path = str(tmp_path / "tokens.json")
+        store = TokenStore(path, refresh_margin=60)
+        fresh = credential_key("tipster", "t@antia.com", "pw")
+        stale = credential_key("admin", "a@antia.com", "pw")
+        store.put(fresh, {"access_token": make_jwt(time.time() + 3600), "user": {"role": "TIPSTER"}})
+        store.put(stale, {"access_token": make_jwt(time.time() + 30)})
+
+        reloaded = TokenStore(path, refresh_margin=60)
+
+        assert reloaded.get(fresh)["user"]["role"] == "TIPSTER"
+        assert reloaded.get(stale) is None
+        assert reloaded.get(credential_key("tipster", "t@antia.com", "changed")) is None
+
+    def test_concurrent_logins_share_one_request(self):
+        """Concurrent logins with one credential hit /auth/login once"""
+        logins = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            logins.append(request.url.path)
+            return httpx.Response(200, json={"access_token": make_jwt(time.time() + 3600),
+                                             "user": {"role": "ADMIN"}})
+
+        async def scenario():
+            tester = BaseTester("http://backend/api", token_store=TokenStore())
+            tester.log = lambda message, level="INFO": None
+            tester.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            responses = await asyncio.gather(*(tester.login("admin", "a@antia.com", "pw") for _ in range(5)))
+            await tester.close()
+            return responses
+
+        responses = asyncio.run(scenario())
+
+        assert logins == ["/api/auth/login"]
+        assert all(response.json()["user"]["role"] == "ADMIN" for response in responses)
+
+    def test_rejected_cached_token_is_invalidated_and_relogged(self, tmp_path):
+        """A 401 for a cached token drops it, logs in again and retries the request once"""
+        path = str(tmp_path / "tokens.json")
+        key = credential_key("tipster", "t@antia.com", "pw")
+        stale = make_jwt(time.time() + 3600)
+        fresh = make_jwt(time.time() + 7200)
+        TokenStore(path).put(key, {"access_token": stale})
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            auth = request.headers.get("Authorization")
+            calls.append((request.url.path, auth))
+            if request.url.path == "/api/auth/login":
+                return httpx.Response(200, json={"access_token": fresh})
+            return httpx.Response(200 if auth == f"Bearer {fresh}" else 401, json={})
+
+        async def scenario():
+            tester = BaseTester("http://backend/api", token_store=TokenStore(path))
+            tester.log = lambda message, level="INFO": None
+            tester.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            tester.access_token = (await tester.login("tipster", "t@antia.com", "pw")).json()["access_token"]
+            response = await tester.make_request("GET", "/tipster/landings")
+            await tester.close()
+            return tester, response
+
+        tester, response = asyncio.run(scenario())
+
+        assert response.status_code == 200
+        assert calls == [
+            ("/api/tipster/landings", f"Bearer {stale}"),
+            ("/api/auth/login", None),
+            ("/api/tipster/landings", f"Bearer {fresh}"),
+        ]
+        assert tester.access_token == fresh
+        assert TokenStore(path).get(key)["access_token"] == fresh
+
+
+class TestExchangeLog:
+    """Deferred and sampled logging in make_request"""
+
+    @staticmethod
+    def run_requests(exchange_log: ExchangeLog, paths, fail_after: bool = False):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"path": request.url.path})
+
+        async def scenario():
+            tester = BaseTester("http://backend/api", exchange_log=exchange_log)
+            tester.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            for path in paths:
+                await tester.make_request("GET", path)
+            if fail_after:
+                tester.log("❌ check failed", "ERROR")
+            await tester.close()
+
+        asyncio.run(scenario())
+
+    def test_deferred_mode_is_silent_until_a_failure(self, capsys):
+        """Nothing is printed per request; an ERROR dumps the most recent exchanges"""
+        self.run_requests(ExchangeLog("deferred", capacity=2), ["/health", "/products", "/landings"])
+        assert capsys.readouterr().out == ""
+
+        self.run_requests(ExchangeLog("deferred", capacity=2), ["/health", "/products", "/landings"],
+                          fail_after=True)
+        out = capsys.readouterr().out
+        assert "/api/health" not in out
+        assert "[DUMP] Making GET request to http://backend/api/products" in out
+        assert '"path": "/api/landings"' in out
+
+    def test_sampled_mode_uses_per_endpoint_rates(self, capsys):
+        """Ids collapse into one route key; only the sampled route is printed"""
+        exchange_log = ExchangeLog("sampled", sample_rate=0.0,
+                                   endpoint_rates={"GET /api/products/{id}": 1.0})
+        self.run_requests(exchange_log, ["/health", "/products/6941ab8bc37d0aa47ab23ef8"])
+
+        out = capsys.readouterr().out
+        assert "products/6941ab8bc37d0aa47ab23ef8" in out
+        assert "/api/health" not in out
+
+
+class GetMeScenario:
+    """Minimal load scenario for the worker test"""
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def next_operation(self) -> Operation:
+        return Operation("getMe", "GET", f"/botTOKEN/getMe?worker={self.index}")
+
+
+class TestWorkers:
+    """Multiprocess load coordinator"""
+
+    def test_workers_split_schedule_and_merge_stats(self):
+        """Every scheduled arrival is sent exactly once and lands in the merged report"""
+        stub = TelegramStub(StubConfig(latency_ms=5), port=0)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(stub.start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            plan = WorkerPlan(stub.base_url, rate=100, duration=1.0, warmup=0.2, processes=2,
+                              max_in_flight=20, connections=10, interval=0.5)
+            report = run_workers(plan, GetMeScenario)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+        assert report.errors == []
+        assert report.sent == 120
+        assert stub.count("getMe") == 120
+        assert report.stats["getMe"].latency.total_count == 100
+        assert sum(stats["getMe"].latency.total_count for stats in report.timeline.values()) == 100
+        assert {call.params["worker"] for call in stub.calls} == {"0", "1"}
+
+
+class TestWebhookReplay:
+    """Webhook replayer schedules and update sources"""
+
+    def test_burst_offsets_add_bursts_on_top_of_steady_rate(self):
+        """Bursts land together every burst_every seconds after warmup, in sorted order"""
+        offsets = list(burst_offsets(rate=10, duration=2.0, warmup=0.5, burst_size=3, burst_every=1.0))
+
+        assert len(offsets) == 25 + 2 * 3
+        assert offsets == sorted(offsets)
+        assert offsets.count(1.5) == 3 + 1
+        assert offsets.count(2.5) == 3
+        assert list(burst_offsets(rate=4, duration=1.0)) == [0.0, 0.25, 0.5, 0.75]
+
+    def test_recorded_updates_renumber_after_corpus_max(self):
+        """Replayed updates get fresh ids past the corpus maximum plus the worker offset"""
+        corpus = [{"update_id": 7, "channel_post": {"chat": {"id": -100}}},
+                  {"update_id": 9, "message": {"text": "/start x", "chat": {"type": "private"}}}]
+
+        renumbered = RecordedUpdates(corpus, update_id_offset=100, update_id_step=2)
+        kept = RecordedUpdates(corpus, keep_update_ids=True)
+
+        first, second, third = (renumbered.next_update() for _ in range(3))
+        assert [first[0], second[0], third[0]] == ["channel_post", "start", "channel_post"]
+        assert [u["update_id"] for _, u in (first, second, third)] == [110, 112, 114]
+        assert corpus[0]["update_id"] == 7
+        assert [kept.next_update()[1]["update_id"] for _ in range(3)] == [7, 9, 7]
+
+    def test_seeded_corpus_follows_mix_and_routes_like_handle_update(self):
+        """A seeded corpus picks the same kinds, follows the mix and classifies as generated"""
+        def sample(seed):
+            corpus = UpdateCorpus(seed=seed, first_update_id=1000)
+            return [corpus.next_update() for _ in range(4000)]
+
+        updates = sample(11)
+        counts = Counter(kind for kind, _ in updates)
+
+        assert [kind for kind, _ in updates] == [kind for kind, _ in sample(11)]
+        assert [u["update_id"] for _, u in updates] == list(range(1000, 5000))
+        assert all(update_kind(update) == kind for kind, update in updates)
+        for kind, share in DEFAULT_UPDATE_MIX.items():
+            assert abs(counts[kind] / len(updates) - share) < 0.03
+
+
+class TestSeeder:
+    """Scale data seeder document generation (no MongoDB required)"""
+
+    def test_events_reference_seeded_dimensions(self):
+        """Clicks point at a house shown on that landing for that country; counts split exactly"""
+        bson = pytest.importorskip("bson")
+        from harness.landing_load import DEFAULT_COUNTRY_MIX
+        from harness.seeder import DEFAULT_EVENT_MIX, EventFactory, build_dimensions, plan_events, split_counts
+
+        rng = random.Random(3)
+        dims, docs = build_dimensions(rng, "test", tipsters=20, houses=8, landings_per_tipster=2, days=30,
+                                      country_mix=DEFAULT_COUNTRY_MIX, object_id=bson.ObjectId)
+        factory = EventFactory(dims, DEFAULT_COUNTRY_MIX, rng, bson.ObjectId)
+
+        for _ in range(500):
+            click = factory.build("landing_click_events")
+            assert click["landing_id"] in dims.landings[click["tipster_id"]]
+            assert click["betting_house_id"] in dims.landing_items[(click["landing_id"], click["country_context"])]
+            assert dims.start <= click["created_at"] <= dims.start + timedelta(days=31)
+        assert len(docs["tipster_affiliate_landings"]) == 40
+
+        counts = plan_events(1_000_003, DEFAULT_EVENT_MIX)
+        shares = split_counts(counts, 3)
+        for collection, count in counts.items():
+            assert sum(share[collection] for share in shares) == count
+
+
+class TestBenchCompare:
+    """Benchmark regression gating"""
+
+    @staticmethod
+    def result(samples, throughputs):
+        return {
+            "samples_ms": samples,
+            "rounds": [{"throughput": throughput, "median_ms": 0.0} for throughput in throughputs],
+            "summary": {"median_ms": sorted(samples)[len(samples) // 2]},
+        }
+
+    def test_significant_slowdown_is_a_regression_and_noise_is_not(self):
+        """A 30% shift over 50 samples is flagged; a 3% shift or a tiny sample set is not"""
+        from harness.bench import compare
+
+        rng = random.Random(11)
+        base = [rng.gauss(100, 5) for _ in range(50)]
+        baseline = {"results": {
+            "slow": self.result(base, [10, 10.2, 9.9, 10.1, 10]),
+            "noise": self.result(base, [10, 10.2, 9.9, 10.1, 10]),
+            "few": self.result(base[:2], [10]),
+        }}
+        current = {"results": {
+            "slow": self.result([value * 1.3 for value in base], [7.7, 7.6, 7.8, 7.7, 7.9]),
+            "noise": self.result([value * 1.03 for value in base], [9.8, 10.1, 9.9, 10, 10]),
+            "few": self.result([value * 1.3 for value in base[:2]], [7.7]),
+            "added": self.result(base, [10]),
+        }}
+
+        verdicts = {verdict["name"]: verdict["status"] for verdict in compare(baseline, current)}
+
+        assert verdicts == {"slow": "regression", "noise": "unchanged", "few": "unchanged", "added": "new"}
@@ -14,9 +14,7 @@ import os
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://campaign-tracker-47.preview.emergentagent.com')
 
-# Test credentials
-TIPSTER_EMAIL = "fausto.perez@antia.com"
-TIPSTER_PASSWORD = "Tipster123!"
+# Tipster credentials and the shared auth_token/auth_headers fixtures live in conftest.py
 
 
 class TestTelegramAuthPublicEndpoints:
@@ -41,34 +39,6 @@ class TestTelegramAuthPublicEndpoints:
 class TestTelegramAuthProtectedEndpoints:
     """Test protected Telegram auth endpoints (authentication required)"""
     
-    @pytest.fixture(scope="class")
-    def auth_token(self):
-        """Get authentication token for tipster"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        })
-        
-        if response.status_code != 200 and response.status_code != 201:
-            pytest.skip(f"Authentication failed: {response.status_code} - {response.text}")
-        
-        data = response.json()
-        token = data.get("access_token") or data.get("token")
-        
-        if not token:
-            pytest.skip(f"No token in response: {data}")
-        
-        print(f"✅ Authenticated as {TIPSTER_EMAIL}")
-        return token
-    
-    @pytest.fixture(scope="class")
-    def auth_headers(self, auth_token):
-        """Get headers with auth token"""
-        return {
-            "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
-        }
-    
     def test_auth_status_returns_isConnected_field(self, auth_headers):
         """GET /api/telegram/auth/status should return auth status with isConnected field"""
         response = requests.get(
@@ -162,28 +132,6 @@ class TestTelegramAuthProtectedEndpoints:
 class TestTelegramChannelsEndpoint:
     """Test Telegram channels list endpoint"""
     
-    @pytest.fixture(scope="class")
-    def auth_token(self):
-        """Get authentication token for tipster"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        })
-        
-        if response.status_code != 200 and response.status_code != 201:
-            pytest.skip(f"Authentication failed: {response.status_code}")
-        
-        data = response.json()
-        return data.get("access_token") or data.get("token")
-    
-    @pytest.fixture(scope="class")
-    def auth_headers(self, auth_token):
-        """Get headers with auth token"""
-        return {
-            "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
-        }
-    
     def test_get_channels_returns_list(self, auth_headers):
         """GET /api/telegram/channels should return list of connected channels"""
         response = requests.get(
@@ -218,28 +166,6 @@ class TestTelegramChannelsEndpoint:
 class TestTelegramAvailableChannels:
     """Test available channels endpoint"""
     
-    @pytest.fixture(scope="class")
-    def auth_token(self):
-        """Get authentication token for tipster"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": TIPSTER_EMAIL,
-            "password": TIPSTER_PASSWORD
-        })
-        
-        if response.status_code != 200 and response.status_code != 201:
-            pytest.skip(f"Authentication failed: {response.status_code}")
-        
-        data = response.json()
-        return data.get("access_token") or data.get("token")
-    
-    @pytest.fixture(scope="class")
-    def auth_headers(self, auth_token):
-        """Get headers with auth token"""
-        return {
-            "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
-        }
-    
     def test_get_available_channels(self, auth_headers):
         """GET /api/telegram/auth/available-channels should return available channels"""
         response = requests.get(
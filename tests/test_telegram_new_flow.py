@@ -215,28 +215,6 @@ class TestAdminLogin:
 class TestTelegramAuthStatusEndpoint:
     """Test GET /api/telegram/auth/status - Protected endpoint"""
     
-    @pytest.fixture(scope="class")
-    def auth_token(self):
-        """Get authentication token for tipster"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": TIPSTER_WITH_TELEGRAM_EMAIL,
-            "password": TIPSTER_WITH_TELEGRAM_PASSWORD
-        })
-        
-        if response.status_code not in [200, 201]:
-            pytest.skip(f"Authentication failed: {response.status_code}")
-        
-        data = response.json()
-        return data.get("access_token") or data.get("token")
-    
-    @pytest.fixture(scope="class")
-    def auth_headers(self, auth_token):
-        """Get headers with auth token"""
-        return {
-            "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
-        }
-    
     def test_auth_status_returns_connected_for_tipster_with_telegram(self, auth_headers):
         """GET /api/telegram/auth/status should return isConnected=true for tipster with Telegram"""
         response = requests.get(
@@ -263,28 +241,6 @@ class TestTelegramAuthStatusEndpoint:
 class TestTelegramChannelsEndpoint:
     """Test GET /api/telegram/channels - Protected endpoint"""
     
-    @pytest.fixture(scope="class")
-    def auth_token(self):
-        """Get authentication token for tipster"""
-        response = requests.post(f"{BASE_URL}/api/auth/login", json={
-            "email": TIPSTER_WITH_TELEGRAM_EMAIL,
-            "password": TIPSTER_WITH_TELEGRAM_PASSWORD
-        })
-        
-        if response.status_code not in [200, 201]:
-            pytest.skip(f"Authentication failed: {response.status_code}")
-        
-        data = response.json()
-        return data.get("access_token") or data.get("token")
-    
-    @pytest.fixture(scope="class")
-    def auth_headers(self, auth_token):
-        """Get headers with auth token"""
-        return {
-            "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
-        }
-    
     def test_get_channels_returns_list(self, auth_headers):
         """GET /api/telegram/channels should return list of connected channels"""
         response = requests.get(